@@ -0,0 +1,109 @@
+"""
+Agenda — cálculo de horários livres
+- Interpretação do expediente configurado em ClinicSettings ("08:00 - 18:00")
+- Intervalos ocupados representados em minutos do dia, ordenados e mesclados
+- Varredura linear que encaixa sessões nos intervalos livres
+
+Todas as funções deste módulo são puras (sem banco de dados), para que possam
+ser reutilizadas por qualquer rota e testadas isoladamente.
+"""
+
+import re
+from datetime import date, time
+
+# Expediente usado quando a clínica ainda não cadastrou ClinicSettings
+DEFAULT_WORKING_HOURS_WEEK = "08:00 - 18:00"
+DEFAULT_WORKING_HOURS_SATURDAY: str | None = None
+
+_HOURS_RE = re.compile(r"^\s*(\d{1,2}):(\d{2})\s*(?:-|–|às|a)\s*(\d{1,2}):(\d{2})\s*$")
+_SLOT_RE = re.compile(r"^\s*(\d+)\s*(m|min|h)?\s*$", re.IGNORECASE)
+
+MINUTES_PER_DAY = 24 * 60
+
+
+def parse_working_hours(value: str | None) -> tuple[int, int] | None:
+    """
+    Converte "08:00 - 18:00" em (480, 1080) minutos do dia.
+    Retorna None para valores vazios, inválidos ou com fim antes do início (dia fechado).
+    """
+    if not value:
+        return None
+    match = _HOURS_RE.match(value)
+    if not match:
+        return None
+    h1, m1, h2, m2 = (int(g) for g in match.groups())
+    start, end = h1 * 60 + m1, h2 * 60 + m2
+    if not (0 <= start < end <= MINUTES_PER_DAY):
+        return None
+    return start, end
+
+
+def parse_slot_minutes(value: str) -> int:
+    """Converte "50m", "50", "1h" em minutos. Lança ValueError para formatos inválidos."""
+    match = _SLOT_RE.match(value or "")
+    if not match:
+        raise ValueError(f"Duração inválida: {value!r}")
+    amount, unit = int(match.group(1)), (match.group(2) or "m").lower()
+    minutes = amount * 60 if unit == "h" else amount
+    if not (5 <= minutes <= 8 * 60):
+        raise ValueError("A duração deve estar entre 5 minutos e 8 horas.")
+    return minutes
+
+
+def working_hours_for(day: date, week: tuple[int, int] | None, saturday: tuple[int, int] | None) -> tuple[int, int] | None:
+    """Expediente do dia: segunda a sexta usa 'week', sábado usa 'saturday', domingo fechado."""
+    weekday = day.weekday()
+    if weekday == 6:
+        return None
+    return saturday if weekday == 5 else week
+
+
+def to_minutes(t: time) -> int:
+    return t.hour * 60 + t.minute
+
+
+def from_minutes(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def merge_intervals(intervals: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Ordena e mescla intervalos [início, fim) sobrepostos ou encostados."""
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def free_slots(
+    opening: tuple[int, int],
+    busy: list[tuple[int, int]],
+    slot_minutes: int,
+    not_before: int = 0,
+) -> list[int]:
+    """
+    Horários de início (em minutos) em que cabe uma sessão de slot_minutes.
+    Varre os intervalos ocupados em ordem: os horários livres são encaixados
+    em sequência a partir da abertura e, ao encontrar um bloqueio, a varredura
+    salta para o fim dele. Custo O(n) no número de intervalos ocupados.
+    """
+    open_at, close_at = opening
+    cursor = max(open_at, not_before)
+    starts: list[int] = []
+    for busy_start, busy_end in merge_intervals(busy):
+        if busy_end <= cursor:
+            continue
+        limit = min(busy_start, close_at)
+        while cursor + slot_minutes <= limit:
+            starts.append(cursor)
+            cursor += slot_minutes
+        cursor = max(cursor, busy_end)
+        if cursor >= close_at:
+            return starts
+    while cursor + slot_minutes <= close_at:
+        starts.append(cursor)
+        cursor += slot_minutes
+    return starts
@@ -1,37 +1,75 @@
 """
 Autenticação — Hash/verificação de senhas + geração/validação de JWT
 - Usa Argon2 para hash de senhas
-- Usa PyJWT (HS256) para tokens de acesso
+- Usa PyJWT para tokens de acesso: EdDSA/ES256 com kid quando há key ring (app/keyring.py),
+  senão HS256 com SECRET_KEY
+- Cache LRU de tokens já validados (SHA-256 do token → claims): a SPA reenvia o mesmo token
+  centenas de vezes por sessão; só a primeira requisição paga assinatura + claims
+- Access tokens curtos com jti; os revogados (logout) são recusados pelo conjunto em memória
+  de app/revocation.py, sem consulta ao banco
 """
 
+import asyncio
+import hashlib
+import threading
+import time
+import uuid
 import jwt
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import TYPE_CHECKING
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from app.config import settings
+from app import revocation
+from app.keyring import get_keyring
 
-# Contexto de criptografia — Argon2 com parâmetros otimizados para resposta rápida
-# memory_cost: 19456 KB (~19 MB), time_cost: 2 iterações, parallelism: 1
-pwd_context = CryptContext(
-    schemes=["argon2"],
-    deprecated="auto",
-    argon2__memory_cost=19456,
-    argon2__time_cost=2,
-    argon2__parallelism=1,
-)
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+
+@lru_cache(maxsize=1)
+def get_pwd_context() -> "CryptContext":
+    """
+    Contexto de criptografia — Argon2 com os parâmetros de ARGON2_* (config)
+    Padrão: memory_cost 19456 KB (~19 MB), time_cost 2 iterações, parallelism 1
+    Hashes com outros parâmetros seguem válidos; needs_update() aponta os que devem ser refeitos.
+    Criado no primeiro uso: passlib/argon2 ficam fora do import da aplicação (partida a frio).
+    """
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=["argon2"],
+        deprecated="auto",
+        argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+        argon2__time_cost=settings.ARGON2_TIME_COST,
+        argon2__parallelism=settings.ARGON2_PARALLELISM,
+    )
 
 # Esquema de autenticação: extrai o Bearer token do header Authorization
 security = HTTPBearer()
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Argon2 gasta dezenas de ms de CPU: nas rotas, calcula em thread para não travar o event loop."""
+    return await asyncio.get_running_loop().run_in_executor(None, get_pwd_context().hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Mesmo motivo de get_password_hash_async: a verificação Argon2 roda em thread."""
+    return await asyncio.get_running_loop().run_in_executor(
+        None, verify_password, plain_password, hashed_password
+    )
 
 
 _JWT_AUDIENCE = "clinical6p-api"
@@ -44,30 +82,107 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
         expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     to_encode["exp"] = expire
+    to_encode["jti"] = uuid.uuid4().hex   # Identifica o token na lista de revogação
     to_encode["aud"] = _JWT_AUDIENCE
     to_encode["iss"] = _JWT_ISSUER
+    signer = get_keyring().active
+    if signer is not None:
+        return jwt.encode(to_encode, signer.private_key, algorithm=signer.algorithm, headers={"kid": signer.kid})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-) -> dict:
-    """Dependência FastAPI: valida o Bearer token e retorna o payload do JWT."""
+def _decode_uncached(token: str) -> dict:
     try:
-        payload = jwt.decode(
-            credentials.credentials,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
+        ring = get_keyring()
+        if ring.active is None:
+            key, algorithm = settings.SECRET_KEY, settings.ALGORITHM
+        else:
+            # Chave escolhida pelo kid; o algoritmo vem da chave, nunca do cabeçalho do token
+            signing_key = ring.verification_key(jwt.get_unverified_header(token).get("kid"))
+            if signing_key is None:
+                raise jwt.InvalidTokenError("kid desconhecido")
+            key, algorithm = signing_key.public_key, signing_key.algorithm
+        return jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
             audience=_JWT_AUDIENCE,
             issuer=_JWT_ISSUER,
         )
-        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expirado. Faça login novamente.")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Token inválido.")
 
 
+class TokenCache:
+    """
+    LRU limitado: SHA-256 do token → (claims, exp).
+    - Só entram tokens que passaram por jwt.decode completo (assinatura, exp, aud, iss)
+    - Acerto após o exp → a entrada sai e o token vai para o jwt.decode (que devolve "expirado")
+    - Revogação não é daqui: decode_access_token consulta app/revocation.py também nos acertos
+    - clear(): descarta tudo (ex: troca de SECRET_KEY/chaves)
+    As dependências síncronas rodam no threadpool: as operações ficam sob um lock.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def decode(self, token: str) -> dict:
+        digest = self._digest(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                claims, exp = entry
+                if exp > now:
+                    self._entries.move_to_end(digest)
+                    self.hits += 1
+                    return dict(claims)  # Cópia: quem recebe pode alterar sem afetar o cache
+                del self._entries[digest]
+            self.misses += 1
+
+        claims = _decode_uncached(token)
+        with self._lock:
+            self._entries[digest] = (claims, float(claims["exp"]))
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return dict(claims)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+token_cache = TokenCache(maxsize=settings.JWT_CACHE_SIZE)
+
+
+def decode_access_token(token: str) -> dict:
+    """Valida assinatura, expiração, audience e issuer do JWT e retorna o payload (401 se inválido ou revogado)."""
+    claims = token_cache.decode(token)
+    if revocation.revocations.is_revoked(claims.get("jti")):
+        raise HTTPException(status_code=401, detail="Token revogado. Faça login novamente.")
+    return claims
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> dict:
+    """Dependência FastAPI: valida o Bearer token e retorna o payload do JWT."""
+    return decode_access_token(credentials.credentials)
+
+
 def require_role(allowed_roles: list[str]):
     """
     Factory de dependência RBAC.
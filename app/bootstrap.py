@@ -0,0 +1,120 @@
+"""
+Inicialização idempotente do admin definido nas variáveis de ambiente (ADMIN_EMAIL/ADMIN_PASSWORD)
+- Caminho comum (nada mudou desde o último deploy): duas consultas baratas, nenhum Argon2 nem escrita
+- Alguma coisa mudou (senha do ambiente, hash salvo ou parâmetros do Argon2): verifica a senha
+  contra o hash salvo e só regrava se ela não confere ou se o hash usa parâmetros antigos
+  (needs_update)
+- Roda sob advisory lock no PostgreSQL: vários workers subindo juntos → um faz o trabalho,
+  os outros esperam e encontram a marca já gravada
+
+A "marca" fica em bootstrap_state: HMAC (com SECRET_KEY) de e-mail, senha do ambiente, hash
+salvo e configuração do Argon2. A senha em texto nunca é gravada; sem a SECRET_KEY a marca
+não serve para testar senhas.
+
+Usado pelo aquecimento do lifespan (app/main.py) e pelo script create_admin.py.
+"""
+
+import hashlib
+import hmac
+import logging
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.auth import get_password_hash_async, get_pwd_context, verify_password_async
+from app.config import settings
+from app.models import BootstrapState, User
+
+logger = logging.getLogger(__name__)
+
+# Chave do pg_advisory_xact_lock (a das migrações é 726_001)
+ADVISORY_LOCK_KEY = 726_002
+
+ADMIN_STATE_KEY = "admin"
+
+# Resultados de ensure_admin
+SKIPPED   = "skipped"      # ADMIN_EMAIL/ADMIN_PASSWORD não configurados
+UNCHANGED = "unchanged"    # marca confere: nada foi verificado nem gravado
+VERIFIED  = "verified"     # senha conferida com o hash salvo; só a marca foi gravada
+CREATED   = "created"
+UPDATED   = "updated"      # senha do ambiente diferente da salva → novo hash
+REHASHED  = "rehashed"     # mesma senha, hash com parâmetros antigos do Argon2 → novo hash
+
+
+def _fingerprint(email: str, password: str, hashed_password: str) -> str:
+    message = "\0".join([email, password, hashed_password, get_pwd_context().to_string()])
+    return hmac.new(settings.SECRET_KEY.encode(), message.encode(), hashlib.sha256).hexdigest()
+
+
+async def _load_state(db: AsyncSession, email: str) -> tuple[User | None, str | None]:
+    admin = (await db.execute(
+        select(User).where(User.email == email).execution_options(populate_existing=True)
+    )).scalars().first()
+    fingerprint = await db.scalar(
+        select(BootstrapState.fingerprint).where(BootstrapState.key == ADMIN_STATE_KEY)
+    )
+    return admin, fingerprint
+
+
+def _matches(admin: User | None, fingerprint: str | None, email: str, password: str) -> bool:
+    return (
+        admin is not None
+        and fingerprint is not None
+        and hmac.compare_digest(fingerprint, _fingerprint(email, password, admin.hashed_password))
+    )
+
+
+async def ensure_admin(db: AsyncSession, email: str, password: str) -> str:
+    """Garante que o admin `email` existe e autentica com `password`; devolve o que foi feito."""
+    if not email or not password:
+        return SKIPPED
+
+    admin, fingerprint = await _load_state(db, email)
+    if _matches(admin, fingerprint, email, password):
+        await db.rollback()  # Só leitura: encerra a transação aberta pelas consultas
+        return UNCHANGED
+
+    if db.get_bind().dialect.name == "postgresql":
+        # Liberado no commit; relê o estado porque outro worker pode ter acabado de gravá-lo
+        await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        admin, fingerprint = await _load_state(db, email)
+        if _matches(admin, fingerprint, email, password):
+            await db.commit()
+            return UNCHANGED
+
+    if admin is None:
+        admin = User(
+            email=email,
+            hashed_password=await get_password_hash_async(password),
+            full_name="Administrador",
+            role="admin",
+            is_active=True,
+        )
+        db.add(admin)
+        outcome = CREATED
+    elif not await verify_password_async(password, admin.hashed_password):
+        admin.hashed_password = await get_password_hash_async(password)
+        outcome = UPDATED
+    elif get_pwd_context().needs_update(admin.hashed_password):
+        admin.hashed_password = await get_password_hash_async(password)
+        outcome = REHASHED
+    else:
+        outcome = VERIFIED
+
+    state = await db.get(BootstrapState, ADMIN_STATE_KEY)
+    if state is None:
+        state = BootstrapState(key=ADMIN_STATE_KEY)
+        db.add(state)
+    state.fingerprint = _fingerprint(email, password, admin.hashed_password)
+    await db.commit()
+
+    logger.info(f"Admin '{email}' da configuração: {outcome}.")
+    return outcome
+
+
+async def ensure_admin_from_settings(db: AsyncSession) -> str:
+    return await ensure_admin(
+        db,
+        getattr(settings, "ADMIN_EMAIL", "") or "",
+        getattr(settings, "ADMIN_PASSWORD", "") or "",
+    )
@@ -20,7 +20,23 @@ class Settings(BaseSettings):
     # JWT — obrigatório via .env ou variável de ambiente
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 480
+    # Access tokens curtos: logout/revogação valem em no máximo alguns minutos mesmo sem
+    # consultar o banco; a sessão continua via refresh token (POST /api/token/refresh)
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Assinatura assimétrica (EdDSA/ES256) com key ring e JWKS — ver app/keyring.py.
+    # Vazio: HS256 com SECRET_KEY. JWT_ACTIVE_KID vazio: assina com a privada de maior kid
+    JWT_KEYS_DIR: str = ""
+    JWT_ACTIVE_KID: str = ""
+    # Tokens já validados mantidos em memória por processo (LRU; ver TokenCache em app/auth.py)
+    JWT_CACHE_SIZE: int = 4096
+
+    # Argon2 (hash de senhas). Recomendação para o hardware: "python -m scripts.argon2_calibrate".
+    # Mudar não obriga ninguém a trocar a senha: hashes antigos continuam válidos e são
+    # refeitos com os novos parâmetros no próximo login (ver app/password_rehash.py)
+    ARGON2_MEMORY_COST: int = 19456   # KiB
+    ARGON2_TIME_COST: int = 2
+    ARGON2_PARALLELISM: int = 1
 
     # CORS — domínios permitidos separados por vírgula
     ALLOWED_ORIGINS: str = "http://localhost:8000"
@@ -31,18 +47,36 @@ class Settings(BaseSettings):
     # URL base da aplicação — usada em links de e-mail (reset de senha, etc.)
     APP_BASE_URL: str = "https://clinicapsi.onrender.com"
 
+    # Migrações do esquema na inicialização. Com false, a aplicação só sobe se o esquema
+    # já estiver em dia (migrações rodadas antes, via "python -m app.migrations")
+    AUTO_MIGRATE: bool = True
+
+    # Perfil de inicialização: tempos de import e das etapas do lifespan no log e em /ready
+    STARTUP_PROFILE: bool = False
+
     # Bootstrap do admin — definir via variável de ambiente, nunca hardcoded
     ADMIN_EMAIL: str = ""
     ADMIN_PASSWORD: str = ""
 
+    # Rate limiting — onde guardar os baldes de tokens:
+    # bucket+memory:// (1 processo), bucket+sqlite:///ratelimit.db (vários workers no mesmo host),
+    # bucket+redis://host:6379/0 (vários hosts; requer o pacote 'redis')
+    RATE_LIMIT_STORAGE_URI: str = "bucket+memory://"
+
+    # Agenda — duração padrão de uma sessão (usada na disponibilidade e em conflitos de horário)
+    APPOINTMENT_DURATION_MINUTES: int = 50
+
     # Groq (IA para resumo de mensagens)
     GROQ_API_KEY: str = ""
+    # Provedor usado pelos resumos clínicos (ver app/summaries.py); "groq" por padrão
+    SUMMARY_PROVIDER: str = "groq"
 
     # SMTP (configuração padrão, pode ser sobrescrita pelo banco)
     SMTP_SERVER: str = ""
     SMTP_PORT: int = 587
     SMTP_USERNAME: str = ""
     SMTP_PASSWORD: str = ""
+    SMTP_FROM_EMAIL: str = ""  # Vazio → usa SMTP_USERNAME como remetente
     SMTP_TLS: bool = True
 
     # Resend API Key (para desviar envio SMTP em ambientes com portas bloqueadas)
@@ -0,0 +1,119 @@
+"""
+Diretório de profissionais em memória (snapshot versionado)
+- A lista de profissionais é lida em praticamente toda tela, mas muda poucas vezes por mês
+- Cada reconstrução gera um snapshot imutável (tupla + mapeamentos somente-leitura) com o
+  JSON já serializado e um ETag; as requisições compartilham o mesmo objeto, sem cópias
+- Cadastro/alteração/remoção reconstroem o snapshot deste worker e avisam os demais pelo
+  barramento de eventos (que descartam o seu e reconstroem na próxima consulta)
+- Os properties professional_name dos modelos leem o nome daqui
+- Reconstrução periódica (main.py) pega os cadastros feitos por fora da API (seed, SQL manual)
+
+O ETag é derivado do conteúdo, então todos os workers geram o mesmo valor para o mesmo diretório.
+"""
+
+import asyncio
+import hashlib
+import json
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from sqlalchemy import select
+
+from app.database import AsyncSession
+from app.events import bus
+
+EVENT_TYPE = "directory"
+
+
+@dataclass(frozen=True)
+class DirectorySnapshot:
+    version: int                            # Contador local de reconstruções (diagnóstico)
+    etag: str
+    items: tuple[Mapping[str, Any], ...]    # Ordenados por nome, no formato de ProfessionalResponse
+    by_id: Mapping[int, Mapping[str, Any]]
+    body: bytes                             # items já serializados para a resposta HTTP
+
+
+class ProfessionalDirectory:
+    def __init__(self) -> None:
+        self._snapshot: DirectorySnapshot | None = None
+        self._version = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def snapshot(self) -> DirectorySnapshot | None:
+        """Snapshot atual, ou None se ainda não construído / invalidado por outro worker."""
+        return self._snapshot
+
+    async def rebuild(self, db: AsyncSession) -> DirectorySnapshot:
+        # Importado aqui: app.models lê o diretório nos properties professional_name
+        from app.models import Professional
+        from app.schemas import ProfessionalResponse
+
+        rows = (await db.execute(select(Professional).order_by(Professional.name))).scalars().all()
+        items = tuple(
+            MappingProxyType(ProfessionalResponse.model_validate(p).model_dump(mode="json")) for p in rows
+        )
+        body = json.dumps([dict(item) for item in items], ensure_ascii=False, separators=(",", ":")).encode()
+        self._version += 1
+        snapshot = DirectorySnapshot(
+            version=self._version,
+            etag='"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+            items=items,
+            by_id=MappingProxyType({item["id"]: item for item in items}),
+            body=body,
+        )
+        self._snapshot = snapshot  # Troca de referência: leitores veem o antigo ou o novo, inteiros
+        return snapshot
+
+    async def get(self, db: AsyncSession) -> DirectorySnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        async with self._lock:
+            if self._snapshot is None:
+                await self.rebuild(db)
+            return self._snapshot
+
+    def name_of(self, professional_id: int | None) -> str | None:
+        snapshot = self._snapshot
+        if snapshot is None or professional_id is None:
+            return None
+        item = snapshot.by_id.get(professional_id)
+        return item["name"] if item else None
+
+    async def changed(self, db: AsyncSession) -> None:
+        """Chamar após o commit de cadastro/alteração/remoção de profissional."""
+        snapshot = await self.rebuild(db)
+        await bus.publish({"type": EVENT_TYPE, "etag": snapshot.etag})
+
+    def invalidate(self) -> None:
+        """Descarta o snapshot; a próxima consulta reconstrói."""
+        self._snapshot = None
+
+    def apply(self, event: dict[str, Any]) -> None:
+        # O próprio worker recebe de volta o evento que publicou: mesmo ETag, nada a fazer
+        if self._snapshot is not None and self._snapshot.etag != event.get("etag"):
+            self.invalidate()
+
+
+directory = ProfessionalDirectory()
+
+
+def professional_name(professional_id: int | None, loaded: Any = None) -> str | None:
+    """
+    Nome do profissional pelo diretório; se o snapshot não estiver disponível, usa o
+    relacionamento já carregado (loaded), como antes.
+    """
+    name = directory.name_of(professional_id)
+    if name is not None:
+        return name
+    return loaded.name if loaded is not None else None
+
+
+def _on_directory_event(event: dict[str, Any]) -> None:
+    directory.apply(event)
+
+
+bus.on(EVENT_TYPE, _on_directory_event)
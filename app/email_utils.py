@@ -9,15 +9,15 @@ Utilitários de E-mail
   · Recuperação de senha (senha provisória)
 """
 
-import smtplib
 import asyncio
 import logging
 import time
-from email.message import EmailMessage
+import uuid
 from sqlalchemy import select
 from app.config import settings
 from app.database import AsyncSession
 from app.models import SystemSettings
+from app.http_clients import registry
 
 logger = logging.getLogger(__name__)
 
@@ -77,7 +77,6 @@ async def _enviar_email(db: AsyncSession, destinatario: str, assunto: str, html:
     Retorna uma string de status: "ok" | "not_configured" | "error".
     """
     if settings.RESEND_API_KEY:
-        import httpx
         try:
             # Recupera as configurações do banco (caso o remetente esteja configurado)
             server, port, username, password, from_email = await get_smtp_settings(db)
@@ -91,7 +90,9 @@ async def _enviar_email(db: AsyncSession, destinatario: str, assunto: str, html:
 
             headers = {
                 "Authorization": f"Bearer {settings.RESEND_API_KEY}",
-                "Content-Type": "application/json"
+                "Content-Type": "application/json",
+                # Permite repetir o POST em falhas transitórias sem enviar o e-mail duas vezes
+                "Idempotency-Key": str(uuid.uuid4()),
             }
             payload = {
                 "from": remetente,
@@ -100,14 +101,13 @@ async def _enviar_email(db: AsyncSession, destinatario: str, assunto: str, html:
                 "html": html
             }
             
-            async with httpx.AsyncClient(timeout=10) as client:
-                response = await client.post("https://api.resend.com/emails", json=payload, headers=headers)
-                if response.status_code in (200, 201):
-                    logger.info(f"E-mail enviado via Resend para {destinatario}: {assunto}")
-                    return "ok"
-                else:
-                    logger.error(f"Erro na API do Resend ao enviar para {destinatario}: {response.status_code} - {response.text}")
-                    return "error"
+            response = await registry.get("resend").post("/emails", json=payload, headers=headers, retry=True)
+            if response.status_code in (200, 201):
+                logger.info(f"E-mail enviado via Resend para {destinatario}: {assunto}")
+                return "ok"
+            else:
+                logger.error(f"Erro na API do Resend ao enviar para {destinatario}: {response.status_code} - {response.text}")
+                return "error"
         except Exception as e:
             logger.error(f"Falha ao enviar e-mail via Resend para {destinatario}: {e}")
             return "error"
@@ -120,6 +120,10 @@ async def _enviar_email(db: AsyncSession, destinatario: str, assunto: str, html:
         return "not_configured"
 
     def _send() -> str:
+        # Transporte SMTP importado só quando usado (a maioria dos deploys usa o Resend)
+        import smtplib
+        from email.message import EmailMessage
+
         msg = EmailMessage()
         msg["Subject"], msg["From"], msg["To"] = assunto, from_email, destinatario
         msg.set_content(texto_plano or assunto, subtype="plain")
@@ -0,0 +1,140 @@
+"""
+Barramento de eventos em tempo real (mensagens de pacientes)
+- Pub/sub em memória: cada conexão SSE tem sua própria fila (asyncio.Queue)
+- Eventos são entregues ao profissional dono da mensagem e aos admins
+- PostgreSQL: LISTEN/NOTIFY distribui os eventos entre todos os workers
+
+- Eventos internos (ex: novos identificadores de login) vão para handlers registrados
+  com on() e nunca são entregues às conexões SSE
+
+Sem PostgreSQL (SQLite/dev, testes) o barramento funciona só dentro do processo,
+o que é suficiente para um único worker.
+"""
+
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "patient_messages"
+SUBSCRIBER_QUEUE_SIZE = 100  # Eventos pendentes por conexão; os mais antigos são descartados
+
+
+class EventBus:
+    """
+    Pub/sub em processo. Assinantes se registram por professional_id
+    (None = admin, recebe os eventos de todos os profissionais).
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: dict[int | None, set[asyncio.Queue]] = {}
+        self._handlers: dict[str, list[Callable[[dict[str, Any]], None]]] = {}
+        self._engine = None             # Definido por start_listener() no PostgreSQL
+        self._listener: asyncio.Task | None = None
+
+    @asynccontextmanager
+    async def subscribe(self, professional_id: int | None) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(professional_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            queues = self._subscribers.get(professional_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[professional_id]
+
+    def on(self, event_type: str, handler: Callable[[dict[str, Any]], None]) -> None:
+        """Registra um handler interno; eventos desse tipo não são repassados aos assinantes SSE."""
+        self._handlers.setdefault(event_type, []).append(handler)
+
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def publish_local(self, event: dict[str, Any]) -> None:
+        """Entrega o evento às filas deste processo (profissional dono + admins)."""
+        handlers = self._handlers.get(event.get("type", ""))
+        if handlers is not None:
+            for handler in handlers:
+                try:
+                    handler(event)
+                except Exception as e:
+                    logger.error(f"Erro no handler de evento '{event.get('type')}': {e}", exc_info=True)
+            return
+
+        targets = set(self._subscribers.get(None, ()))
+        prof_id = event.get("professional_id")
+        if prof_id is not None:
+            targets |= self._subscribers.get(prof_id, set())
+        for queue in targets:
+            if queue.full():
+                # Consumidor lento: descarta o evento mais antigo em vez de bloquear o publicador
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    async def publish(self, event: dict[str, Any]) -> None:
+        """
+        Publica um evento. Com o listener do PostgreSQL ativo o evento vai por NOTIFY
+        (e volta para este processo pelo LISTEN, como para os demais workers);
+        caso contrário é entregue diretamente.
+        """
+        if self._engine is None:
+            self.publish_local(event)
+            return
+        try:
+            async with self._engine.begin() as conn:
+                await conn.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": NOTIFY_CHANNEL, "payload": json.dumps(event, default=str)},
+                )
+        except Exception as e:
+            logger.warning(f"NOTIFY falhou, entregando apenas localmente: {e}")
+            self.publish_local(event)
+
+    async def start_listener(self, engine) -> None:
+        """Inicia o LISTEN em uma conexão dedicada (somente PostgreSQL)."""
+        if engine.dialect.name != "postgresql" or self._listener is not None:
+            return
+        self._engine = engine
+        self._listener = asyncio.create_task(self._listen(engine))
+
+    async def stop_listener(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        self._listener = None
+        self._engine = None
+
+    async def _listen(self, engine) -> None:
+        import psycopg
+
+        conninfo = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(conninfo, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                    logger.info("Listener de eventos (LISTEN/NOTIFY) conectado.")
+                    async for notify in conn.notifies():
+                        try:
+                            self.publish_local(json.loads(notify.payload))
+                        except ValueError:
+                            logger.warning("Payload de NOTIFY inválido ignorado.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Enquanto reconecta, os eventos publicados por este processo continuam
+                # chegando pelo fallback local de publish()
+                logger.error(f"Listener de eventos desconectado: {e}")
+                await asyncio.sleep(5)
+
+
+bus = EventBus()
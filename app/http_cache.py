@@ -0,0 +1,13 @@
+"""
+Cache HTTP condicional (ETag / If-None-Match)
+- Usado pelas respostas com ETag pré-calculado: diretório de profissionais e JWKS
+- Comparação fraca, como manda a RFC 9110 para If-None-Match: W/"x" casa com "x"
+"""
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match (RFC 9110): lista separada por vírgulas, "*" ou ETags fracas (W/"...")."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
@@ -0,0 +1,267 @@
+"""
+Clientes HTTP de saída (Resend, Groq, ...)
+- Um httpx.AsyncClient por serviço externo, criado no primeiro uso e reaproveitado
+  (pool de conexões keep-alive por host, em vez de um cliente novo por chamada);
+  o httpx só é importado nesse momento, fora da partida a frio
+- Semáforo por serviço: limita quantas chamadas rodam ao mesmo tempo
+- Timeouts, novas tentativas com backoff exponencial + jitter para falhas transitórias
+- Circuit breaker: após falhas seguidas o serviço fica "aberto" e as chamadas falham
+  na hora (sem prender requisições) até o tempo de espera passar
+- Métricas de latência por serviço (expostas em /api/debug/outbound-metrics)
+
+Toda chamada HTTP externa da aplicação deve passar por registry.get("<serviço>").
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+MAX_BACKOFF_SECONDS = 5.0
+LATENCY_WINDOW = 200          # Amostras recentes usadas para p50/p95
+
+
+class CircuitOpenError(Exception):
+    """Serviço externo com o circuito aberto — a chamada nem foi tentada."""
+
+
+class CircuitBreaker:
+    """
+    closed → (failure_threshold falhas seguidas) → open → (reset_timeout) → half-open.
+    Em half-open uma única chamada de teste é liberada: sucesso fecha, falha reabre;
+    se ela for interrompida sem resultado (cancelada, URL inválida...), release() libera
+    a vez para a próxima chamada testar.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._probing = False
+
+    def release(self) -> None:
+        """Chamada encerrada sem dizer nada sobre o serviço: não conta, só libera o teste."""
+        self._probing = False
+
+
+class LatencyStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.rejected = 0         # Recusadas pelo circuit breaker
+        self.samples: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def observe(self, elapsed_ms: float, ok: bool) -> None:
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+        self.samples.append(elapsed_ms)
+
+    def snapshot(self) -> dict[str, Any]:
+        ordered = sorted(self.samples)
+
+        def pct(p: float) -> float | None:
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 1) if ordered else None
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "rejected": self.rejected,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": round(ordered[-1], 1) if ordered else None,
+        }
+
+
+class OutboundClient:
+    """Cliente de um serviço externo: pool próprio + semáforo + retry + circuit breaker."""
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        *,
+        max_connections: int = 10,
+        max_concurrency: int = 5,
+        timeout: float = 10.0,
+        retries: int = 2,
+        backoff: float = 0.3,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        transport: "httpx.AsyncBaseTransport | None" = None,
+    ) -> None:
+        import httpx
+
+        self.name = name
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.stats = LatencyStats()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._transport_error = httpx.TransportError
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport,
+        )
+
+    def _delay(self, attempt: int, response: "httpx.Response | None") -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), MAX_BACKOFF_SECONDS)
+        # Backoff exponencial com "full jitter": espalha as novas tentativas no tempo
+        return random.uniform(0, min(self.backoff * (2 ** attempt), MAX_BACKOFF_SECONDS))
+
+    async def request(self, method: str, url: str, *, retry: bool | None = None, **kwargs: Any) -> "httpx.Response":
+        """
+        Faz a chamada. retry=None → só métodos idempotentes são repetidos; POSTs que
+        podem ser repetidos com segurança (ex: com Idempotency-Key) passam retry=True.
+        Devolve a última resposta (mesmo com erro HTTP) ou levanta a exceção de transporte.
+        """
+        attempts = 1 + (self.retries if (retry if retry is not None else method.upper() in IDEMPOTENT_METHODS) else 0)
+
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                self.stats.rejected += 1
+                raise CircuitOpenError(f"Serviço '{self.name}' indisponível (circuito aberto).")
+
+            response: "httpx.Response | None" = None
+            async with self._semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await self._client.request(method, url, **kwargs)
+                    failed = response.status_code in RETRY_STATUSES
+                    error: Exception | None = None
+                except self._transport_error as e:
+                    failed, error = True, e
+                except BaseException:
+                    # Cancelamento (cliente desconectou) ou erro que não é do serviço: sem
+                    # liberar, uma chamada de teste interrompida deixaria o circuito aberto
+                    self.breaker.release()
+                    self.stats.observe((time.perf_counter() - started) * 1000, ok=False)
+                    raise
+                self.stats.observe((time.perf_counter() - started) * 1000, ok=not failed)
+
+            if not failed:
+                self.breaker.record_success()
+                return response
+            if response is not None and response.status_code == 429:
+                self.breaker.record_success()   # Limite de uso: o serviço está no ar
+            else:
+                self.breaker.record_failure()
+
+            if attempt == attempts - 1:
+                if error is not None:
+                    raise error
+                return response
+
+            self.stats.retries += 1
+            delay = self._delay(attempt, response)
+            logger.warning(
+                f"Chamada a '{self.name}' falhou ({error or response.status_code}); "
+                f"nova tentativa em {delay:.2f}s."
+            )
+            await asyncio.sleep(delay)
+
+        raise AssertionError("unreachable")
+
+    async def get(self, url: str, **kwargs: Any) -> "httpx.Response":
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> "httpx.Response":
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+class ClientRegistry:
+    """
+    Registro dos serviços externos. Os clientes são criados sob demanda no primeiro
+    get() (ou todos de uma vez por start()) e fechados por close() no shutdown.
+    """
+
+    def __init__(self) -> None:
+        self._configs: dict[str, dict[str, Any]] = {}
+        self._clients: dict[str, OutboundClient] = {}
+
+    def register(self, name: str, base_url: str, **options: Any) -> None:
+        self._configs[name] = {"base_url": base_url, **options}
+
+    async def configure(self, name: str, **options: Any) -> None:
+        """Altera opções de um serviço (ex: transport nos testes); recria o cliente no próximo get()."""
+        self._configs[name].update(options)
+        client = self._clients.pop(name, None)
+        if client is not None:
+            await client.aclose()
+
+    def get(self, name: str) -> OutboundClient:
+        client = self._clients.get(name)
+        if client is None:
+            client = self._clients[name] = OutboundClient(name, **self._configs[name])
+        return client
+
+    async def start(self) -> None:
+        for name in self._configs:
+            self.get(name)
+        logger.info(f"Clientes HTTP de saída prontos: {', '.join(self._configs)}.")
+
+    async def close(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            name: {**client.stats.snapshot(), "circuit": client.breaker.state}
+            for name, client in self._clients.items()
+        }
+
+
+registry = ClientRegistry()
+
+# E-mails transacionais (Resend) — envios em rajada (ex: lembretes) não abrem dezenas de conexões
+registry.register("resend", "https://api.resend.com", max_concurrency=5)
+# IA de resumos (Groq, API compatível com OpenAI) — respostas lentas, timeout maior
+registry.register("groq", "https://api.groq.com/openai/v1", max_concurrency=4, timeout=60.0)
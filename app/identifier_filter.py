@@ -0,0 +1,213 @@
+"""
+Filtro de Bloom dos identificadores de login (e-mails e CPFs cadastrados)
+- Construído na inicialização e reconstruído periodicamente a partir do banco
+- Atualizado na hora quando usuários/pacientes são criados ou alterados
+  (e propagado aos demais workers pelo barramento de eventos)
+- Login e "esqueci minha senha" consultam o filtro antes do banco: identificador
+  que o filtro garante não existir é recusado sem nenhuma query
+
+O filtro não tem falso negativo (se diz "não existe", não existe), mas tem falso
+positivo (~1%): nesses casos a consulta ao banco acontece normalmente.
+
+Para não virar um oráculo de enumeração (resposta rápida = não cadastrado), a recusa
+pelo filtro espera o tempo típico do caminho "não encontrado" que passa pelo banco.
+Com o filtro pronto esse caminho quase não acontece (só nos falsos positivos), então
+cada reconstrução mede o tempo real com algumas consultas-sonda de identificadores
+inexistentes e recalibra a média.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import random
+import secrets
+import statistics
+import time
+from typing import Any, Iterable
+
+from sqlalchemy import select
+
+from app.database import AsyncSession
+from app.events import bus
+from app.models import Patient, User
+
+logger = logging.getLogger(__name__)
+
+FALSE_POSITIVE_RATE = 0.01
+MIN_CAPACITY = 1024       # Folga para os cadastros feitos entre duas reconstruções
+GROWTH_FACTOR = 2         # Capacidade = 2x os identificadores existentes
+MISS_PROBES = 5           # Consultas-sonda por reconstrução para medir o caminho "não encontrado"
+EVENT_TYPE = "identifiers"
+
+# Tipos de identificador (prefixo da chave no filtro)
+USER_EMAIL = "user_email"
+PATIENT_CPF = "patient_cpf"
+PATIENT_EMAIL = "patient_email"
+
+
+def identifier_digest(kind: str, value: str) -> bytes:
+    """SHA-256 de 'tipo:valor' — é isso que circula entre os workers, nunca o e-mail/CPF em claro."""
+    return hashlib.sha256(f"{kind}:{value}".encode("utf-8")).digest()
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom sobre um bytearray, dimensionado para `capacity` itens:
+    m = -n·ln(p) / ln(2)² bits e k = (m/n)·ln(2) funções de hash.
+    As k posições saem de um único BLAKE2b com sal aleatório por processo
+    (double hashing: h1 + i·h2), então o padrão de bits não é previsível de fora.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = FALSE_POSITIVE_RATE) -> None:
+        n = max(capacity, 1)
+        self.size = max(64, math.ceil(-n * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / n * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+        self._salt = secrets.token_bytes(16)
+
+    def _positions(self, digest: bytes) -> Iterable[int]:
+        h = hashlib.blake2b(digest, digest_size=16, key=self._salt).digest()
+        h1 = int.from_bytes(h[:8], "little")
+        h2 = int.from_bytes(h[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, digest: bytes) -> None:
+        for pos in self._positions(digest):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(digest))
+
+
+class MissLatency:
+    """
+    Média móvel exponencial do tempo do caminho "não encontrado" que consulta o banco.
+    pad() faz a recusa pelo filtro durar o mesmo (com ±10% de variação).
+    O valor inicial só vale até a primeira medição (sonda ou requisição real).
+    """
+
+    def __init__(self, initial_seconds: float = 0.005, alpha: float = 0.1) -> None:
+        self.seconds = initial_seconds
+        self.alpha = alpha
+        self.measured = False
+
+    def observe(self, elapsed: float) -> None:
+        if not self.measured:
+            self.seconds, self.measured = elapsed, True
+            return
+        self.seconds += self.alpha * (elapsed - self.seconds)
+
+    def calibrate(self, samples: list[float]) -> None:
+        """Entra com a mediana das sondas (robusta a uma consulta atípica)."""
+        if samples:
+            self.observe(statistics.median(samples))
+
+    async def pad(self, started: float) -> None:
+        remaining = self.seconds * random.uniform(0.9, 1.1) - (time.perf_counter() - started)
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+
+class IdentifierIndex:
+    """
+    Índice de identificadores de login. Enquanto não foi construído (ready=False),
+    might_contain() responde sempre True e tudo segue para o banco.
+    """
+
+    def __init__(self) -> None:
+        self._filter: BloomFilter | None = None
+        self._pending: list[bytes] | None = None   # Adições feitas durante uma reconstrução
+        self.login_miss = MissLatency()
+        self.forgot_miss = MissLatency()
+
+    @property
+    def ready(self) -> bool:
+        return self._filter is not None
+
+    async def rebuild(self, db: AsyncSession) -> int:
+        """Reconstrói o filtro com todos os identificadores do banco. Retorna quantos foram indexados."""
+        self._pending = []
+        try:
+            user_emails = (await db.execute(select(User.email).where(User.email.is_not(None)))).scalars().all()
+            patient_rows = (await db.execute(select(Patient.cpf, Patient.email))).all()
+
+            digests = [identifier_digest(USER_EMAIL, e) for e in user_emails]
+            for cpf, email in patient_rows:
+                if cpf:
+                    digests.append(identifier_digest(PATIENT_CPF, cpf))
+                if email:
+                    digests.append(identifier_digest(PATIENT_EMAIL, email))
+
+            bloom = BloomFilter(max(MIN_CAPACITY, GROWTH_FACTOR * len(digests)))
+            for digest in digests + self._pending:
+                bloom.add(digest)
+            self._filter = bloom
+        finally:
+            self._pending = None
+
+        try:
+            await self.sample_misses(db)
+        except Exception as e:
+            logger.warning(f"Medição do caminho 'não encontrado' falhou; mantendo a média anterior: {e}")
+        return len(digests)
+
+    async def sample_misses(self, db: AsyncSession, probes: int = MISS_PROBES) -> None:
+        """
+        Roda as mesmas consultas do login e do "esqueci minha senha" com identificadores
+        que não existem e recalibra login_miss/forgot_miss com o tempo medido.
+        """
+        login: list[float] = []
+        forgot: list[float] = []
+        for _ in range(probes):
+            probe = f"sonda-{secrets.token_hex(8)}@invalido"
+
+            started = time.perf_counter()
+            (await db.execute(select(User).where(User.email == probe))).scalars().first()
+            (await db.execute(select(Patient).where(Patient.cpf == probe))).scalars().first()
+            login.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            (await db.execute(select(User).where(User.email == probe))).scalars().first()
+            (await db.execute(select(Patient).where(Patient.email == probe))).scalars().first()
+            forgot.append(time.perf_counter() - started)
+
+        self.login_miss.calibrate(login)
+        self.forgot_miss.calibrate(forgot)
+
+    def add_digests(self, digests: Iterable[bytes]) -> None:
+        for digest in digests:
+            if self._pending is not None:
+                self._pending.append(digest)
+            if self._filter is not None:
+                self._filter.add(digest)
+
+    def might_contain(self, *keys: tuple[str, str]) -> bool:
+        """False = nenhum dos identificadores está cadastrado (garantido)."""
+        if self._filter is None:
+            return True
+        return any(identifier_digest(kind, value) in self._filter for kind, value in keys)
+
+    async def register(self, *keys: tuple[str, str | None]) -> None:
+        """
+        Inclui identificadores novos (chamar após o commit do cadastro/alteração).
+        Aplica localmente na hora e publica no barramento para os outros workers.
+        """
+        digests = [identifier_digest(kind, value) for kind, value in keys if value]
+        if not digests:
+            return
+        self.add_digests(digests)
+        await bus.publish({"type": EVENT_TYPE, "digests": [d.hex() for d in digests]})
+
+
+index = IdentifierIndex()
+
+
+def _on_identifiers_event(event: dict[str, Any]) -> None:
+    # Resolve o índice no momento do evento (os testes substituem `index`)
+    index.add_digests(bytes.fromhex(d) for d in event.get("digests", ()))
+
+
+bus.on(EVENT_TYPE, _on_identifiers_event)
@@ -1,13 +1,12 @@
 ﻿"""
 Script utilitário para forçar a criação das tabelas no banco de dados.
-Geralmente rodado apenas uma vez, ou a cada vez que as estruturas de
-modelos da pasta app/models.py sofrem mudança e optamos por não usar o Alembic.
+Equivale a "python -m app.migrations": aplica as migrações versionadas pendentes
+(app/migrations.py), que criam as tabelas a partir de app/models.py.
 """
 
 import asyncio
-from app.database import engine, Base
-
-import app.models  # Importa todos os modelos para que o SQLAlchemy os reconheça
+from app.database import engine
+from app import migrations
 
 
 async def init_models() -> None:
@@ -17,10 +16,7 @@ async def init_models() -> None:
     Esta função tem um único trabalho: olhar para as plantas do projeto (os arquivos na pasta Models) e construir as paredes e fundações reais no banco de dados (criar as tabelas).
     Se algo der errado ou for a primeira vez rodando o programa, chamamos o pedreiro 'init_models' para construir tudo com base no projeto.
     """
-    async with engine.begin() as conn:
-        # Remova ou comente a linha abaixo em PRODUÇÃO para não perder dados:
-        # await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
+    await migrations.upgrade(engine)
 
     print("Sucesso: Tabelas verificadas e criadas no banco de dados.")
 
@@ -0,0 +1,142 @@
+"""
+Chaves de assinatura dos JWT (key ring) para assinatura assimétrica (EdDSA/ES256)
+- JWT_KEYS_DIR aponta para um diretório com as chaves em PEM:
+    <kid>.pem       chave privada (Ed25519 → EdDSA, EC P-256 → ES256): assina e verifica
+    <kid>.pub.pem   só a chave pública de uma chave aposentada: apenas verifica
+- Assina com a chave ativa (JWT_ACTIVE_KID, ou a privada de maior kid) e coloca o kid no
+  cabeçalho; verifica escolhendo a chave pelo kid
+- As chaves são lidas e parseadas uma única vez por processo (primeiro uso); o JWKS
+  (/.well-known/jwks.json) sai pronto em bytes, com ETag
+- Sem JWT_KEYS_DIR: HS256 com SECRET_KEY (comportamento anterior), JWKS vazio
+
+Rotação sem derrubar ninguém (kids com data ordenam sozinhos):
+1. Gere a nova chave: python -m app.keyring generate --dir keys --alg EdDSA
+2. Publique o deploy: a chave nova passa a assinar; a anterior continua verificando
+3. Passado o prazo do access token (ACCESS_TOKEN_EXPIRE_MINUTES) e do cache do JWKS nos
+   serviços que o consomem, troque a anterior por <kid>.pub.pem ou remova-a
+
+Requer o pacote 'cryptography' (pyjwt[crypto]) apenas quando JWT_KEYS_DIR está configurado.
+"""
+
+import argparse
+import hashlib
+import json
+import secrets
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from app.config import settings
+
+JWKS_MAX_AGE_SECONDS = 300
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: str
+    algorithm: str                 # "EdDSA" ou "ES256"
+    public_key: Any                # Objetos já parseados (cryptography): nada de PEM por requisição
+    private_key: Any | None        # None = chave aposentada, só verifica
+    jwk: dict[str, str] = field(repr=False)
+
+
+class KeyRing:
+    def __init__(self, keys: list[SigningKey], active_kid: str | None = None) -> None:
+        self.keys = {key.kid: key for key in keys}
+        signers = sorted(key.kid for key in keys if key.private_key is not None)
+        if active_kid and active_kid not in signers:
+            raise ValueError(f"JWT_ACTIVE_KID '{active_kid}' não tem chave privada em JWT_KEYS_DIR.")
+        self.active: SigningKey | None = self.keys[active_kid or signers[-1]] if signers else None
+        self.jwks_body = json.dumps(
+            {"keys": [key.jwk for key in keys]}, separators=(",", ":")
+        ).encode()
+        self.jwks_etag = f'"{hashlib.sha256(self.jwks_body).hexdigest()[:32]}"'
+
+    def verification_key(self, kid: str | None) -> SigningKey | None:
+        return self.keys.get(kid) if kid is not None else None
+
+
+def load_key(path: Path) -> SigningKey:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+    from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+
+    data = path.read_bytes()
+    if path.name.endswith(".pub.pem"):
+        kid, private_key = path.name[: -len(".pub.pem")], None
+        public_key = serialization.load_pem_public_key(data)
+    else:
+        kid = path.name[: -len(".pem")]
+        private_key = serialization.load_pem_private_key(data, password=None)
+        public_key = private_key.public_key()
+
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        algorithm, jwk = "EdDSA", json.loads(OKPAlgorithm.to_jwk(public_key))
+    elif isinstance(public_key, ec.EllipticCurvePublicKey) and public_key.curve.name == "secp256r1":
+        algorithm, jwk = "ES256", json.loads(ECAlgorithm.to_jwk(public_key))
+    else:
+        raise ValueError(f"Chave '{path.name}': use Ed25519 (EdDSA) ou EC P-256 (ES256).")
+    jwk.update(kid=kid, alg=algorithm, use="sig")
+    return SigningKey(kid, algorithm, public_key, private_key, jwk)
+
+
+def load_keyring(directory: str, active_kid: str = "") -> KeyRing:
+    keys: list[SigningKey] = []
+    for path in sorted(Path(directory).glob("*.pem")):
+        key = load_key(path)
+        if any(existing.kid == key.kid for existing in keys):
+            raise ValueError(f"kid '{key.kid}' repetido em {directory}.")
+        keys.append(key)
+    if not any(key.private_key is not None for key in keys):
+        raise ValueError(f"Nenhuma chave privada (<kid>.pem) em JWT_KEYS_DIR ({directory}).")
+    return KeyRing(keys, active_kid or None)
+
+
+@lru_cache(maxsize=1)
+def get_keyring() -> KeyRing:
+    """Key ring do processo, carregado no primeiro uso (cryptography fica fora da partida)."""
+    if not settings.JWT_KEYS_DIR:
+        return KeyRing([])
+    return load_keyring(settings.JWT_KEYS_DIR, settings.JWT_ACTIVE_KID)
+
+
+def generate(directory: str, algorithm: str) -> Path:
+    """Cria uma chave privada nova em <directory>/<kid>.pem (kid = data + sufixo aleatório)."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+    private_key = ed25519.Ed25519PrivateKey.generate() if algorithm == "EdDSA" else ec.generate_private_key(ec.SECP256R1())
+    kid = f"{datetime.now(timezone.utc):%Y%m%d}-{secrets.token_hex(3)}"
+    path = Path(directory) / f"{kid}.pem"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ))
+    path.chmod(0o600)
+    return path
+
+
+def _main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.keyring", description="Chaves de assinatura dos JWT.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate", help="gera uma chave privada nova")
+    gen.add_argument("--dir", required=True)
+    gen.add_argument("--alg", choices=["EdDSA", "ES256"], default="EdDSA")
+    sub.add_parser("status", help="mostra as chaves carregadas de JWT_KEYS_DIR")
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        print(f"Chave criada: {generate(args.dir, args.alg)}")
+        return
+    ring = get_keyring()
+    if ring.active is None:
+        print("JWT_KEYS_DIR não configurado: tokens assinados com HS256 (SECRET_KEY).")
+        return
+    for key in ring.keys.values():
+        print(f"  {key.kid:<24} {key.algorithm:<6} {'ativa' if key is ring.active else 'só verificação'}")
+
+
+if __name__ == "__main__":
+    _main()
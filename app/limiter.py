@@ -1,9 +1,19 @@
 """
 Rate Limiting — instância global do slowapi
 Importado por main.py (middleware) e pelos endpoints que precisam de limite.
+O backend é escolhido por RATE_LIMIT_STORAGE_URI (ver app/rate_limit.py): com um
+backend compartilhado, os limites valem para todos os workers, não para cada um.
 """
 
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-limiter = Limiter(key_func=get_remote_address, default_limits=["200/minute"])
+from app.config import settings
+from app.rate_limit import strategy_for
+
+limiter = Limiter(
+    key_func=get_remote_address,
+    default_limits=["200/minute"],
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI,
+    strategy=strategy_for(settings.RATE_LIMIT_STORAGE_URI),
+)
@@ -13,35 +13,51 @@ import logging
 import os
 from datetime import datetime, timedelta, timezone
 from contextlib import asynccontextmanager
-from fastapi import Depends, FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
-from sqlalchemy import select, update as sa_update, text
-from sqlalchemy.orm import joinedload
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-
-from app.database import engine, Base, SessionLocal
-from app.models import Appointment, Professional, Patient, User
-from app.email_utils import send_appointment_alarm
-from app.auth import get_current_user, get_password_hash, require_role
-from app.config import settings
-from app.limiter import limiter
+from typing import Awaitable, Callable
+
+# Primeiro import do app: marca o início da inicialização (perfil de tempos, ver app/startup.py)
+from app.startup import profile, readiness
+
+with profile.stage("import: fastapi, sqlalchemy, slowapi"):
+    from fastapi import Depends, FastAPI, Request
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import JSONResponse, FileResponse, Response
+    from fastapi.staticfiles import StaticFiles
+    from sqlalchemy import select, text, update as sa_update
+    from sqlalchemy.orm import joinedload
+    from slowapi import _rate_limit_exceeded_handler
+    from slowapi.errors import RateLimitExceeded
+
+with profile.stage("import: núcleo do app"):
+    from app.database import engine, SessionLocal
+    from app.models import Appointment, AppointmentSeries, Professional, Patient, User
+    from app import recurrence
+    from app.email_utils import send_appointment_alarm
+    from app.auth import get_current_user, require_role
+    from app.config import settings
+    from app.limiter import limiter
+    from app.events import bus
+    from app import unread_counters
+    from app import bootstrap, identifier_filter, keyring, migrations, refresh_tokens, revocation, typeahead
+    from app.http_clients import registry as http_clients
+    from app.directory import directory
+    from app.http_cache import etag_matches
 
 # ═════════════════════════════════════════════════════════════════════
 # ROTAS (ENDPOINTS)
 # ═════════════════════════════════════════════════════════════════════
 
-from app.rotas.autenticacao import router as auth_router
-from app.rotas.dashboard import router as dashboard_router
-from app.rotas.pacientes import router as patients_router
-from app.rotas.profissionais import router as professionals_router
-from app.rotas.agendamentos import router as appointments_router
-from app.rotas.atestados import router as certificates_router
-from app.rotas.mensagens import router as messages_router
-from app.rotas.configuracoes import router as settings_router
-from app.rotas.debug import router as debug_router
+with profile.stage("import: rotas"):
+    from app.rotas.autenticacao import router as auth_router
+    from app.rotas.dashboard import router as dashboard_router
+    from app.rotas.pacientes import router as patients_router
+    from app.rotas.profissionais import router as professionals_router
+    from app.rotas.agendamentos import router as appointments_router
+    from app.rotas.atestados import router as certificates_router
+    from app.rotas.mensagens import router as messages_router
+    from app.rotas.configuracoes import router as settings_router
+    from app.rotas.debug import router as debug_router
+    from app.rotas.autocompletar import router as autocomplete_router
 
 
 # Configuração básica de logging
@@ -53,6 +69,27 @@ ALARM_INTERVAL_SECONDS = 60
 ALARM_LOOKAHEAD_MINUTES = 30
 ALARM_BATCH_LIMIT = 200  # Máximo de consultas carregadas por ciclo — evita uso excessivo de memória
 
+# Intervalo da verificação de consistência dos contadores de mensagens não lidas
+UNREAD_RECONCILE_INTERVAL_SECONDS = 600
+
+# Reconstrução do filtro de identificadores de login (pega cadastros feitos por scripts/seed)
+IDENTIFIER_FILTER_REFRESH_SECONDS = 300
+
+# Reconstrução do diretório de profissionais (as alterações pela API já entram na hora)
+DIRECTORY_REFRESH_SECONDS = 300
+
+# Reconstrução do índice de autocompletar (as alterações pela API já entram na hora)
+TYPEAHEAD_REFRESH_SECONDS = 600
+
+# Lista de access tokens revogados: leitura incremental do banco (o barramento já entrega
+# as revogações na hora; isto cobre falhas do LISTEN) e leitura completa a cada N ciclos
+REVOCATION_SYNC_SECONDS = 60
+REVOCATION_FULL_SYNC_EVERY = 30
+
+# Aquecimento: tentativas por etapa (espera de WARMUP_RETRY_SECONDS × tentativa entre elas)
+WARMUP_ATTEMPTS = 3
+WARMUP_RETRY_SECONDS = 5
+
 
 async def appointment_alarm_task() -> None:
     """
@@ -88,7 +125,14 @@ async def appointment_alarm_task() -> None:
                     .limit(ALARM_BATCH_LIMIT)
                 )
                 result = await db.execute(stmt)
-                appointments_today = result.scalars().unique().all()
+                appointments_today: list = list(result.scalars().unique().all())
+
+                # Ocorrências virtuais de séries também recebem alarme; ao enviar,
+                # são materializadas com alarm_sent=True para não repetir no próximo ciclo.
+                appointments_today += [
+                    occ for occ in await recurrence.load_occurrences(db, now.date(), now.date())
+                    if occ.status == "Confirmado"
+                ]
 
                 sent_ids: list[int] = []
 
@@ -113,7 +157,14 @@ async def appointment_alarm_task() -> None:
                             )
 
                             if success:
-                                sent_ids.append(appointment.id)
+                                if isinstance(appointment, recurrence.SeriesOccurrence):
+                                    series = await db.get(AppointmentSeries, appointment.series_id)
+                                    await recurrence.materialize_occurrence(
+                                        db, series, appointment.date, {"alarm_sent": True}
+                                    )
+                                    await db.commit()
+                                else:
+                                    sent_ids.append(appointment.id)
                                 logger.info(
                                     f"Alarme enviado: patient_id={appointment.patient_id} "
                                     f"professional_id={appointment.professional_id} às {time_str}"
@@ -134,72 +185,219 @@ async def appointment_alarm_task() -> None:
         await asyncio.sleep(ALARM_INTERVAL_SECONDS)
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
+async def unread_counter_reconcile_task() -> None:
     """
-    [EXPLICAÇÃO DIDÁTICA PARA INICIANTES]
-    O que é esta 'função' (async def)? Pense em 'lifespan' (tempo de vida) como o interruptor de energia da sua loja (o site).
+    Verificação periódica dos contadores de não lidas (unread_message_counters).
+    Os contadores são mantidos a cada escrita; esta tarefa recalcula a partir de
+    patient_messages e corrige divergências (ex: mensagens inseridas por scripts de seed).
+    A primeira execução, logo na inicialização, também preenche a tabela em bancos antigos.
+    """
+    while True:
+        try:
+            async with SessionLocal() as db:
+                if await unread_counters.reconcile(db):
+                    await db.commit()
+        except Exception as e:
+            logger.error(f"Erro na reconciliação dos contadores de não lidas: {e}", exc_info=True)
 
-    - O trecho de código antes do 'yield' roda uma única vez no segundo que você liga a loja ("Abre a loja, arruma as cadeiras, e liga a máquina - o robô - de e-mails em segundo plano").
-    - O 'yield' fala: "Pronto, a loja está aberta, podem entrar clientes (receber requisições)".
-    - O trecho depois do 'yield' só será rodado se alguém desligar o servidor. Ou seja, ele avisa: "Cancelem o robô dos e-mails, fechem as portas em segurança."
+        await asyncio.sleep(UNREAD_RECONCILE_INTERVAL_SECONDS)
+
+
+async def identifier_filter_refresh_task() -> None:
+    """
+    Reconstrói periodicamente o filtro de Bloom de e-mails/CPFs (a primeira construção é
+    uma etapa do aquecimento). Cadastros feitos pela API entram na hora; a reconstrução
+    cobre os feitos por fora (create_admin.py, seed) e descarta identificadores removidos.
     """
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    logger.info("Tabelas criadas/verificadas no banco de dados.")
-
-    # Executa cada migração em uma transação separada para evitar que falhas individuais
-    # (ex: coluna já existente) abortem a transação inteira no PostgreSQL.
-    for table, col, col_type in [
-        ("patient_messages", "saved", "BOOLEAN DEFAULT FALSE"),
-        ("users", "phone", "VARCHAR"),
-        ("users", "role_title", "VARCHAR"),
-        ("users", "crp", "VARCHAR"),
-        ("users", "photo", "TEXT"),
-        ("users", "created_at", "TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP"),
-        ("patients", "photo", "VARCHAR")
-    ]:
+    while True:
+        await asyncio.sleep(IDENTIFIER_FILTER_REFRESH_SECONDS)
+        try:
+            await build_identifier_filter()
+        except Exception as e:
+            logger.error(f"Erro ao reconstruir o filtro de identificadores: {e}", exc_info=True)
+
+
+async def typeahead_refresh_task() -> None:
+    """Reconstrói periodicamente o índice de autocompletar (a primeira construção é do aquecimento)."""
+    while True:
+        await asyncio.sleep(TYPEAHEAD_REFRESH_SECONDS)
         try:
-            async with engine.begin() as conn:
-                await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {col} {col_type}"))
-            logger.info(f"Migração: coluna '{col}' adicionada em '{table}'.")
-        except Exception:
-            pass  # Silencioso se a coluna já existir
+            await build_typeahead()
+        except Exception as e:
+            logger.error(f"Erro ao reconstruir o índice de autocompletar: {e}", exc_info=True)
 
+
+async def directory_refresh_task() -> None:
+    """
+    Reconstrói periodicamente o diretório de profissionais (a primeira construção é do
+    aquecimento): cobre os cadastros feitos por fora da API (seed_bulk, SQL manual).
+    """
+    while True:
+        await asyncio.sleep(DIRECTORY_REFRESH_SECONDS)
+        try:
+            await warm_directory()
+        except Exception as e:
+            logger.error(f"Erro ao reconstruir o diretório de profissionais: {e}", exc_info=True)
+
+
+async def revocation_sync_task() -> None:
+    """
+    Mantém em dia o conjunto de tokens revogados deste worker e apaga do banco as
+    revogações e refresh tokens vencidos. A carga inicial é feita no lifespan.
+    """
+    cycle = 0
+    while True:
+        await asyncio.sleep(REVOCATION_SYNC_SECONDS)
+        cycle += 1
+        try:
+            async with SessionLocal() as db:
+                await revocation.revocations.sync(db, full=cycle % REVOCATION_FULL_SYNC_EVERY == 0)
+                if cycle % REVOCATION_FULL_SYNC_EVERY == 0:
+                    await revocation.purge_expired(db)
+                    await refresh_tokens.purge_expired(db)
+        except Exception as e:
+            logger.error(f"Erro ao sincronizar a lista de tokens revogados: {e}", exc_info=True)
+
+
+async def bootstrap_data() -> None:
+    """Banco vazio → dados de demonstração; senão garante o admin das variáveis de ambiente."""
     async with SessionLocal() as db:
         # Verifica se o banco de dados está vazio (sem nenhum usuário cadastrado)
-        result_empty = await db.execute(select(User))
-        if not result_empty.scalars().first():
+        result_empty = await db.execute(select(User.id).limit(1))
+        if result_empty.scalar() is None:
             logger.info("Banco de dados vazio detectado. Populando com dados mock/seed...")
             from app.seed import seed_mock_data
             await seed_mock_data(db)
         else:
-            # Caso contrário, garante que o admin existirá E terá a senha atualizada caso configurado via variáveis de ambiente do Render
-            admin_email = getattr(settings, "ADMIN_EMAIL", "") or ""
-            admin_password = getattr(settings, "ADMIN_PASSWORD", "") or ""
-            if admin_email and admin_password:
-                result = await db.execute(select(User).where(User.email == admin_email))
-                existing_admin = result.scalars().first()
-                if not existing_admin:
-                    db.add(User(
-                        email=admin_email,
-                        hashed_password=get_password_hash(admin_password),
-                        full_name="Administrador",
-                        role="admin",
-                        is_active=True,
-                    ))
-                    logger.info(f"Usuário admin criado: {admin_email}")
-                else:
-                    existing_admin.hashed_password = get_password_hash(admin_password)
-                    logger.info(f"Senha do admin '{admin_email}' sincronizada com as variáveis de ambiente.")
-                await db.commit()
-
-    alarm_task = asyncio.create_task(appointment_alarm_task())
-    logger.info("Tarefa de alarme de consultas iniciada.")
+            # Idempotente: só calcula Argon2/grava quando a senha do ambiente (ou o hash) mudou
+            await bootstrap.ensure_admin_from_settings(db)
+
+
+async def build_identifier_filter() -> None:
+    """Filtro de identificadores de login, já com o admin/seed criados por bootstrap_data."""
+    async with SessionLocal() as db:
+        total = await identifier_filter.index.rebuild(db)
+    logger.info(f"Filtro de identificadores de login construído ({total} identificadores).")
+
+
+async def build_typeahead() -> None:
+    """Índice de autocompletar de nomes de pacientes e profissionais."""
+    async with SessionLocal() as db:
+        await typeahead.index.rebuild(db)
+
+
+async def warm_directory() -> None:
+    """Diretório de profissionais em memória (lista e nomes servidos sem consultar o banco)."""
+    async with SessionLocal() as db:
+        await directory.rebuild(db)
+
+
+# Aquecimento em segundo plano, na ordem: os índices em memória são construídos depois do
+# seed/admin, senão nasceriam sem eles (login do admin recusado pelo filtro, autocompletar vazio)
+WARMUP_STEPS = {
+    "dados iniciais/admin": bootstrap_data,
+    "filtro de identificadores": build_identifier_filter,
+    "índice de autocompletar": build_typeahead,
+    "diretório de profissionais": warm_directory,
+}
+
+
+async def startup_warmup_task() -> None:
+    """
+    Roda as etapas de WARMUP_STEPS e marca cada uma como concluída para o /ready.
+    Uma etapa com erro (ex: banco ainda subindo) é repetida algumas vezes; se continuar
+    falhando fica registrada e o /ready responde 503.
+    """
+    for name, step in WARMUP_STEPS.items():
+        error: Exception | None = None
+        for attempt in range(1, WARMUP_ATTEMPTS + 1):
+            try:
+                with profile.stage(f"aquecimento: {name}"):
+                    await step()
+                error = None
+                break
+            except Exception as e:
+                error = e
+                logger.error(f"Falha no aquecimento '{name}' (tentativa {attempt}/{WARMUP_ATTEMPTS}): {e}", exc_info=True)
+                if attempt < WARMUP_ATTEMPTS:
+                    await asyncio.sleep(WARMUP_RETRY_SECONDS * attempt)
+        readiness.done(name, error)
+
+    if settings.STARTUP_PROFILE:
+        profile.log()
+
+
+async def after_warmup(warmup: asyncio.Task, periodic: Callable[[], Awaitable[None]]) -> None:
+    """Inicia uma tarefa periódica só quando o aquecimento (que faz a primeira construção) termina."""
+    await asyncio.wait({warmup})
+    await periodic()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    [EXPLICAÇÃO DIDÁTICA PARA INICIANTES]
+    O que é esta 'função' (async def)? Pense em 'lifespan' (tempo de vida) como o interruptor de energia da sua loja (o site).
+
+    - O trecho de código antes do 'yield' roda uma única vez no segundo que você liga a loja ("Abre a loja, arruma as cadeiras, e liga a máquina - o robô - de e-mails em segundo plano").
+    - O 'yield' fala: "Pronto, a loja está aberta, podem entrar clientes (receber requisições)".
+    - O trecho depois do 'yield' só será rodado se alguém desligar o servidor. Ou seja, ele avisa: "Cancelem o robô dos e-mails, fechem as portas em segurança."
+    """
+    # Esquema do banco: migrações versionadas (app/migrations.py). Com o esquema em dia
+    # isto é uma única consulta; em produção as migrações rodam antes, na fase de release.
+    with profile.stage("lifespan: migrações"):
+        if settings.AUTO_MIGRATE:
+            applied = await migrations.upgrade(engine)
+            if applied:
+                logger.info(f"{len(applied)} migração(ões) aplicada(s); esquema na versão {migrations.LATEST_VERSION}.")
+        elif todo := await migrations.pending(engine):
+            raise RuntimeError(
+                f"Esquema do banco desatualizado ({len(todo)} migração(ões) pendente(s)). "
+                "Rode 'python -m app.migrations' antes de iniciar a aplicação."
+            )
+
+    # Chaves de assinatura dos JWT: com JWT_KEYS_DIR, uma chave inválida impede a subida
+    # em vez de derrubar o primeiro login
+    if settings.JWT_KEYS_DIR:
+        with profile.stage("lifespan: chaves JWT"):
+            keyring.get_keyring()
+
+    # Tokens revogados ainda no prazo (logout antes desta inicialização): carregados antes de
+    # aceitar requisições, senão este worker aceitaria tokens já revogados até a 1ª sincronização
+    with profile.stage("lifespan: tokens revogados"):
+        async with SessionLocal() as db:
+            await revocation.revocations.sync(db, full=True)
+
+    # Seed/admin e caches rodam depois que o servidor já aceita conexões; /ready espera por eles.
+    # Os clientes HTTP de saída (Resend, Groq) são criados no primeiro uso.
+    readiness.begin(*WARMUP_STEPS)
+    warmup_task = asyncio.create_task(startup_warmup_task())
+
+    with profile.stage("lifespan: tarefas em segundo plano"):
+        alarm_task = asyncio.create_task(appointment_alarm_task())
+        logger.info("Tarefa de alarme de consultas iniciada.")
+
+        reconcile_task = asyncio.create_task(unread_counter_reconcile_task())
+        identifier_task = asyncio.create_task(after_warmup(warmup_task, identifier_filter_refresh_task))
+        typeahead_task = asyncio.create_task(after_warmup(warmup_task, typeahead_refresh_task))
+        directory_task = asyncio.create_task(after_warmup(warmup_task, directory_refresh_task))
+        revocation_task = asyncio.create_task(revocation_sync_task())
+
+    # PostgreSQL: LISTEN/NOTIFY distribui os eventos SSE entre os workers
+    with profile.stage("lifespan: listener de eventos"):
+        await bus.start_listener(engine)
 
     yield
 
+    await bus.stop_listener()
+    warmup_task.cancel()
+    identifier_task.cancel()
+    typeahead_task.cancel()
+    directory_task.cancel()
+    revocation_task.cancel()
+    reconcile_task.cancel()
     alarm_task.cancel()
+    await http_clients.close()
     logger.info("Shutdown finalizado.")
 
 
@@ -245,6 +443,7 @@ app.include_router(patients_router, dependencies=_staff)
 app.include_router(professionals_router, dependencies=_staff)
 app.include_router(appointments_router, dependencies=_staff)
 app.include_router(certificates_router, dependencies=_staff)
+app.include_router(autocomplete_router, dependencies=_staff)
 
 # Rotas exclusivas de admin (configurações globais, debug)
 _admin = [Depends(require_role(["admin"]))]
@@ -254,9 +453,45 @@ app.include_router(debug_router, dependencies=_admin)
 
 @app.get("/health", tags=["infra"])
 async def health_check():
+    """Liveness: o processo está de pé (não consulta o banco)."""
     return {"status": "ok", "version": "1.0.0"}
 
 
+@app.get("/.well-known/jwks.json", tags=["infra"])
+async def jwks(request: Request):
+    """
+    Chaves públicas que validam os access tokens (JWKS, RFC 7517), para outros serviços.
+    Corpo pré-montado no key ring; ETag + max-age curto para a rotação se propagar.
+    """
+    ring = keyring.get_keyring()
+    headers = {
+        "ETag": ring.jwks_etag,
+        "Cache-Control": f"public, max-age={keyring.JWKS_MAX_AGE_SECONDS}",
+    }
+    if etag_matches(request.headers.get("if-none-match"), ring.jwks_etag):
+        return Response(status_code=304, headers=headers)
+    return Response(ring.jwks_body, media_type="application/jwk-set+json", headers=headers)
+
+
+@app.get("/ready", tags=["infra"])
+async def readiness_check():
+    """Readiness: 503 enquanto o aquecimento roda, se uma etapa dele falhou ou se o banco não responde."""
+    body = {"status": "ready", **readiness.snapshot()}
+    if settings.STARTUP_PROFILE:
+        body["startup"] = profile.report()
+
+    if not readiness.ready:
+        status = "failed" if readiness.failed else "starting"
+        return JSONResponse(status_code=503, content={**body, "status": status})
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.warning(f"Readiness: banco indisponível: {e}")
+        return JSONResponse(status_code=503, content={**body, "status": "unavailable"})
+    return body
+
+
 # ═════════════════════════════════════════════════════════════════════
 # MONTAGEM DO FRONTEND (REACT SPA)
 # ═════════════════════════════════════════════════════════════════════
@@ -269,7 +504,7 @@ if os.path.exists(frontend_dist):
     @app.get("/{catchall:path}")
     async def serve_frontend(catchall: str):
         # Ignora caminhos da API e da Documentação
-        if catchall.startswith("api") or catchall.startswith("docs") or catchall.startswith("redoc") or catchall.startswith("openapi.json") or catchall.startswith("health"):
+        if catchall.startswith("api") or catchall.startswith("docs") or catchall.startswith("redoc") or catchall.startswith("openapi.json") or catchall.startswith("health") or catchall.startswith("ready"):
             return JSONResponse(status_code=404, content={"message": "Not Found"})
         
         # Se o caminho for um arquivo real na pasta dist (ex: favicon.svg), serve o arquivo
@@ -0,0 +1,252 @@
+"""
+Migrações versionadas do esquema do banco
+- Tabela schema_version guarda as migrações já aplicadas (uma linha por versão)
+- Com o esquema em dia, a verificação custa uma consulta e nada mais roda
+- As pendentes rodam uma única vez, em uma transação, sob advisory lock no PostgreSQL
+  (vários workers subindo juntos: um aplica, os outros esperam e encontram tudo pronto)
+
+Uso (fase de release do deploy):
+    python -m app.migrations            # aplica as pendentes
+    python -m app.migrations status     # mostra a versão atual e as pendentes
+
+Com AUTO_MIGRATE=true (padrão) o lifespan também aplica as pendentes na inicialização.
+
+Nova migração: acrescente uma função ao final de MIGRATIONS — nunca altere uma já publicada.
+"""
+
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.database import Base
+
+logger = logging.getLogger(__name__)
+
+# Chave do pg_advisory_xact_lock (qualquer inteiro fixo e exclusivo desta aplicação)
+ADVISORY_LOCK_KEY = 726_001
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[AsyncConnection], Awaitable[None]]
+
+
+# ═════════════════════════════════════════════════════════════════════
+# MIGRAÇÕES
+# ═════════════════════════════════════════════════════════════════════
+
+async def _baseline(conn: AsyncConnection) -> None:
+    """Todas as tabelas dos modelos (bancos novos); em bancos antigos cria só as que faltam."""
+    import app.models  # noqa: F401 — registra os modelos no metadata
+
+    await conn.run_sync(Base.metadata.create_all)
+
+
+# Colunas adicionadas depois da criação original das tabelas (create_all não altera tabelas existentes)
+_LEGACY_COLUMNS = [
+    ("patient_messages", "saved", "BOOLEAN DEFAULT FALSE"),
+    ("users", "phone", "VARCHAR"),
+    ("users", "role_title", "VARCHAR"),
+    ("users", "crp", "VARCHAR"),
+    ("users", "photo", "TEXT"),
+    ("users", "created_at", "TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP"),
+    ("patients", "photo", "VARCHAR"),
+    ("appointments", "series_id", "INTEGER REFERENCES appointment_series(id)"),
+    ("appointments", "original_date", "DATE"),
+]
+
+
+async def _legacy_columns(conn: AsyncConnection) -> None:
+    def existing_columns(sync_conn) -> dict[str, set[str]]:
+        inspector = inspect(sync_conn)
+        return {
+            table: {c["name"] for c in inspector.get_columns(table)}
+            for table in {t for t, _, _ in _LEGACY_COLUMNS}
+        }
+
+    columns = await conn.run_sync(existing_columns)
+    for table, col, col_type in _LEGACY_COLUMNS:
+        if col not in columns[table]:
+            if conn.dialect.name == "sqlite":
+                # SQLite não aceita ADD COLUMN com default não constante (o antigo loop falhava calado)
+                col_type = col_type.replace(" DEFAULT CURRENT_TIMESTAMP", "")
+            await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {col} {col_type}"))
+            logger.info(f"Migração: coluna '{col}' adicionada em '{table}'.")
+
+
+async def _indexes(conn: AsyncConnection) -> None:
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_appointments_professional_date_time "
+        "ON appointments (professional_id, date, time)"
+    ))
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_appointments_series_id ON appointments (series_id)"
+    ))
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_patient_messages_professional_is_read "
+        "ON patient_messages (professional_id, is_read)"
+    ))
+
+
+async def _patient_search(conn: AsyncConnection) -> None:
+    """Busca textual de pacientes (pg_trgm/tsvector no PostgreSQL, FTS5 no SQLite)."""
+    from app import search
+
+    try:
+        # Savepoint: sem pg_trgm/unaccent (ou FTS5) a busca fica indisponível, mas o restante
+        # das migrações é aplicado e a aplicação sobe
+        async with conn.begin_nested():
+            await search.ensure_search_index(conn)
+    except Exception as e:
+        logger.warning(f"Índice de busca de pacientes não criado: {e}")
+
+
+async def _appointments_no_overlap(conn: AsyncConnection) -> None:
+    """
+    PostgreSQL: constraint de exclusão impede sobreposição de consultas do mesmo profissional
+    mesmo que duas marcações escapem da verificação da aplicação (última barreira).
+    """
+    if conn.dialect.name != "postgresql":
+        return
+    from app.config import settings
+
+    duration = settings.APPOINTMENT_DURATION_MINUTES
+    try:
+        # Savepoint: extensão indisponível ou dados legados conflitantes não derrubam as demais
+        async with conn.begin_nested():
+            await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+            await conn.execute(text(
+                "ALTER TABLE appointments ADD CONSTRAINT appointments_no_overlap "
+                "EXCLUDE USING gist (professional_id WITH =, "
+                f"tsrange(date + time, date + time + interval '{duration} minutes') WITH &&) "
+                "WHERE (status IS DISTINCT FROM 'Cancelado')"
+            ))
+        logger.info("Migração: constraint 'appointments_no_overlap' criada.")
+    except Exception as e:
+        logger.warning(f"Constraint 'appointments_no_overlap' não criada: {e}")
+
+
+async def _bootstrap_state(conn: AsyncConnection) -> None:
+    """Marcas da inicialização idempotente do admin (app/bootstrap.py)."""
+    from app.models import BootstrapState
+
+    await conn.run_sync(BootstrapState.__table__.create, checkfirst=True)
+
+
+async def _refresh_tokens(conn: AsyncConnection) -> None:
+    """Refresh tokens (hash) e access tokens revogados (app/refresh_tokens.py, app/revocation.py)."""
+    from app.models import RefreshToken, RevokedToken
+
+    await conn.run_sync(RefreshToken.__table__.create, checkfirst=True)
+    await conn.run_sync(RevokedToken.__table__.create, checkfirst=True)
+
+
+MIGRATIONS: list[Migration] = [
+    Migration(1, "baseline", _baseline),
+    Migration(2, "legacy_columns", _legacy_columns),
+    Migration(3, "indexes", _indexes),
+    Migration(4, "patient_search", _patient_search),
+    Migration(5, "appointments_no_overlap", _appointments_no_overlap),
+    Migration(6, "bootstrap_state", _bootstrap_state),
+    Migration(7, "refresh_tokens", _refresh_tokens),
+    # Refaz a busca: o tsvector do PostgreSQL passou a quebrar o e-mail em palavras
+    # (ix_patients_search_tsv -> ix_patients_search_words); no SQLite é no-op
+    Migration(8, "patient_search_words", _patient_search),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+# ═════════════════════════════════════════════════════════════════════
+# EXECUÇÃO
+# ═════════════════════════════════════════════════════════════════════
+
+async def _applied_version(conn: AsyncConnection) -> int:
+    return await conn.scalar(text("SELECT coalesce(max(version), 0) FROM schema_version")) or 0
+
+
+async def current_version(engine: AsyncEngine) -> int:
+    """Maior versão aplicada (0 se o banco nunca passou pelas migrações)."""
+    async with engine.connect() as conn:
+        try:
+            return await _applied_version(conn)
+        except DBAPIError:
+            return 0  # schema_version ainda não existe
+
+
+async def pending(engine: AsyncEngine) -> list[Migration]:
+    version = await current_version(engine)
+    return [m for m in MIGRATIONS if m.version > version]
+
+
+async def upgrade(engine: AsyncEngine) -> list[Migration]:
+    """Aplica as migrações pendentes; devolve as que foram aplicadas por este processo."""
+    if not await pending(engine):
+        return []  # Caminho comum: esquema em dia, nenhuma DDL nem lock
+
+    async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Liberado no fim da transação; quem chega depois espera aqui
+            await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY})
+        await conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_version ("
+            "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, "
+            "applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        # Relido sob o lock: outro processo pode ter acabado de aplicar
+        version = await _applied_version(conn)
+        applied = [m for m in MIGRATIONS if m.version > version]
+        for migration in applied:
+            logger.info(f"Aplicando migração {migration.version}: {migration.name}")
+            await migration.apply(conn)
+            await conn.execute(
+                text("INSERT INTO schema_version (version, name) VALUES (:version, :name)"),
+                {"version": migration.version, "name": migration.name},
+            )
+    return applied
+
+
+async def reset(engine: AsyncEngine) -> None:
+    """Apaga todas as tabelas e recria o esquema do zero (scripts de seed com --reset)."""
+    import app.models  # noqa: F401
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.execute(text("DROP TABLE IF EXISTS schema_version"))
+        if conn.dialect.name == "sqlite":
+            await conn.execute(text("DROP TABLE IF EXISTS patients_fts"))
+    await upgrade(engine)
+
+
+async def _main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.migrations", description="Migrações do esquema do banco.")
+    parser.add_argument("command", nargs="?", choices=["upgrade", "status"], default="upgrade")
+    args = parser.parse_args(argv)
+
+    from app.database import engine
+
+    try:
+        if args.command == "status":
+            version = await current_version(engine)
+            print(f"Versão atual: {version} (mais recente: {LATEST_VERSION})")
+            for m in MIGRATIONS:
+                if m.version > version:
+                    print(f"  pendente: {m.version} {m.name}")
+        else:
+            applied = await upgrade(engine)
+            print(f"{len(applied)} migração(ões) aplicada(s); esquema na versão {LATEST_VERSION}.")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main())
@@ -6,11 +6,16 @@ Cada classe aqui representa uma tabela no banco de dados.
 - Professional: profissionais da clínica (psicólogos, médicos, etc.)
 - Patient: pacientes cadastrados
 - Appointment: agendamentos de consultas
+- AppointmentSeries: séries de consultas recorrentes (ex: sessão semanal)
 - Prescription: receitas médicas
 - Certificate: atestados médicos
 - ClinicSettings: dados da clínica (nome, CNPJ, configuração de horários)
 - PatientMessage: mensagens enviadas por pacientes via portal
+- UnreadMessageCounter: contador de mensagens não lidas por profissional
+- SummaryJob / SummaryCache / SummaryChunk: resumos clínicos por IA (jobs, cache final e por período)
 - SystemSettings: configurações SMTP do sistema de e-mails
+- BootstrapState: marcas das tarefas de inicialização já concluídas (ex: admin do ambiente)
+- RefreshToken / RevokedToken: sessões de longa duração (hash do refresh token) e access tokens revogados
 
 [EXPLICAÇÃO DIDÁTICA PARA INICIANTES]
 Note que neste arquivo NÃO TEMOS NENHUMA FUNÇÃO (def). Por que?
@@ -20,10 +25,11 @@ Então nós criamos a "Classe Patient" (molde) dizendo: "Olha banco de dados, to
 É por isso que este arquivo se chama 'models': apenas cria as regras de como guardar as coisas.
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text, Date, Time
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Text, Date, Time, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
+from app.directory import professional_name as directory_professional_name
 
 
 # ═════════════════════════════════════════════════════════════════════
@@ -145,8 +151,7 @@ class Patient(Base):
 
     @property
     def professional_name(self) -> str | None:
-        p = self.__dict__.get("professional")
-        return p.name if p else None
+        return directory_professional_name(self.professional_id, self.__dict__.get("professional"))
     prescriptions = relationship("Prescription", back_populates="patient")
     certificates = relationship("Certificate", back_populates="patient")
     messages = relationship("PatientMessage", back_populates="patient")
@@ -161,6 +166,10 @@ class Appointment(Base):
     Agendamentos de consultas de pacientes com profissionais.
     """
     __tablename__ = "appointments"
+    __table_args__ = (
+        # Busca de conflitos de horário: range scan por profissional + dia + horário
+        Index("ix_appointments_professional_date_time", "professional_id", "date", "time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"))
@@ -173,6 +182,10 @@ class Appointment(Base):
     alarm_sent = Column(Boolean, default=False)             # Status do lembrete por e-mail
     observations = Column(Text, nullable=True)
 
+    # --- Exceção de série recorrente (ocorrência materializada) ---
+    series_id = Column(Integer, ForeignKey("appointment_series.id"), nullable=True, index=True)
+    original_date = Column(Date, nullable=True)             # Data da ocorrência que esta linha substitui
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # --- Relacionamentos ---
@@ -186,9 +199,50 @@ class Appointment(Base):
 
     @property
     def professional_name(self) -> str | None:
-        p = self.__dict__.get("professional")
+        return directory_professional_name(self.professional_id, self.__dict__.get("professional"))
+
+
+class AppointmentSeries(Base):
+    """
+    Série de consultas recorrentes (regra semelhante a uma RRULE semanal).
+    As ocorrências NÃO são gravadas: são calculadas sob demanda para a janela consultada.
+    Apenas exceções (ocorrência remarcada, confirmada, cancelada, alarme enviado)
+    viram linhas em Appointment, com series_id + original_date.
+    """
+    __tablename__ = "appointment_series"
+
+    id = Column(Integer, primary_key=True, index=True)
+    patient_id = Column(Integer, ForeignKey("patients.id"))
+    professional_id = Column(Integer, ForeignKey("professionals.id"), index=True)
+
+    # --- Regra de recorrência ---
+    start_date = Column(Date, nullable=False)               # Primeira ocorrência possível
+    time = Column(Time, nullable=False)
+    weekdays = Column(String, nullable=False)               # Dias da semana (0=segunda … 6=domingo), ex: "0,3"
+    interval_weeks = Column(Integer, default=1)             # 1 = semanal, 2 = quinzenal
+    until = Column(Date, nullable=True)                     # Última data possível (inclusive)
+    count = Column(Integer, nullable=True)                  # Ou: número total de ocorrências
+
+    # --- Valores herdados pelas ocorrências ---
+    type = Column(String, nullable=True)
+    status = Column(String, default="Aguardando")
+    observations = Column(Text, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # --- Relacionamentos ---
+    patient = relationship("Patient")
+    professional = relationship("Professional")
+
+    @property
+    def patient_name(self) -> str | None:
+        p = self.__dict__.get("patient")
         return p.name if p else None
 
+    @property
+    def professional_name(self) -> str | None:
+        return directory_professional_name(self.professional_id, self.__dict__.get("professional"))
+
 
 class Prescription(Base):
     """
@@ -219,8 +273,7 @@ class Prescription(Base):
 
     @property
     def professional_name(self) -> str | None:
-        p = self.__dict__.get("professional")
-        return p.name if p else None
+        return directory_professional_name(self.professional_id, self.__dict__.get("professional"))
 
 
 class Certificate(Base):
@@ -251,8 +304,7 @@ class Certificate(Base):
 
     @property
     def professional_name(self) -> str | None:
-        p = self.__dict__.get("professional")
-        return p.name if p else None
+        return directory_professional_name(self.professional_id, self.__dict__.get("professional"))
 
 
 class PatientMessage(Base):
@@ -261,6 +313,10 @@ class PatientMessage(Base):
     direcionadas ao seu profissional responsável.
     """
     __tablename__ = "patient_messages"
+    __table_args__ = (
+        # Usado pela reconciliação dos contadores de não lidas (GROUP BY professional_id)
+        Index("ix_patient_messages_professional_is_read", "professional_id", "is_read"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     patient_id = Column(Integer, ForeignKey("patients.id"))
@@ -283,8 +339,21 @@ class PatientMessage(Base):
 
     @property
     def professional_name(self) -> str | None:
-        p = self.__dict__.get("professional")
-        return p.name if p else None
+        return directory_professional_name(self.professional_id, self.__dict__.get("professional"))
+
+
+class UnreadMessageCounter(Base):
+    """
+    Quantidade de mensagens não lidas de cada profissional.
+    Atualizado na mesma transação que cria/lê as mensagens (leitura O(1) para o badge);
+    uma tarefa periódica recalcula a partir de patient_messages e corrige divergências.
+    """
+    __tablename__ = "unread_message_counters"
+
+    professional_id = Column(Integer, ForeignKey("professionals.id", ondelete="CASCADE"), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
 
 # ═════════════════════════════════════════════════════════════════════
@@ -309,6 +378,61 @@ class AnamnesisEntry(Base):
     patient = relationship("Patient", backref="anamnesis_entries")
 
 
+# ═════════════════════════════════════════════════════════════════════
+# RESUMOS CLÍNICOS (IA)
+# ═════════════════════════════════════════════════════════════════════
+
+class SummaryJob(Base):
+    """
+    Pedido de resumo clínico processado em segundo plano.
+    status: pending → running → done | error
+    """
+    __tablename__ = "summary_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False, index=True)
+    cache_key = Column(String(64), nullable=False, index=True)  # Entrada de summary_cache que o job produz
+
+    status = Column(String, nullable=False, default="pending")
+    summary = Column(Text, nullable=True)
+    messages_count = Column(Integer, nullable=True)
+    error = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class SummaryCache(Base):
+    """
+    Resumos já gerados, indexados pelo hash (mensagens salvas + modelo + prompt).
+    O mesmo conjunto de mensagens nunca é enviado duas vezes ao provedor de IA.
+    """
+    __tablename__ = "summary_cache"
+
+    cache_key = Column(String(64), primary_key=True)
+    model = Column(String, nullable=False)
+    summary = Column(Text, nullable=False)
+    messages_count = Column(Integer, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class SummaryChunk(Base):
+    """
+    Resumo parcial de um período do histórico (mês, ou grupo de resumos parciais).
+    Indexado pelo hash do conteúdo: períodos antigos não mudam e nunca são reprocessados.
+    """
+    __tablename__ = "summary_chunks"
+
+    cache_key = Column(String(64), primary_key=True)
+    patient_id = Column(Integer, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False, index=True)
+    period = Column(String, nullable=False)                 # Ex: "2025-03", "2025-03#2", "2024-01..2024-12"
+    summary = Column(Text, nullable=False)
+    messages_count = Column(Integer, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
 # ═════════════════════════════════════════════════════════════════════
 # CONFIGURAÇÕES DO SISTEMA E CLÍNICA
 # ═════════════════════════════════════════════════════════════════════
@@ -361,3 +485,45 @@ class PasswordResetToken(Base):
     expires_at = Column(DateTime, nullable=False)
     used = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class RefreshToken(Base):
+    """
+    Refresh tokens (sessão de longa duração). Só o SHA-256 do token é guardado.
+    Cada uso troca o token por um novo da mesma família (rotação); reapresentar um token
+    já trocado revoga a família inteira (token vazado). Ver app/refresh_tokens.py.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    token_hash = Column(String, unique=True, index=True, nullable=False)
+    family = Column(String, index=True, nullable=False)       # Um login = uma família
+    subject = Column(String, index=True, nullable=False)      # "user:<id>" ou "patient:<id>"
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class RevokedToken(Base):
+    """
+    Access tokens revogados antes do exp (logout), pelo jti.
+    Os workers leem de forma incremental (id crescente) para o conjunto em memória (app/revocation.py).
+    """
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String, unique=True, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+
+class BootstrapState(Base):
+    """
+    Marca de cada tarefa de inicialização já concluída (chave → impressão digital da entrada).
+    Ex: "admin" guarda o HMAC de e-mail/senha do ambiente + hash salvo; enquanto bater,
+    os workers que sobem pulam a verificação Argon2 (ver app/bootstrap.py).
+    """
+    __tablename__ = "bootstrap_state"
+
+    key = Column(String, primary_key=True)
+    fingerprint = Column(String, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,108 @@
+"""
+Rehash transparente de senhas (parâmetros do Argon2 ajustados sem forçar troca de senha)
+- Login bem-sucedido com hash de parâmetros antigos (needs_update) → agenda o novo hash em
+  BackgroundTasks: a resposta do login não espera o Argon2 extra
+- A gravação é condicional (UPDATE ... WHERE hashed_password = hash antigo): se a senha foi
+  trocada enquanto isso, o novo hash é descartado em vez de sobrescrever a troca
+- Métricas: distribuição das versões de hash (tipo + parâmetros) em usuários e pacientes e
+  contadores do rehash deste processo, em /api/debug/password-hashes
+
+O job roda com sua própria sessão (SessionLocal), pois a sessão da requisição já foi fechada.
+"""
+
+import logging
+from collections import Counter
+from typing import Any
+
+from fastapi import BackgroundTasks
+from sqlalchemy import select, update
+
+from app.auth import get_password_hash_async, get_pwd_context
+from app.config import settings
+from app.database import AsyncSession, SessionLocal
+from app.models import Patient, User
+
+logger = logging.getLogger(__name__)
+
+_MODELS = {"user": User, "patient": Patient}
+
+
+def hash_version(hashed_password: str) -> str:
+    """'$argon2id$v=19$m=19456,t=2,p=1$<sal>$<hash>' → 'argon2id v=19 m=19456,t=2,p=1'."""
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[1]:
+        return "desconhecido"
+    if parts[1].startswith("argon2"):
+        return " ".join(parts[1:4])
+    return parts[1]  # Outros esquemas (ex: bcrypt "2b"): só o identificador
+
+
+class PasswordRehasher:
+    def __init__(self) -> None:
+        self.counters: Counter[str] = Counter()
+        self._in_flight: set[tuple[str, int]] = set()
+
+    def schedule(
+        self, background_tasks: BackgroundTasks, kind: str, row_id: int, password: str, hashed_password: str
+    ) -> bool:
+        """Chamado após a senha conferir; agenda o rehash se o hash usa parâmetros antigos."""
+        if not get_pwd_context().needs_update(hashed_password):
+            return False
+        self.counters["scheduled"] += 1
+        background_tasks.add_task(self.rehash, kind, row_id, password, hashed_password)
+        return True
+
+    async def rehash(self, kind: str, row_id: int, password: str, old_hash: str) -> None:
+        key = (kind, row_id)
+        if key in self._in_flight:  # Logins simultâneos da mesma conta: um rehash basta
+            self.counters["skipped"] += 1
+            return
+        self._in_flight.add(key)
+        try:
+            new_hash = await get_password_hash_async(password)
+            model = _MODELS[kind]
+            async with SessionLocal() as db:
+                result = await db.execute(
+                    update(model)
+                    .where(model.id == row_id, model.hashed_password == old_hash)
+                    .values(hashed_password=new_hash)
+                )
+                await db.commit()
+            self.counters["rehashed" if result.rowcount else "skipped"] += 1
+        except Exception as e:
+            self.counters["failed"] += 1
+            logger.warning(f"Falha no rehash da senha ({kind} {row_id}): {e}")
+        finally:
+            self._in_flight.discard(key)
+
+    async def distribution(self, db: AsyncSession) -> dict[str, Any]:
+        """Quantos hashes há de cada versão e quantos ainda serão refeitos no próximo login."""
+        context = get_pwd_context()
+        versions: dict[str, dict[str, int]] = {}
+        outdated: dict[str, int] = {}
+        samples: dict[str, bool] = {}  # versão → needs_update (igual para todos os hashes da versão)
+        for kind, model in _MODELS.items():
+            counts: Counter[str] = Counter()
+            stale = 0
+            rows = await db.stream_scalars(select(model.hashed_password).where(model.hashed_password.is_not(None)))
+            async for hashed_password in rows:
+                version = hash_version(hashed_password)
+                counts[version] += 1
+                if version not in samples:
+                    samples[version] = context.needs_update(hashed_password)
+                stale += samples[version]
+            versions[f"{kind}s"] = dict(counts)
+            outdated[f"{kind}s"] = stale
+        return {
+            "current": {
+                "memory_cost": settings.ARGON2_MEMORY_COST,
+                "time_cost": settings.ARGON2_TIME_COST,
+                "parallelism": settings.ARGON2_PARALLELISM,
+            },
+            "versions": versions,
+            "outdated": outdated,
+            "rehash": dict(self.counters),
+        }
+
+
+rehasher = PasswordRehasher()
@@ -0,0 +1,357 @@
+"""
+Rate limiting — estratégia token bucket e backends de armazenamento
+- Estratégia "token-bucket" registrada no limits/slowapi (O(1) por verificação)
+- bucket+memory://          → um único processo (dicionário em memória)
+- bucket+sqlite:///arquivo   → vários workers no mesmo host (arquivo SQLite compartilhado)
+- bucket+redis://host:6379/0 → vários hosts (script Lua atômico; requer o pacote 'redis')
+
+Cada chave guarda apenas (tokens, última atualização). A cada requisição os tokens
+são recarregados proporcionalmente ao tempo decorrido e, se houver saldo, um token
+é consumido — sem listas de timestamps nem varreduras de janela.
+Um limite "10/minute" vira um balde de capacidade 10 recarregado a 10/60 tokens por segundo.
+"""
+
+import math
+import sqlite3
+import threading
+import time
+import urllib.parse
+from abc import ABC, abstractmethod
+from typing import Any
+
+from limits.errors import ConfigurationError
+from limits.storage import Storage
+from limits.strategies import STRATEGIES, RateLimiter
+from limits.util import WindowStats
+
+BUCKET_SCHEME_PREFIX = "bucket+"
+
+
+# ═════════════════════════════════════════════════════════════════════
+# MATEMÁTICA DO TOKEN BUCKET (PURA)
+# ═════════════════════════════════════════════════════════════════════
+
+def refill(tokens: float, updated: float, now: float, capacity: float, rate: float) -> float:
+    """Saldo do balde após recarregar 'rate' tokens/segundo desde 'updated', limitado à capacidade."""
+    return min(capacity, tokens + max(0.0, now - updated) * rate)
+
+
+def seconds_until_full(tokens: float, capacity: float, rate: float) -> float:
+    """Tempo até o balde encher de novo — depois disso a chave pode ser descartada."""
+    return max(0.0, (capacity - tokens) / rate) if rate > 0 else 0.0
+
+
+# ═════════════════════════════════════════════════════════════════════
+# BACKENDS
+# ═════════════════════════════════════════════════════════════════════
+
+class TokenBucketStorage(Storage, ABC):
+    """
+    Base dos backends de token bucket. Herda a interface de Storage do limits para ser
+    criado por storage_from_string(); além do balde (consume/peek), cada backend guarda
+    contadores de janela fixa (incr/get/get_expiry) no mesmo formato de registro
+    (valor, início, expira em), exigidos pela interface do limits.
+    """
+
+    STORAGE_SCHEME: list[str] | None = None
+
+    @abstractmethod
+    def consume(self, key: str, capacity: float, rate: float, cost: float) -> tuple[bool, float]:
+        """Recarrega e tenta consumir 'cost' tokens. Retorna (permitido, saldo restante)."""
+
+    @abstractmethod
+    def peek(self, key: str, capacity: float, rate: float) -> float:
+        """Saldo atual sem consumir."""
+
+    @property
+    def base_exceptions(self) -> type[Exception] | tuple[type[Exception], ...]:
+        return (sqlite3.Error, OSError)
+
+    def check(self) -> bool:
+        return True
+
+
+class MemoryBucketStorage(TokenBucketStorage):
+    """Um processo: dicionário chave → [tokens, atualizado_em, expira_em]."""
+
+    STORAGE_SCHEME = ["bucket+memory"]
+    PRUNE_EVERY = 1024  # Operações entre limpezas das chaves que já voltaram a encher
+
+    def __init__(self, uri: str | None = None, wrap_exceptions: bool = False, **options: Any):
+        self._buckets: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+        self._ops = 0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions)
+
+    def consume(self, key: str, capacity: float, rate: float, cost: float) -> tuple[bool, float]:
+        now = time.time()
+        with self._lock:
+            state = self._buckets.get(key)
+            tokens = capacity if state is None else refill(state[0], state[1], now, capacity, rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = [tokens, now, now + seconds_until_full(tokens, capacity, rate)]
+            self._ops += 1
+            if self._ops % self.PRUNE_EVERY == 0:
+                self._prune(now)
+        return allowed, tokens
+
+    def peek(self, key: str, capacity: float, rate: float) -> float:
+        with self._lock:
+            state = self._buckets.get(key)
+        return capacity if state is None else refill(state[0], state[1], time.time(), capacity, rate)
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        with self._lock:
+            state = self._buckets.get(key)
+            if state is None or state[2] <= now:
+                state = self._buckets[key] = [0.0, now, now + expiry]
+            state[0] += amount
+            return int(state[0])
+
+    def get(self, key: str) -> int:
+        with self._lock:
+            state = self._buckets.get(key)
+        return int(state[0]) if state is not None and state[2] > time.time() else 0
+
+    def get_expiry(self, key: str) -> float:
+        with self._lock:
+            state = self._buckets.get(key)
+        return state[2] if state is not None else time.time()
+
+    def _prune(self, now: float) -> None:
+        for key in [k for k, state in self._buckets.items() if state[2] <= now]:
+            del self._buckets[key]
+
+    def reset(self) -> int | None:
+        with self._lock:
+            count = len(self._buckets)
+            self._buckets.clear()
+        return count
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._buckets.pop(key, None)
+
+
+class SQLiteBucketStorage(TokenBucketStorage):
+    """
+    Vários workers no mesmo host: um arquivo SQLite compartilhado (modo WAL).
+    Cada verificação é uma transação BEGIN IMMEDIATE com leitura e escrita por chave primária.
+    """
+
+    STORAGE_SCHEME = ["bucket+sqlite"]
+    PRUNE_EVERY = 1024
+
+    def __init__(self, uri: str | None = None, wrap_exceptions: bool = False, **options: Any):
+        path = urllib.parse.urlparse(uri or "").path
+        # bucket+sqlite:///relativo.db → "relativo.db"; bucket+sqlite:////abs/x.db → "/abs/x.db"
+        self.path = path[1:] if path.startswith("/") else path
+        if not self.path:
+            raise ValueError("Informe o arquivo: bucket+sqlite:///caminho/ratelimit.db")
+        self._lock = threading.Lock()
+        self._ops = 0
+        self._conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS token_buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, expires REAL NOT NULL)"
+        )
+        super().__init__(uri, wrap_exceptions=wrap_exceptions)
+
+    def consume(self, key: str, capacity: float, rate: float, cost: float) -> tuple[bool, float]:
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")  # Trava de escrita entre processos durante o read-modify-write
+            try:
+                now = time.time()
+                row = conn.execute("SELECT tokens, updated FROM token_buckets WHERE key = ?", (key,)).fetchone()
+                tokens = capacity if row is None else refill(row[0], row[1], now, capacity, rate)
+                allowed = tokens >= cost
+                if allowed:
+                    tokens -= cost
+                conn.execute(
+                    "INSERT INTO token_buckets (key, tokens, updated, expires) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, "
+                    "updated = excluded.updated, expires = excluded.expires",
+                    (key, tokens, now, now + seconds_until_full(tokens, capacity, rate)),
+                )
+                self._ops += 1
+                if self._ops % self.PRUNE_EVERY == 0:
+                    conn.execute("DELETE FROM token_buckets WHERE expires <= ?", (now,))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return allowed, tokens
+
+    def peek(self, key: str, capacity: float, rate: float) -> float:
+        with self._lock:
+            row = self._conn.execute("SELECT tokens, updated FROM token_buckets WHERE key = ?", (key,)).fetchone()
+        return capacity if row is None else refill(row[0], row[1], time.time(), capacity, rate)
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        with self._lock:
+            # Janela vencida recomeça do zero; senão soma ao contador (um único comando atômico)
+            row = self._conn.execute(
+                "INSERT INTO token_buckets (key, tokens, updated, expires) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET "
+                "tokens = CASE WHEN expires <= ? THEN excluded.tokens ELSE tokens + excluded.tokens END, "
+                "updated = CASE WHEN expires <= ? THEN excluded.updated ELSE updated END, "
+                "expires = CASE WHEN expires <= ? THEN excluded.expires ELSE expires END "
+                "RETURNING tokens",
+                (key, amount, now, now + expiry, now, now, now),
+            ).fetchone()
+        return int(row[0])
+
+    def get(self, key: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT tokens FROM token_buckets WHERE key = ? AND expires > ?", (key, time.time())
+            ).fetchone()
+        return int(row[0]) if row is not None else 0
+
+    def get_expiry(self, key: str) -> float:
+        with self._lock:
+            row = self._conn.execute("SELECT expires FROM token_buckets WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else time.time()
+
+    def reset(self) -> int | None:
+        with self._lock:
+            return self._conn.execute("DELETE FROM token_buckets").rowcount
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM token_buckets WHERE key = ?", (key,))
+
+
+# Executado atomicamente pelo Redis; usa o relógio do servidor (TIME) para que
+# workers com relógios diferentes compartilhem o mesmo balde de forma consistente.
+REDIS_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if cost > 0 and tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+if cost > 0 then
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+    redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+end
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBucketStorage(TokenBucketStorage):
+    """
+    Vários hosts: balde guardado em um hash do Redis e atualizado por um script Lua
+    (uma ida ao servidor por verificação). O cliente pode ser injetado (client=...),
+    o que permite testar com um servidor falso que fale o mesmo protocolo.
+    """
+
+    STORAGE_SCHEME = ["bucket+redis", "bucket+rediss"]
+    KEY_PREFIX = "ratelimit:"
+
+    def __init__(self, uri: str | None = None, wrap_exceptions: bool = False, client: Any = None, **options: Any):
+        if client is None:
+            import redis  # Dependência opcional — só necessária com este backend
+
+            client = redis.Redis.from_url((uri or "").replace(BUCKET_SCHEME_PREFIX, "", 1))
+        self._client = client
+        super().__init__(uri, wrap_exceptions=wrap_exceptions)
+
+    @property
+    def base_exceptions(self) -> type[Exception] | tuple[type[Exception], ...]:
+        return (OSError, ConnectionError)
+
+    def _run(self, key: str, capacity: float, rate: float, cost: float) -> tuple[bool, float]:
+        allowed, tokens = self._client.eval(
+            REDIS_TOKEN_BUCKET_SCRIPT, 1, self.KEY_PREFIX + key, capacity, rate, cost
+        )
+        return int(allowed) == 1, float(tokens)
+
+    def consume(self, key: str, capacity: float, rate: float, cost: float) -> tuple[bool, float]:
+        return self._run(key, capacity, rate, cost)
+
+    def peek(self, key: str, capacity: float, rate: float) -> float:
+        return self._run(key, capacity, rate, 0)[1]
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        pipe = self._client.pipeline()
+        pipe.incrby(self.KEY_PREFIX + key, amount)
+        pipe.expire(self.KEY_PREFIX + key, expiry, nx=True)  # O prazo conta do primeiro incremento
+        return int(pipe.execute()[0])
+
+    def get(self, key: str) -> int:
+        return int(self._client.get(self.KEY_PREFIX + key) or 0)
+
+    def get_expiry(self, key: str) -> float:
+        return time.time() + max(0, self._client.ttl(self.KEY_PREFIX + key))
+
+    def check(self) -> bool:
+        try:
+            return bool(self._client.ping())
+        except Exception:
+            return False
+
+    def reset(self) -> int | None:
+        keys = list(self._client.scan_iter(match=self.KEY_PREFIX + "*"))
+        return self._client.delete(*keys) if keys else 0
+
+    def clear(self, key: str) -> None:
+        self._client.delete(self.KEY_PREFIX + key)
+
+
+# ═════════════════════════════════════════════════════════════════════
+# ESTRATÉGIA
+# ═════════════════════════════════════════════════════════════════════
+
+class TokenBucketRateLimiter(RateLimiter):
+    """Estratégia 'token-bucket' para o limits/slowapi (requer um backend bucket+)."""
+
+    def __init__(self, storage: TokenBucketStorage):
+        if not isinstance(storage, TokenBucketStorage):
+            raise ConfigurationError("A estratégia 'token-bucket' requer um storage bucket+ (ex: bucket+memory://).")
+        super().__init__(storage)
+        self.storage: TokenBucketStorage = storage
+
+    @staticmethod
+    def _bucket(item) -> tuple[float, float]:
+        capacity = float(item.amount)
+        return capacity, capacity / item.get_expiry()
+
+    def hit(self, item, *identifiers: str, cost: int = 1) -> bool:
+        capacity, rate = self._bucket(item)
+        return self.storage.consume(item.key_for(*identifiers), capacity, rate, cost)[0]
+
+    def test(self, item, *identifiers: str, cost: int = 1) -> bool:
+        capacity, rate = self._bucket(item)
+        return self.storage.peek(item.key_for(*identifiers), capacity, rate) >= cost
+
+    def get_window_stats(self, item, *identifiers: str) -> WindowStats:
+        capacity, rate = self._bucket(item)
+        tokens = self.storage.peek(item.key_for(*identifiers), capacity, rate)
+        return WindowStats(time.time() + seconds_until_full(tokens, capacity, rate), math.floor(tokens))
+
+    def clear(self, item, *identifiers: str) -> None:
+        self.storage.clear(item.key_for(*identifiers))
+
+
+STRATEGIES["token-bucket"] = TokenBucketRateLimiter
+
+
+def strategy_for(storage_uri: str) -> str:
+    """Backends bucket+ usam token bucket; os demais (memory://, redis://...) mantêm a janela fixa do limits."""
+    return "token-bucket" if storage_uri.startswith(BUCKET_SCHEME_PREFIX) else "fixed-window"
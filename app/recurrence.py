@@ -0,0 +1,271 @@
+"""
+Séries de consultas recorrentes — expansão preguiçosa de ocorrências
+- Regra semanal (dias da semana + intervalo + até/contagem), no estilo RRULE
+- Ocorrências calculadas só para a janela consultada, com cache por janela
+- Exceções (ocorrências alteradas) são linhas reais em Appointment e têm prioridade
+
+As ocorrências virtuais expõem os mesmos atributos de Appointment usados pelas
+rotas (date, time, status, patient, professional...), então podem ser
+serializadas pelo mesmo código das consultas reais.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Any, Iterator
+
+from sqlalchemy import select, or_
+from sqlalchemy.orm import selectinload
+
+from app.database import AsyncSession
+from app.directory import professional_name as directory_professional_name
+from app.models import Appointment, AppointmentSeries, Patient, Professional
+
+
+# ═════════════════════════════════════════════════════════════════════
+# REGRA DE RECORRÊNCIA (FUNÇÕES PURAS)
+# ═════════════════════════════════════════════════════════════════════
+
+def parse_weekdays(value: str) -> tuple[int, ...]:
+    """Converte "0,3" em (0, 3). Lança ValueError para dias fora de 0–6."""
+    days = tuple(sorted({int(part) for part in value.split(",") if part.strip() != ""}))
+    if not days or any(d < 0 or d > 6 for d in days):
+        raise ValueError("weekdays deve conter dias entre 0 (segunda) e 6 (domingo).")
+    return days
+
+
+@lru_cache(maxsize=4096)
+def expand_rule(
+    start: date,
+    weekdays: tuple[int, ...],
+    interval_weeks: int,
+    until: date | None,
+    count: int | None,
+    window_start: date,
+    window_end: date,
+) -> tuple[date, ...]:
+    """
+    Datas das ocorrências da regra dentro de [window_start, window_end].
+    Salta direto para a primeira semana da janela (sem percorrer o histórico),
+    então o custo é proporcional ao tamanho da janela, não à idade da série.
+    O resultado é cacheado por (regra, janela).
+    """
+    interval = max(1, interval_weeks or 1)
+    last = min(window_end, until) if until else window_end
+    if window_start > last or start > last:
+        return ()
+
+    week0 = start - timedelta(days=start.weekday())          # Segunda-feira da primeira semana
+    skipped_first = sum(1 for wd in weekdays if wd < start.weekday())
+    period = max(0, (window_start - week0).days // 7) // interval
+
+    result: list[date] = []
+    while True:
+        week_start = week0 + timedelta(weeks=period * interval)
+        if week_start > last:
+            break
+        for pos, wd in enumerate(weekdays):
+            day = week_start + timedelta(days=wd)
+            if day < start:
+                continue
+            if count is not None and period * len(weekdays) + pos - skipped_first >= count:
+                return tuple(result)
+            if day > last:
+                break
+            if day >= window_start:
+                result.append(day)
+        period += 1
+    return tuple(result)
+
+
+def series_dates(series: AppointmentSeries, window_start: date, window_end: date) -> tuple[date, ...]:
+    """Atalho: expande a regra gravada em uma AppointmentSeries."""
+    return expand_rule(
+        series.start_date,
+        parse_weekdays(series.weekdays),
+        series.interval_weeks or 1,
+        series.until,
+        series.count,
+        window_start,
+        window_end,
+    )
+
+
+def last_date(series: AppointmentSeries) -> date | None:
+    """Última ocorrência da série (por 'until' ou 'count'); None para série aberta."""
+    if series.until is not None:
+        return series.until
+    if series.count is None:
+        return None
+    weekdays = parse_weekdays(series.weekdays)
+    interval = max(1, series.interval_weeks or 1)
+    weeks = (-(-series.count // len(weekdays)) + 1) * interval   # Semanas suficientes para 'count' ocorrências
+    dates = series_dates(series, series.start_date, series.start_date + timedelta(weeks=weeks))
+    return dates[-1] if dates else series.start_date
+
+
+def common_dates(a: AppointmentSeries, b: AppointmentSeries) -> Iterator[date]:
+    """
+    Datas em que as duas regras têm ocorrência, em ordem, sem expandir cada série.
+    Anda pelas semanas ativas da regra de maior intervalo e testa a fase da outra;
+    se um ciclo inteiro (intervalo da outra) passa sem coincidência, elas nunca coincidem.
+    Infinito quando as duas séries são abertas e coincidem — quem consome decide onde parar.
+    """
+    weekdays = sorted(set(parse_weekdays(a.weekdays)) & set(parse_weekdays(b.weekdays)))
+    if not weekdays:
+        return
+    lo = max(a.start_date, b.start_date)
+    ends = [d for d in (last_date(a), last_date(b)) if d is not None]
+    hi = min(ends) if ends else None
+
+    step, other = (a, b) if (a.interval_weeks or 1) >= (b.interval_weeks or 1) else (b, a)
+    step_interval, other_interval = max(1, step.interval_weeks or 1), max(1, other.interval_weeks or 1)
+    step_week0 = step.start_date - timedelta(days=step.start_date.weekday())
+    other_week0 = other.start_date - timedelta(days=other.start_date.weekday())
+    lo_week = lo - timedelta(days=lo.weekday())
+
+    period = max(0, -(-(lo_week - step_week0).days // (7 * step_interval)))
+    misses = 0
+    while True:
+        week = step_week0 + timedelta(weeks=period * step_interval)
+        if hi is not None and week > hi:
+            return
+        if ((week - other_week0).days // 7) % other_interval == 0:
+            misses = 0
+            for wd in weekdays:
+                day = week + timedelta(days=wd)
+                if hi is not None and day > hi:
+                    return
+                if day >= lo:
+                    yield day
+        else:
+            misses += 1
+            if misses >= other_interval:
+                return
+        period += 1
+
+
+# ═════════════════════════════════════════════════════════════════════
+# OCORRÊNCIAS VIRTUAIS
+# ═════════════════════════════════════════════════════════════════════
+
+@dataclass
+class SeriesOccurrence:
+    """Ocorrência calculada de uma série (não existe como linha no banco)."""
+    series_id: int
+    patient_id: int | None
+    professional_id: int | None
+    date: date
+    time: time
+    type: str | None
+    status: str | None
+    observations: str | None
+    patient: Patient | None = None
+    professional: Professional | None = None
+    created_at: datetime | None = None
+    alarm_sent: bool = False
+    original_date: date | None = field(default=None)
+
+    @property
+    def id(self) -> str:
+        # Identificador estável da ocorrência virtual (não colide com ids inteiros)
+        return f"series-{self.series_id}-{self.date.isoformat()}"
+
+    @property
+    def patient_name(self) -> str | None:
+        return self.patient.name if self.patient else None
+
+    @property
+    def professional_name(self) -> str | None:
+        return directory_professional_name(self.professional_id, self.professional)
+
+
+async def load_occurrences(
+    db: AsyncSession,
+    window_start: date,
+    window_end: date,
+    professional_id: int | None = None,
+    with_relations: bool = True,
+) -> list[SeriesOccurrence]:
+    """
+    Ocorrências virtuais das séries ativas na janela, já descontadas as exceções
+    materializadas. Duas queries no total, independentemente do número de séries.
+    """
+    stmt = select(AppointmentSeries).where(
+        AppointmentSeries.start_date <= window_end,
+        or_(AppointmentSeries.until.is_(None), AppointmentSeries.until >= window_start),
+    )
+    if professional_id:
+        stmt = stmt.where(AppointmentSeries.professional_id == professional_id)
+    if with_relations:
+        stmt = stmt.options(
+            selectinload(AppointmentSeries.patient),
+            selectinload(AppointmentSeries.professional),
+        )
+    series_list = (await db.execute(stmt)).scalars().all()
+    if not series_list:
+        return []
+
+    exceptions = {
+        (sid, orig)
+        for sid, orig in (await db.execute(
+            select(Appointment.series_id, Appointment.original_date).where(
+                Appointment.series_id.in_([s.id for s in series_list]),
+                Appointment.original_date >= window_start,
+                Appointment.original_date <= window_end,
+            )
+        )).all()
+    }
+
+    occurrences: list[SeriesOccurrence] = []
+    for s in series_list:
+        for day in series_dates(s, window_start, window_end):
+            if (s.id, day) in exceptions:
+                continue
+            occurrences.append(SeriesOccurrence(
+                series_id=s.id,
+                patient_id=s.patient_id,
+                professional_id=s.professional_id,
+                date=day,
+                time=s.time,
+                type=s.type,
+                status=s.status,
+                observations=s.observations,
+                patient=s.__dict__.get("patient"),
+                professional=s.__dict__.get("professional"),
+                created_at=s.created_at,
+                original_date=day,
+            ))
+    occurrences.sort(key=lambda o: (o.date, o.time))
+    return occurrences
+
+
+async def materialize_occurrence(
+    db: AsyncSession,
+    series: AppointmentSeries,
+    day: date,
+    changes: dict[str, Any] | None = None,
+) -> Appointment:
+    """
+    Transforma uma ocorrência virtual em exceção (linha real em Appointment),
+    aplicando as alterações informadas. Não faz commit.
+    """
+    if day not in series_dates(series, day, day):
+        raise ValueError("A data informada não é uma ocorrência desta série.")
+
+    appt = Appointment(
+        patient_id=series.patient_id,
+        professional_id=series.professional_id,
+        date=day,
+        time=series.time,
+        type=series.type,
+        status=series.status,
+        observations=series.observations,
+        series_id=series.id,
+        original_date=day,
+    )
+    for key, value in (changes or {}).items():
+        setattr(appt, key, value)
+    db.add(appt)
+    await db.flush()
+    return appt
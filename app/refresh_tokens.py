@@ -0,0 +1,104 @@
+"""
+Refresh tokens — sessão de longa duração com access tokens curtos
+- O token (aleatório, 256 bits) vai só para o cliente; no banco fica o SHA-256
+- Rotação: cada uso marca o token como trocado e emite outro da mesma família
+- Reuso de um token já trocado (fora da janela de tolerância) = token vazado →
+  a família inteira é revogada e o próximo refresh de qualquer cópia falha
+- A tolerância cobre duas abas renovando ao mesmo tempo com o mesmo token: a que perde
+  recebe 401 e relê o token novo que a outra gravou, sem derrubar a sessão
+
+Assunto (subject) no formato "user:<id>" ou "patient:<id>".
+"""
+
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import delete, select, update
+
+from app.config import settings
+from app.database import AsyncSession
+from app.models import RefreshToken
+
+REUSE_GRACE_SECONDS = 30
+
+
+def _hash(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def issue(db: AsyncSession, subject: str, family: str | None = None) -> str:
+    """Cria um refresh token (quem chama faz o commit) e devolve o valor em claro."""
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        token_hash=_hash(token),
+        family=family or secrets.token_hex(16),
+        subject=subject,
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+
+async def rotate(db: AsyncSession, token: str) -> tuple[str, str]:
+    """Troca o refresh token por um novo (commit feito aqui). Devolve (subject, novo token)."""
+    now = datetime.utcnow()
+    row = (await db.execute(
+        select(RefreshToken).where(RefreshToken.token_hash == _hash(token))
+    )).scalars().first()
+    if row is None:
+        raise HTTPException(status_code=401, detail="Sessão inválida. Faça login novamente.")
+    if row.revoked_at is not None:
+        if now - row.revoked_at > timedelta(seconds=REUSE_GRACE_SECONDS):
+            await revoke_family(db, row.family)
+        raise HTTPException(status_code=401, detail="Sessão encerrada. Faça login novamente.")
+    if row.expires_at <= now:
+        raise HTTPException(status_code=401, detail="Sessão expirada. Faça login novamente.")
+
+    # Condicional: de dois usos simultâneos do mesmo token, só um vence
+    claimed = await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == row.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+    )
+    if not claimed.rowcount:
+        await db.rollback()
+        raise HTTPException(status_code=401, detail="Sessão encerrada. Faça login novamente.")
+    new_token = issue(db, row.subject, row.family)
+    await db.commit()
+    return row.subject, new_token
+
+
+async def revoke_family(db: AsyncSession, family: str) -> None:
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family == family, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+    await db.commit()
+
+
+async def revoke_token(db: AsyncSession, token: str, subject: str) -> None:
+    """Logout: encerra a família do token, se ele pertence a `subject`."""
+    family = await db.scalar(
+        select(RefreshToken.family).where(
+            RefreshToken.token_hash == _hash(token), RefreshToken.subject == subject
+        )
+    )
+    if family is not None:
+        await revoke_family(db, family)
+
+
+async def revoke_subject(db: AsyncSession, subject: str) -> None:
+    """Encerra todas as sessões de um usuário/paciente (ex: senha redefinida). Sem commit."""
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.subject == subject, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+
+
+async def purge_expired(db: AsyncSession) -> None:
+    """Remove os refresh tokens vencidos (não servem mais nem para detectar reuso)."""
+    await db.execute(delete(RefreshToken).where(RefreshToken.expires_at <= datetime.utcnow()))
+    await db.commit()
@@ -0,0 +1,94 @@
+"""
+Revogação de access tokens (logout) sem consulta ao banco por requisição
+- revoked_tokens guarda o jti de cada access token revogado até o seu exp
+- Cada worker mantém em memória o conjunto jti → exp; a verificação em decode_access_token
+  é uma busca em dict (O(1)), também nos acertos do cache de tokens
+- Revogação feita aqui: aplicada na hora e publicada no barramento (LISTEN/NOTIFY no
+  PostgreSQL) para os demais workers
+- sync() lê do banco só as linhas novas (id > último visto); uma leitura completa periódica
+  cobre as linhas que chegam fora de ordem (transações concorrentes) e as de outros processos
+  quando o barramento está fora
+
+Entradas vencidas saem da memória e do banco: depois do exp o token já é recusado.
+"""
+
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+from sqlalchemy import delete, select
+
+from app.database import AsyncSession
+from app.events import bus
+from app.models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPE = "token_revoked"
+
+
+def _epoch(naive_utc: datetime) -> float:
+    return naive_utc.replace(tzinfo=timezone.utc).timestamp()
+
+
+class RevocationList:
+    def __init__(self) -> None:
+        self._revoked: dict[str, float] = {}   # jti → exp (epoch)
+        self._last_id = 0
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+    def is_revoked(self, jti: str | None) -> bool:
+        return jti is not None and jti in self._revoked
+
+    def add(self, jti: str, exp: float) -> None:
+        if exp > time.time():
+            self._revoked[jti] = exp
+
+    def prune(self) -> None:
+        now = time.time()
+        for jti in [jti for jti, exp in self._revoked.items() if exp <= now]:
+            del self._revoked[jti]
+
+    async def sync(self, db: AsyncSession, full: bool = False) -> int:
+        """Carrega as revogações novas (ou todas, com full=True); devolve quantas leu."""
+        stmt = select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at).where(
+            RevokedToken.expires_at > datetime.utcnow()
+        )
+        if not full:
+            stmt = stmt.where(RevokedToken.id > self._last_id)
+        rows = (await db.execute(stmt)).all()
+        for row_id, jti, expires_at in rows:
+            self.add(jti, _epoch(expires_at))
+            self._last_id = max(self._last_id, row_id)
+        self.prune()
+        return len(rows)
+
+    async def revoke(self, db: AsyncSession, jti: str, exp: float) -> None:
+        """Grava a revogação (commit), aplica neste processo e avisa os demais workers."""
+        expires_at = datetime.fromtimestamp(exp, timezone.utc).replace(tzinfo=None)
+        existing = await db.scalar(select(RevokedToken.id).where(RevokedToken.jti == jti))
+        if existing is None:
+            db.add(RevokedToken(jti=jti, expires_at=expires_at))
+        await db.commit()
+        self.add(jti, exp)
+        await bus.publish({"type": EVENT_TYPE, "jti": jti, "exp": exp})
+
+
+async def purge_expired(db: AsyncSession) -> None:
+    """Remove do banco as revogações vencidas (o exp já recusa esses tokens)."""
+    await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.utcnow()))
+    await db.commit()
+
+
+revocations = RevocationList()
+
+
+def _on_revocation_event(event: dict[str, Any]) -> None:
+    # Resolve a lista no momento do evento (os testes substituem `revocations`)
+    revocations.add(event["jti"], float(event["exp"]))
+
+
+bus.on(EVENT_TYPE, _on_revocation_event)
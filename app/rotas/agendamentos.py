@@ -2,23 +2,39 @@
 Rotas de Agendamentos (Appointments)
 - CRUD completo
 - Consultas de hoje e próximas consultas (para o dashboard)
+- Horários livres calculados a partir do expediente da clínica
+- Detecção de conflito de horário (sem dupla marcação para o mesmo profissional)
+- Séries recorrentes (ocorrências calculadas sob demanda; só exceções são gravadas)
+- Alteração em lote (confirmar/remarcar várias consultas em uma transação)
 """
 
 import logging
 from typing import Any
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, insert, update as sa_update, exists, literal, text, or_, and_, case
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload, joinedload, aliased
+from datetime import date, datetime, time, timedelta
 
 from app.database import AsyncSession, get_db
-from app.models import Patient, Professional, Appointment
-from app.schemas import AppointmentCreate, AppointmentUpdate, AppointmentResponse
+from app.models import Patient, Professional, Appointment, AppointmentSeries, ClinicSettings
+from app.schemas import (
+    AppointmentCreate, AppointmentUpdate, AppointmentResponse, AppointmentBatchItem,
+    AppointmentSeriesCreate, AppointmentSeriesResponse, OccurrenceUpdate,
+)
 from app.auth import get_current_user
+from app.config import settings
+from app import agenda, recurrence
 
 router = APIRouter(prefix="/api/appointments", tags=["Agendamentos"])
 logger = logging.getLogger(__name__)
 
+AVAILABILITY_MAX_DAYS = 62  # Janela máxima por consulta de disponibilidade
+CONFLICT_DETAIL = "Conflito de horário: o profissional já possui uma consulta neste intervalo."
+UPCOMING_SERIES_WINDOW_DAYS = 60  # Janela de expansão das séries para "próximas consultas"
+BATCH_MAX_ITEMS = 500             # Limite de alterações por PATCH /batch
+SERIES_LOCK_WINDOW_DAYS = 365    # Dias (a partir do início) de uma série nova travados contra marcações simultâneas
+
 
 # ═════════════════════════════════════════════════════════════════════
 # FUNÇÕES AUXILIARES
@@ -35,13 +51,14 @@ def _appointment_to_dict(a: Appointment) -> dict[str, Any]:
         "patient_id": a.patient_id,
         "professional_id": a.professional_id,
         "patient_name": a.patient.name if getattr(a, 'patient', None) else None,
-        "professional_name": a.professional.name if getattr(a, 'professional', None) else None,
+        "professional_name": a.professional_name,
         "care_modality": a.patient.care_modality if getattr(a, 'patient', None) else None,
         "date": str(a.date),
         "time": str(a.time),
         "type": a.type,
         "status": a.status,
         "observations": a.observations,
+        "series_id": getattr(a, "series_id", None),
         "created_at": a.created_at,
     }
 
@@ -68,6 +85,165 @@ def _query_with_relations():
     )
 
 
+def _overlap_exists(professional_id: int, day: date, start: time, exclude_id: int | None = None):
+    """
+    Subquery EXISTS que detecta outra consulta ativa do mesmo profissional cujo
+    intervalo [início, início + duração) cruza o intervalo informado.
+    Como todas as sessões têm a mesma duração, basta procurar horários no
+    intervalo aberto (início - duração, início + duração) — um range scan
+    no índice (professional_id, date, time).
+    """
+    other = aliased(Appointment)
+    duration = timedelta(minutes=settings.APPOINTMENT_DURATION_MINUTES)
+    start_dt = datetime.combine(day, start)
+    conditions = [
+        other.professional_id == professional_id,
+        other.date == day,
+        or_(other.status.is_(None), other.status != "Cancelado"),
+    ]
+    if (start_dt - duration).date() == day:
+        conditions.append(other.time > (start_dt - duration).time())
+    if (start_dt + duration).date() == day:
+        conditions.append(other.time < (start_dt + duration).time())
+    if exclude_id is not None:
+        conditions.append(other.id != exclude_id)
+    return exists(select(other.id).where(*conditions))
+
+
+async def _lock_professional_day(db: AsyncSession, professional_id: int, day: date) -> None:
+    """
+    No PostgreSQL, serializa marcações concorrentes do mesmo profissional no mesmo dia
+    com um advisory lock de transação (liberado no commit/rollback).
+    No SQLite a escrita já é serializada pelo próprio banco.
+    """
+    if db.bind is not None and db.bind.dialect.name == "postgresql":
+        await db.execute(
+            text("SELECT pg_advisory_xact_lock(:prof, :day)"),
+            {"prof": professional_id, "day": day.toordinal()},
+        )
+
+
+async def _lock_professional_series(db: AsyncSession, professional_id: int) -> None:
+    """Serializa a criação de séries do mesmo profissional (chave 0: nenhum dia tem ordinal 0)."""
+    if db.bind is not None and db.bind.dialect.name == "postgresql":
+        await db.execute(text("SELECT pg_advisory_xact_lock(:prof, 0)"), {"prof": professional_id})
+
+
+async def _series_conflict(
+    db: AsyncSession,
+    professional_id: int,
+    day: date,
+    start: time,
+    skip_occurrence: tuple[int, date] | None = None,
+) -> bool:
+    """
+    Verifica sobreposição com ocorrências virtuais de séries recorrentes naquele dia
+    (elas não existem como linhas, então não são vistas pelo EXISTS do INSERT).
+    """
+    duration = settings.APPOINTMENT_DURATION_MINUTES
+    begin = agenda.to_minutes(start)
+    for occ in await recurrence.load_occurrences(db, day, day, professional_id, with_relations=False):
+        if skip_occurrence == (occ.series_id, occ.date) or occ.status == "Cancelado":
+            continue
+        if abs(agenda.to_minutes(occ.time) - begin) < duration:
+            return True
+    return False
+
+
+async def _series_booking_conflict(db: AsyncSession, series: AppointmentSeries) -> date | None:
+    """
+    Primeira ocorrência da série nova que cruza uma consulta ativa ou uma ocorrência de outra
+    série do mesmo profissional (mesma regra de sobreposição de _book_appointment), ou None.
+    Vale para toda a vigência, inclusive séries abertas:
+    - consultas reais: uma query a partir do início da série, filtrada pelo horário e pela regra
+    - outras séries: interseção das regras (recurrence.common_dates), sem expandir as datas
+    Trava a criação de séries do profissional e os dias do primeiro ano (em ordem, sem
+    deadlock) contra marcações simultâneas até o commit da série.
+    """
+    await _lock_professional_series(db, series.professional_id)
+    for day in recurrence.series_dates(
+        series, series.start_date, series.start_date + timedelta(days=SERIES_LOCK_WINDOW_DAYS)
+    ):
+        await _lock_professional_day(db, series.professional_id, day)
+
+    duration = settings.APPOINTMENT_DURATION_MINUTES
+    begin = agenda.to_minutes(series.time)
+    last = recurrence.last_date(series)
+    conflicts: list[date] = []
+
+    stmt = select(Appointment.date, Appointment.time).where(
+        Appointment.professional_id == series.professional_id,
+        Appointment.date >= series.start_date,
+        or_(Appointment.status.is_(None), Appointment.status != "Cancelado"),
+    ).order_by(Appointment.date)
+    if last is not None:
+        stmt = stmt.where(Appointment.date <= last)
+    for day, start in (await db.execute(stmt)).all():
+        if abs(agenda.to_minutes(start) - begin) < duration and recurrence.series_dates(series, day, day):
+            conflicts.append(day)
+            break
+
+    others = (await db.execute(
+        select(AppointmentSeries).where(
+            AppointmentSeries.professional_id == series.professional_id,
+            or_(AppointmentSeries.status.is_(None), AppointmentSeries.status != "Cancelado"),
+            or_(AppointmentSeries.until.is_(None), AppointmentSeries.until >= series.start_date),
+        )
+    )).scalars().all()
+    others = [s for s in others if abs(agenda.to_minutes(s.time) - begin) < duration]
+    if others:
+        # Ocorrências materializadas saem da regra (a consulta real já foi vista acima)
+        exceptions = set((await db.execute(
+            select(Appointment.series_id, Appointment.original_date).where(
+                Appointment.series_id.in_([s.id for s in others]),
+                Appointment.original_date >= series.start_date,
+            )
+        )).all())
+        for other in others:
+            for day in recurrence.common_dates(series, other):
+                if (other.id, day) not in exceptions:
+                    conflicts.append(day)
+                    break
+    return min(conflicts) if conflicts else None
+
+
+async def _book_appointment(db: AsyncSession, data: dict[str, Any]) -> int:
+    """
+    Insere a consulta somente se o horário estiver livre, em uma única instrução
+    INSERT ... SELECT ... WHERE NOT EXISTS (atômica mesmo com marcações simultâneas).
+    Retorna o id criado ou lança 409 em caso de conflito.
+    """
+    columns = list(data)
+    source = select(*[
+        literal(data[c], type_=Appointment.__table__.c[c].type).label(c) for c in columns
+    ])
+    if data.get("status") != "Cancelado":
+        source = source.where(~_overlap_exists(data["professional_id"], data["date"], data["time"]))
+
+    await _lock_professional_day(db, data["professional_id"], data["date"])
+    if data.get("status") != "Cancelado" and await _series_conflict(
+        db, data["professional_id"], data["date"], data["time"],
+        skip_occurrence=(data["series_id"], data["original_date"]) if data.get("series_id") else None,
+    ):
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
+    try:
+        new_id = (await db.execute(
+            insert(Appointment).from_select(columns, source).returning(Appointment.id)
+        )).scalar()
+    except IntegrityError:
+        # Constraint de exclusão do PostgreSQL (última barreira contra sobreposição)
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
+
+    if new_id is None:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
+
+    await db.commit()
+    return new_id
+
+
 # ═════════════════════════════════════════════════════════════════════
 # ENDPOINTS ESPECIAIS (DASHBOARD)
 # ═════════════════════════════════════════════════════════════════════
@@ -83,9 +259,13 @@ async def today_appointments(
         if prof_id:
             stmt = stmt.where(Appointment.professional_id == prof_id)
         result = await db.execute(stmt)
+        today = date.today()
+        rows: list[Any] = list(result.scalars().all())
+        rows += await recurrence.load_occurrences(db, today, today, prof_id)
+        rows.sort(key=lambda a: a.time)
 
         appointments = []
-        for a in result.scalars().all():
+        for a in rows:
             appt_dict = _appointment_to_dict(a)
             appt_dict["date"] = str(a.date) if a.date else None
             appt_dict["time"] = a.time.strftime("%H:%M") if a.time else None
@@ -114,9 +294,15 @@ async def upcoming_appointments(
         if prof_id:
             stmt = stmt.where(Appointment.professional_id == prof_id)
         result = await db.execute(stmt)
+        rows: list[Any] = list(result.scalars().all())
+        first_day = date.today() + timedelta(days=1)
+        rows += await recurrence.load_occurrences(
+            db, first_day, first_day + timedelta(days=UPCOMING_SERIES_WINDOW_DAYS), prof_id
+        )
+        rows = sorted(rows, key=lambda a: (a.date, a.time))[:10]
 
         appointments = []
-        for a in result.scalars().all():
+        for a in rows:
             appt_dict = _appointment_to_dict(a)
             # Formata a data de forma curta: dd/mm
             appt_dict["date"] = a.date.strftime("%d/%m") if hasattr(a.date, "strftime") else (str(a.date)[:5] if a.date else None)
@@ -130,6 +316,341 @@ async def upcoming_appointments(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/availability")
+async def get_availability(
+    professional_id: int | None = None,
+    from_date: date | None = Query(None, alias="from"),
+    to_date: date | None = Query(None, alias="to"),
+    slot: str = "50m",
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+) -> dict[str, Any]:
+    """
+    Horários livres por profissional e por dia, entre 'from' e 'to' (inclusive).
+    O expediente vem de ClinicSettings; cada consulta não cancelada ocupa
+    APPOINTMENT_DURATION_MINUTES a partir do seu horário.
+    Sem professional_id, admins recebem todos os profissionais ativos.
+    """
+    try:
+        slot_minutes = agenda.parse_slot_minutes(slot)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    start = from_date or date.today()
+    end = to_date or start + timedelta(days=6)
+    if end < start:
+        raise HTTPException(status_code=422, detail="'to' deve ser posterior a 'from'.")
+    if (end - start).days + 1 > AVAILABILITY_MAX_DAYS:
+        raise HTTPException(status_code=422, detail=f"O intervalo máximo é de {AVAILABILITY_MAX_DAYS} dias.")
+
+    # --- Escopo: não-admins só consultam a própria agenda ---
+    own_prof_id = await _get_prof_id_for_user(current_user, db)
+    if current_user.get("role") != "admin":
+        if not own_prof_id or (professional_id and professional_id != own_prof_id):
+            raise HTTPException(status_code=403, detail="Acesso negado à agenda deste profissional.")
+        professional_id = own_prof_id
+
+    prof_stmt = select(Professional.id, Professional.name).order_by(Professional.name)
+    if professional_id:
+        prof_stmt = prof_stmt.where(Professional.id == professional_id)
+    else:
+        prof_stmt = prof_stmt.where(Professional.status == "Ativo")
+    professionals = (await db.execute(prof_stmt)).all()
+    if professional_id and not professionals:
+        raise HTTPException(status_code=404, detail="Professional not found")
+
+    clinic = (await db.execute(select(ClinicSettings).order_by(ClinicSettings.id).limit(1))).scalars().first()
+    week_hours = agenda.parse_working_hours(
+        clinic.working_hours_week if clinic else agenda.DEFAULT_WORKING_HOURS_WEEK
+    )
+    saturday_hours = agenda.parse_working_hours(
+        clinic.working_hours_saturday if clinic else agenda.DEFAULT_WORKING_HOURS_SATURDAY
+    )
+
+    # --- Intervalos ocupados: uma única query para todos os profissionais da janela ---
+    busy_stmt = (
+        select(Appointment.professional_id, Appointment.date, Appointment.time)
+        .where(
+            Appointment.date >= start,
+            Appointment.date <= end,
+            Appointment.status != "Cancelado",
+        )
+    )
+    if professional_id:
+        busy_stmt = busy_stmt.where(Appointment.professional_id == professional_id)
+
+    duration = settings.APPOINTMENT_DURATION_MINUTES
+    busy: dict[tuple[int, date], list[tuple[int, int]]] = {}
+    for prof, appt_date, appt_time in (await db.execute(busy_stmt)).all():
+        begin = agenda.to_minutes(appt_time)
+        busy.setdefault((prof, appt_date), []).append((begin, begin + duration))
+    for occ in await recurrence.load_occurrences(db, start, end, professional_id, with_relations=False):
+        if occ.status != "Cancelado":
+            begin = agenda.to_minutes(occ.time)
+            busy.setdefault((occ.professional_id, occ.date), []).append((begin, begin + duration))
+
+    now = datetime.now()
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    openings = {d: agenda.working_hours_for(d, week_hours, saturday_hours) for d in days}
+
+    result = []
+    for prof_id, prof_name in professionals:
+        free: dict[str, list[str]] = {}
+        for d in days:
+            opening = openings[d]
+            if opening is None or d < now.date():
+                continue
+            not_before = now.hour * 60 + now.minute if d == now.date() else 0
+            starts = agenda.free_slots(opening, busy.get((prof_id, d), []), slot_minutes, not_before)
+            free[d.isoformat()] = [agenda.from_minutes(m) for m in starts]
+        result.append({"professional_id": prof_id, "professional_name": prof_name, "days": free})
+
+    return {
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "slot_minutes": slot_minutes,
+        "professionals": result,
+    }
+
+
+# ═════════════════════════════════════════════════════════════════════
+# SÉRIES RECORRENTES
+# ═════════════════════════════════════════════════════════════════════
+
+async def _get_series_for_user(series_id: int, current_user: dict, db: AsyncSession) -> AppointmentSeries:
+    series = await db.get(AppointmentSeries, series_id)
+    if not series:
+        raise HTTPException(status_code=404, detail="Série não encontrada.")
+    prof_id = await _get_prof_id_for_user(current_user, db)
+    if prof_id and series.professional_id != prof_id:
+        raise HTTPException(status_code=403, detail="Acesso negado a esta série.")
+    return series
+
+
+@router.post("/series", response_model=AppointmentSeriesResponse)
+async def create_series(
+    body: AppointmentSeriesCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+) -> AppointmentSeries:
+    """
+    Cria uma série recorrente (ex: sessão toda quinta às 14h).
+    Nenhuma consulta é gravada aqui — as ocorrências são calculadas quando consultadas.
+    Nenhuma ocorrência, em toda a vigência da série, pode cruzar a agenda do profissional (409).
+    """
+    data = body.model_dump()
+    try:
+        weekdays = recurrence.parse_weekdays(data["weekdays"] or str(body.start_date.weekday()))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if body.interval_weeks < 1 or (body.count is not None and body.count < 1):
+        raise HTTPException(status_code=422, detail="interval_weeks e count devem ser positivos.")
+    data["weekdays"] = ",".join(map(str, weekdays))
+
+    prof_id = await _get_prof_id_for_user(current_user, db)
+    if prof_id and body.professional_id != prof_id:
+        raise HTTPException(status_code=403, detail="Acesso negado à agenda deste profissional.")
+    if not await db.get(Patient, body.patient_id):
+        raise HTTPException(status_code=404, detail="Patient not found")
+    if not await db.get(Professional, body.professional_id):
+        raise HTTPException(status_code=404, detail="Professional not found")
+
+    series = AppointmentSeries(**data)
+    if series.status != "Cancelado" and (conflict := await _series_booking_conflict(db, series)):
+        await db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail=f"{CONFLICT_DETAIL} Primeira ocorrência em conflito: {conflict.isoformat()}.",
+        )
+    db.add(series)
+    await db.commit()
+    await db.refresh(series)
+    return series
+
+
+@router.get("/series", response_model=list[AppointmentSeriesResponse])
+async def list_series(
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+) -> list[AppointmentSeries]:
+    stmt = (
+        select(AppointmentSeries)
+        .options(selectinload(AppointmentSeries.patient), selectinload(AppointmentSeries.professional))
+        .order_by(AppointmentSeries.id)
+    )
+    prof_id = await _get_prof_id_for_user(current_user, db)
+    if prof_id:
+        stmt = stmt.where(AppointmentSeries.professional_id == prof_id)
+    return list((await db.execute(stmt)).scalars().all())
+
+
+@router.delete("/series/{series_id}")
+async def end_series(
+    series_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+) -> dict[str, str]:
+    """
+    Encerra a série a partir de hoje: as ocorrências passadas continuam no histórico,
+    as futuras deixam de ser geradas. Exceções já materializadas não são alteradas.
+    """
+    series = await _get_series_for_user(series_id, current_user, db)
+    series.until = date.today() - timedelta(days=1)
+    await db.commit()
+    return {"message": "Série encerrada."}
+
+
+@router.put("/series/{series_id}/occurrences/{occurrence_date}")
+async def update_occurrence(
+    series_id: int,
+    occurrence_date: date,
+    body: OccurrenceUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+) -> dict[str, Any]:
+    """
+    Altera uma única ocorrência (confirmar, cancelar, remarcar...).
+    A ocorrência é materializada como consulta real ligada à série; alterações
+    seguintes usam o PUT normal de /api/appointments/{id}.
+    """
+    series = await _get_series_for_user(series_id, current_user, db)
+
+    existing = (await db.execute(
+        select(Appointment.id).where(
+            Appointment.series_id == series_id,
+            Appointment.original_date == occurrence_date,
+        )
+    )).scalar()
+    if existing:
+        raise HTTPException(status_code=409, detail="Ocorrência já materializada; edite a consulta pelo id.")
+
+    if occurrence_date not in recurrence.series_dates(series, occurrence_date, occurrence_date):
+        raise HTTPException(status_code=404, detail="A data informada não é uma ocorrência desta série.")
+
+    data = {
+        "patient_id": series.patient_id,
+        "professional_id": series.professional_id,
+        "date": occurrence_date,
+        "time": series.time,
+        "type": series.type,
+        "status": series.status,
+        "observations": series.observations,
+        "series_id": series.id,
+        "original_date": occurrence_date,
+    }
+    data.update(body.model_dump(exclude_unset=True))
+    new_id = await _book_appointment(db, data)
+
+    created = (await db.execute(_query_with_relations().where(Appointment.id == new_id))).scalars().first()
+    if not created:
+        raise HTTPException(status_code=500, detail="Erro interno ao carregar ocorrência.")
+    return _appointment_to_dict(created)
+
+
+# ═════════════════════════════════════════════════════════════════════
+# ALTERAÇÃO EM LOTE
+# ═════════════════════════════════════════════════════════════════════
+
+@router.patch("/batch")
+async def batch_update_appointments(
+    items: list[AppointmentBatchItem],
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+) -> list[dict[str, Any]]:
+    """
+    Aplica várias alterações (status, data, hora) em uma única transação:
+    - um único UPDATE ... SET col = CASE id ... WHERE id IN (...), com a restrição
+      ao profissional logado feita no próprio WHERE (subquery pelo e-mail do token);
+    - uma única verificação de conflito para todas as linhas alteradas;
+    - uma única query para devolver as consultas atualizadas.
+    Tudo ou nada: se algum id não existir/não pertencer ao profissional, ou se
+    houver conflito de horário, nada é alterado.
+    """
+    if not items:
+        return []
+    if len(items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=422, detail=f"Máximo de {BATCH_MAX_ITEMS} alterações por lote.")
+
+    changes = {item.id: item.model_dump(exclude_unset=True, exclude={"id"}) for item in items}
+    if len(changes) != len(items):
+        raise HTTPException(status_code=422, detail="Cada consulta pode aparecer apenas uma vez no lote.")
+    if any(not fields for fields in changes.values()):
+        raise HTTPException(status_code=422, detail="Cada item deve alterar status, date ou time.")
+    ids = list(changes)
+
+    values: dict[str, Any] = {}
+    for column in ("status", "date", "time"):
+        whens = {appt_id: fields[column] for appt_id, fields in changes.items() if column in fields}
+        if whens:
+            values[column] = case(whens, value=Appointment.id, else_=getattr(Appointment, column))
+
+    stmt = sa_update(Appointment).where(Appointment.id.in_(ids)).values(**values)
+    if current_user.get("role") != "admin":
+        stmt = stmt.where(Appointment.professional_id == (
+            select(Professional.id)
+            .where(Professional.email == current_user.get("email", ""))
+            .scalar_subquery()
+        ))
+    stmt = stmt.returning(
+        Appointment.id, Appointment.professional_id, Appointment.date, Appointment.time,
+        Appointment.status,
+    ).execution_options(synchronize_session=False)
+
+    try:
+        updated = (await db.execute(stmt)).all()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
+
+    missing = sorted(set(ids) - {row.id for row in updated})
+    if missing:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail=f"Agendamentos não encontrados: {missing}")
+
+    active = [row for row in updated if row.status != "Cancelado"]
+    if active:
+        for prof, day in sorted({(row.professional_id, row.date) for row in active}):
+            await _lock_professional_day(db, prof, day)
+
+        # As linhas já estão atualizadas nesta transação, então a mesma verificação
+        # cobre conflitos com a agenda existente e entre itens do próprio lote.
+        clash = (await db.execute(
+            select(literal(1)).where(or_(*[
+                _overlap_exists(row.professional_id, row.date, row.time, exclude_id=row.id)
+                for row in active
+            ])).limit(1)
+        )).scalar()
+
+        if not clash:
+            first_day = min(row.date for row in active)
+            last_day = max(row.date for row in active)
+            duration = settings.APPOINTMENT_DURATION_MINUTES
+            occupied: dict[tuple[int, date], list[int]] = {}
+            for occ in await recurrence.load_occurrences(db, first_day, last_day, with_relations=False):
+                if occ.status != "Cancelado":
+                    occupied.setdefault((occ.professional_id, occ.date), []).append(agenda.to_minutes(occ.time))
+            clash = any(
+                abs(begin - agenda.to_minutes(row.time)) < duration
+                for row in active
+                for begin in occupied.get((row.professional_id, row.date), [])
+            )
+
+        if clash:
+            await db.rollback()
+            raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
+
+    await db.commit()
+
+    result = await db.execute(
+        select(Appointment)
+        .options(joinedload(Appointment.patient), joinedload(Appointment.professional))
+        .where(Appointment.id.in_(ids))
+        .order_by(Appointment.date, Appointment.time)
+        .execution_options(populate_existing=True)
+    )
+    return [_appointment_to_dict(a) for a in result.scalars().unique().all()]
+
+
 # ═════════════════════════════════════════════════════════════════════
 # CRUD PADRÃO
 # ═════════════════════════════════════════════════════════════════════
@@ -187,6 +708,7 @@ async def create_appointment(appointment: AppointmentCreate, db: AsyncSession =
     O computador não confia em ninguém. Antes de carimbar o papel e salvar na pasta (banco de dados), ele checa pra ver se tudo faz sentido:
     "Espera aí, o Paciente de ID 5 realmente existe na minha clínica? E esse Profissional ID 2, é falso?".
     Se não existirem, bloqueia o agendamento! Só salva (commit) com tudo verificado.
+    Por fim, ele confere se o profissional já tem outra consulta naquele horário: se tiver, recusa (Erro 409).
     """
     patient = await db.get(Patient, appointment.patient_id)
     if not patient:
@@ -196,10 +718,10 @@ async def create_appointment(appointment: AppointmentCreate, db: AsyncSession =
     if not professional:
         raise HTTPException(status_code=404, detail="Professional not found")
 
-    db_appt = Appointment(**appointment.model_dump())
-    db.add(db_appt)
-    await db.commit()
-    await db.refresh(db_appt)
+    new_id = await _book_appointment(db, appointment.model_dump())
+    db_appt = await db.get(Appointment, new_id)
+    if not db_appt:
+        raise HTTPException(status_code=500, detail="Erro interno ao carregar agendamento criado.")
 
     return db_appt
 
@@ -227,10 +749,35 @@ async def update_appointment(
     if prof_id and db_appt.professional_id != prof_id:
         raise HTTPException(status_code=403, detail="Acesso negado a este agendamento.")
 
-    for key, value in appointment_update.model_dump(exclude_unset=True).items():
-        setattr(db_appt, key, value)
+    changes = appointment_update.model_dump(exclude_unset=True)
+    if changes:
+        target_prof = changes.get("professional_id", db_appt.professional_id)
+        target_date = changes.get("date", db_appt.date)
+        target_time = changes.get("time", db_appt.time)
+        target_status = changes.get("status", db_appt.status)
+
+        # UPDATE condicional: só aplica se o novo horário não conflitar com outra consulta
+        stmt_upd = sa_update(Appointment).where(Appointment.id == appointment_id).values(**changes)
+        if target_status != "Cancelado":
+            stmt_upd = stmt_upd.where(
+                ~_overlap_exists(target_prof, target_date, target_time, exclude_id=appointment_id)
+            )
+            await _lock_professional_day(db, target_prof, target_date)
+            skip = (db_appt.series_id, db_appt.original_date) if db_appt.series_id else None
+            if await _series_conflict(db, target_prof, target_date, target_time, skip_occurrence=skip):
+                await db.rollback()
+                raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
+        try:
+            updated = (await db.execute(stmt_upd.execution_options(synchronize_session=False))).rowcount
+        except IntegrityError:
+            await db.rollback()
+            raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
+        if not updated:
+            await db.rollback()
+            raise HTTPException(status_code=409, detail=CONFLICT_DETAIL)
 
     await db.commit()
+    db.expunge(db_appt)
 
     # Recarrega com os relacionamentos para que a resposta contenha os nomes associados
     stmt2 = _query_with_relations().where(Appointment.id == appointment_id)
@@ -6,11 +6,12 @@ Rotas de Atestados (Certificates)
 from typing import Any
 from datetime import date
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import select
+from sqlalchemy import insert, literal_column, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 
 from app.database import AsyncSession, get_db
-from app.models import Patient, Professional, Certificate
+from app.models import Patient, Certificate
 from app.schemas import CertificateCreate, CertificateUpdate, CertificateResponse
 
 router = APIRouter(prefix="/api/certificates", tags=["Atestados"])
@@ -20,10 +21,11 @@ router = APIRouter(prefix="/api/certificates", tags=["Atestados"])
 # FUNÇÕES AUXILIARES
 # ═════════════════════════════════════════════════════════════════════
 
-def _certificate_to_dict(cert: Certificate) -> dict[str, Any]:
+def _certificate_to_dict(cert: Any) -> dict[str, Any]:
     """
     Constrói um dict serializado a partir dos campos explícitos do atestado.
-    Inclui patient_name e professional_name vindos dos relacionamentos já carregados.
+    Inclui patient_name e professional_name vindos dos relacionamentos já carregados
+    (ou, para a linha devolvida pelo INSERT ... RETURNING, das colunas de mesmo nome).
     """
     return {
         "id": cert.id,
@@ -34,11 +36,23 @@ def _certificate_to_dict(cert: Certificate) -> dict[str, Any]:
         "description": cert.description,
         "date": cert.date,
         "created_at": cert.created_at,
-        "patient_name": cert.patient.name if cert.patient else None,
-        "professional_name": cert.professional.name if cert.professional else None,
+        "patient_name": cert.patient_name,
+        "professional_name": cert.professional_name,
     }
 
 
+# INSERT ... RETURNING com os nomes de paciente e profissional resolvidos no mesmo comando
+_RETURNING = (
+    *Certificate.__table__.c,
+    literal_column(
+        "(SELECT patients.name FROM patients WHERE patients.id = certificates.patient_id)"
+    ).label("patient_name"),
+    literal_column(
+        "(SELECT professionals.name FROM professionals WHERE professionals.id = certificates.professional_id)"
+    ).label("professional_name"),
+)
+
+
 async def _reload_with_relations(db: AsyncSession, certificate_id: int) -> Certificate | None:
     """Recarrega um atestado com paciente e profissional em uma única query."""
     stmt = (
@@ -78,30 +92,28 @@ async def list_certificates(
 @router.post("", response_model=CertificateResponse)
 async def create_certificate(cert: CertificateCreate, db: AsyncSession = Depends(get_db)) -> dict[str, Any]:
     """
-    Cria um atestado após verificar que o paciente e o profissional informados existem.
+    Cria um atestado com um único INSERT ... RETURNING, que já devolve os nomes do
+    paciente e do profissional. Nome ausente = paciente/profissional inexistente:
+    desfaz a gravação e responde 404 (no PostgreSQL a FK já recusa o INSERT).
     A data é preenchida com a data de hoje quando não informada.
     """
-    patient = await db.get(Patient, cert.patient_id)
-    if not patient:
-        raise HTTPException(status_code=404, detail="Paciente não encontrado.")
-
-    professional = await db.get(Professional, cert.professional_id)
-    if not professional:
-        raise HTTPException(status_code=404, detail="Profissional não encontrado.")
-
     cert_data = cert.model_dump()
     if not cert_data.get("date"):
         cert_data["date"] = date.today()
 
-    db_cert = Certificate(**cert_data)
-    db.add(db_cert)
-    await db.commit()
-    await db.refresh(db_cert)
+    try:
+        db_cert = (await db.execute(insert(Certificate).values(**cert_data).returning(*_RETURNING))).one()
+    except IntegrityError:
+        db_cert = None
+    if db_cert is None or db_cert.patient_name is None or db_cert.professional_name is None:
+        await db.rollback()
+        # Só no caminho de erro: descobre qual dos dois não existe
+        if not await db.get(Patient, cert.patient_id):
+            raise HTTPException(status_code=404, detail="Paciente não encontrado.")
+        raise HTTPException(status_code=404, detail="Profissional não encontrado.")
 
-    reloaded = await _reload_with_relations(db, int(str(db_cert.id)))
-    if not reloaded:
-        raise HTTPException(status_code=500, detail="Erro ao recarregar atestado criado.")
-    return _certificate_to_dict(reloaded)
+    await db.commit()
+    return _certificate_to_dict(db_cert)
 
 
 @router.put("/{certificate_id}", response_model=CertificateResponse)
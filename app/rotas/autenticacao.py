@@ -1,23 +1,27 @@
 ﻿"""
 Rotas de Autenticação
 - Login (email para funcionários, CPF para pacientes)
+- Renovação da sessão (refresh token → novo access token curto) e logout
 - Recuperação de senha (esqueci minha senha)
 """
 
 import secrets
 import logging
+import time
 from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
 from sqlalchemy import select
 from pydantic import BaseModel
 
 from app.database import AsyncSession, get_db
 from app.models import User, Patient, PasswordResetToken
-from app.auth import verify_password, get_password_hash, create_access_token
+from app.auth import verify_password_async, get_password_hash, create_access_token, get_current_user
 from app.config import settings
 from app.schemas import ForgotPasswordRequest, ResetPasswordRequest
 from app.email_utils import send_reset_password_link_email
 from app.limiter import limiter
+from app import identifier_filter, refresh_tokens, revocation
+from app.password_rehash import rehasher
 
 
 router = APIRouter(prefix="/api", tags=["Autenticação"])
@@ -36,16 +40,69 @@ class LoginRequest(BaseModel):
     password: str
 
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+class LogoutRequest(BaseModel):
+    refresh_token: str | None = None
+
+
+# ═════════════════════════════════════════════════════════════════════
+# SESSÃO (ACCESS TOKEN + REFRESH TOKEN)
+# ═════════════════════════════════════════════════════════════════════
+
+async def _issue_session(db: AsyncSession, subject: str, claims: dict) -> dict:
+    """Access token curto + refresh token de uma nova sessão (família)."""
+    refresh_token = refresh_tokens.issue(db, subject)
+    await db.commit()
+    return {
+        "access_token": create_access_token(claims),
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+
+async def _subject_claims(db: AsyncSession, subject: str) -> dict | None:
+    """Claims atuais do dono da sessão (None se removido/inativo): o refresh reflete mudanças de perfil."""
+    kind, _, raw_id = subject.partition(":")
+    if kind == "user":
+        user = await db.get(User, int(raw_id))
+        if user is None or not user.is_active:
+            return None
+        return {"sub": str(user.id), "email": user.email, "role": user.role}
+    patient = await db.get(Patient, int(raw_id))
+    if patient is None or patient.status != "Ativo" or not patient.hashed_password:
+        return None
+    return {"sub": str(patient.id), "email": patient.cpf, "role": "patient"}
+
+
 # ═════════════════════════════════════════════════════════════════════
 # ENDPOINTS DE AUTENTICAÇÃO
 # ═════════════════════════════════════════════════════════════════════
 
 @router.post("/login")
 @limiter.limit("10/minute")
-async def login(request: Request, body: LoginRequest, db: AsyncSession = Depends(get_db)) -> dict:
+async def login(
+    request: Request,
+    body: LoginRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db),
+) -> dict:
     try:
         email_or_cpf = body.email.strip()
         password = body.password.strip()
+        started = time.perf_counter()
+
+        # Identificador que o filtro garante não existir → recusa sem consultar o banco,
+        # no mesmo tempo médio da recusa que passa pelo banco (sem oráculo de enumeração)
+        index = identifier_filter.index
+        if not index.might_contain(
+            (identifier_filter.USER_EMAIL, email_or_cpf), (identifier_filter.PATIENT_CPF, email_or_cpf)
+        ):
+            await index.login_miss.pad(started)
+            raise HTTPException(status_code=404, detail="E-mail ou CPF não encontrado no sistema.")
 
         # --- Tenta login como funcionário (tabela Users) ---
         stmt_user = select(User).where(User.email == email_or_cpf)
@@ -55,12 +112,15 @@ async def login(request: Request, body: LoginRequest, db: AsyncSession = Depends
         if user:
             if not user.is_active:
                 raise HTTPException(status_code=403, detail="Usuário inativo. Contate o administrador.")
-            if not verify_password(password, user.hashed_password):
+            if not await verify_password_async(password, user.hashed_password):
                 raise HTTPException(status_code=401, detail="Senha incorreta.")
-            token = create_access_token({"sub": str(user.id), "email": user.email, "role": user.role})
+            # Hash com parâmetros antigos do Argon2: refeito depois da resposta
+            rehasher.schedule(background_tasks, "user", user.id, password, user.hashed_password)
+            session = await _issue_session(
+                db, f"user:{user.id}", {"sub": str(user.id), "email": user.email, "role": user.role}
+            )
             return {
-                "access_token": token,
-                "token_type": "bearer",
+                **session,
                 "id": user.id,
                 "email": user.email,
                 "full_name": user.full_name,
@@ -76,18 +136,22 @@ async def login(request: Request, body: LoginRequest, db: AsyncSession = Depends
         if patient and patient.hashed_password:
             if patient.status != "Ativo":
                 raise HTTPException(status_code=403, detail="Paciente inativo. Contate a clínica.")
-            if not verify_password(password, patient.hashed_password):
+            if not await verify_password_async(password, patient.hashed_password):
                 raise HTTPException(status_code=401, detail="Senha incorreta.")
-            token = create_access_token({"sub": str(patient.id), "email": patient.cpf, "role": "patient"})
+            rehasher.schedule(background_tasks, "patient", patient.id, password, patient.hashed_password)
+            session = await _issue_session(
+                db, f"patient:{patient.id}", {"sub": str(patient.id), "email": patient.cpf, "role": "patient"}
+            )
             return {
-                "access_token": token,
-                "token_type": "bearer",
+                **session,
                 "id": patient.id,
                 "email": patient.cpf,
                 "full_name": patient.name,
                 "role": "patient",
             }
 
+        if not user and not patient:
+            index.login_miss.observe(time.perf_counter() - started)
         raise HTTPException(status_code=404, detail="E-mail ou CPF não encontrado no sistema.")
 
     except HTTPException:
@@ -97,6 +161,42 @@ async def login(request: Request, body: LoginRequest, db: AsyncSession = Depends
         raise HTTPException(status_code=503, detail="Serviço temporariamente indisponível. Tente novamente.")
 
 
+@router.post("/token/refresh")
+@limiter.limit("30/minute")
+async def refresh_session(request: Request, body: RefreshRequest, db: AsyncSession = Depends(get_db)) -> dict:
+    """
+    Troca o refresh token por um novo par (access token curto + refresh token rotacionado).
+    Não exige o access token: é justamente quando ele venceu que o frontend chama esta rota.
+    """
+    subject, new_refresh_token = await refresh_tokens.rotate(db, body.refresh_token)
+    claims = await _subject_claims(db, subject)
+    if claims is None:
+        await refresh_tokens.revoke_subject(db, subject)
+        await db.commit()
+        raise HTTPException(status_code=401, detail="Usuário inativo. Contate o administrador.")
+    return {
+        "access_token": create_access_token(claims),
+        "refresh_token": new_refresh_token,
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+
+@router.post("/logout")
+async def logout(
+    body: LogoutRequest | None = None,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> dict:
+    """Encerra a sessão: revoga o refresh token (família) e o access token atual em todos os workers."""
+    kind = "patient" if current_user.get("role") == "patient" else "user"
+    if body is not None and body.refresh_token:
+        await refresh_tokens.revoke_token(db, body.refresh_token, f"{kind}:{current_user['sub']}")
+    if current_user.get("jti"):
+        await revocation.revocations.revoke(db, current_user["jti"], float(current_user["exp"]))
+    return {"message": "Sessão encerrada."}
+
+
 @router.post("/forgot-password")
 async def forgot_password(request: ForgotPasswordRequest, db: AsyncSession = Depends(get_db)) -> dict:
     """
@@ -105,6 +205,12 @@ async def forgot_password(request: ForgotPasswordRequest, db: AsyncSession = Dep
     """
     email = request.email.strip()
     _GENERIC_RESPONSE = {"message": "Se esse e-mail estiver cadastrado, você receberá um link de redefinição em instantes."}
+    started = time.perf_counter()
+
+    index = identifier_filter.index
+    if not index.might_contain((identifier_filter.USER_EMAIL, email), (identifier_filter.PATIENT_EMAIL, email)):
+        await index.forgot_miss.pad(started)
+        return _GENERIC_RESPONSE
 
     # Verifica se pertence a um funcionário ou paciente
     result_user = await db.execute(select(User).where(User.email == email))
@@ -115,6 +221,7 @@ async def forgot_password(request: ForgotPasswordRequest, db: AsyncSession = Dep
 
     if not user and not patient:
         # Retorna a mesma resposta genérica — não revela se o e-mail existe
+        index.forgot_miss.observe(time.perf_counter() - started)
         return _GENERIC_RESPONSE
 
     # Gera token seguro e persiste com expiração de 1 hora
@@ -148,7 +255,7 @@ async def forgot_password(request: ForgotPasswordRequest, db: AsyncSession = Dep
 async def reset_password(request: ResetPasswordRequest, db: AsyncSession = Depends(get_db)) -> dict:
     """
     Redefine a senha usando o token recebido por e-mail.
-    O token é de uso único e expira em 1 hora.
+    O token é de uso único e expira em 1 hora. As sessões abertas (refresh tokens) são encerradas.
     """
     if len(request.new_password) < 8:
         raise HTTPException(status_code=422, detail="A nova senha deve ter pelo menos 8 caracteres.")
@@ -174,11 +281,13 @@ async def reset_password(request: ResetPasswordRequest, db: AsyncSession = Depen
     user = result_user.scalars().first()
     if user:
         user.hashed_password = new_hash
+        await refresh_tokens.revoke_subject(db, f"user:{user.id}")
     else:
         result_patient = await db.execute(select(Patient).where(Patient.email == email))
         patient = result_patient.scalars().first()
         if patient:
             patient.hashed_password = new_hash
+            await refresh_tokens.revoke_subject(db, f"patient:{patient.id}")
         else:
             raise HTTPException(status_code=404, detail="Usuário não encontrado.")
 
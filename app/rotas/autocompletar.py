@@ -0,0 +1,54 @@
+"""
+Rotas de Autocompletar
+- Sugestões de pacientes e profissionais por prefixo do nome (seletores dos formulários)
+- Servidas do índice em memória (app/typeahead.py), sem consulta ao banco por tecla digitada
+"""
+
+from typing import Any
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+
+from app.database import AsyncSession, get_db
+from app.models import Professional
+from app.auth import get_current_user
+from app import typeahead
+
+router = APIRouter(prefix="/api/autocomplete", tags=["Autocompletar"])
+
+MAX_LIMIT = 25
+
+
+# ═════════════════════════════════════════════════════════════════════
+# ENDPOINTS DE AUTOCOMPLETAR
+# ═════════════════════════════════════════════════════════════════════
+
+@router.get("/patients")
+async def autocomplete_patients(
+    q: str = "",
+    limit: int = typeahead.DEFAULT_LIMIT,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+) -> list[dict[str, Any]]:
+    """Pacientes cujo nome (ou sobrenome) começa com q; profissionais só veem os próprios."""
+    await typeahead.index.ensure(db)
+    limit = max(1, min(limit, MAX_LIMIT))
+
+    if current_user.get("role") == "admin":
+        return typeahead.index.search_patients(q, None, limit)
+
+    stmt_prof = select(Professional.id).where(Professional.email == current_user.get("email", ""))
+    prof_id = (await db.execute(stmt_prof)).scalar()
+    if not prof_id:
+        return []
+    return typeahead.index.search_patients(q, prof_id, limit)
+
+
+@router.get("/professionals")
+async def autocomplete_professionals(
+    q: str = "",
+    limit: int = typeahead.DEFAULT_LIMIT,
+    db: AsyncSession = Depends(get_db),
+) -> list[dict[str, Any]]:
+    """Profissionais cujo nome (ou sobrenome) começa com q — apenas id e nome."""
+    await typeahead.index.ensure(db)
+    return typeahead.index.search_professionals(q, max(1, min(limit, MAX_LIMIT)))
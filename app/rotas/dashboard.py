@@ -2,7 +2,9 @@
 Rotas do Dashboard
 - Estatísticas gerais (total pacientes, consultas hoje/semana)
 - Dados para gráficos numéricos (diário, semanal, mensal)
-- Dados estruturados do calendário mensal (consultas por dia)
+- Dados estruturados do calendário mensal (consultas por dia ou resumo de contagens)
+- Detalhe de um dia do calendário (carregado sob demanda)
+- Ocorrências de séries recorrentes entram no calendário sem serem gravadas
 """
 
 from typing import Any
@@ -14,6 +16,7 @@ from datetime import date, datetime, timedelta
 from app.database import AsyncSession, get_db
 from app.models import Patient, Appointment, Professional
 from app.auth import get_current_user
+from app import recurrence
 
 router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
 
@@ -200,15 +203,8 @@ async def get_chart_data(
     return {"labels": labels, "data": data_points}
 
 
-@router.get("/calendar")
-async def get_calendar_data(
-    month: int | None = None,
-    year: int | None = None,
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
-) -> dict[str, Any]:
-    prof_id = await _get_prof_id(current_user, db)
-
+def _month_bounds(month: int | None, year: int | None) -> tuple[date, date]:
+    """Valida mês/ano (padrão: mês atual) e retorna o primeiro e o último dia do mês."""
     today = date.today()
     target_month = month or today.month
     target_year = year or today.year
@@ -225,6 +221,63 @@ async def get_calendar_data(
         date(target_year + 1, 1, 1) - timedelta(days=1) if target_month == 12
         else date(target_year, target_month + 1, 1) - timedelta(days=1)
     )
+    return first_day, last_day
+
+
+@router.get("/calendar")
+async def get_calendar_data(
+    month: int | None = None,
+    year: int | None = None,
+    view: str = "full",
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+) -> dict[str, Any]:
+    """
+    Dados do calendário mensal.
+    view=full    → lista de consultas de cada dia (comportamento original).
+    view=summary → apenas contagens por dia e status, calculadas por um único GROUP BY;
+                   os detalhes de um dia são carregados sob demanda em /calendar/day/{dia}.
+    """
+    if view not in ("full", "summary"):
+        raise HTTPException(status_code=422, detail="view deve ser 'full' ou 'summary'.")
+
+    prof_id = await _get_prof_id(current_user, db)
+    first_day, last_day = _month_bounds(month, year)
+
+    response: dict[str, Any] = {
+        "month": first_day.month,
+        "year": first_day.year,
+        "days_in_month": last_day.day,
+        "first_weekday": first_day.weekday(),
+    }
+
+    if view == "summary":
+        rows = (await db.execute(
+            select(Appointment.date, Appointment.status, func.count(Appointment.id))
+            .where(
+                Appointment.date >= first_day,
+                Appointment.date <= last_day,
+                *_appt_filter(prof_id),
+            )
+            .group_by(Appointment.date, Appointment.status)
+        )).all()
+
+        days: dict[str, dict[str, Any]] = {}
+        for day, status, count in rows:
+            bucket = days.setdefault(day.strftime("%Y-%m-%d"), {"total": 0, "by_status": {}})
+            key = status or "Aguardando"
+            bucket["by_status"][key] = bucket["by_status"].get(key, 0) + count
+            bucket["total"] += count
+
+        for occ in await recurrence.load_occurrences(db, first_day, last_day, prof_id, with_relations=False):
+            bucket = days.setdefault(occ.date.strftime("%Y-%m-%d"), {"total": 0, "by_status": {}})
+            key = occ.status or "Aguardando"
+            bucket["by_status"][key] = bucket["by_status"].get(key, 0) + 1
+            bucket["total"] += 1
+
+        response["view"] = "summary"
+        response["days"] = days
+        return response
 
     appointments_stmt = (
         select(Appointment)
@@ -236,7 +289,9 @@ async def get_calendar_data(
         )
         .order_by(Appointment.date, Appointment.time)
     )
-    appointments = (await db.execute(appointments_stmt)).scalars().all()
+    appointments: list[Any] = list((await db.execute(appointments_stmt)).scalars().all())
+    appointments += await recurrence.load_occurrences(db, first_day, last_day, prof_id)
+    appointments.sort(key=lambda a: (a.date, a.time))
 
     calendar_dict: dict[str, list[dict[str, str]]] = {}
     for appt in appointments:
@@ -251,10 +306,61 @@ async def get_calendar_data(
             "type": appt.type or "",
         })
 
-    return {
-        "month": target_month,
-        "year": target_year,
-        "days_in_month": last_day.day,
-        "first_weekday": first_day.weekday(),
-        "appointments": calendar_dict,
-    }
+    response["appointments"] = calendar_dict
+    return response
+
+
+@router.get("/calendar/day/{day}")
+async def get_calendar_day(
+    day: date,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+) -> dict[str, Any]:
+    """
+    Detalhe de um único dia do calendário (carregado quando o dia é aberto na grade).
+    Seleciona apenas as colunas exibidas, com os nomes resolvidos por JOIN.
+    """
+    prof_id = await _get_prof_id(current_user, db)
+
+    rows = (await db.execute(
+        select(
+            Appointment.id,
+            Appointment.time,
+            Appointment.status,
+            Appointment.type,
+            Appointment.professional_id,
+            Patient.name,
+            Professional.name,
+        )
+        .outerjoin(Patient, Patient.id == Appointment.patient_id)
+        .outerjoin(Professional, Professional.id == Appointment.professional_id)
+        .where(Appointment.date == day, *_appt_filter(prof_id))
+        .order_by(Appointment.time)
+    )).all()
+
+    items = [
+        {
+            "id": appt_id,
+            "time": appt_time.strftime("%H:%M"),
+            "patient": patient_name or "Paciente Removido",
+            "professional_id": professional_id,
+            "professional_name": professional_name,
+            "status": status or "Aguardando",
+            "type": appt_type or "",
+        }
+        for appt_id, appt_time, status, appt_type, professional_id, patient_name, professional_name in rows
+    ]
+    for occ in await recurrence.load_occurrences(db, day, day, prof_id):
+        items.append({
+            "id": occ.id,
+            "time": occ.time.strftime("%H:%M"),
+            "patient": occ.patient_name or "Paciente Removido",
+            "professional_id": occ.professional_id,
+            "professional_name": occ.professional_name,
+            "status": occ.status or "Aguardando",
+            "type": occ.type or "",
+            "series_id": occ.series_id,
+        })
+    items.sort(key=lambda item: item["time"])
+
+    return {"date": day.isoformat(), "appointments": items}
@@ -1,22 +1,25 @@
 """
 Rotas de Debug e Ferramentas Internas
 - Teste de conexão SMTP (diagnóstico de infraestrutura de e-mails)
+- Métricas das chamadas HTTP de saída (latência, erros, estado do circuit breaker)
+- Versões dos hashes de senha (parâmetros do Argon2) e andamento do rehash no login
 """
 
-import smtplib
 import traceback
 from typing import Any
 from fastapi import APIRouter, Depends, HTTPException
 
 from app.database import AsyncSession, get_db
 from app.email_utils import get_smtp_settings
+from app.http_clients import registry
+from app.password_rehash import rehasher
 from app.config import settings
 
 router = APIRouter(prefix="/api/debug", tags=["Debug"])
 
 
 from fastapi.security import HTTPBearer
-import jwt
+from app.auth import decode_access_token
 
 security_optional = HTTPBearer(auto_error=False)
 
@@ -27,18 +30,10 @@ async def _require_debug_or_admin(auth: Any = Depends(security_optional)) -> Non
         return
     if not auth:
         raise HTTPException(status_code=401, detail="Token de autenticação ausente.")
-    try:
-        payload = jwt.decode(
-            auth.credentials,
-            settings.SECRET_KEY,
-            algorithms=[settings.ALGORITHM],
-            audience="clinical6p-api",
-            issuer="clinical6p",
-        )
-        if payload.get("role") != "admin":
-            raise HTTPException(status_code=403, detail="Apenas administradores podem testar a conexão SMTP.")
-    except Exception:
-        raise HTTPException(status_code=401, detail="Token inválido ou expirado.")
+    # Mesma validação (e mesmo cache de tokens) das demais rotas; 401 se inválido/expirado
+    payload = decode_access_token(auth.credentials)
+    if payload.get("role") != "admin":
+        raise HTTPException(status_code=403, detail="Apenas administradores podem testar a conexão SMTP.")
 
 
 # ═════════════════════════════════════════════════════════════════════
@@ -54,7 +49,6 @@ async def test_smtp_connection(db: AsyncSession = Depends(get_db), _: None = Dep
     Se a API do Resend não estiver ativa, ela tenta conectar de forma clássica via SMTP do GMail/Outlook.
     """
     if settings.RESEND_API_KEY:
-        import httpx
         response = {
             "server": "api.resend.com (HTTP API)",
             "port": 443,
@@ -66,12 +60,11 @@ async def test_smtp_connection(db: AsyncSession = Depends(get_db), _: None = Dep
         }
         try:
             headers = {"Authorization": f"Bearer {settings.RESEND_API_KEY}"}
-            async with httpx.AsyncClient(timeout=10) as client:
-                res = await client.get("https://api.resend.com/domains", headers=headers)
-                if res.status_code == 200:
-                    response["success"] = True
-                else:
-                    response["error"] = f"Resend API retornou status {res.status_code}: {res.text}"
+            res = await registry.get("resend").get("/domains", headers=headers)
+            if res.status_code == 200:
+                response["success"] = True
+            else:
+                response["error"] = f"Resend API retornou status {res.status_code}: {res.text}"
         except Exception as e:
             response["error"] = str(e)
             response["traceback"] = traceback.format_exc()
@@ -89,6 +82,8 @@ async def test_smtp_connection(db: AsyncSession = Depends(get_db), _: None = Dep
         "traceback": None
     }
 
+    import smtplib
+
     try:
         # Usa factory de gerenciamento de conexão local para forçar o timeout
         with smtplib.SMTP(server, port, timeout=10) as smtp:
@@ -103,3 +98,17 @@ async def test_smtp_connection(db: AsyncSession = Depends(get_db), _: None = Dep
         response["traceback"] = traceback.format_exc()
 
     return response
+
+
+@router.get("/outbound-metrics")
+async def outbound_metrics(_: None = Depends(_require_debug_or_admin)) -> dict[str, Any]:
+    """Latência (p50/p95/máx), erros, novas tentativas e estado do circuito por serviço externo."""
+    return registry.metrics()
+
+
+@router.get("/password-hashes")
+async def password_hash_metrics(
+    db: AsyncSession = Depends(get_db), _: None = Depends(_require_debug_or_admin)
+) -> dict[str, Any]:
+    """Hashes por versão (tipo + parâmetros), quantos ainda usam parâmetros antigos e contadores do rehash."""
+    return await rehasher.distribution(db)
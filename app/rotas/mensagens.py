@@ -4,23 +4,87 @@ Rotas de Mensagens de Pacientes
 - Listagem de mensagens (com filtro por profissional)
 - Contagem de não lidas
 - Marcar como lida
+- Ações em lote (ler / salvar / remover do card) com um único UPDATE
+- Stream em tempo real (SSE) de novas mensagens e contagem de não lidas
 """
 
-from typing import Any
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
-from sqlalchemy import select, func, desc
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from collections import Counter
+from sqlalchemy import select, desc, update as sa_update
 from sqlalchemy.orm import selectinload
 
 from app.database import AsyncSession, get_db
 from app.models import Patient, PatientMessage, Professional
-from app.schemas import PatientMessageCreate, PatientMessageResponse
-from app.auth import verify_password, get_current_user
+from app.schemas import PatientMessageCreate, PatientMessageResponse, PatientMessageBulkAction
+from app.auth import verify_password, get_current_user, decode_access_token
 from app.email_utils import bg_send_patient_message_notification
+from app.events import bus
+from app import revocation, unread_counters
 
 from typing import Optional
 
 router = APIRouter(prefix="/api", tags=["Mensagens de Pacientes"])
 
+BULK_MAX_IDS = 1000          # Limite de ids por ação em lote
+SSE_HEARTBEAT_SECONDS = 15  # Comentário ": ping" mantém a conexão viva atrás de proxies
+EVENT_PREVIEW_CHARS = 140   # Trecho da mensagem no evento; o NOTIFY do PostgreSQL recusa payloads de 8000 bytes ou mais
+
+# O stream só aceita o token no header Authorization: na URL (?token=) ele iria parar nos
+# logs de acesso do proxy. O SPA abre o stream com fetch(), que envia headers (EventSource não)
+_optional_bearer = HTTPBearer(auto_error=False)
+
+
+async def _unread_counts(db: AsyncSession, professional_id: int | None) -> dict[str, int]:
+    """Não lidas do profissional e total geral (para admins), lidas dos contadores."""
+    count = await unread_counters.get_count(db, professional_id) if professional_id else 0
+    return {"count": count, "total": await unread_counters.get_total(db)}
+
+
+async def _publish_unread(db: AsyncSession, professional_id: int | None) -> None:
+    await bus.publish({"type": "unread", "professional_id": professional_id, **await _unread_counts(db, professional_id)})
+
+
+def _preview(message: str) -> str:
+    return message if len(message) <= EVENT_PREVIEW_CHARS else message[: EVENT_PREVIEW_CHARS - 1] + "…"
+
+
+def _sse_format(event: dict[str, Any]) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+def _bulk_update_stmt(body: PatientMessageBulkAction, current_user: dict, **values: Any):
+    """
+    UPDATE em lote já autorizado: para não-admins a restrição ao próprio profissional
+    é uma subquery no WHERE (sem consulta prévia); mensagens de outros profissionais
+    simplesmente não são afetadas.
+    """
+    if not body.ids and body.before is None:
+        raise HTTPException(status_code=422, detail="Informe 'ids' ou 'before'.")
+    if body.ids and len(body.ids) > BULK_MAX_IDS:
+        raise HTTPException(status_code=422, detail=f"Máximo de {BULK_MAX_IDS} ids por requisição.")
+
+    stmt = sa_update(PatientMessage).values(**values).execution_options(synchronize_session=False)
+    if body.ids:
+        stmt = stmt.where(PatientMessage.id.in_(body.ids))
+    if body.before is not None:
+        stmt = stmt.where(PatientMessage.created_at <= body.before)
+
+    if current_user.get("role", "") != "admin":
+        stmt = stmt.where(PatientMessage.professional_id == (
+            select(Professional.id)
+            .where(Professional.email == current_user.get("email", ""))
+            .scalar_subquery()
+        ))
+    elif body.professional_id:
+        stmt = stmt.where(PatientMessage.professional_id == body.professional_id)
+    return stmt
+
 
 # ═════════════════════════════════════════════════════════════════════
 # ENDPOINTS DO PORTAL DO PACIENTE (ENVIO)
@@ -60,8 +124,22 @@ async def send_patient_message(
         message=message_data.message
     )
     db.add(db_msg)
+    await unread_counters.adjust(db, patient.professional_id, +1)  # Mesma transação da mensagem
     await db.commit()
 
+    # Tempo real: avisa as abas abertas do profissional (e dos admins) pelo stream SSE.
+    # Só ids e um trecho curto: o texto completo pode passar do limite do NOTIFY e
+    # o cliente o busca pela API quando abre a mensagem
+    await bus.publish({
+        "type": "message",
+        "professional_id": db_msg.professional_id,
+        "message_id": db_msg.id,
+        "patient_id": patient.id,
+        "patient_name": patient.name[:EVENT_PREVIEW_CHARS],
+        "preview": _preview(db_msg.message),
+    })
+    await _publish_unread(db, db_msg.professional_id)
+
     # Notifica o profissional em background — response retorna imediatamente
     if patient.professional and patient.professional.email:
         background_tasks.add_task(
@@ -162,7 +240,7 @@ async def list_messages(
             "is_read": m.is_read,
             "saved": m.saved,
             "patient_name": m.patient.name if m.patient else None,
-            "professional_name": m.professional.name if m.professional else None,
+            "professional_name": m.professional_name,
             "created_at": m.created_at
         }
         for m in messages
@@ -179,10 +257,9 @@ async def count_unread_messages(
     [EXPLICAÇÃO DIDÁTICA PARA INICIANTES]
     A 'função' Calculadora Rápida de Notificações.
     Sabe aquela bolinha vermelha irritante tipo no ícone do Whatsapp contendo o número de msgs não lidas? É esta função aqui que descobre ele!
-    Ela faz um 'select(func.count)' perguntando ao banco: "Ei, me conta na ponta do lápis qual a quantidade onde o estado de leitura é FALSO (is_read == False)?". Retorna só o número isolado. É rapidíssimo.
+    Em vez de contar as mensagens uma a uma a cada pedido, ela lê um contador pronto (tabela unread_message_counters),
+    que é atualizado sempre que uma mensagem chega ou é lida. Uma única linha lida por chave primária — rapidíssimo.
     """
-    query = select(func.count(PatientMessage.id)).where(PatientMessage.is_read == False)
-
     role = current_user.get("role", "")
     caller_email = current_user.get("email", "")
 
@@ -193,12 +270,124 @@ async def count_unread_messages(
         prof_id = prof_id_result.scalar()
         if not prof_id:
             raise HTTPException(status_code=403, detail="Profissional não associado a este usuário.")
-        query = query.where(PatientMessage.professional_id == prof_id)
-    elif professional_id:
-        query = query.where(PatientMessage.professional_id == professional_id)
+        return {"count": await unread_counters.get_count(db, prof_id)}
+    if professional_id:
+        return {"count": await unread_counters.get_count(db, professional_id)}
+    return {"count": await unread_counters.get_total(db)}
+
+
+@router.get("/patient-messages/stream")
+async def stream_patient_messages(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials | None = Depends(_optional_bearer),
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Server-Sent Events: substitui o polling de /patient-messages/unread.
+    Envia a contagem atual ao conectar e, depois, eventos 'message' (nova mensagem)
+    e 'unread' (contagem alterada) do profissional logado. Admin recebe de todos.
+    O stream termina quando o access token vence ou é revogado (logout); o cliente
+    reconecta com o token renovado.
+    """
+    if not credentials:
+        raise HTTPException(status_code=401, detail="Token ausente.")
+    current_user = decode_access_token(credentials.credentials)
+
+    prof_id: int | None = None
+    if current_user.get("role", "") != "admin":
+        stmt_prof = select(Professional.id).where(Professional.email == current_user.get("email", ""))
+        prof_id = (await db.execute(stmt_prof)).scalar()
+        if not prof_id:
+            raise HTTPException(status_code=403, detail="Profissional não associado a este usuário.")
+
+    initial = {"type": "unread", "professional_id": prof_id, **await _unread_counts(db, prof_id)}
+    # Encerra a transação: a conexão volta ao pool em vez de ficar presa durante o stream
+    await db.commit()
+
+    return StreamingResponse(
+        _sse_events(request, prof_id, initial, current_user.get("jti"), float(current_user["exp"])),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _sse_events(
+    request: Request, prof_id: int | None, initial: dict[str, Any], jti: str | None, exp: float,
+) -> AsyncIterator[str]:
+    """Gera o stream SSE de um assinante até o cliente desconectar ou o token vencer/ser revogado."""
+    def adapt(event: dict[str, Any]) -> dict[str, Any]:
+        # Para admins o badge mostra o total geral, não o do profissional do evento
+        if prof_id is None and event.get("type") == "unread":
+            return {**event, "count": event.get("total", event.get("count"))}
+        return event
+
+    async with bus.subscribe(prof_id) as queue:
+        yield _sse_format(adapt(initial))
+        while not await request.is_disconnected():
+            # Conferido a cada evento e heartbeat: o token foi validado só na conexão
+            remaining = exp - time.time()
+            if remaining <= 0 or revocation.revocations.is_revoked(jti):
+                return
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=min(SSE_HEARTBEAT_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield _sse_format(adapt(event))
+
+
+# ═════════════════════════════════════════════════════════════════════
+# AÇÕES EM LOTE
+# ═════════════════════════════════════════════════════════════════════
+
+@router.put("/patient-messages/read")
+async def bulk_mark_messages_as_read(
+    body: PatientMessageBulkAction,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+) -> dict[str, int]:
+    """
+    Marca várias mensagens como lidas (por ids ou "todas até 'before'") com um único UPDATE.
+    O RETURNING informa de quais profissionais eram as mensagens, para ajustar os contadores
+    de não lidas na mesma transação.
+    """
+    stmt = _bulk_update_stmt(body, current_user, is_read=True).where(PatientMessage.is_read == False)
+    rows = (await db.execute(stmt.returning(PatientMessage.professional_id))).scalars().all()
+
+    per_professional = Counter(rows)
+    for prof_id, count in per_professional.items():
+        await unread_counters.adjust(db, prof_id, -count)
+    await db.commit()
 
-    count = await db.scalar(query) or 0
-    return {"count": count}
+    for prof_id in per_professional:
+        await _publish_unread(db, prof_id)
+    return {"updated": len(rows)}
+
+
+@router.put("/patient-messages/save")
+async def bulk_save_messages(
+    body: PatientMessageBulkAction,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+) -> dict[str, int]:
+    """Salva várias mensagens no card do paciente com um único UPDATE."""
+    stmt = _bulk_update_stmt(body, current_user, saved=True).where(PatientMessage.saved.is_not(True))
+    updated = (await db.execute(stmt)).rowcount
+    await db.commit()
+    return {"updated": updated}
+
+
+@router.put("/patient-messages/unsave")
+async def bulk_unsave_messages(
+    body: PatientMessageBulkAction,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+) -> dict[str, int]:
+    """Remove várias mensagens do card do paciente com um único UPDATE."""
+    stmt = _bulk_update_stmt(body, current_user, saved=False).where(PatientMessage.saved == True)
+    updated = (await db.execute(stmt)).rowcount
+    await db.commit()
+    return {"updated": updated}
 
 
 @router.put("/patient-messages/{message_id}/save")
@@ -289,7 +478,19 @@ async def mark_message_as_read(
         if not prof_id or msg.professional_id != prof_id:
             raise HTTPException(status_code=403, detail="Você não tem permissão para marcar esta mensagem como lida.")
 
-    msg.is_read = True
+    # UPDATE condicional: só a requisição que efetivamente muda o estado decrementa o contador
+    result = await db.execute(
+        sa_update(PatientMessage)
+        .where(PatientMessage.id == message_id, PatientMessage.is_read == False)
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    was_unread = result.rowcount == 1
+    if was_unread:
+        await unread_counters.adjust(db, msg.professional_id, -1)
     await db.commit()
 
+    if was_unread:
+        await _publish_unread(db, msg.professional_id)
+
     return {"message": "Marcado como lido"}
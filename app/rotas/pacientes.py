@@ -1,22 +1,25 @@
 ﻿"""
 Rotas de Pacientes
 - Listar, buscar, criar, atualizar pacientes
+- Busca textual ranqueada (nome, CPF, telefone, e-mail) — ver app/search.py
 - Geração automática de senha + envio de e-mail de boas-vindas
 """
 
 import secrets
 from typing import Any
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
-from sqlalchemy import select
+from fastapi.responses import JSONResponse
+from sqlalchemy import insert, literal_column, select, update
 from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import IntegrityError
 
 from pydantic import BaseModel
 from app.database import AsyncSession, get_db
-from app.models import Patient, AnamnesisEntry, Professional
+from app.models import Patient, AnamnesisEntry, Professional, SummaryJob
 from app.schemas import PatientCreate, PatientUpdate
-from app.auth import get_password_hash, get_current_user
+from app.auth import get_password_hash_async, get_current_user
 from app.email_utils import bg_send_patient_welcome_email
+from app import identifier_filter, search, summaries, typeahead
 
 
 router = APIRouter(prefix="/api/patients", tags=["Pacientes"])
@@ -26,13 +29,14 @@ router = APIRouter(prefix="/api/patients", tags=["Pacientes"])
 # FUNÇÕES AUXILIARES
 # ═════════════════════════════════════════════════════════════════════
 
-def _patient_to_dict(p: Patient) -> dict[str, Any]:
+def _patient_to_dict(p: Any) -> dict[str, Any]:
     """
     [EXPLICAÇÃO DIDÁTICA PARA INICIANTES]
     O que é esta 'função' (def)? É um Tradutor Simples!
     O Banco de Dados nos devolve um objeto "Pesado" (uma Classe com superpoderes internos).
     Mas a Internet (a tela do site) gosta de receber pacotes simples e organizados, os Dicionários (JSON).
     Então o tradutor tira cada pecinha do objeto gigante (ex: p.name) e coloca numa caixinha arrumada pra viajar pela rede.
+    Aceita tanto o objeto Patient quanto a linha devolvida pelo RETURNING (mesmos nomes de campo).
     """
     return {
         "id": p.id,
@@ -61,13 +65,23 @@ def _patient_to_dict(p: Patient) -> dict[str, Any]:
         "emergency_contact_relation": p.emergency_contact_relation,
         "consent_terms_accepted": p.consent_terms_accepted,
         "professional_id": p.professional_id,
-        "professional_name": p.professional.name if getattr(p, 'professional', None) else None,
+        "professional_name": p.professional_name,
         "status": p.status,
         "observations": p.observations,
         "created_at": p.created_at,
     }
 
 
+# Colunas devolvidas pelo INSERT/UPDATE ... RETURNING: a linha gravada + nome do profissional,
+# tudo no mesmo comando (sem commit → refresh → recarregar com o relacionamento)
+_RETURNING = (
+    *Patient.__table__.c,
+    literal_column(
+        "(SELECT professionals.name FROM professionals WHERE professionals.id = patients.professional_id)"
+    ).label("professional_name"),
+)
+
+
 async def _reload_with_professional(db: AsyncSession, patient_id: int) -> Patient | None:
     """
     [EXPLICAÇÃO DIDÁTICA PARA INICIANTES]
@@ -113,6 +127,44 @@ async def list_patients(
     return [_patient_to_dict(p) for p in patients]
 
 
+SEARCH_MAX_LIMIT = 50
+
+
+@router.get("/search")
+async def search_patients(
+    q: str,
+    skip: int = 0,
+    limit: int = 20,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+) -> dict[str, Any]:
+    """
+    Busca por nome (sem diferenciar acentos), dígitos do CPF, telefone ou e-mail.
+    Resultados do mais ao menos relevante; has_more indica se existe próxima página.
+    """
+    if len(q.strip()) < search.MIN_QUERY_LENGTH:
+        raise HTTPException(status_code=422, detail=f"A busca precisa de pelo menos {search.MIN_QUERY_LENGTH} caracteres.")
+    limit = max(1, min(limit, SEARCH_MAX_LIMIT))
+    skip = max(skip, 0)
+
+    professional_id = None
+    if current_user.get("role") != "admin":
+        stmt_prof = select(Professional.id).where(Professional.email == current_user.get("email", ""))
+        professional_id = (await db.execute(stmt_prof)).scalar()
+        if not professional_id:
+            return {"items": [], "skip": skip, "limit": limit, "has_more": False}
+
+    # Busca um a mais para saber se há próxima página sem um COUNT(*)
+    ids = await search.search_patient_ids(db, q, professional_id=professional_id, skip=skip, limit=limit + 1)
+    has_more = len(ids) > limit
+    ids = ids[:limit]
+
+    stmt = select(Patient).options(selectinload(Patient.professional)).where(Patient.id.in_(ids))
+    by_id = {p.id: p for p in (await db.execute(stmt)).scalars().all()}
+    items = [_patient_to_dict(by_id[i]) for i in ids if i in by_id]
+    return {"items": items, "skip": skip, "limit": limit, "has_more": has_more}
+
+
 @router.get("/{patient_id}")
 async def get_patient(
     patient_id: int,
@@ -159,21 +211,25 @@ async def create_patient(
 
     # --- Se a senha final existir, aplica o Hash ---
     if raw_password:
-        patient_data["hashed_password"] = get_password_hash(raw_password)
+        patient_data["hashed_password"] = await get_password_hash_async(raw_password)
 
     # Remove a senha em texto plano do dict antes de gravar
     patient_data.pop("password", None)
 
-    # --- Salva no banco de dados ---
-    db_patient = Patient(**patient_data)
-    db.add(db_patient)
+    # --- Salva no banco de dados: um único INSERT ... RETURNING já traz a ficha completa ---
     try:
+        db_patient = (await db.execute(insert(Patient).values(**patient_data).returning(*_RETURNING))).one()
         await db.commit()
-        await db.refresh(db_patient)
     except IntegrityError:
         await db.rollback()
         raise HTTPException(status_code=409, detail="CPF ou e-mail já cadastrado.")
 
+    await identifier_filter.index.register(
+        (identifier_filter.PATIENT_CPF, patient_data.get("cpf")),
+        (identifier_filter.PATIENT_EMAIL, patient_data.get("email")),
+    )
+    await typeahead.patient_changed(db_patient.id, db_patient.name, db_patient.professional_id)
+
     # Dispara e-mail de boas-vindas em background — response retorna imediatamente
     if raw_password and patient_data.get("email") and patient_data.get("cpf"):
         background_tasks.add_task(
@@ -184,13 +240,7 @@ async def create_patient(
             raw_password,
         )
 
-    # Retorna os dados completos do paciente recarregados para conter eventuais relacionamentos default
-    new_patient = await _reload_with_professional(db, int(str(db_patient.id)))
-    # O novo paciente não deve ser None aqui
-    if new_patient:
-        return _patient_to_dict(new_patient)
-    else:
-        raise HTTPException(status_code=500, detail="Error fetching newly created patient")
+    return _patient_to_dict(db_patient)
 
 
 @router.put("/{patient_id}")
@@ -205,13 +255,6 @@ async def update_patient(
     Quando o paciente muda de telefone ou a secretária escolheu o convênio errado e quer corrigir, é essa máquina que pega a ficha nova e joga lá.
     Se a ficha nova contém um pedido para alterar a senha, ela primeiro criptografa a senha na engrenagem de Hash para não salvar desprotegida.
     """
-    stmt = select(Patient).where(Patient.id == patient_id)
-    result = await db.execute(stmt)
-    db_patient = result.scalars().first()
-
-    if not db_patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
-
     # exclude_unset=True previne que campos não enviados na requisição sobrescrevam os dados com None
     update_data = patient_update.model_dump(exclude_unset=True)
 
@@ -219,20 +262,38 @@ async def update_patient(
     if "password" in update_data:
         raw_pwd = update_data.pop("password")
         if raw_pwd:
-            update_data["hashed_password"] = get_password_hash(raw_pwd)
+            update_data["hashed_password"] = await get_password_hash_async(raw_pwd)
+
+    # --- Um único UPDATE ... RETURNING: grava e devolve a ficha (nenhuma linha = paciente inexistente) ---
+    if update_data:
+        stmt = (
+            update(Patient)
+            .where(Patient.id == patient_id)
+            .values(**update_data)
+            .returning(*_RETURNING)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        stmt = select(*_RETURNING).where(Patient.id == patient_id)
+    try:
+        db_patient = (await db.execute(stmt)).first()
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="CPF ou e-mail já cadastrado.")
 
-    # --- Atualiza o objeto do SQLAlchemy ---
-    for key, value in update_data.items():
-        setattr(db_patient, key, value)
+    if not db_patient:
+        raise HTTPException(status_code=404, detail="Patient not found")
 
-    await db.commit()
-    await db.refresh(db_patient)
+    # CPF/e-mail novos passam a valer para login e recuperação de senha
+    await identifier_filter.index.register(
+        (identifier_filter.PATIENT_CPF, update_data.get("cpf")),
+        (identifier_filter.PATIENT_EMAIL, update_data.get("email")),
+    )
+    if "name" in update_data or "professional_id" in update_data:
+        await typeahead.patient_changed(patient_id, db_patient.name, db_patient.professional_id)
 
-    updated_patient = await _reload_with_professional(db, patient_id)
-    if updated_patient:
-        return _patient_to_dict(updated_patient)
-    else:
-        raise HTTPException(status_code=500, detail="Error fetching updated patient")
+    return _patient_to_dict(db_patient)
 
 
 # ═════════════════════════════════════════════════════════════════════
@@ -294,64 +355,67 @@ async def create_anamnesis_entry(
 @router.post("/{patient_id}/summary")
 async def generate_patient_summary(
     patient_id: int,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: dict = Depends(get_current_user),
-) -> dict:
-    """Gera um resumo clínico das mensagens salvas do paciente usando Groq (Llama 3)."""
-    from groq import AsyncGroq
-    from app.config import settings
-    from app.models import PatientMessage
-
-    if not settings.GROQ_API_KEY:
+):
+    """
+    Pede o resumo clínico das mensagens salvas do paciente.
+    - Mesmo conjunto de mensagens já resumido → 200 com o resumo em cache (sem chamar a IA)
+    - Caso contrário → 202 com o job_id; o resumo é gerado em segundo plano
+      e acompanhado por GET /api/patients/summary-jobs/{job_id}
+    """
+    try:
+        provider = summaries.get_provider()
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if not provider.is_configured():
         raise HTTPException(status_code=503, detail="Chave da API de IA não configurada.")
 
-    # Busca paciente
-    stmt_p = select(Patient).where(Patient.id == patient_id)
-    result_p = await db.execute(stmt_p)
-    patient = result_p.scalars().first()
+    patient = await db.get(Patient, patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Paciente não encontrado.")
 
-    # Busca mensagens salvas
-    stmt_m = (
-        select(PatientMessage)
-        .where(PatientMessage.patient_id == patient_id, PatientMessage.saved == True)
-        .order_by(PatientMessage.created_at)
-    )
-    result_m = await db.execute(stmt_m)
-    messages = result_m.scalars().all()
-
+    messages = await summaries.saved_messages(db, patient_id)
     if not messages:
         raise HTTPException(status_code=400, detail="Nenhuma mensagem salva para resumir.")
 
-    msgs_text = "\n\n".join(
-        f"[{m.created_at.strftime('%d/%m/%Y %H:%M') if m.created_at else '—'}]\n{m.message}"
-        for m in messages
-    )
+    key = summaries.cache_key(provider.model, patient.name, messages)
+    cached = await summaries.get_cached(db, key)
+    if cached is not None:
+        return {"status": "done", "summary": cached.summary, "messages_count": cached.messages_count, "cached": True}
 
-    prompt = f"""Você é um assistente clínico de psicologia. Analise as anotações abaixo enviadas pelo paciente {patient.name} ao longo do tempo.
+    # Pedido repetido enquanto o mesmo resumo ainda está sendo gerado → reaproveita o job
+    job = await summaries.find_active_job(db, key)
+    if job is None:
+        job = SummaryJob(patient_id=patient_id, cache_key=key, status="pending")
+        db.add(job)
+        await db.commit()
+        background_tasks.add_task(summaries.run_job, job.id)
 
-Produza um resumo clínico objetivo em português, organizado nos seguintes tópicos:
-1. Padrões emocionais recorrentes
-2. Eventos ou situações relevantes mencionados
-3. Pontos de atenção ou alertas
-4. Evolução percebida ao longo das mensagens
+    return JSONResponse(status_code=202, content={"job_id": job.id, "status": job.status})
 
-Seja conciso e clínico. Não invente informações além do que está nas mensagens.
 
-Mensagens do paciente:
-{msgs_text}"""
+@router.get("/summary-jobs/{job_id}")
+async def get_summary_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+) -> dict:
+    """Situação de um job de resumo (pending, running, done ou error)."""
+    job = await db.get(SummaryJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job de resumo não encontrado.")
 
-    client = AsyncGroq(api_key=settings.GROQ_API_KEY)
-    response = await client.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.3,
-        max_tokens=1024,
-    )
+    # Não-admins só acompanham resumos dos próprios pacientes
+    if current_user.get("role") != "admin":
+        stmt_prof = select(Professional.id).where(Professional.email == current_user.get("email", ""))
+        prof_id = (await db.execute(stmt_prof)).scalar()
+        owner_id = (await db.execute(select(Patient.professional_id).where(Patient.id == job.patient_id))).scalar()
+        if not prof_id or owner_id != prof_id:
+            raise HTTPException(status_code=403, detail="Acesso negado a este paciente.")
 
-    summary = response.choices[0].message.content
-    return {"summary": summary, "messages_count": len(messages)}
+    return summaries.job_to_dict(job)
 
 
 @router.delete("/anamnesis/{entry_id}", status_code=204)
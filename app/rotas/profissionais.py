@@ -6,7 +6,7 @@ Rotas de Profissionais
 
 import logging
 from typing import Optional
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 
@@ -15,6 +15,9 @@ from app.models import Professional, User
 from app.schemas import ProfessionalCreate, ProfessionalUpdate, ProfessionalResponse
 from app.auth import get_password_hash, require_role
 from app.email_utils import bg_send_professional_welcome_email
+from app import identifier_filter, typeahead
+from app.directory import directory
+from app.http_cache import etag_matches
 
 router = APIRouter(prefix="/api/professionals", tags=["Profissionais"])
 logger = logging.getLogger(__name__)
@@ -25,15 +28,19 @@ logger = logging.getLogger(__name__)
 # ═════════════════════════════════════════════════════════════════════
 
 @router.get("", response_model=list[ProfessionalResponse])
-async def list_professionals(db: AsyncSession = Depends(get_db)) -> list[Professional]:
+async def list_professionals(request: Request, db: AsyncSession = Depends(get_db)) -> Response:
     """
     [EXPLICAÇÃO DIDÁTICA PARA INICIANTES]
     O que esta 'função' faz? Ela simplesmente abre a "Lista Telefônica" da clínica.
     Filtra todos os profissionais, organiza em ordem alfabética de A a Z e entrega para o painel desenhar a tabela.
+    A lista fica pronta na memória (app/directory.py) e só é refeita quando alguém é cadastrado,
+    alterado ou removido. Se o navegador já tem a versão atual (ETag), respondemos só "não mudou" (304).
     """
-    stmt = select(Professional).order_by(Professional.name)
-    result = await db.execute(stmt)
-    return list(result.scalars().all())
+    snapshot = await directory.get(db)
+    headers = {"ETag": snapshot.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
 
 
 @router.post("", response_model=ProfessionalResponse)
@@ -70,6 +77,11 @@ async def create_professional(
         await db.commit()
         await db.refresh(db_prof)
 
+        if prof_data.get("email") and raw_password:
+            await identifier_filter.index.register((identifier_filter.USER_EMAIL, prof_data["email"]))
+        await typeahead.professional_changed(db_prof.id, db_prof.name)
+        await directory.changed(db)
+
         # Dispara e-mail de boas-vindas em background — response retorna imediatamente
         if prof_data.get("email") and raw_password:
             background_tasks.add_task(
@@ -154,12 +166,17 @@ async def update_professional(
     try:
         await db.commit()
         await db.refresh(db_prof)
-        return db_prof
-
     except IntegrityError:
         await db.rollback()
         raise HTTPException(status_code=400, detail="Email already in use.")
 
+    if email_changing and db_user is not None:
+        await identifier_filter.index.register((identifier_filter.USER_EMAIL, new_email))
+    if "name" in update_data:
+        await typeahead.professional_changed(professional_id, db_prof.name)
+    await directory.changed(db)
+    return db_prof
+
 
 @router.delete("/{professional_id}")
 async def delete_professional(
@@ -183,8 +200,6 @@ async def delete_professional(
     try:
         await db.delete(prof)
         await db.commit()
-        return {"message": "Professional deleted successfully"}
-
     except IntegrityError:
         await db.rollback()
         raise HTTPException(
@@ -195,3 +210,7 @@ async def delete_professional(
         await db.rollback()
         logger.error(f"Erro inesperado ao deletar profissional {professional_id}: {e}")
         raise HTTPException(status_code=500, detail="Erro interno ao tentar remover o profissional.")
+
+    await typeahead.professional_changed(professional_id, None, deleted=True)
+    await directory.changed(db)
+    return {"message": "Professional deleted successfully"}
@@ -158,6 +158,13 @@ class AppointmentCreate(AppointmentBase):
     pass
 
 
+def _reject_null(v: Any) -> Any:
+    # Campo omitido = não alterar; null explícito gravaria NULL na consulta
+    if v is None:
+        raise ValueError("não pode ser nulo; omita o campo para manter o valor atual")
+    return v
+
+
 class AppointmentUpdate(BaseModel):
     patient_id: Optional[int] = None
     professional_id: Optional[int] = None
@@ -167,6 +174,8 @@ class AppointmentUpdate(BaseModel):
     status: Optional[str] = None
     observations: Optional[str] = None
 
+    reject_null = field_validator("date", "time", mode="before")(_reject_null)
+
 
 class AppointmentResponse(AppointmentBase):
     id: int
@@ -177,6 +186,55 @@ class AppointmentResponse(AppointmentBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class AppointmentBatchItem(BaseModel):
+    """Alteração de uma consulta dentro de PATCH /api/appointments/batch."""
+    id: int
+    status: Optional[str] = None
+    date: Optional[dt_date] = None
+    time: Optional[dt_time] = None
+
+    reject_null = field_validator("date", "time", mode="before")(_reject_null)
+
+
+class AppointmentSeriesCreate(BaseModel):
+    """
+    Série recorrente: weekdays usa 0=segunda … 6=domingo (ex: "0,3").
+    Informe 'until' (última data) ou 'count' (total de ocorrências), ou nenhum para série aberta.
+    """
+    patient_id: int
+    professional_id: int
+    start_date: dt_date
+    time: dt_time
+    weekdays: Optional[str] = None                     # Padrão: dia da semana de start_date
+    interval_weeks: int = 1
+    until: Optional[dt_date] = None
+    count: Optional[int] = None
+    type: Optional[str] = None
+    status: Optional[str] = "Aguardando"
+    observations: Optional[str] = None
+
+
+class AppointmentSeriesResponse(AppointmentSeriesCreate):
+    id: int
+    weekdays: str
+    patient_name: Optional[str] = None
+    professional_name: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class OccurrenceUpdate(BaseModel):
+    """Alteração de uma única ocorrência de série (vira uma exceção materializada)."""
+    date: Optional[dt_date] = None
+    time: Optional[dt_time] = None
+    type: Optional[str] = None
+    status: Optional[str] = None
+    observations: Optional[str] = None
+
+    reject_null = field_validator("date", "time", mode="before")(_reject_null)
+
+
 # ═════════════════════════════════════════════════════════════════════
 # RECEITAS (PRESCRIPTIONS)
 # ═════════════════════════════════════════════════════════════════════
@@ -288,6 +346,17 @@ class PatientMessageResponse(PatientMessageBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class PatientMessageBulkAction(BaseModel):
+    """
+    Seleção de mensagens para ações em lote (ler, salvar, remover do card).
+    Informe 'ids' e/ou 'before' (todas criadas até este instante).
+    'professional_id' só é considerado para admins.
+    """
+    ids: Optional[list[int]] = None
+    before: Optional[datetime] = None
+    professional_id: Optional[int] = None
+
+
 # ═════════════════════════════════════════════════════════════════════
 # CONFIGURAÇÕES DO SISTEMA (SMTP)
 # ═════════════════════════════════════════════════════════════════════
@@ -0,0 +1,174 @@
+"""
+Busca textual de pacientes (nome, dígitos do CPF, telefone e e-mail)
+- PostgreSQL: pg_trgm + tsvector sobre unaccent (nomes com ou sem acento batem igual),
+  com índices GIN de expressão — a busca usa índice mesmo com centenas de milhares de linhas
+- SQLite: tabela virtual FTS5 (patients_fts) mantida por triggers, tokenizer unicode61
+  sem diacríticos e busca por prefixo (telefone também casa sem o DDD)
+- Resultado ordenado por relevância e paginado
+
+ensure_search_index() é idempotente e roda pelas migrações (app/migrations.py).
+"""
+
+import logging
+import re
+import unicodedata
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.database import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+MIN_QUERY_LENGTH = 2
+MIN_DIGITS = 3                # Menos que isso não é busca por CPF/telefone
+SQLITE_CANDIDATES = 2000      # Buscas muito amplas ("ma") ranqueiam só os primeiros candidatos
+
+
+def normalize(value: str) -> str:
+    """Minúsculas e sem acentos ("José" → "jose")."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower().strip()
+
+
+def digits_of(value: str) -> str:
+    return re.sub(r"\D", "", value)
+
+
+def _terms(query: str) -> list[str]:
+    return re.findall(r"\w+", normalize(query))
+
+
+# ═════════════════════════════════════════════════════════════════════
+# ÍNDICES
+# ═════════════════════════════════════════════════════════════════════
+
+# Expressões indexadas no PostgreSQL — a consulta usa exatamente as mesmas para casar com o índice
+# ({t} = prefixo da tabela: "" no CREATE INDEX, "p." na consulta)
+_PG_NAME = "search_unaccent(lower({t}name))"
+# Pontuação vira espaço: o parser 'simple' manteria "maria@exemplo.com" como um único token,
+# e a busca "maria@exe" (termos "maria" e "exe") não casaria com o e-mail
+_PG_TSV = (
+    "to_tsvector('simple', regexp_replace(search_unaccent(lower("
+    "coalesce({t}name, '') || ' ' || coalesce({t}email, ''))), '[^[:alnum:]]+', ' ', 'g'))"
+)
+_PG_CPF = "regexp_replace(coalesce({t}cpf, ''), '[^0-9]', '', 'g')"
+_PG_PHONE = "regexp_replace(coalesce({t}phone, ''), '[^0-9]', '', 'g')"
+
+_PG_SETUP = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    # unaccent() não é IMMUTABLE; o wrapper permite usá-la em índices de expressão
+    "CREATE OR REPLACE FUNCTION search_unaccent(text) RETURNS text "
+    "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT AS $$ SELECT public.unaccent('public.unaccent', $1) $$",
+    f"CREATE INDEX IF NOT EXISTS ix_patients_search_name_trgm ON patients USING gin (({_PG_NAME.format(t='')}) gin_trgm_ops)",
+    "DROP INDEX IF EXISTS ix_patients_search_tsv",  # Expressão anterior (sem separar o e-mail)
+    f"CREATE INDEX IF NOT EXISTS ix_patients_search_words ON patients USING gin (({_PG_TSV.format(t='')}))",
+    f"CREATE INDEX IF NOT EXISTS ix_patients_search_cpf_digits ON patients (({_PG_CPF.format(t='')}) text_pattern_ops)",
+    f"CREATE INDEX IF NOT EXISTS ix_patients_search_phone_trgm ON patients USING gin (({_PG_PHONE.format(t='')}) gin_trgm_ops)",
+]
+
+# SQLite: só dígitos para CPF/telefone (sem regex no SQLite, remove a pontuação usual)
+_SQLITE_DIGITS = "replace(replace(replace(replace(replace(replace(coalesce({col}, ''), '.', ''), '-', ''), '(', ''), ')', ''), ' ', ''), '+', '')"
+# FTS5 só casa prefixos: o telefone é indexado também sem o DDD, para achar pelo número local
+_SQLITE_PHONE = "{d} || ' ' || substr({d}, 3)".format(d=_SQLITE_DIGITS.format(col="{p}.phone"))
+_SQLITE_VALUES = (
+    "{p}.id, {p}.name, "
+    + _SQLITE_DIGITS.format(col="{p}.cpf") + ", "
+    + _SQLITE_PHONE + ", "
+    "coalesce({p}.email, '')"
+)
+
+_SQLITE_SETUP = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS patients_fts USING fts5("
+    "name, cpf, phone, email, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    "CREATE TRIGGER IF NOT EXISTS patients_fts_ai AFTER INSERT ON patients BEGIN "
+    f"INSERT INTO patients_fts (rowid, name, cpf, phone, email) VALUES ({_SQLITE_VALUES.format(p='new')}); END",
+    "CREATE TRIGGER IF NOT EXISTS patients_fts_ad AFTER DELETE ON patients BEGIN "
+    "DELETE FROM patients_fts WHERE rowid = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS patients_fts_au AFTER UPDATE OF name, cpf, phone, email ON patients BEGIN "
+    "DELETE FROM patients_fts WHERE rowid = old.id; "
+    f"INSERT INTO patients_fts (rowid, name, cpf, phone, email) VALUES ({_SQLITE_VALUES.format(p='new')}); END",
+]
+
+
+async def ensure_search_index(conn: AsyncConnection) -> None:
+    """Cria extensões/índices (PostgreSQL) ou a tabela FTS5 + triggers (SQLite) e sincroniza."""
+    if conn.dialect.name == "postgresql":
+        for stmt in _PG_SETUP:
+            await conn.execute(text(stmt))
+        return
+
+    for stmt in _SQLITE_SETUP:
+        await conn.execute(text(stmt))
+    # Linhas gravadas antes dos triggers existirem (bancos antigos): reindexa tudo
+    indexed = await conn.scalar(text("SELECT count(*) FROM patients_fts"))
+    total = await conn.scalar(text("SELECT count(*) FROM patients"))
+    if indexed != total:
+        await conn.execute(text("DELETE FROM patients_fts"))
+        await conn.execute(text(
+            "INSERT INTO patients_fts (rowid, name, cpf, phone, email) "
+            f"SELECT {_SQLITE_VALUES.format(p='patients')} FROM patients"
+        ))
+        logger.info(f"Índice de busca de pacientes reconstruído ({total} pacientes).")
+
+
+# ═════════════════════════════════════════════════════════════════════
+# CONSULTA
+# ═════════════════════════════════════════════════════════════════════
+
+async def search_patient_ids(
+    db: AsyncSession, query: str, *, professional_id: int | None, skip: int, limit: int
+) -> list[int]:
+    """
+    IDs dos pacientes que casam com a busca, do mais ao menos relevante.
+    professional_id restringe aos pacientes do profissional (None = todos, para admin).
+    """
+    terms = _terms(query)
+    digits = digits_of(query)
+    if len(digits) < MIN_DIGITS:
+        digits = ""
+    if not terms and not digits:
+        return []
+
+    params: dict = {"limit": limit, "offset": skip, "prof": professional_id}
+    scope = "AND p.professional_id = :prof" if professional_id is not None else ""
+
+    if db.bind.dialect.name == "postgresql":
+        name, tsv, cpf, phone = (e.format(t="p.") for e in (_PG_NAME, _PG_TSV, _PG_CPF, _PG_PHONE))
+        params.update(q=" ".join(terms), tsq=" & ".join(f"{t}:*" for t in terms) or "''", digits=digits)
+        sql = f"""
+            SELECT p.id FROM patients p, to_tsquery('simple', :tsq) AS tsq
+            WHERE (
+                {name} % :q
+                OR {tsv} @@ tsq
+                OR (:digits <> '' AND ({cpf} LIKE :digits || '%' OR {phone} LIKE '%' || :digits || '%'))
+            ) {scope}
+            ORDER BY
+                (CASE WHEN :digits <> '' AND {cpf} = :digits THEN 2 ELSE 0 END)
+                + similarity({name}, :q) + ts_rank({tsv}, tsq) DESC,
+                p.name
+            LIMIT :limit OFFSET :offset
+        """
+    else:
+        # Cada termo vira prefixo ("mar"*); termos combinados com AND. Dígitos também
+        # buscam nas colunas de CPF/telefone.
+        clauses = [" AND ".join(f'"{t}"*' for t in terms)] if terms else []
+        if digits:
+            clauses.append(f'{{cpf phone}} : "{digits}"*')
+        params.update(match=" OR ".join(f"({c})" for c in clauses), candidates=SQLITE_CANDIDATES)
+        # A subconsulta sem ORDER BY para no limite de candidatos; só eles são ordenados
+        sql = f"""
+            SELECT id FROM (
+                SELECT p.id, p.name, bm25(patients_fts, 10.0, 5.0, 2.0, 1.0) AS rank
+                FROM patients_fts
+                JOIN patients p ON p.id = patients_fts.rowid
+                WHERE patients_fts MATCH :match {scope}
+                LIMIT :candidates
+            )
+            ORDER BY rank, name
+            LIMIT :limit OFFSET :offset
+        """
+
+    result = await db.execute(text(sql), params)
+    return [row[0] for row in result]
@@ -4,6 +4,7 @@ Cria tabelas e insere dados de exemplo em todas as entidades.
 """
 
 import logging
+from functools import lru_cache
 from datetime import date, time, datetime, timedelta
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -17,6 +18,9 @@ from app.auth import get_password_hash
 
 logger = logging.getLogger(__name__)
 
+# Hash Argon2 calculado uma única vez por senha distinta (as contas mock compartilham senhas)
+_hash_password = lru_cache(maxsize=None)(get_password_hash)
+
 # ═════════════════════════════════════════════════════════════════════
 # DADOS MOCKADOS
 # ═════════════════════════════════════════════════════════════════════
@@ -189,7 +193,7 @@ async def seed_mock_data(session: AsyncSession):
     for u in USERS:
         obj = User(
             email=u["email"],
-            hashed_password=get_password_hash(u["password"]),
+            hashed_password=_hash_password(u["password"]),
             full_name=u["full_name"],
             role=u["role"],
             role_title=u.get("role_title"),
@@ -217,7 +221,7 @@ async def seed_mock_data(session: AsyncSession):
             insurance_number=p.get("insurance_number"),
             status=p["status"],
             care_modality=p.get("care_modality", "Presencial"),
-            hashed_password=get_password_hash(p["password"]),
+            hashed_password=_hash_password(p["password"]),
             professional_id=professionals[p["prof_index"]].id,
         )
         session.add(obj)
@@ -0,0 +1,75 @@
+"""
+Inicialização: perfil de tempos e prontidão (readiness)
+- profile: registra quanto cada etapa levou (imports do app.main, etapas do lifespan,
+  aquecimento em segundo plano). Com STARTUP_PROFILE=true o relatório vai para o log e
+  para a resposta de /ready
+- readiness: etapas de aquecimento ainda em andamento. /health (liveness) responde assim
+  que o processo sobe; /ready só depois que todas terminam sem erro
+
+Para o detalhe de cada módulo importado: python -X importtime -c "import app.main"
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Referência de tempo: o primeiro import deste módulo (início do import de app.main)
+STARTED_AT = time.perf_counter()
+
+
+class StartupProfile:
+    def __init__(self) -> None:
+        self.stages: list[tuple[str, float]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - started))
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "stages_ms": {name: round(seconds * 1000, 1) for name, seconds in self.stages},
+            "elapsed_ms": round((time.perf_counter() - STARTED_AT) * 1000, 1),
+        }
+
+    def log(self) -> None:
+        lines = [f"  {name:<40} {seconds * 1000:8.1f} ms" for name, seconds in self.stages]
+        logger.info("Perfil de inicialização:\n" + "\n".join(lines))
+
+
+class Readiness:
+    def __init__(self) -> None:
+        self._pending: set[str] = set()
+        self._failed: dict[str, str] = {}
+        self._started = False
+
+    def begin(self, *names: str) -> None:
+        self._started = True
+        self._pending.update(names)
+
+    def done(self, name: str, error: Exception | None = None) -> None:
+        self._pending.discard(name)
+        if error is not None:
+            self._failed[name] = str(error)
+
+    @property
+    def ready(self) -> bool:
+        """Pronto quando o lifespan já registrou o aquecimento e todas as etapas terminaram sem erro."""
+        return self._started and not self._pending and not self._failed
+
+    @property
+    def failed(self) -> bool:
+        return bool(self._failed)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"pending": sorted(self._pending), "failed": dict(self._failed)}
+
+
+profile = StartupProfile()
+readiness = Readiness()
@@ -0,0 +1,336 @@
+"""
+Resumos clínicos por IA (mensagens salvas do paciente)
+- Gerados em segundo plano: o endpoint cria um job e responde na hora (202)
+- Resultado em cache pelo hash de (mensagens salvas + modelo + versão do prompt):
+  o mesmo conjunto de mensagens nunca é reenviado ao provedor
+- Provedor plugável: "groq" em produção; testes registram um provedor falso
+- Históricos longos: map-reduce por período (mês). Cada período vira um resumo parcial
+  em cache (summary_chunks); um novo pedido só resume os períodos que mudaram
+  e junta os parciais — o custo acompanha as mensagens novas, não o histórico todo
+
+O job roda com sua própria sessão (SessionLocal), pois a sessão da requisição
+já foi encerrada quando a tarefa em segundo plano executa.
+"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from typing import Callable, Protocol, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.config import settings
+from app.database import AsyncSession, SessionLocal
+from app.http_clients import registry
+from app.models import Patient, PatientMessage, SummaryCache, SummaryChunk, SummaryJob
+
+logger = logging.getLogger(__name__)
+
+PROMPT_VERSION = 2            # Incrementar ao mudar o prompt (invalida o cache)
+MAX_TOKENS = 1024
+DIRECT_MAX_CHARS = 12_000     # Até aqui o histórico cabe em um único prompt
+CHUNK_MAX_CHARS = 12_000      # Mês maior que isso é dividido em partes
+CHUNK_MAX_TOKENS = 400        # Tamanho de cada resumo parcial
+REDUCE_FANIN = 12             # Máximo de resumos parciais juntados em um único prompt
+JOB_STALE_MINUTES = 10        # Job "pending/running" mais antigo que isso não é reaproveitado
+
+
+# ═════════════════════════════════════════════════════════════════════
+# PROVEDORES DE IA
+# ═════════════════════════════════════════════════════════════════════
+
+class SummaryProvider(Protocol):
+    model: str
+
+    def is_configured(self) -> bool: ...
+
+    async def complete(self, prompt: str, max_tokens: int) -> str: ...
+
+
+class GroqSummaryProvider:
+    """Groq (Llama 3) pela API REST compatível com OpenAI, via cliente HTTP compartilhado."""
+
+    model = "llama-3.1-8b-instant"
+
+    def is_configured(self) -> bool:
+        return bool(settings.GROQ_API_KEY)
+
+    async def complete(self, prompt: str, max_tokens: int) -> str:
+        # POST sem retry: uma completion repetida é gerada (e cobrada) de novo
+        response = await registry.get("groq").post(
+            "/chat/completions",
+            json={
+                "model": self.model,
+                "messages": [{"role": "user", "content": prompt}],
+                "temperature": 0.3,
+                "max_tokens": max_tokens,
+            },
+            headers={"Authorization": f"Bearer {settings.GROQ_API_KEY}"},
+        )
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"]
+
+
+_PROVIDERS: dict[str, Callable[[], SummaryProvider]] = {"groq": GroqSummaryProvider}
+
+
+def register_provider(name: str, factory: Callable[[], SummaryProvider]) -> None:
+    _PROVIDERS[name] = factory
+
+
+def get_provider() -> SummaryProvider:
+    factory = _PROVIDERS.get(settings.SUMMARY_PROVIDER)
+    if factory is None:
+        raise ValueError(f"Provedor de resumo desconhecido: '{settings.SUMMARY_PROVIDER}'")
+    return factory()
+
+
+# ═════════════════════════════════════════════════════════════════════
+# PROMPT E CHAVE DE CACHE
+# ═════════════════════════════════════════════════════════════════════
+
+async def saved_messages(db: AsyncSession, patient_id: int) -> Sequence[PatientMessage]:
+    result = await db.execute(
+        select(PatientMessage)
+        .where(PatientMessage.patient_id == patient_id, PatientMessage.saved == True)
+        .order_by(PatientMessage.created_at, PatientMessage.id)
+    )
+    return result.scalars().all()
+
+
+def cache_key(model: str, patient_name: str, messages: Sequence[PatientMessage]) -> str:
+    """SHA-256 de tudo que entra no prompt — qualquer mensagem nova/alterada gera outra chave."""
+    payload = json.dumps(
+        [PROMPT_VERSION, model, patient_name, [(m.id, str(m.created_at), m.message) for m in messages]],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _format_messages(messages: Sequence[PatientMessage]) -> str:
+    return "\n\n".join(
+        f"[{m.created_at.strftime('%d/%m/%Y %H:%M') if m.created_at else '—'}]\n{m.message}"
+        for m in messages
+    )
+
+
+def build_prompt(patient_name: str, messages: Sequence[PatientMessage]) -> str:
+    msgs_text = _format_messages(messages)
+    return f"""Você é um assistente clínico de psicologia. Analise as anotações abaixo enviadas pelo paciente {patient_name} ao longo do tempo.
+
+Produza um resumo clínico objetivo em português, organizado nos seguintes tópicos:
+1. Padrões emocionais recorrentes
+2. Eventos ou situações relevantes mencionados
+3. Pontos de atenção ou alertas
+4. Evolução percebida ao longo das mensagens
+
+Seja conciso e clínico. Não invente informações além do que está nas mensagens.
+
+Mensagens do paciente:
+{msgs_text}"""
+
+
+def build_chunk_prompt(period: str, messages: Sequence[PatientMessage]) -> str:
+    return f"""Você é um assistente clínico de psicologia. Resuma as anotações abaixo, enviadas por um paciente no período {period}.
+
+Registre de forma concisa: estado emocional predominante, eventos ou situações relevantes e qualquer ponto de atenção.
+Não invente informações além do que está nas mensagens.
+
+Mensagens do período:
+{_format_messages(messages)}"""
+
+
+def build_merge_prompt(partials: Sequence[tuple[str, str]]) -> str:
+    """Junta resumos parciais de períodos consecutivos em um resumo do intervalo inteiro."""
+    text = "\n\n".join(f"[{period}]\n{summary}" for period, summary in partials)
+    return f"""Você é um assistente clínico de psicologia. Abaixo estão resumos de períodos consecutivos das anotações de um paciente.
+
+Combine-os em um único resumo cronológico e conciso, preservando os pontos de atenção e as mudanças ao longo do tempo.
+
+Resumos dos períodos:
+{text}"""
+
+
+def build_reduce_prompt(patient_name: str, partials: Sequence[tuple[str, str]]) -> str:
+    text = "\n\n".join(f"[{period}]\n{summary}" for period, summary in partials)
+    return f"""Você é um assistente clínico de psicologia. Abaixo estão resumos, por período, das anotações enviadas pelo paciente {patient_name} ao longo do tempo.
+
+Produza um resumo clínico objetivo em português, organizado nos seguintes tópicos:
+1. Padrões emocionais recorrentes
+2. Eventos ou situações relevantes mencionados
+3. Pontos de atenção ou alertas
+4. Evolução percebida ao longo dos períodos
+
+Seja conciso e clínico. Não invente informações além do que está nos resumos.
+
+Resumos por período:
+{text}"""
+
+
+async def get_cached(db: AsyncSession, key: str) -> SummaryCache | None:
+    return await db.get(SummaryCache, key)
+
+
+async def _store_cache(db: AsyncSession, key: str, model: str, summary: str, messages_count: int) -> None:
+    dialect = postgresql if db.bind is not None and db.bind.dialect.name == "postgresql" else sqlite
+    await db.execute(
+        dialect.insert(SummaryCache)
+        .values(cache_key=key, model=model, summary=summary, messages_count=messages_count)
+        .on_conflict_do_nothing(index_elements=[SummaryCache.cache_key])
+    )
+
+
+# ═════════════════════════════════════════════════════════════════════
+# MAP-REDUCE (HISTÓRICOS LONGOS)
+# ═════════════════════════════════════════════════════════════════════
+
+def period_chunks(messages: Sequence[PatientMessage]) -> list[tuple[str, list[PatientMessage]]]:
+    """
+    Agrupa as mensagens (já ordenadas) por mês; meses maiores que CHUNK_MAX_CHARS
+    são divididos em partes ("2025-03", "2025-03#2", ...). Mensagens novas só
+    alteram a última parte do mês corrente.
+    """
+    chunks: list[tuple[str, list[PatientMessage]]] = []
+    for month, group in groupby(messages, key=lambda m: m.created_at.strftime("%Y-%m") if m.created_at else "sem data"):
+        parts: list[list[PatientMessage]] = [[]]
+        size = 0
+        for m in group:
+            if parts[-1] and size + len(m.message) > CHUNK_MAX_CHARS:
+                parts.append([])
+                size = 0
+            parts[-1].append(m)
+            size += len(m.message)
+        chunks.extend((month if i == 0 else f"{month}#{i + 1}", part) for i, part in enumerate(parts))
+    return chunks
+
+
+def _chunk_key(patient_id: int, model: str, stage: str, period: str, content: str) -> str:
+    payload = json.dumps([PROMPT_VERSION, model, patient_id, stage, period, content], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def _cached_partial(
+    db: AsyncSession, provider: SummaryProvider, patient_id: int, period: str,
+    key: str, prompt: str, messages_count: int,
+) -> str:
+    """Resumo parcial do cache ou gerado agora (e gravado, para os próximos pedidos)."""
+    cached = await db.get(SummaryChunk, key)
+    if cached is not None:
+        return cached.summary
+
+    summary = await provider.complete(prompt, CHUNK_MAX_TOKENS)
+    dialect = postgresql if db.bind is not None and db.bind.dialect.name == "postgresql" else sqlite
+    await db.execute(
+        dialect.insert(SummaryChunk)
+        .values(cache_key=key, patient_id=patient_id, period=period, summary=summary, messages_count=messages_count)
+        .on_conflict_do_nothing(index_elements=[SummaryChunk.cache_key])
+    )
+    # Commit a cada parcial: se um período posterior falhar, os já resumidos não se perdem
+    await db.commit()
+    return summary
+
+
+async def summarize(db: AsyncSession, provider: SummaryProvider, patient: Patient, messages: Sequence[PatientMessage]) -> str:
+    """
+    Históricos curtos → um único prompt (como sempre foi).
+    Históricos longos → map (um resumo por período, em cache) + reduce hierárquico:
+    enquanto houver mais de REDUCE_FANIN parciais, grupos consecutivos são juntados
+    (também em cache), e o último nível gera o resumo clínico final.
+    """
+    if len(_format_messages(messages)) <= DIRECT_MAX_CHARS:
+        return await provider.complete(build_prompt(patient.name, messages), MAX_TOKENS)
+
+    partials: list[tuple[str, str, int]] = []  # (período, resumo, nº de mensagens)
+    for period, chunk in period_chunks(messages):
+        content = json.dumps([(m.id, str(m.created_at), m.message) for m in chunk], ensure_ascii=False)
+        key = _chunk_key(patient.id, provider.model, "map", period, content)
+        summary = await _cached_partial(
+            db, provider, patient.id, period, key, build_chunk_prompt(period, chunk), len(chunk)
+        )
+        partials.append((period, summary, len(chunk)))
+
+    while len(partials) > REDUCE_FANIN:
+        merged: list[tuple[str, str, int]] = []
+        for i in range(0, len(partials), REDUCE_FANIN):
+            group = partials[i:i + REDUCE_FANIN]
+            if len(group) == 1:
+                merged.append(group[0])
+                continue
+            period = f"{group[0][0].split('..')[0]}..{group[-1][0].split('..')[-1]}"
+            pairs = [(p, s) for p, s, _ in group]
+            key = _chunk_key(patient.id, provider.model, "merge", period, json.dumps(pairs, ensure_ascii=False))
+            count = sum(n for _, _, n in group)
+            summary = await _cached_partial(db, provider, patient.id, period, key, build_merge_prompt(pairs), count)
+            merged.append((period, summary, count))
+        partials = merged
+
+    return await provider.complete(build_reduce_prompt(patient.name, [(p, s) for p, s, _ in partials]), MAX_TOKENS)
+
+
+async def find_active_job(db: AsyncSession, key: str) -> SummaryJob | None:
+    """Job ainda em andamento para a mesma chave (evita gerar o mesmo resumo duas vezes)."""
+    recent = datetime.now(timezone.utc) - timedelta(minutes=JOB_STALE_MINUTES)
+    result = await db.execute(
+        select(SummaryJob)
+        .where(
+            SummaryJob.cache_key == key,
+            SummaryJob.status.in_(("pending", "running")),
+            SummaryJob.created_at >= recent,
+        )
+        .order_by(SummaryJob.id.desc())
+        .limit(1)
+    )
+    return result.scalars().first()
+
+
+def job_to_dict(job: SummaryJob) -> dict:
+    return {
+        "job_id": job.id,
+        "patient_id": job.patient_id,
+        "status": job.status,
+        "summary": job.summary,
+        "messages_count": job.messages_count,
+        "error": job.error,
+    }
+
+
+async def run_job(job_id: int) -> None:
+    """Executa um job pendente: gera o resumo (ou reaproveita o cache) e grava o resultado."""
+    async with SessionLocal() as db:
+        job = await db.get(SummaryJob, job_id)
+        if job is None or job.status != "pending":
+            return
+        job.status = "running"
+        await db.commit()
+
+        try:
+            provider = get_provider()
+            patient = await db.get(Patient, job.patient_id)
+            messages = await saved_messages(db, job.patient_id)
+            if patient is None or not messages:
+                raise LookupError("Paciente sem mensagens salvas.")
+
+            # As mensagens podem ter mudado desde o pedido: a chave é recalculada
+            key = cache_key(provider.model, patient.name, messages)
+            cached = await get_cached(db, key)
+            if cached is not None:
+                summary = cached.summary
+            else:
+                summary = await summarize(db, provider, patient, messages)
+                await _store_cache(db, key, provider.model, summary, len(messages))
+
+            job.cache_key = key
+            job.summary = summary
+            job.messages_count = len(messages)
+            job.status = "done"
+        except Exception as e:
+            logger.error(f"Erro ao gerar resumo (job {job_id}): {e}", exc_info=True)
+            await db.rollback()
+            job.status = "error"
+            job.error = "Falha ao gerar o resumo. Tente novamente."
+
+        job.finished_at = datetime.now(timezone.utc)
+        await db.commit()
@@ -0,0 +1,195 @@
+"""
+Índice em memória para autocompletar nomes (seletores de paciente e profissional)
+- Array ordenado de (nome normalizado, id) consultado com bisect: busca por prefixo
+  em O(log n + k), sem ir ao banco
+- Cada palavra do nome também é indexada ("silva" encontra "Maria José Silva")
+- Pacientes indexados por profissional (cada profissional só vê os seus) e em um índice geral (admin)
+- Atualização incremental no cadastro/alteração, propagada aos demais workers pelo
+  barramento de eventos; reconstrução completa na inicialização e periodicamente
+
+O índice é construído sob demanda na primeira consulta se o lifespan ainda não o fez.
+"""
+
+import asyncio
+import logging
+from bisect import bisect_left, insort
+from typing import Any
+
+from sqlalchemy import select
+
+from app.database import AsyncSession
+from app.events import bus
+from app.models import Patient, Professional
+from app.search import normalize
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPE = "typeahead"
+DEFAULT_LIMIT = 10
+
+
+class PrefixIndex:
+    """Array ordenado de chaves (palavra-sufixo do nome normalizado, id)."""
+
+    def __init__(self) -> None:
+        self._entries: list[tuple[str, int]] = []
+        self._names: dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @staticmethod
+    def _keys(name: str) -> list[str]:
+        words = normalize(name).split()
+        return [" ".join(words[i:]) for i in range(len(words))]
+
+    def upsert(self, item_id: int, name: str) -> None:
+        self.remove(item_id)
+        self._names[item_id] = name
+        for key in self._keys(name):
+            insort(self._entries, (key, item_id))
+
+    def remove(self, item_id: int) -> None:
+        name = self._names.pop(item_id, None)
+        if name is None:
+            return
+        for key in self._keys(name):
+            pos = bisect_left(self._entries, (key, item_id))
+            if pos < len(self._entries) and self._entries[pos] == (key, item_id):
+                del self._entries[pos]
+
+    def load(self, items: list[tuple[int, str]]) -> None:
+        """Carga inicial: monta e ordena tudo de uma vez (mais rápido que upserts)."""
+        self._names = dict(items)
+        self._entries = sorted((key, item_id) for item_id, name in items for key in self._keys(name))
+
+    def search(self, prefix: str, limit: int = DEFAULT_LIMIT) -> list[tuple[int, str]]:
+        prefix = " ".join(normalize(prefix).split())
+        if not prefix:
+            return []
+        results: list[tuple[int, str]] = []
+        seen: set[int] = set()
+        pos = bisect_left(self._entries, (prefix, -1))
+        while pos < len(self._entries) and len(results) < limit:
+            key, item_id = self._entries[pos]
+            if not key.startswith(prefix):
+                break
+            if item_id not in seen:
+                seen.add(item_id)
+                results.append((item_id, self._names[item_id]))
+            pos += 1
+        return results
+
+
+class TypeaheadIndex:
+    def __init__(self) -> None:
+        self.professionals = PrefixIndex()
+        self.patients = PrefixIndex()                          # Todos (admin)
+        self.patients_by_professional: dict[int | None, PrefixIndex] = {}
+        self._patient_owner: dict[int, int | None] = {}
+        self.ready = False
+        self._lock = asyncio.Lock()
+        self._pending: list[dict[str, Any]] | None = None   # Eventos chegados durante uma reconstrução
+
+    async def rebuild(self, db: AsyncSession) -> None:
+        """
+        Lê tudo do banco e troca os índices. Eventos que chegam enquanto os SELECTs rodam
+        ficam guardados e são reaplicados depois da troca (senão a foto antiga os apagaria).
+        """
+        self._pending = []
+        try:
+            await self._rebuild(db)
+        finally:
+            pending, self._pending = self._pending, None
+        for event in pending:
+            self._apply(event)
+
+    async def _rebuild(self, db: AsyncSession) -> None:
+        professionals = (await db.execute(select(Professional.id, Professional.name))).all()
+        patients = (await db.execute(select(Patient.id, Patient.name, Patient.professional_id))).all()
+
+        by_prof: dict[int | None, list[tuple[int, str]]] = {}
+        for pid, name, prof_id in patients:
+            by_prof.setdefault(prof_id, []).append((pid, name))
+
+        self.professionals.load([(pid, name) for pid, name in professionals])
+        self.patients.load([(pid, name) for pid, name, _ in patients])
+        scoped: dict[int | None, PrefixIndex] = {}
+        for prof_id, items in by_prof.items():
+            scoped[prof_id] = PrefixIndex()
+            scoped[prof_id].load(items)
+        self.patients_by_professional = scoped
+        self._patient_owner = {pid: prof_id for pid, _, prof_id in patients}
+        self.ready = True
+
+    async def ensure(self, db: AsyncSession) -> None:
+        if self.ready:
+            return
+        async with self._lock:
+            if not self.ready:
+                await self.rebuild(db)
+
+    def apply(self, event: dict[str, Any]) -> None:
+        """Aplica uma alteração (local ou vinda de outro worker)."""
+        if self._pending is not None:
+            self._pending.append(event)
+        self._apply(event)
+
+    def _apply(self, event: dict[str, Any]) -> None:
+        if not self.ready:
+            return  # A construção completa vai trazer o estado atual
+        item_id = event["id"]
+        deleted = event.get("deleted", False)
+        if event["kind"] == "professional":
+            if deleted:
+                self.professionals.remove(item_id)
+            else:
+                self.professionals.upsert(item_id, event["name"])
+            return
+
+        old_owner = self._patient_owner.pop(item_id, None)
+        if old_owner in self.patients_by_professional:
+            self.patients_by_professional[old_owner].remove(item_id)
+        if deleted:
+            self.patients.remove(item_id)
+            return
+        owner = event.get("professional_id")
+        self.patients.upsert(item_id, event["name"])
+        self.patients_by_professional.setdefault(owner, PrefixIndex()).upsert(item_id, event["name"])
+        self._patient_owner[item_id] = owner
+
+    def search_patients(self, prefix: str, professional_id: int | None, limit: int) -> list[dict[str, Any]]:
+        """professional_id=None → todos os pacientes (admin)."""
+        source = self.patients if professional_id is None else self.patients_by_professional.get(professional_id)
+        if source is None:
+            return []
+        return [
+            {"id": pid, "name": name, "professional_id": self._patient_owner.get(pid)}
+            for pid, name in source.search(prefix, limit)
+        ]
+
+    def search_professionals(self, prefix: str, limit: int) -> list[dict[str, Any]]:
+        return [{"id": pid, "name": name} for pid, name in self.professionals.search(prefix, limit)]
+
+
+index = TypeaheadIndex()
+
+
+async def patient_changed(patient_id: int, name: str | None, professional_id: int | None, deleted: bool = False) -> None:
+    """Chamar após o commit do cadastro/alteração de um paciente."""
+    await bus.publish({
+        "type": EVENT_TYPE, "kind": "patient", "id": patient_id,
+        "name": name, "professional_id": professional_id, "deleted": deleted,
+    })
+
+
+async def professional_changed(professional_id: int, name: str | None, deleted: bool = False) -> None:
+    """Chamar após o commit do cadastro/alteração/remoção de um profissional."""
+    await bus.publish({"type": EVENT_TYPE, "kind": "professional", "id": professional_id, "name": name, "deleted": deleted})
+
+
+def _on_typeahead_event(event: dict[str, Any]) -> None:
+    index.apply(event)
+
+
+bus.on(EVENT_TYPE, _on_typeahead_event)
@@ -0,0 +1,102 @@
+"""
+Contadores de mensagens não lidas por profissional
+- Ajustados na mesma transação que cria ou marca mensagens como lidas
+- Leitura O(1) por chave primária (sem COUNT sobre patient_messages)
+- Reconciliação periódica: recalcula a partir das mensagens e corrige divergências
+- Mensagens sem profissional (paciente sem vínculo, ex: seed) não têm contador: entram
+  no total do admin por um COUNT que usa o índice (professional_id, is_read)
+
+As funções de escrita não fazem commit — quem chama controla a transação,
+para que mensagem e contador sejam gravados juntos.
+"""
+
+import logging
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.database import AsyncSession
+from app.models import PatientMessage, UnreadMessageCounter
+
+logger = logging.getLogger(__name__)
+
+_counters = UnreadMessageCounter.__table__
+
+
+def _is_postgres(db: AsyncSession) -> bool:
+    return db.bind is not None and db.bind.dialect.name == "postgresql"
+
+
+def _unread_subquery(professional_id: int):
+    """COUNT atual das não lidas do profissional, avaliado no momento da escrita."""
+    return (
+        select(func.count(PatientMessage.id))
+        .where(PatientMessage.professional_id == professional_id, PatientMessage.is_read == False)
+        .scalar_subquery()
+    )
+
+
+async def adjust(db: AsyncSession, professional_id: int | None, delta: int) -> None:
+    """Soma delta ao contador do profissional (cria a linha se ainda não existir)."""
+    if not professional_id or not delta:
+        return
+    dialect = postgresql if _is_postgres(db) else sqlite
+    clamp = func.greatest if _is_postgres(db) else func.max  # Nunca negativo
+    stmt = dialect.insert(_counters).values(professional_id=professional_id, unread_count=max(delta, 0))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[_counters.c.professional_id],
+        set_={"unread_count": clamp(_counters.c.unread_count + delta, 0), "updated_at": func.now()},
+    )
+    await db.execute(stmt)
+
+
+async def get_count(db: AsyncSession, professional_id: int) -> int:
+    return await db.scalar(
+        select(_counters.c.unread_count).where(_counters.c.professional_id == professional_id)
+    ) or 0
+
+
+async def get_total(db: AsyncSession) -> int:
+    """Total geral (badge do admin): soma de uma linha por profissional + não lidas sem profissional."""
+    counted = await db.scalar(select(func.sum(_counters.c.unread_count))) or 0
+    unassigned = await db.scalar(
+        select(func.count(PatientMessage.id))
+        .where(PatientMessage.professional_id.is_(None), PatientMessage.is_read == False)
+    ) or 0
+    return counted + unassigned
+
+
+async def reconcile(db: AsyncSession) -> int:
+    """
+    Recalcula os contadores a partir de patient_messages e corrige apenas os divergentes.
+    A correção usa um COUNT avaliado dentro do próprio UPDATE, então mensagens gravadas
+    entre a detecção e a correção não são perdidas.
+    Retorna quantos profissionais foram corrigidos. Não faz commit.
+    """
+    actual = dict((await db.execute(
+        select(PatientMessage.professional_id, func.count(PatientMessage.id))
+        .where(PatientMessage.is_read == False, PatientMessage.professional_id.is_not(None))
+        .group_by(PatientMessage.professional_id)
+    )).all())
+    stored = dict((await db.execute(
+        select(_counters.c.professional_id, _counters.c.unread_count)
+    )).all())
+
+    drift = [
+        prof_id for prof_id in actual.keys() | stored.keys()
+        if actual.get(prof_id, 0) != stored.get(prof_id)
+    ]
+    dialect = postgresql if _is_postgres(db) else sqlite
+    for prof_id in drift:
+        await db.execute(
+            dialect.insert(_counters)
+            .values(professional_id=prof_id, unread_count=_unread_subquery(prof_id))
+            .on_conflict_do_update(
+                index_elements=[_counters.c.professional_id],
+                set_={"unread_count": _unread_subquery(prof_id), "updated_at": func.now()},
+            )
+        )
+
+    if drift:
+        logger.warning(f"Contadores de não lidas corrigidos para {len(drift)} profissional(is).")
+    return len(drift)
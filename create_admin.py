@@ -1,41 +1,32 @@
 #!/usr/bin/env python
 """
 Script para verificar se o admin existe e criá-lo se necessário.
+Mesmo caminho do aquecimento da API (app/bootstrap.py): cria o admin de ADMIN_EMAIL,
+sincroniza a senha com ADMIN_PASSWORD quando ela mudou e não faz nada quando já está em dia.
 """
 import asyncio
-from app.database import SessionLocal, engine, Base
-from app.models import User
-from app.auth import get_password_hash
+from app.database import SessionLocal, engine
+from app import bootstrap, migrations
 from app.config import settings
-from sqlalchemy import select
-import app.models  # Carrega os modelos
+
+_MESSAGES = {
+    bootstrap.SKIPPED: "✗ ADMIN_EMAIL/ADMIN_PASSWORD não configurados no .env",
+    bootstrap.UNCHANGED: "✓ Admin já existe e está em dia: {email}",
+    bootstrap.VERIFIED: "✓ Admin já existe e está em dia: {email}",
+    bootstrap.CREATED: "✓ Admin criado com sucesso: {email}\n  Senha definida conforme ADMIN_PASSWORD no .env",
+    bootstrap.UPDATED: "✓ Senha do admin {email} sincronizada com ADMIN_PASSWORD",
+    bootstrap.REHASHED: "✓ Hash da senha do admin {email} atualizado para os parâmetros atuais",
+}
+
 
 async def create_admin():
-    # Cria as tabelas se não existirem
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    
+    # Cria/atualiza as tabelas (migrações pendentes)
+    await migrations.upgrade(engine)
+
     async with SessionLocal() as db:
-        # Verifica se o admin já existe
-        result = await db.execute(select(User).where(User.email == settings.ADMIN_EMAIL))
-        admin = result.scalars().first()
-        
-        if admin:
-            print(f"✓ Admin já existe: {admin.email}")
-            return
-        
-        # Cria o admin
-        admin_user = User(
-            email=settings.ADMIN_EMAIL,
-            hashed_password=get_password_hash(settings.ADMIN_PASSWORD),
-            full_name="Administrador",
-            role="admin",
-            is_active=True,
-        )
-        db.add(admin_user)
-        await db.commit()
-        print(f"✓ Admin criado com sucesso: {settings.ADMIN_EMAIL}")
-        print("  Senha definida conforme ADMIN_PASSWORD no .env")
+        outcome = await bootstrap.ensure_admin_from_settings(db)
+    print(_MESSAGES[outcome].format(email=settings.ADMIN_EMAIL))
+    await engine.dispose()
 
 if __name__ == "__main__":
     asyncio.run(create_admin())
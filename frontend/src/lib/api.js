@@ -18,18 +18,113 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// Renovação da sessão: o access token dura poucos minutos; ao receber 401 troca o
+// refresh token por um novo par e repete a requisição. Várias requisições falhando ao
+// mesmo tempo compartilham uma única renovação.
+let refreshPromise = null;
+
+export function refreshAccessToken() {
+  if (!refreshPromise) {
+    const refreshToken = localStorage.getItem("refresh_token");
+    refreshPromise = (
+      refreshToken
+        ? axios.post(`${API_BASE_URL}/api/token/refresh`, { refresh_token: refreshToken })
+        : Promise.reject(new Error("Sem refresh token"))
+    )
+      .then(({ data }) => {
+        localStorage.setItem("token", data.access_token);
+        localStorage.setItem("refresh_token", data.refresh_token);
+        return data.access_token;
+      })
+      .finally(() => {
+        refreshPromise = null;
+      });
+  }
+  return refreshPromise;
+}
+
+export function clearSession() {
+  localStorage.removeItem("token");
+  localStorage.removeItem("refresh_token");
+  localStorage.removeItem("user");
+}
+
+// Stream SSE com o token no header Authorization (EventSource não envia headers, e o token
+// na URL iria para os logs de acesso). O servidor encerra o stream quando o access token
+// vence ou é revogado: reconecta com o token atual e, se recusado (401), renova a sessão.
+// Retorna a função que fecha o stream.
+export function openEventStream(path, handlers) {
+  const controller = new AbortController();
+  const decoder = new TextDecoder();
+
+  const dispatch = (block) => {
+    let type = "message";
+    const data = [];
+    for (const line of block.split("\n")) {
+      if (line.startsWith("event:")) type = line.slice(6).trim();
+      else if (line.startsWith("data:")) data.push(line.slice(5).trimStart());
+    }
+    if (data.length && handlers[type]) handlers[type](JSON.parse(data.join("\n")));
+  };
+
+  const run = async () => {
+    let failures = 0;
+    while (!controller.signal.aborted) {
+      try {
+        const response = await fetch(`${API_BASE_URL}${path}`, {
+          headers: { Authorization: `Bearer ${localStorage.getItem("token")}` },
+          signal: controller.signal,
+        });
+        if (response.status === 401) {
+          await refreshAccessToken();
+          continue;
+        }
+        if (!response.ok) throw new Error(`HTTP ${response.status}`);
+        failures = 0;
+        const reader = response.body.getReader();
+        let buffer = "";
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+          const blocks = buffer.split("\n\n");
+          buffer = blocks.pop();
+          blocks.forEach(dispatch);
+        }
+      } catch {
+        if (controller.signal.aborted || !localStorage.getItem("refresh_token")) return;
+        failures += 1;
+        await new Promise((resolve) => setTimeout(resolve, Math.min(30000, 1000 * 2 ** failures)));
+      }
+    }
+  };
+
+  run();
+  return () => controller.abort();
+}
+
 // Interceptor para tratar erros
 api.interceptors.response.use(
   (response) => response,
-  (error) => {
-    const isLoginRoute = error.config?.url?.includes("/login");
+  async (error) => {
+    const config = error.config;
+    const isLoginRoute = config?.url?.includes("/login");
+    const sentToken = config?.headers?.Authorization?.replace("Bearer ", "");
     const hasToken = !!localStorage.getItem("token");
-    // Só redireciona se o usuário JÁ estava autenticado (token existia)
+    // Só renova/redireciona se o usuário JÁ estava autenticado (token existia)
     // Evita redirecionar quando o próprio login falha com 401
-    if (error.response?.status === 401 && hasToken && !isLoginRoute) {
-      localStorage.removeItem("token");
-      localStorage.removeItem("user");
-      window.location.href = "/login";
+    if (error.response?.status === 401 && hasToken && !isLoginRoute && !config._retry) {
+      config._retry = true;
+      try {
+        // Outra aba pode já ter renovado: usa o token novo antes de gastar o refresh token
+        const current = localStorage.getItem("token");
+        const token = current && current !== sentToken ? current : await refreshAccessToken();
+        config.headers.Authorization = `Bearer ${token}`;
+        return api(config);
+      } catch {
+        clearSession();
+        window.location.href = "/login";
+      }
     }
     return Promise.reject(error);
   },
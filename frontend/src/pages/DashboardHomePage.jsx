@@ -12,7 +12,7 @@ import {
   Clock,
   CheckCircle,
 } from "lucide-react";
-import api from "../lib/api";
+import api, { openEventStream } from "../lib/api";
 
 const StatCard = ({ label, value, loading }) => (
   <div className="rounded-xl border border-slate-200 dark:border-slate-600 p-5 bg-slate-50 dark:bg-slate-700/50 flex flex-col">
@@ -67,6 +67,32 @@ export default function DashboardHomePage() {
     load();
   }, []);
 
+  // Tempo real: o servidor envia a contagem de não lidas e as novas mensagens (SSE)
+  useEffect(() => {
+    if (!localStorage.getItem("token")) return undefined;
+
+    const onUnread = (data) => {
+      setUnreadMessages(data.count ?? 0);
+    };
+    const onMessage = (data) => {
+      setRecentMessages((prev) => [
+        {
+          id: data.message_id,
+          patient_id: data.patient_id,
+          professional_id: data.professional_id,
+          patient_name: data.patient_name,
+          message: data.preview,
+          is_read: false,
+          saved: false,
+          created_at: new Date().toISOString(),
+        },
+        ...prev,
+      ].slice(0, 5));
+    };
+
+    return openEventStream("/api/patient-messages/stream", { unread: onUnread, message: onMessage });
+  }, []);
+
   const msgCard = (
     <Card className="bg-white/90 dark:bg-slate-800 border border-slate-200 dark:border-slate-700">
       <div className="flex items-center justify-between gap-3 mb-6">
@@ -2,6 +2,7 @@ import { useState, useEffect } from "react";
 import { Outlet, useLocation, useNavigate } from "react-router-dom";
 import Sidebar from "../components/Sidebar";
 import { Menu } from "lucide-react";
+import api, { clearSession } from "../lib/api";
 
 const getUserFromStorage = () => {
   const stored = localStorage.getItem("user");
@@ -58,8 +59,11 @@ export default function DashboardPage() {
   }, [pageTitle]);
 
   const handleLogout = () => {
-    localStorage.removeItem("token");
-    localStorage.removeItem("user");
+    // Revoga a sessão no servidor (refresh token + access token atual); não espera a resposta
+    api
+      .post("/api/logout", { refresh_token: localStorage.getItem("refresh_token") })
+      .catch(() => {})
+      .finally(clearSession);
     navigate("/login", { replace: true });
   };
 
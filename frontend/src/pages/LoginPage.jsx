@@ -46,8 +46,9 @@ export default function LoginPage() {
         email: proFormData.email,
         password: proFormData.password,
       });
-      const { access_token, token_type, ...userData } = response.data;
+      const { access_token, refresh_token, token_type, expires_in, ...userData } = response.data;
       localStorage.setItem("token", access_token);
+      localStorage.setItem("refresh_token", refresh_token);
       localStorage.setItem("user", JSON.stringify(userData));
       navigate("/dashboard", { replace: true });
     } catch (error) {
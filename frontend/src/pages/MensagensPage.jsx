@@ -83,6 +83,20 @@ export default function MensagensPage() {
     }
   };
 
+  const handleMarkAllAsRead = async () => {
+    try {
+      // Uma única requisição (UPDATE em lote) em vez de uma por mensagem
+      const { data } = await api.put("/api/patient-messages/read", {
+        before: new Date().toISOString(),
+      });
+      setMessages((current) => current.map((message) => ({ ...message, is_read: true })));
+      setSelectedMessage((m) => (m ? { ...m, is_read: true } : m));
+      toast.success(`${data.updated} mensagem(ns) marcada(s) como lida(s).`);
+    } catch {
+      setError("Não foi possível marcar as mensagens como lidas. Tente novamente.");
+    }
+  };
+
   const handleSaveToPatient = async (messageId) => {
     try {
       await api.put(`/api/patient-messages/${messageId}/save`);
@@ -198,6 +212,11 @@ export default function MensagensPage() {
                 className="w-full rounded-lg border border-slate-200 dark:border-slate-600 bg-slate-50 dark:bg-slate-700 py-3 pl-10 pr-4 text-sm text-slate-700 dark:text-slate-200 outline-none transition focus:border-emerald-300 focus:ring-2 focus:ring-emerald-100"
               />
             </div>
+            {unreadCount > 0 && (
+              <Button variant="secondary" onClick={handleMarkAllAsRead} className="shrink-0">
+                <CheckCircle className="w-4 h-4 mr-2" /> Marcar todas como lidas
+              </Button>
+            )}
             <Button variant="secondary" onClick={loadMessages} className="shrink-0">
               Atualizar
             </Button>
@@ -348,6 +348,7 @@ export default function PacientesPage() {
   const [patients, setPatients] = useState([]);
   const [professionals, setProfessionals] = useState([]);
   const [search, setSearch] = useState("");
+  const [searchResults, setSearchResults] = useState(null);
   const [loading, setLoading] = useState(true);
   const [hasLoadError, setHasLoadError] = useState(false);
 
@@ -418,15 +419,38 @@ export default function PacientesPage() {
     load();
   }, []);
 
+  // Busca no servidor (todos os pacientes, não só a primeira página carregada)
+  useEffect(() => {
+    const term = search.trim();
+    if (term.length < 2) {
+      setSearchResults(null);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const res = await api.get("/api/patients/search", { params: { q: term, limit: 50 } });
+        if (!cancelled) setSearchResults(res.data.items);
+      } catch {
+        if (!cancelled) setSearchResults(null);
+      }
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [search]);
+
   const filteredPatients = useMemo(() => {
     const term = search.trim().toLowerCase();
     if (!term) return patients;
+    if (searchResults) return searchResults;
     return patients.filter((p) =>
       [p.name, p.cpf, p.status, p.email, p.phone]
         .filter(Boolean)
         .some((f) => f.toLowerCase().includes(term)),
     );
-  }, [patients, search]);
+  }, [patients, search, searchResults]);
 
   const activeCount = patients.filter(
     (p) => p.status?.toLowerCase() === "ativo",
@@ -451,7 +475,21 @@ export default function PacientesPage() {
     setSummary(null);
     try {
       const res = await api.post(`/api/patients/${viewPatient.id}/summary`);
-      setSummary(res.data);
+      if (res.status === 202) {
+        // Resumo gerado em segundo plano — acompanha o job até terminar
+        let job = res.data;
+        while (job.status === "pending" || job.status === "running") {
+          await new Promise((resolve) => setTimeout(resolve, 1500));
+          job = (await api.get(`/api/patients/summary-jobs/${job.job_id}`)).data;
+        }
+        if (job.status === "error") {
+          toast.error(job.error || "Erro ao gerar resumo.");
+          return;
+        }
+        setSummary(job);
+      } else {
+        setSummary(res.data);
+      }
     } catch (err) {
       toast.error(err.response?.data?.detail || "Erro ao gerar resumo.");
     } finally {
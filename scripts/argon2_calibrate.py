@@ -0,0 +1,75 @@
+"""
+Calibração do Argon2 para o hardware atual.
+Mede o tempo de verificação (o custo que cada login paga) para combinações de memória e
+iterações e recomenda a mais forte cujo p95 cabe no alvo. Rode no mesmo tipo de máquina
+da produção (ex: um shell na instância do Render), sem carga de outros processos.
+
+A saída termina com as variáveis ARGON2_* a configurar. Trocar os parâmetros não obriga
+ninguém a redefinir a senha: os hashes antigos continuam válidos e são refeitos no próximo
+login (app/password_rehash.py). Acompanhe a migração em /api/debug/password-hashes.
+
+Uso:
+    python -m scripts.argon2_calibrate --target-ms 150
+    python -m scripts.argon2_calibrate --target-ms 250 --memory 19456 65536 --samples 21
+"""
+
+import argparse
+import statistics
+import time
+
+from argon2 import PasswordHasher, Type
+
+_DEFAULT_MEMORY_KIB = [19456, 32768, 47104, 65536, 131072]
+_MAX_TIME_COST = 8
+
+
+def _measure(memory_cost: int, time_cost: int, parallelism: int, samples: int) -> tuple[float, float]:
+    """Mediana e p95 (ms) de verify() de um hash com os parâmetros dados."""
+    hasher = PasswordHasher(
+        time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism, type=Type.ID
+    )
+    hashed = hasher.hash("senha-de-calibracao")
+    hasher.verify(hashed, "senha-de-calibracao")  # Aquecimento (alocação inicial da memória)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.verify(hashed, "senha-de-calibracao")
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, round(0.95 * (len(timings) - 1)))]
+    return statistics.median(timings), p95
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recomenda parâmetros do Argon2 para um tempo-alvo de verificação.")
+    parser.add_argument("--target-ms", type=float, default=150, help="p95 máximo aceitável por verificação")
+    parser.add_argument("--memory", type=int, nargs="+", default=_DEFAULT_MEMORY_KIB, help="memory_cost em KiB")
+    parser.add_argument("--parallelism", type=int, default=1)
+    parser.add_argument("--samples", type=int, default=11)
+    args = parser.parse_args()
+
+    print(f"{'memória (KiB)':>14} {'iterações':>10} {'mediana ms':>11} {'p95 ms':>8}")
+    candidates: list[tuple[int, int, float]] = []
+    for memory_cost in sorted(args.memory):
+        for time_cost in range(1, _MAX_TIME_COST + 1):
+            median, p95 = _measure(memory_cost, time_cost, args.parallelism, args.samples)
+            fits = p95 <= args.target_ms
+            print(f"{memory_cost:>14} {time_cost:>10} {median:>11.1f} {p95:>8.1f}{'' if fits else '  (acima do alvo)'}")
+            if not fits:
+                break  # Mais iterações só aumentam o tempo
+            candidates.append((memory_cost, time_cost, p95))
+
+    if not candidates:
+        print(f"\nNenhuma combinação cabe em {args.target_ms:.0f} ms; aumente o alvo ou reduza a memória.")
+        return
+
+    # Mais forte = mais trabalho (memória × iterações); no empate, mais memória (resiste melhor a GPU)
+    memory_cost, time_cost, p95 = max(candidates, key=lambda c: (c[0] * c[1], c[0]))
+    print(f"\nRecomendado para p95 ≤ {args.target_ms:.0f} ms (medido: {p95:.1f} ms):")
+    print(f"ARGON2_MEMORY_COST={memory_cost}")
+    print(f"ARGON2_TIME_COST={time_cost}")
+    print(f"ARGON2_PARALLELISM={args.parallelism}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Microbenchmark da validação de JWT por requisição.
+Compara, para um token típico da SPA:
+- jwt.decode completo (assinatura + exp/aud/iss) — o custo de cada requisição sem cache
+- só a assinatura (claims não verificadas) e só a decodificação (sem assinatura nem claims),
+  para separar o custo do HMAC, da validação das claims e do parse base64/JSON
+- decode_access_token com o token já no cache (acerto: SHA-256 + LRU)
+- decode_access_token com cache cheio de outros tokens (falha: decode completo + inserção)
+
+Uso:
+    python -m scripts.jwt_benchmark --number 20000
+"""
+
+import argparse
+import os
+import timeit
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-0123456789abcdef")
+
+import jwt  # noqa: E402
+
+from app import auth  # noqa: E402
+from app.config import settings  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mede o custo de validar um JWT por requisição.")
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = auth.create_access_token({"sub": "42", "email": "drtest@clinic.com", "role": "user"})
+    key, algorithms = settings.SECRET_KEY, [settings.ALGORITHM]
+    claims_opts = {"audience": "clinical6p-api", "issuer": "clinical6p"}
+    miss_tokens = [
+        auth.create_access_token({"sub": str(i), "email": f"u{i}@clinic.com", "role": "user"})
+        for i in range(args.number)
+    ]
+    miss_iter = iter(miss_tokens)
+    cache = auth.TokenCache(maxsize=1024)
+
+    cases = {
+        "jwt.decode completo": lambda: jwt.decode(token, key, algorithms=algorithms, **claims_opts),
+        "só assinatura": lambda: jwt.decode(
+            token, key, algorithms=algorithms,
+            options={"verify_exp": False, "verify_aud": False, "verify_iss": False},
+        ),
+        "só parse (sem verificação)": lambda: jwt.decode(token, options={"verify_signature": False}),
+        "cache: acerto": lambda: auth.decode_access_token(token),
+        "cache: falha": lambda: cache.decode(next(miss_iter)),
+    }
+
+    auth.decode_access_token(token)  # Coloca o token no cache global
+    print(f"{args.number} execuções por caso:")
+    for name, fn in cases.items():
+        seconds = timeit.timeit(fn, number=args.number)
+        print(f"  {name:<28} {seconds / args.number * 1e6:8.2f} µs/op")
+
+
+if __name__ == "__main__":
+    main()
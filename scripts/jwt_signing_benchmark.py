@@ -0,0 +1,68 @@
+"""
+Benchmark de assinatura/verificação de JWT: HS256 x ES256 x EdDSA.
+Mede operações por segundo de jwt.encode (login/refresh) e jwt.decode completo (toda
+requisição que não acerta o cache de tokens), com as chaves já parseadas, como no key ring.
+
+ES256 e EdDSA exigem o pacote 'cryptography' (pyjwt[crypto]); sem ele, só HS256 é medido.
+
+Uso:
+    python -m scripts.jwt_signing_benchmark --number 5000
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+import jwt
+
+_CLAIMS = {
+    "sub": "42", "email": "drtest@clinic.com", "role": "user", "jti": "0" * 32,
+    "aud": "clinical6p-api", "iss": "clinical6p",
+}
+
+
+def _keys() -> dict[str, tuple[object, object]]:
+    """algoritmo → (chave de assinatura, chave de verificação)."""
+    secret = "benchmark-secret-key-0123456789abcdef"
+    keys: dict[str, tuple[object, object]] = {"HS256": (secret, secret)}
+    try:
+        from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+    except ImportError:
+        print("Pacote 'cryptography' ausente: medindo só HS256 (pip install 'pyjwt[crypto]').\n")
+        return keys
+    es_key = ec.generate_private_key(ec.SECP256R1())
+    ed_key = ed25519.Ed25519PrivateKey.generate()
+    keys["ES256"] = (es_key, es_key.public_key())
+    keys["EdDSA"] = (ed_key, ed_key.public_key())
+    return keys
+
+
+def _rate(fn, number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return number / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara throughput de assinatura/verificação de JWT.")
+    parser.add_argument("--number", type=int, default=5000)
+    args = parser.parse_args()
+
+    claims = {**_CLAIMS, "exp": datetime.now(timezone.utc) + timedelta(minutes=15)}
+    keys = _keys()
+    print(f"{'algoritmo':<8} {'assinar/s':>12} {'verificar/s':>12} {'token (bytes)':>14}")
+    for algorithm, (signing_key, verifying_key) in keys.items():
+        token = jwt.encode(claims, signing_key, algorithm=algorithm, headers={"kid": "bench"})
+        sign = _rate(lambda: jwt.encode(claims, signing_key, algorithm=algorithm, headers={"kid": "bench"}), args.number)
+        verify = _rate(
+            lambda: jwt.decode(
+                token, verifying_key, algorithms=[algorithm], audience="clinical6p-api", issuer="clinical6p"
+            ),
+            args.number,
+        )
+        print(f"{algorithm:<8} {sign:>12,.0f} {verify:>12,.0f} {len(token):>14}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+"""
+Gerador de dados sintéticos em alto volume (modo "bulk").
+Produz profissionais, pacientes, agendamentos e mensagens em escala de produção
+para testes de desempenho.
+
+- Sementes determinísticas: a mesma --seed (com a mesma --today) gera sempre os mesmos dados
+- Distribuições realistas (carteira de pacientes desigual, agenda em dias úteis,
+  status dependente de passado/futuro, mensagens concentradas no período recente)
+- Um único hash Argon2 pré-calculado é reutilizado em todas as credenciais
+- Inserção em lotes via Core insert() (SQLite) ou COPY (PostgreSQL)
+
+Uso:
+    python -m scripts.seed.seed_bulk --professionals 200 --patients 500000 \\
+        --appointments 5000000 --messages 1000000 --seed 42 --today 2026-01-15
+
+Com --reset as tabelas são apagadas e recriadas antes da geração.
+Sem --reset, use uma --seed diferente a cada execução (e-mails e CPFs derivam dela).
+--today fixa a data de referência (idades, agenda passada/futura, mensagens); sem ela,
+vale a data do dia e os dados só se repetem dentro do mesmo dia.
+"""
+
+import argparse
+import asyncio
+import random
+import time as time_mod
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Iterable, Iterator
+
+from sqlalchemy import Table, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.models import Appointment, Patient, PatientMessage, Professional, User
+from app.auth import get_password_hash
+
+
+# ─────────────────────────────────────────────────────────────────────
+# PARÂMETROS E VOCABULÁRIO
+# ─────────────────────────────────────────────────────────────────────
+
+DEFAULT_PASSWORD = "senha123"
+DEFAULT_BATCH_SIZE = 5000
+
+FIRST_NAMES_F = [
+    "Ana", "Maria", "Juliana", "Fernanda", "Camila", "Beatriz", "Larissa", "Patrícia",
+    "Aline", "Mariana", "Gabriela", "Letícia", "Bruna", "Amanda", "Luana", "Raquel",
+    "Vanessa", "Carolina", "Isabela", "Júlia", "Sofia", "Helena", "Alice", "Lívia",
+]
+FIRST_NAMES_M = [
+    "João", "Pedro", "Lucas", "Gabriel", "Rafael", "Felipe", "Bruno", "Gustavo",
+    "Carlos", "André", "Thiago", "Rodrigo", "Marcelo", "Eduardo", "Vinícius", "Mateus",
+    "Leonardo", "Daniel", "Diego", "Henrique", "Otávio", "Caio", "Samuel", "Heitor",
+]
+LAST_NAMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira",
+    "Lima", "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes",
+    "Soares", "Fernandes", "Vieira", "Barbosa", "Rocha", "Dias", "Nascimento", "Andrade",
+    "Moreira", "Nunes", "Marques", "Machado", "Mendes", "Freitas", "Cardoso", "Araújo",
+]
+CITIES = [
+    # (cidade, UF, peso)
+    ("São Paulo", "SP", 45), ("Guarulhos", "SP", 8), ("Osasco", "SP", 6),
+    ("Santo André", "SP", 6), ("São Bernardo do Campo", "SP", 6), ("Campinas", "SP", 9),
+    ("Rio de Janeiro", "RJ", 8), ("Belo Horizonte", "MG", 6), ("Curitiba", "PR", 6),
+]
+PROFESSIONAL_ROLES = [
+    # (cargo, especialidade, registro, peso)
+    ("Psicólogo(a)", "Terapia Cognitivo-Comportamental", "CRP", 40),
+    ("Psicólogo(a)", "Psicanálise", "CRP", 20),
+    ("Psicólogo(a)", "Terapia Familiar", "CRP", 12),
+    ("Neuropsicólogo(a)", "Neuropsicologia", "CRP", 10),
+    ("Psiquiatra", "Psiquiatria Clínica", "CRM", 10),
+    ("Psicopedagogo(a)", "Psicopedagogia", "ABPp", 8),
+]
+INSURANCE_PLANS = ["Unimed", "Amil", "Bradesco Saúde", "SulAmérica", "Porto Seguro", "Hapvida"]
+MESSAGE_TEMPLATES = [
+    "Essa semana foi mais tranquila, consegui aplicar os exercícios de respiração.",
+    "Tive uma crise de ansiedade no trabalho e precisei sair da sala por alguns minutos.",
+    "Dormi mal nos últimos dias, acordando várias vezes durante a noite.",
+    "Consegui conversar com minha família sobre o que discutimos na sessão.",
+    "Estou me sentindo mais motivado(a) desde a última consulta.",
+    "Voltei a ter pensamentos repetitivos antes de dormir, gostaria de falar sobre isso.",
+    "O registro diário de emoções está me ajudando a perceber alguns padrões.",
+    "Tive uma discussão difícil com meu chefe e fiquei abalado(a) o resto do dia.",
+    "Consegui sair de casa e encontrar amigos, algo que eu vinha evitando.",
+    "Percebi que fico mais irritado(a) quando não durmo bem.",
+]
+
+# Grade de horários: sessões de 50 minutos
+SLOT_MINUTES = 50
+WEEKDAY_SLOTS = [time(8 + (m // 60), m % 60) for m in range(0, 10 * 60 - SLOT_MINUTES + 1, SLOT_MINUTES)]
+SATURDAY_SLOTS = [time(8 + (m // 60), m % 60) for m in range(0, 4 * 60 - SLOT_MINUTES + 1, SLOT_MINUTES)]
+
+# Ocupação média da agenda — define quantos dias de histórico cada profissional precisa
+AGENDA_OCCUPANCY = 0.75
+FUTURE_SHARE = 0.15
+
+
+@dataclass(frozen=True)
+class BulkCounts:
+    """Quantidades alvo de cada entidade gerada."""
+    professionals: int = 200
+    patients: int = 500_000
+    appointments: int = 5_000_000
+    messages: int = 1_000_000
+
+
+# ─────────────────────────────────────────────────────────────────────
+# FUNÇÕES AUXILIARES
+# ─────────────────────────────────────────────────────────────────────
+
+def _cpf_from_number(n: int) -> str:
+    """Gera um CPF formatado com dígitos verificadores válidos a partir de um inteiro único."""
+    base = [int(c) for c in f"{n % 10**9:09d}"]
+    for length in (9, 10):
+        total = sum(d * w for d, w in zip(base, range(length + 1, 1, -1)))
+        digit = (total * 10) % 11
+        base.append(0 if digit == 10 else digit)
+    s = "".join(map(str, base))
+    return f"{s[:3]}.{s[3:6]}.{s[6:9]}-{s[9:]}"
+
+
+def _ascii_slug(text: str) -> str:
+    table = str.maketrans("áàâãéêíóôõúüçÁÀÂÃÉÊÍÓÔÕÚÜÇ", "aaaaeeiooouucAAAAEEIOOOUUC")
+    return text.translate(table).lower().replace(" ", "").replace("(", "").replace(")", "")
+
+
+def _chunks(rows: Iterable[dict[str, Any]], size: int) -> Iterator[list[dict[str, Any]]]:
+    batch: list[dict[str, Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _bulk_insert(conn: AsyncConnection, table: Table, rows: list[dict[str, Any]]) -> None:
+    """
+    Insere um lote de linhas.
+    PostgreSQL → COPY FROM STDIN (caminho mais rápido do driver psycopg).
+    Demais bancos → Core insert() em executemany, que o SQLAlchemy converte em
+    INSERTs multi-VALUES agrupados.
+    """
+    if conn.dialect.name == "postgresql":
+        columns = list(rows[0].keys())
+        raw = await conn.get_raw_connection()
+        async with raw.driver_connection.cursor() as cur:
+            async with cur.copy(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN") as copy:
+                for row in rows:
+                    await copy.write_row([row[c] for c in columns])
+    else:
+        await conn.execute(insert(table), rows)
+
+
+# ─────────────────────────────────────────────────────────────────────
+# GERADOR DE LINHAS (DETERMINÍSTICO)
+# ─────────────────────────────────────────────────────────────────────
+
+class BulkSeedGenerator:
+    """
+    Gera as linhas de cada tabela como dicionários prontos para insert().
+    Toda aleatoriedade vem de geradores random.Random derivados da semente,
+    um por entidade, para que mudar a quantidade de uma entidade não altere as outras.
+    """
+
+    def __init__(self, counts: BulkCounts, seed: int = 42, today: date | None = None) -> None:
+        self.counts = counts
+        self.seed = seed
+        self.today = today or date.today()
+        self.password_hash = get_password_hash(DEFAULT_PASSWORD)  # calculado uma única vez
+
+    def _rng(self, entity: str) -> random.Random:
+        return random.Random(f"{self.seed}:{entity}")
+
+    # --- Profissionais -------------------------------------------------
+    def professionals(self) -> Iterator[dict[str, Any]]:
+        rng = self._rng("professionals")
+        roles = PROFESSIONAL_ROLES
+        role_weights = [r[3] for r in roles]
+        for i in range(self.counts.professionals):
+            female = rng.random() < 0.7
+            first = rng.choice(FIRST_NAMES_F if female else FIRST_NAMES_M)
+            last = rng.choice(LAST_NAMES)
+            role, specialty, register, _ = rng.choices(roles, role_weights)[0]
+            title = ("Dra. " if female else "Dr. ") if register == "CRM" or rng.random() < 0.5 else ""
+            yield {
+                "name": f"{title}{first} {last}",
+                "email": f"{_ascii_slug(first)}.{_ascii_slug(last)}.{self.seed}.{i}@clinica.exemplo.com",
+                "role": role,
+                "professional_register": f"{register} 06/{rng.randint(10000, 99999)}",
+                "specialty": specialty,
+                "phone": f"(11) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+                "status": "Ativo" if rng.random() < 0.92 else "Inativo",
+            }
+
+    def users(self, professionals: list[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        """Um login (User) por profissional, todos com o mesmo hash pré-calculado."""
+        for p in professionals:
+            yield {
+                "email": p["email"],
+                "hashed_password": self.password_hash,
+                "full_name": p["name"],
+                "role": "user",
+                "role_title": p["role"],
+                "is_active": p["status"] == "Ativo",
+            }
+
+    def caseload_weights(self, n_professionals: int) -> list[float]:
+        """Peso da carteira de cada profissional — cauda longa (Pareto), como em clínicas reais."""
+        rng = self._rng("caseload")
+        return [rng.paretovariate(2.5) for _ in range(n_professionals)]
+
+    # --- Pacientes -----------------------------------------------------
+    def patients(self, professional_ids: list[int]) -> Iterator[dict[str, Any]]:
+        rng = self._rng("patients")
+        weights = self.caseload_weights(len(professional_ids))
+        cities = CITIES
+        city_weights = [c[2] for c in cities]
+        for i in range(self.counts.patients):
+            female = rng.random() < 0.62
+            first = rng.choice(FIRST_NAMES_F if female else FIRST_NAMES_M)
+            surname = f"{rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+            age = int(rng.triangular(6, 85, 32))
+            birth = self.today - timedelta(days=age * 365 + rng.randint(0, 364))
+            city, state, _ = rng.choices(cities, city_weights)[0]
+            insured = rng.random() < 0.4
+            status_roll = rng.random()
+            yield {
+                "name": f"{first} {surname}",
+                "cpf": _cpf_from_number(self.seed * 10_000_019 + i),
+                "birth_date": birth,
+                "gender": "Feminino" if female else "Masculino",
+                "phone": f"(11) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+                "email": f"{_ascii_slug(first)}.{i}.{self.seed}@paciente.exemplo.com",
+                "address_city": city,
+                "address_state": state,
+                "attendance_type": "Convênio" if insured else "Particular",
+                "insurance_plan": rng.choice(INSURANCE_PLANS) if insured else None,
+                "status": "Ativo" if status_roll < 0.85 else ("Inativo" if status_roll < 0.95 else "Aguardando"),
+                "care_modality": "Online" if rng.random() < 0.45 else "Presencial",
+                "consent_terms_accepted": True,
+                "hashed_password": self.password_hash,
+                "professional_id": (
+                    rng.choices(professional_ids, weights)[0]
+                    if professional_ids and rng.random() < 0.95 else None
+                ),
+            }
+
+    # --- Agendamentos --------------------------------------------------
+    def _agenda_days(self, needed_slots: int) -> list[date]:
+        """Dias úteis + sábados necessários para acomodar needed_slots com a ocupação média."""
+        capacity_target = needed_slots / AGENDA_OCCUPANCY
+        per_week = 5 * len(WEEKDAY_SLOTS) + len(SATURDAY_SLOTS)
+        total_days = int(capacity_target / per_week * 7) + 7
+        start = self.today - timedelta(days=int(total_days * (1 - FUTURE_SHARE)))
+        return [
+            d for d in (start + timedelta(days=k) for k in range(total_days))
+            if d.weekday() != 6
+        ]
+
+    def appointments(self, patients_by_professional: dict[int, list[int]]) -> Iterator[dict[str, Any]]:
+        """
+        Distribui os agendamentos proporcionalmente à carteira de cada profissional.
+        Cada profissional recebe horários distintos (sem sobreposição) sorteados
+        de uma grade de sessões de 50 minutos.
+        """
+        rng = self._rng("appointments")
+        # Só quem tem pacientes recebe agenda; o último deles fica com o resto do arredondamento
+        prof_ids = [p for p in sorted(patients_by_professional) if patients_by_professional[p]]
+        total_patients = sum(len(v) for v in patients_by_professional.values()) or 1
+        remaining = self.counts.appointments
+        for idx, prof_id in enumerate(prof_ids):
+            own_patients = patients_by_professional[prof_id]
+            if idx == len(prof_ids) - 1:
+                n = remaining
+            else:
+                n = min(remaining, round(self.counts.appointments * len(own_patients) / total_patients))
+            remaining -= n
+            if n <= 0:
+                continue
+
+            grid: list[tuple[date, time]] = []
+            for d in self._agenda_days(n):
+                grid.extend((d, t) for t in (SATURDAY_SLOTS if d.weekday() == 5 else WEEKDAY_SLOTS))
+            for slot_idx in sorted(rng.sample(range(len(grid)), min(n, len(grid)))):
+                appt_date, appt_time = grid[slot_idx]
+                past = appt_date < self.today
+                roll = rng.random()
+                if past:
+                    status = "Confirmado" if roll < 0.75 else ("Cancelado" if roll < 0.87 else "Aguardando")
+                else:
+                    status = "Aguardando" if roll < 0.6 else ("Confirmado" if roll < 0.95 else "Cancelado")
+                yield {
+                    "patient_id": rng.choice(own_patients),
+                    "professional_id": prof_id,
+                    "date": appt_date,
+                    "time": appt_time,
+                    "type": "Primeira Consulta" if rng.random() < 0.1 else "Retorno",
+                    "status": status,
+                    "alarm_sent": past and status == "Confirmado",
+                }
+
+    # --- Mensagens -----------------------------------------------------
+    def messages(self, patients_by_professional: dict[int, list[int]], history_days: int = 730) -> Iterator[dict[str, Any]]:
+        """Mensagens concentradas no período recente; as mais antigas tendem a estar lidas."""
+        rng = self._rng("messages")
+        prof_ids = [p for p, pats in sorted(patients_by_professional.items()) if pats]
+        if not prof_ids:
+            return
+        weights = [len(patients_by_professional[p]) for p in prof_ids]
+        now = datetime.combine(self.today, time(12, 0), tzinfo=timezone.utc)
+        for _ in range(self.counts.messages):
+            prof_id = rng.choices(prof_ids, weights)[0]
+            age_days = history_days * rng.betavariate(1, 3)
+            yield {
+                "patient_id": rng.choice(patients_by_professional[prof_id]),
+                "professional_id": prof_id,
+                "message": rng.choice(MESSAGE_TEMPLATES),
+                "is_read": rng.random() < min(0.98, 0.2 + age_days / 14),
+                "saved": rng.random() < 0.15,
+                "created_at": now - timedelta(days=age_days),
+            }
+
+
+# ─────────────────────────────────────────────────────────────────────
+# ORQUESTRAÇÃO
+# ─────────────────────────────────────────────────────────────────────
+
+async def _insert_all(engine: AsyncEngine, table: Table, rows: Iterable[dict[str, Any]], batch_size: int) -> int:
+    """Insere as linhas em lotes, cada lote em sua própria transação."""
+    total = 0
+    for batch in _chunks(rows, batch_size):
+        async with engine.begin() as conn:
+            await _bulk_insert(conn, table, batch)
+        total += len(batch)
+    return total
+
+
+async def _max_id(engine: AsyncEngine, table: Table) -> int:
+    async with engine.connect() as conn:
+        return (await conn.scalar(select(func.max(table.c.id)))) or 0
+
+
+async def seed_bulk(
+    engine: AsyncEngine,
+    counts: BulkCounts,
+    seed: int = 42,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    verbose: bool = True,
+    today: date | None = None,
+) -> dict[str, int]:
+    """Gera e insere todos os dados; retorna a quantidade inserida por tabela."""
+    gen = BulkSeedGenerator(counts, seed, today)
+    log = print if verbose else (lambda *_: None)
+    inserted: dict[str, int] = {}
+    started = time_mod.perf_counter()
+
+    log("-> Criando profissionais e logins...")
+    professionals = list(gen.professionals())
+    before = await _max_id(engine, Professional.__table__)
+    inserted["professionals"] = await _insert_all(engine, Professional.__table__, professionals, batch_size)
+    inserted["users"] = await _insert_all(engine, User.__table__, gen.users(professionals), batch_size)
+    async with engine.connect() as conn:
+        prof_ids = list((await conn.scalars(
+            select(Professional.id).where(Professional.id > before).order_by(Professional.id)
+        )).all())
+
+    log("-> Criando pacientes...")
+    before = await _max_id(engine, Patient.__table__)
+    inserted["patients"] = await _insert_all(engine, Patient.__table__, gen.patients(prof_ids), batch_size)
+    patients_by_professional: dict[int, list[int]] = {p: [] for p in prof_ids}
+    async with engine.connect() as conn:
+        result = await conn.stream(
+            select(Patient.id, Patient.professional_id)
+            .where(Patient.id > before, Patient.professional_id.is_not(None))
+        )
+        async for pat_id, prof_id in result:
+            patients_by_professional.setdefault(prof_id, []).append(pat_id)
+
+    log("-> Criando agendamentos...")
+    inserted["appointments"] = await _insert_all(
+        engine, Appointment.__table__, gen.appointments(patients_by_professional), batch_size
+    )
+
+    log("-> Criando mensagens...")
+    inserted["messages"] = await _insert_all(
+        engine, PatientMessage.__table__, gen.messages(patients_by_professional), batch_size
+    )
+
+    elapsed = time_mod.perf_counter() - started
+    log(f"\nOK Seed bulk concluído em {elapsed:.1f}s")
+    for name, n in inserted.items():
+        log(f"  {name:<14}: {n}")
+    log(f"  Senha de todos os logins gerados: {DEFAULT_PASSWORD}")
+    return inserted
+
+
+def _parse_args() -> argparse.Namespace:
+    defaults = BulkCounts()
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos em alto volume.")
+    parser.add_argument("--professionals", type=int, default=defaults.professionals)
+    parser.add_argument("--patients", type=int, default=defaults.patients)
+    parser.add_argument("--appointments", type=int, default=defaults.appointments)
+    parser.add_argument("--messages", type=int, default=defaults.messages)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--today", type=date.fromisoformat, default=None,
+        help="Data de referência AAAA-MM-DD (padrão: hoje); fixe-a para repetir os mesmos dados",
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--reset", action="store_true", help="Apaga e recria as tabelas antes de gerar")
+    return parser.parse_args()
+
+
+async def main() -> None:
+    from app.database import engine
+    from app import migrations
+
+    args = _parse_args()
+    if args.reset:
+        print("-> Resetando banco de dados...")
+        await migrations.reset(engine)
+
+    counts = BulkCounts(args.professionals, args.patients, args.appointments, args.messages)
+    await seed_bulk(engine, counts, seed=args.seed, batch_size=args.batch_size, today=args.today)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,10 +6,12 @@ Uso: python -m scripts.seed.seed_mock
 """
 
 import asyncio
+from functools import lru_cache
 from datetime import date, time, datetime, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import engine, Base, SessionLocal
+from app.database import engine, SessionLocal
+from app import migrations
 from app.models import (
     User, Professional, Patient, Appointment,
     Prescription, Certificate, PatientMessage,
@@ -19,6 +21,9 @@ from app.auth import get_password_hash
 
 import app.models  # garante que todos os modelos são registrados
 
+# Hash Argon2 calculado uma única vez por senha distinta (as contas mock compartilham senhas)
+_hash_password = lru_cache(maxsize=None)(get_password_hash)
+
 
 # ─────────────────────────────────────────────────────────────────────
 # DADOS MOCKADOS
@@ -219,7 +224,7 @@ async def seed(session: AsyncSession):
     for u in USERS:
         obj = User(
             email=u["email"],
-            hashed_password=get_password_hash(u["password"]),
+            hashed_password=_hash_password(u["password"]),
             full_name=u["full_name"],
             role=u["role"],
             role_title=u.get("role_title"),
@@ -246,7 +251,7 @@ async def seed(session: AsyncSession):
             insurance_number=p.get("insurance_number"),
             status=p["status"],
             care_modality=p.get("care_modality", "Presencial"),
-            hashed_password=get_password_hash(p["password"]),
+            hashed_password=_hash_password(p["password"]),
             professional_id=professionals[p["prof_index"]].id,
         )
         session.add(obj)
@@ -358,9 +363,7 @@ async def seed(session: AsyncSession):
 
 async def main():
     print("-> Resetando banco de dados...")
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-        await conn.run_sync(Base.metadata.create_all)
+    await migrations.reset(engine)
 
     async with SessionLocal() as session:
         await seed(session)
@@ -0,0 +1,88 @@
+"""
+Benchmark de inicialização a frio.
+Cada rodada é um processo Python novo (como um worker recém-criado no Render) que mede:
+- import: tempo para importar app.main
+- lifespan: tempo até o lifespan liberar o tráfego (yield)
+- ready: tempo até a aplicação ficar pronta (/ready), incluindo o aquecimento em segundo plano
+- total: do início do processo até pronto
+
+Usa um banco SQLite temporário, preparado por uma rodada inicial descartada
+(migrações + seed), para medir o caso comum: reinício com o banco já em dia.
+
+Uso:
+    python -m scripts.startup_benchmark --runs 7
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+_CHILD = r"""
+import asyncio, json, time
+t0 = time.perf_counter()
+from app.main import app
+t_import = time.perf_counter()
+
+async def main():
+    async with app.router.lifespan_context(app):
+        t_lifespan = time.perf_counter()
+        try:
+            from app.startup import readiness
+        except ImportError:
+            readiness = None
+        while readiness is not None and not readiness.ready:
+            await asyncio.sleep(0.005)
+        t_ready = time.perf_counter()
+    return t_lifespan, t_ready
+
+t_lifespan, t_ready = asyncio.run(main())
+print(json.dumps({
+    "import": t_import - t0,
+    "lifespan": t_lifespan - t_import,
+    "ready": t_ready - t_import,
+    "total": t_ready - t0,
+}))
+"""
+
+
+def _run_once(env: dict[str, str]) -> dict[str, float]:
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD], cwd=_PROJECT_ROOT, env=env,
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mede o tempo de inicialização a frio da API.")
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite+aiosqlite:///{tmp}/startup.db",
+            "SECRET_KEY": os.environ.get("SECRET_KEY", "benchmark-secret-key-0123456789abcdef"),
+            "ADMIN_EMAIL": "admin@benchmark.local",
+            "ADMIN_PASSWORD": "benchmark-password",
+            "PYTHONDONTWRITEBYTECODE": "",
+        }
+        _run_once(env)  # Prepara o banco (migrações + seed); não entra na conta
+
+        runs = [_run_once(env) for _ in range(args.runs)]
+
+    print(f"{args.runs} rodadas (mediana / mínimo), em ms:")
+    for key in ("import", "lifespan", "ready", "total"):
+        values = [r[key] * 1000 for r in runs]
+        print(f"  {key:<9} {statistics.median(values):8.1f} / {min(values):8.1f}")
+
+
+if __name__ == "__main__":
+    main()
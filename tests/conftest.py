@@ -50,11 +50,13 @@ if not _STATIC_DIR.exists():
 
 import jwt
 from httpx import AsyncClient, ASGITransport
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
 from app.database import Base, get_db
 from app.models import User, Professional, Patient, Appointment
 from app.auth import get_password_hash
+from app.directory import directory
 
 # ─────────────────────────────────────────────────────────────────────
 # Engine e SessionFactory dedicados aos testes (SQLite :memory:)
@@ -105,6 +107,8 @@ async def reset_tables():
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
         await conn.run_sync(Base.metadata.create_all)
+    # Caches em memória derivados do banco não podem sobreviver à recriação
+    directory.invalidate()
     yield
     if _STATIC_CREATED_BY_TEST and _STATIC_DIR.exists():
         try:
@@ -129,6 +133,19 @@ async def db_session() -> AsyncGenerator[AsyncSession, None]:
 # AsyncClient com override de get_db e lifespan no-op
 # ─────────────────────────────────────────────────────────────────────
 
+@pytest.fixture()
+def query_log() -> list[str]:
+    """Registra cada comando SQL enviado ao banco de teste (para contar idas ao banco)."""
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(test_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
 @pytest_asyncio.fixture()
 async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     """
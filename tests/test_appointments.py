@@ -9,7 +9,14 @@ Cenários cobertos:
 - Deletar agendamento inexistente → 404
 - Listar agendamentos hoje → 200
 - Listar todos os agendamentos → 200
-- Atualizar agendamento → 200
+- Atualizar agendamento → 200; date/time nulos → 422
+- Horários livres respeitam expediente e consultas marcadas
+- Sobreposição de horário → 409 (inclusive com marcações concorrentes)
+- Séries recorrentes: expansão da regra, ocorrências no calendário e exceções
+- Série nova que cruza consulta ou outra série do profissional → 409, em toda a vigência
+  (interseção das regras, inclusive depois do primeiro ano)
+- Ocorrência alterada com date/time nulos → 422
+- Alteração em lote: um UPDATE, tudo ou nada, restrito ao profissional logado; date/time nulos → 422
 """
 
 import pytest
@@ -181,6 +188,13 @@ async def test_update_appointment(
     assert update_resp.status_code == 200
     assert update_resp.json()["status"] == "Confirmado"
 
+    # null explícito chegava ao datetime.combine da checagem de sobreposição (TypeError → 500)
+    for field in ("date", "time"):
+        null_resp = await client.put(
+            f"{APPTS_URL}/{appt_id}", json={field: None}, headers=_auth_headers(valid_token),
+        )
+        assert null_resp.status_code == 422
+
 
 # ─────────────────────────────────────────────────────────────────────
 # Testes de Exclusão
@@ -234,3 +248,448 @@ async def test_get_appointment_not_found(client: AsyncClient, valid_token: str):
         headers=_auth_headers(valid_token),
     )
     assert response.status_code == 404
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Testes de Disponibilidade
+# ─────────────────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_availability_skips_booked_slots(
+    client: AsyncClient,
+    valid_token: str,
+    db_session,
+    patient: Patient,
+    professional: Professional,
+):
+    """Horários livres devem respeitar o expediente e pular as consultas já marcadas."""
+    from app.models import ClinicSettings
+
+    db_session.add(ClinicSettings(working_hours_week="08:00 - 12:00", working_hours_saturday=None))
+    await db_session.commit()
+
+    today = date.today()
+    monday = today + timedelta(days=7 - today.weekday())
+    sunday = monday + timedelta(days=6)
+    resp = await client.post(
+        APPTS_URL,
+        json={**_appt_payload(patient.id, professional.id, str(monday)), "time": "09:00:00"},
+        headers=_auth_headers(valid_token),
+    )
+    assert resp.status_code == 200
+
+    response = await client.get(
+        f"{APPTS_URL}/availability",
+        params={"professional_id": professional.id, "from": str(monday), "to": str(sunday), "slot": "50m"},
+        headers=_auth_headers(valid_token),
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["slot_minutes"] == 50
+    days = data["professionals"][0]["days"]
+    # 09:00–09:50 ocupado: 08:00 cabe antes, a varredura retoma às 09:50
+    assert days[str(monday)] == ["08:00", "09:50", "10:40"]
+    assert days[str(monday + timedelta(days=1))] == ["08:00", "08:50", "09:40", "10:30"]
+    # Sábado sem expediente e domingo fechado não aparecem
+    assert str(monday + timedelta(days=5)) not in days
+    assert str(sunday) not in days
+
+
+@pytest.mark.asyncio
+async def test_availability_invalid_slot(client: AsyncClient, valid_token: str):
+    """Duração de sessão em formato inválido deve retornar 422."""
+    response = await client.get(
+        f"{APPTS_URL}/availability?slot=abc",
+        headers=_auth_headers(valid_token),
+    )
+    assert response.status_code == 422
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Testes de Conflito de Horário
+# ─────────────────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_create_appointment_overlap_conflict(
+    client: AsyncClient,
+    valid_token: str,
+    patient: Patient,
+    professional: Professional,
+):
+    """Consulta que se sobrepõe a outra do mesmo profissional deve retornar 409."""
+    # ids capturados antes: o rollback do conflito expira os objetos da sessão compartilhada
+    patient_id, professional_id = patient.id, professional.id
+    first = await client.post(APPTS_URL, json=_appt_payload(patient_id, professional_id, TOMORROW), headers=_auth_headers(valid_token))
+    assert first.status_code == 200
+
+    overlapping = {**_appt_payload(patient_id, professional_id, TOMORROW), "time": "10:30:00"}
+    response = await client.post(APPTS_URL, json=overlapping, headers=_auth_headers(valid_token))
+    assert response.status_code == 409
+
+    # Logo após o término da sessão (10:50) o horário está livre
+    adjacent = {**_appt_payload(patient_id, professional_id, TOMORROW), "time": "10:50:00"}
+    response = await client.post(APPTS_URL, json=adjacent, headers=_auth_headers(valid_token))
+    assert response.status_code == 200
+
+    # Reagendar a segunda consulta para cima da primeira também é conflito
+    update_resp = await client.put(
+        f"{APPTS_URL}/{response.json()['id']}",
+        json={"time": "10:20:00"},
+        headers=_auth_headers(valid_token),
+    )
+    assert update_resp.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_cancelled_appointment_frees_slot(
+    client: AsyncClient,
+    valid_token: str,
+    patient: Patient,
+    professional: Professional,
+):
+    """Consultas canceladas não bloqueiam o horário."""
+    first = await client.post(APPTS_URL, json=_appt_payload(patient.id, professional.id, TOMORROW), headers=_auth_headers(valid_token))
+    await client.put(f"{APPTS_URL}/{first.json()['id']}", json={"status": "Cancelado"}, headers=_auth_headers(valid_token))
+
+    response = await client.post(APPTS_URL, json=_appt_payload(patient.id, professional.id, TOMORROW), headers=_auth_headers(valid_token))
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_concurrent_bookings_same_slot(tmp_path):
+    """
+    Stress: muitas marcações simultâneas para o mesmo horário, cada uma em sua própria
+    conexão, devem resultar em exatamente uma consulta criada.
+    """
+    import asyncio
+    from fastapi import HTTPException
+    from sqlalchemy import func, select
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+    from app.database import Base
+    from app.rotas.agendamentos import _book_appointment
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'stress.db'}", connect_args={"timeout": 30})
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with factory() as db:
+        prof = Professional(name="Dra. Stress", email="stress@clinic.com", role="Psicóloga")
+        pat = Patient(name="Paciente Stress")
+        db.add_all([prof, pat])
+        await db.commit()
+        prof_id, pat_id = prof.id, pat.id
+
+    slot_day = date.today() + timedelta(days=3)
+
+    async def booker(minute: int) -> bool:
+        async with factory() as db:
+            try:
+                await _book_appointment(db, {
+                    "patient_id": pat_id,
+                    "professional_id": prof_id,
+                    "date": slot_day,
+                    "time": time(10, minute),
+                    "type": "Retorno",
+                    "status": "Aguardando",
+                    "observations": None,
+                })
+                return True
+            except HTTPException as e:
+                assert e.status_code == 409
+                return False
+
+    # 30 marcações concorrentes entre 10:00 e 10:29 — todas se sobrepõem entre si
+    results = await asyncio.gather(*(booker(m) for m in range(30)))
+    assert sum(results) == 1
+
+    async with factory() as db:
+        assert await db.scalar(select(func.count(Appointment.id))) == 1
+    await engine.dispose()
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Testes de Séries Recorrentes
+# ─────────────────────────────────────────────────────────────────────
+
+def test_expand_rule_interval_count_and_until():
+    """A regra respeita intervalo de semanas, contagem total e data final."""
+    from app.recurrence import expand_rule
+
+    start = date(2026, 1, 5)  # segunda-feira
+    # Segundas e quintas, semana sim semana não, 5 ocorrências no total
+    dates = expand_rule(start, (0, 3), 2, None, 5, start, date(2026, 12, 31))
+    assert dates == (
+        date(2026, 1, 5), date(2026, 1, 8),
+        date(2026, 1, 19), date(2026, 1, 22),
+        date(2026, 2, 2),
+    )
+
+    # Janela no meio da série: a contagem continua valendo a partir do início
+    assert expand_rule(start, (0, 3), 2, None, 5, date(2026, 1, 20), date(2026, 3, 1)) == (
+        date(2026, 1, 22), date(2026, 2, 2),
+    )
+
+    # Dias da semana anteriores ao início não contam na primeira semana
+    wednesday = date(2026, 1, 7)
+    assert expand_rule(wednesday, (0, 2), 1, None, 2, wednesday, date(2026, 2, 1)) == (
+        date(2026, 1, 7), date(2026, 1, 12),
+    )
+
+    assert expand_rule(start, (0,), 1, date(2026, 1, 19), None, start, date(2026, 12, 31)) == (
+        date(2026, 1, 5), date(2026, 1, 12), date(2026, 1, 19),
+    )
+
+
+@pytest.mark.asyncio
+async def test_series_occurrences_are_listed_without_rows(
+    client: AsyncClient,
+    valid_token: str,
+    patient: Patient,
+    professional: Professional,
+    db_session,
+):
+    """As ocorrências aparecem em /today e no calendário, mas nenhuma consulta é gravada."""
+    from sqlalchemy import func, select
+
+    today = date.today()
+    payload = {
+        "patient_id": patient.id,
+        "professional_id": professional.id,
+        "start_date": str(today),
+        "time": "14:00:00",
+        "type": "Retorno",
+        "status": "Confirmado",
+    }
+    response = await client.post(f"{APPTS_URL}/series", json=payload, headers=_auth_headers(valid_token))
+    assert response.status_code == 200
+    series = response.json()
+    assert series["weekdays"] == str(today.weekday())
+
+    today_resp = await client.get(f"{APPTS_URL}/today", headers=_auth_headers(valid_token))
+    occurrences = [a for a in today_resp.json() if a["series_id"] == series["id"]]
+    assert len(occurrences) == 1
+    assert occurrences[0]["time"] == "14:00"
+
+    summary = await client.get(
+        "/api/dashboard/calendar",
+        params={"month": today.month, "year": today.year, "view": "summary"},
+        headers=_auth_headers(valid_token),
+    )
+    assert summary.json()["days"][str(today)]["by_status"]["Confirmado"] == 1
+
+    assert await db_session.scalar(select(func.count(Appointment.id))) == 0
+
+    # O horário da série fica ocupado para novas marcações
+    clash = {**_appt_payload(patient.id, professional.id, TODAY), "time": "14:20:00"}
+    clash_resp = await client.post(APPTS_URL, json=clash, headers=_auth_headers(valid_token))
+    assert clash_resp.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_occurrence_exception_replaces_virtual(
+    client: AsyncClient,
+    valid_token: str,
+    patient: Patient,
+    professional: Professional,
+):
+    """Alterar uma ocorrência grava uma exceção, que substitui a ocorrência virtual."""
+    start = date.today() + timedelta(days=7)
+    payload = {
+        "patient_id": patient.id,
+        "professional_id": professional.id,
+        "start_date": str(start),
+        "time": "09:00:00",
+        "count": 3,
+    }
+    series = (await client.post(f"{APPTS_URL}/series", json=payload, headers=_auth_headers(valid_token))).json()
+
+    response = await client.put(
+        f"{APPTS_URL}/series/{series['id']}/occurrences/{start}",
+        json={"status": "Cancelado"},
+        headers=_auth_headers(valid_token),
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "Cancelado"
+    assert response.json()["series_id"] == series["id"]
+
+    day = await client.get(f"/api/dashboard/calendar/day/{start}", headers=_auth_headers(valid_token))
+    items = day.json()["appointments"]
+    assert len(items) == 1
+    assert items[0]["status"] == "Cancelado"
+    assert items[0]["id"] == response.json()["id"]
+
+    # Datas fora da regra não são ocorrências
+    off_rule = await client.put(
+        f"{APPTS_URL}/series/{series['id']}/occurrences/{start + timedelta(days=1)}",
+        json={"status": "Confirmado"},
+        headers=_auth_headers(valid_token),
+    )
+    assert off_rule.status_code == 404
+
+    # null explícito não substitui a data/hora da ocorrência
+    next_occurrence = start + timedelta(weeks=1)
+    for field in ("date", "time"):
+        null_resp = await client.put(
+            f"{APPTS_URL}/series/{series['id']}/occurrences/{next_occurrence}",
+            json={field: None},
+            headers=_auth_headers(valid_token),
+        )
+        assert null_resp.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_series_rejects_double_booking(
+    client: AsyncClient,
+    valid_token: str,
+    patient: Patient,
+    professional: Professional,
+):
+    """Uma série não pode cair sobre consulta marcada nem sobre ocorrência de outra série."""
+    start = date.today() + timedelta(days=1)
+    booked = {**_appt_payload(patient.id, professional.id, str(start + timedelta(weeks=3))), "time": "10:30:00"}
+    assert (await client.post(APPTS_URL, json=booked, headers=_auth_headers(valid_token))).status_code == 200
+
+    weekly = {"patient_id": patient.id, "professional_id": professional.id, "start_date": str(start), "time": "10:00:00"}
+    response = await client.post(f"{APPTS_URL}/series", json=weekly, headers=_auth_headers(valid_token))
+    assert response.status_code == 409
+    assert str(start + timedelta(weeks=3)) in response.json()["detail"]
+
+    # Termina antes da consulta marcada: livre
+    short = {**weekly, "count": 3}
+    assert (await client.post(f"{APPTS_URL}/series", json=short, headers=_auth_headers(valid_token))).status_code == 200
+
+    # Quinzenal começando na semana seguinte cruza a 2ª ocorrência da série anterior
+    other = {**weekly, "start_date": str(start + timedelta(weeks=1)), "time": "10:20:00", "interval_weeks": 2, "count": 1}
+    response = await client.post(f"{APPTS_URL}/series", json=other, headers=_auth_headers(valid_token))
+    assert response.status_code == 409
+
+    # Horário sem sobreposição (mesma duração da sessão) é aceito
+    later = {**other, "time": "11:00:00"}
+    assert (await client.post(f"{APPTS_URL}/series", json=later, headers=_auth_headers(valid_token))).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_open_series_conflict_after_first_year(
+    client: AsyncClient,
+    valid_token: str,
+    patient: Patient,
+    professional: Professional,
+):
+    """Duas séries abertas são comparadas pelas regras, não por uma janela de datas."""
+    monday = date.today() + timedelta(days=7 - date.today().weekday())
+    base = {"patient_id": patient.id, "professional_id": professional.id, "time": "15:00:00"}
+
+    # Série quinzenal que só começa daqui a dois anos
+    future_start = monday + timedelta(weeks=106)
+    future = {**base, "start_date": str(future_start), "interval_weeks": 2}
+    assert (await client.post(f"{APPTS_URL}/series", json=future, headers=_auth_headers(valid_token))).status_code == 200
+
+    # Semanal aberta a partir da próxima segunda: cruza a série futura na primeira ocorrência dela
+    weekly = {**base, "start_date": str(monday), "time": "15:30:00"}
+    response = await client.post(f"{APPTS_URL}/series", json=weekly, headers=_auth_headers(valid_token))
+    assert response.status_code == 409
+    assert str(future_start) in response.json()["detail"]
+
+    # Quinzenal na semana oposta à da série futura: nunca coincide
+    opposite = {**weekly, "start_date": str(monday + timedelta(weeks=1)), "interval_weeks": 2}
+    assert (await client.post(f"{APPTS_URL}/series", json=opposite, headers=_auth_headers(valid_token))).status_code == 200
+
+    # Em outro dia da semana, livre
+    tuesday = {**weekly, "start_date": str(monday + timedelta(days=1))}
+    assert (await client.post(f"{APPTS_URL}/series", json=tuesday, headers=_auth_headers(valid_token))).status_code == 200
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Testes de Alteração em Lote
+# ─────────────────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_batch_update_appointments(
+    client: AsyncClient,
+    valid_token: str,
+    patient: Patient,
+    professional: Professional,
+):
+    """Confirma e remarca várias consultas de uma vez; conflitos desfazem o lote inteiro."""
+    patient_id, professional_id = patient.id, professional.id
+    ids = []
+    for hour in ("09:00:00", "10:00:00", "11:00:00"):
+        payload = {**_appt_payload(patient_id, professional_id, TOMORROW), "time": hour}
+        ids.append((await client.post(APPTS_URL, json=payload, headers=_auth_headers(valid_token))).json()["id"])
+
+    response = await client.patch(
+        f"{APPTS_URL}/batch",
+        json=[
+            {"id": ids[0], "status": "Confirmado"},
+            {"id": ids[1], "status": "Confirmado", "time": "15:00:00"},
+            {"id": ids[2], "status": "Cancelado"},
+        ],
+        headers=_auth_headers(valid_token),
+    )
+    assert response.status_code == 200
+    by_id = {a["id"]: a for a in response.json()}
+    assert by_id[ids[0]]["status"] == "Confirmado"
+    assert by_id[ids[1]]["time"] == "15:00:00"
+    assert by_id[ids[2]]["status"] == "Cancelado"
+    assert by_id[ids[0]]["patient_name"] == "Paciente Teste"
+
+    # Mover a primeira para cima da segunda (15:00) gera conflito e nada é alterado
+    conflict = await client.patch(
+        f"{APPTS_URL}/batch",
+        json=[{"id": ids[0], "time": "15:10:00"}, {"id": ids[2], "status": "Aguardando"}],
+        headers=_auth_headers(valid_token),
+    )
+    assert conflict.status_code == 409
+    unchanged = await client.get(f"{APPTS_URL}/{ids[0]}", headers=_auth_headers(valid_token))
+    assert unchanged.json()["time"] == "09:00:00"
+
+    missing = await client.patch(
+        f"{APPTS_URL}/batch",
+        json=[{"id": ids[0], "status": "Aguardando"}, {"id": 999999, "status": "Confirmado"}],
+        headers=_auth_headers(valid_token),
+    )
+    assert missing.status_code == 404
+
+    # null explícito em date/time não vira NULL no banco (nem um 409 enganoso)
+    for field in ("date", "time"):
+        null_field = await client.patch(
+            f"{APPTS_URL}/batch", json=[{"id": ids[0], field: None}], headers=_auth_headers(valid_token)
+        )
+        assert null_field.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_batch_update_restricted_to_professional(
+    client: AsyncClient,
+    patient: Patient,
+    professional: Professional,
+    db_session,
+):
+    """Profissionais só alteram as próprias consultas (restrição aplicada no WHERE do UPDATE)."""
+    from app.auth import create_access_token
+
+    other = Professional(name="Dra. Outra", email="outra@clinic.com", role="Psicóloga")
+    db_session.add(other)
+    await db_session.commit()
+    own = Appointment(patient_id=patient.id, professional_id=professional.id,
+                      date=date.today() + timedelta(days=2), time=time(9, 0), status="Aguardando")
+    foreign = Appointment(patient_id=patient.id, professional_id=other.id,
+                          date=date.today() + timedelta(days=2), time=time(9, 0), status="Aguardando")
+    db_session.add_all([own, foreign])
+    await db_session.commit()
+    own_id, foreign_id = own.id, foreign.id
+
+    token = create_access_token({"sub": "99", "email": professional.email, "role": "user"})
+    headers = _auth_headers(token)
+
+    denied = await client.patch(
+        f"{APPTS_URL}/batch",
+        json=[{"id": own_id, "status": "Confirmado"}, {"id": foreign_id, "status": "Confirmado"}],
+        headers=headers,
+    )
+    assert denied.status_code == 404
+
+    allowed = await client.patch(f"{APPTS_URL}/batch", json=[{"id": own_id, "status": "Confirmado"}], headers=headers)
+    assert allowed.status_code == 200
+    assert [a["status"] for a in allowed.json()] == ["Confirmado"]
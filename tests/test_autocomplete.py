@@ -0,0 +1,139 @@
+"""
+test_autocomplete.py — Testes do autocompletar de pacientes e profissionais.
+
+Cenários cobertos:
+- Prefixo do nome ou do sobrenome, com ou sem acento
+- Profissional só recebe sugestões dos próprios pacientes; admin recebe todas
+- Cadastro e alteração de nome entram no índice sem reconstrução
+- Remoção de profissional sai do índice
+- Alteração que chega durante a reconstrução não é apagada pela foto antiga do banco
+- Limite de resultados (top-k)
+"""
+
+import pytest
+
+from app import typeahead
+from app.auth import create_access_token
+from app.models import Patient, Professional
+
+
+@pytest.fixture(autouse=True)
+def fresh_index(monkeypatch):
+    """Índice novo por teste (o banco também é recriado a cada teste)."""
+    monkeypatch.setattr(typeahead, "index", typeahead.TypeaheadIndex())
+
+
+def _auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Índice em memória
+# ─────────────────────────────────────────────────────────────────────
+
+def test_prefix_index_matches_any_word_ignoring_accents():
+    idx = typeahead.PrefixIndex()
+    idx.load([(1, "Maria José Silva"), (2, "João Souza"), (3, "Mariana Lima")])
+
+    assert [pid for pid, _ in idx.search("mar")] == [1, 3]
+    assert idx.search("JOSE") == [(1, "Maria José Silva")]
+    assert idx.search("jose si") == [(1, "Maria José Silva")]
+    assert [pid for pid, _ in idx.search("s")] == [1, 2]
+    assert idx.search("mar", limit=1) == [(1, "Maria José Silva")]
+
+    idx.upsert(1, "Ana Costa")
+    assert idx.search("silva") == []
+    idx.remove(3)
+    assert idx.search("mar") == []
+    assert len(idx) == 2
+
+
+@pytest.mark.asyncio
+async def test_events_during_rebuild_are_replayed(db_session, patient):
+    idx = typeahead.TypeaheadIndex()
+    await idx.rebuild(db_session)
+    original_execute = db_session.execute
+    selects = 0
+
+    async def execute_with_concurrent_write(*args, **kwargs):
+        # Entre os SELECTs da reconstrução, outro worker renomeia o paciente
+        nonlocal selects
+        result = await original_execute(*args, **kwargs)
+        selects += 1
+        if selects == 1:
+            idx.apply({"type": "typeahead", "kind": "patient", "id": patient.id,
+                       "name": "Renomeado Agora", "professional_id": patient.professional_id})
+        return result
+
+    db_session.execute = execute_with_concurrent_write
+    await idx.rebuild(db_session)
+    assert idx.search_patients("renomeado", None, 10) == [
+        {"id": patient.id, "name": "Renomeado Agora", "professional_id": patient.professional_id}
+    ]
+    assert idx.search_patients("paciente", None, 10) == []
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Endpoints
+# ─────────────────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_autocomplete_patients_scoped_by_professional(client, db_session, valid_token, patient):
+    other = Professional(name="Dra. Outra", email="outra@clinic.com", role="Psicóloga")
+    db_session.add(other)
+    await db_session.flush()
+    db_session.add(Patient(name="Paciente Alheio", professional_id=other.id))
+    await db_session.commit()
+
+    response = await client.get("/api/autocomplete/patients?q=pac", headers=_auth(valid_token))
+    assert response.status_code == 200
+    assert {p["name"] for p in response.json()} == {"Paciente Teste", "Paciente Alheio"}
+
+    prof_token = create_access_token({"sub": "drtest@clinic.com", "email": "drtest@clinic.com", "role": "user"})
+    response = await client.get("/api/autocomplete/patients?q=pac", headers=_auth(prof_token))
+    assert [p["name"] for p in response.json()] == ["Paciente Teste"]
+    assert response.json()[0]["professional_id"] == patient.professional_id
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_follows_create_and_rename(client, valid_token, patient):
+    headers = _auth(valid_token)
+    # Primeira consulta constrói o índice a partir do banco
+    assert (await client.get("/api/autocomplete/patients?q=teste", headers=headers)).json()[0]["id"] == patient.id
+
+    response = await client.put(f"/api/patients/{patient.id}", json={"name": "Beatriz Álvares"}, headers=headers)
+    assert response.status_code == 200
+    response = await client.post("/api/patients", json={"name": "Bento Ramos"}, headers=headers)
+    assert response.status_code in (200, 201)
+
+    names = [p["name"] for p in (await client.get("/api/autocomplete/patients?q=be", headers=headers)).json()]
+    assert names == ["Beatriz Álvares", "Bento Ramos"]
+    assert (await client.get("/api/autocomplete/patients?q=alva", headers=headers)).json()[0]["id"] == patient.id
+    assert (await client.get("/api/autocomplete/patients?q=teste", headers=headers)).json() == []
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_professionals_and_delete(client, valid_token, patient):
+    headers = _auth(valid_token)
+    response = await client.get("/api/autocomplete/professionals?q=dr", headers=headers)
+    assert response.json() == [{"id": patient.professional_id, "name": "Dr. Teste"}]
+
+    response = await client.post("/api/professionals", json={"name": "Dra. Renata", "role": "Psicóloga"}, headers=headers)
+    assert response.status_code in (200, 201)
+    new_id = response.json()["id"]
+    response = await client.get("/api/autocomplete/professionals?q=renata", headers=headers)
+    assert [p["id"] for p in response.json()] == [new_id]
+
+    assert (await client.delete(f"/api/professionals/{new_id}", headers=headers)).status_code == 200
+    assert (await client.get("/api/autocomplete/professionals?q=renata", headers=headers)).json() == []
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_limit(client, db_session, valid_token, patient):
+    db_session.add_all(Patient(name=f"Paciente {i:02d}", professional_id=patient.professional_id) for i in range(30))
+    await db_session.commit()
+
+    headers = _auth(valid_token)
+    assert len((await client.get("/api/autocomplete/patients?q=pac&limit=5", headers=headers)).json()) == 5
+    assert len((await client.get("/api/autocomplete/patients?q=pac&limit=500", headers=headers)).json()) == 25
+    assert (await client.get("/api/autocomplete/patients?q=", headers=headers)).json() == []
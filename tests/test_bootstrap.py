@@ -0,0 +1,100 @@
+"""
+test_bootstrap.py — Testes da inicialização idempotente do admin (app/bootstrap.py).
+
+Cenários cobertos:
+- Sem ADMIN_EMAIL/ADMIN_PASSWORD nada é feito
+- Primeira execução cria o admin; as seguintes não calculam Argon2 nem gravam nada
+- Senha do ambiente alterada → novo hash; senha alterada fora do ambiente → volta à do ambiente
+- Hash com parâmetros antigos do Argon2 é refeito (needs_update), mesma senha
+- Admin existente com a senha certa e sem marca → só a marca é gravada
+"""
+
+import pytest
+from passlib.context import CryptContext
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import bootstrap
+from app.auth import get_password_hash, verify_password
+from app.models import BootstrapState, User
+
+EMAIL = "admin@clinic.com"
+
+
+async def _admin(db: AsyncSession) -> User:
+    return (await db.execute(
+        select(User).where(User.email == EMAIL).execution_options(populate_existing=True)
+    )).scalar_one()
+
+
+@pytest.fixture()
+def no_argon2(monkeypatch):
+    """Falha o teste se o bootstrap tentar verificar ou calcular um hash."""
+    async def forbidden(*args):
+        raise AssertionError("Argon2 não deveria rodar")
+
+    def arm():
+        monkeypatch.setattr(bootstrap, "verify_password_async", forbidden)
+        monkeypatch.setattr(bootstrap, "get_password_hash_async", forbidden)
+
+    return arm
+
+
+@pytest.mark.asyncio
+async def test_skipped_without_credentials(db_session: AsyncSession):
+    assert await bootstrap.ensure_admin(db_session, EMAIL, "") == bootstrap.SKIPPED
+    assert await bootstrap.ensure_admin(db_session, "", "senha") == bootstrap.SKIPPED
+    assert await db_session.scalar(select(func.count(User.id))) == 0
+
+
+@pytest.mark.asyncio
+async def test_created_then_unchanged(db_session: AsyncSession, no_argon2):
+    assert await bootstrap.ensure_admin(db_session, EMAIL, "senha-1") == bootstrap.CREATED
+    admin = await _admin(db_session)
+    assert admin.role == "admin" and verify_password("senha-1", admin.hashed_password)
+    stored_hash = admin.hashed_password
+
+    no_argon2()
+    for _ in range(3):  # Reinícios/workers seguintes
+        assert await bootstrap.ensure_admin(db_session, EMAIL, "senha-1") == bootstrap.UNCHANGED
+    assert (await _admin(db_session)).hashed_password == stored_hash
+
+
+@pytest.mark.asyncio
+async def test_password_changes_are_synced(db_session: AsyncSession):
+    await bootstrap.ensure_admin(db_session, EMAIL, "senha-1")
+
+    assert await bootstrap.ensure_admin(db_session, EMAIL, "senha-2") == bootstrap.UPDATED
+    assert verify_password("senha-2", (await _admin(db_session)).hashed_password)
+
+    # Senha trocada pela aplicação: o hash salvo não bate com a marca → volta à do ambiente
+    admin = await _admin(db_session)
+    admin.hashed_password = get_password_hash("trocada-na-tela")
+    await db_session.commit()
+    assert await bootstrap.ensure_admin(db_session, EMAIL, "senha-2") == bootstrap.UPDATED
+    assert verify_password("senha-2", (await _admin(db_session)).hashed_password)
+
+
+@pytest.mark.asyncio
+async def test_outdated_hash_is_rehashed(db_session: AsyncSession):
+    old_context = CryptContext(schemes=["argon2"], argon2__memory_cost=8192, argon2__time_cost=1)
+    db_session.add(User(email=EMAIL, hashed_password=old_context.hash("senha-1"), role="admin"))
+    await db_session.commit()
+
+    assert await bootstrap.ensure_admin(db_session, EMAIL, "senha-1") == bootstrap.REHASHED
+    new_hash = (await _admin(db_session)).hashed_password
+    assert "m=19456" in new_hash and verify_password("senha-1", new_hash)
+
+
+@pytest.mark.asyncio
+async def test_existing_admin_only_records_fingerprint(db_session: AsyncSession, no_argon2):
+    stored_hash = get_password_hash("senha-1")
+    db_session.add(User(email=EMAIL, hashed_password=stored_hash, role="admin"))
+    await db_session.commit()
+
+    assert await bootstrap.ensure_admin(db_session, EMAIL, "senha-1") == bootstrap.VERIFIED
+    assert (await _admin(db_session)).hashed_password == stored_hash
+    assert await db_session.get(BootstrapState, bootstrap.ADMIN_STATE_KEY) is not None
+
+    no_argon2()
+    assert await bootstrap.ensure_admin(db_session, EMAIL, "senha-1") == bootstrap.UNCHANGED
@@ -0,0 +1,54 @@
+"""
+test_certificates.py — Testes de criação de atestados.
+
+Cenários cobertos:
+- Criar atestado → 200 com nomes de paciente e profissional, em um único comando SQL
+- Paciente ou profissional inexistente → 404 e nada gravado
+"""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from app.models import Certificate, Patient
+
+CERTIFICATES_URL = "/api/certificates"
+
+
+def _auth_headers(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.asyncio
+async def test_create_certificate_single_statement(
+    client: AsyncClient, valid_token: str, patient: Patient, query_log: list[str]
+):
+    payload = {
+        "patient_id": patient.id,
+        "professional_id": patient.professional_id,
+        "type": "Comparecimento",
+        "date": "2026-03-10",
+    }
+    response = await client.post(CERTIFICATES_URL, json=payload, headers=_auth_headers(valid_token))
+    assert response.status_code == 200
+    data = response.json()
+    assert data["patient_name"] == "Paciente Teste"
+    assert data["professional_name"] == "Dr. Teste"
+    assert data["date"] == "2026-03-10"
+    assert len(query_log) == 1 and query_log[0].startswith("INSERT INTO certificates")
+
+
+@pytest.mark.asyncio
+async def test_create_certificate_missing_references(client: AsyncClient, valid_token: str, patient: Patient, db_session):
+    headers = _auth_headers(valid_token)
+    base = {"patient_id": patient.id, "professional_id": patient.professional_id, "type": "Médico"}
+
+    response = await client.post(CERTIFICATES_URL, json={**base, "patient_id": 9999}, headers=headers)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Paciente não encontrado."
+
+    response = await client.post(CERTIFICATES_URL, json={**base, "professional_id": 9999}, headers=headers)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Profissional não encontrado."
+
+    assert await db_session.scalar(select(func.count()).select_from(Certificate)) == 0
@@ -8,6 +8,8 @@ Cenários cobertos:
 - GET /api/dashboard/chart-data?period=weekly → 200 + labels/data
 - GET /api/dashboard/chart-data?period=monthly → 200 + labels/data
 - GET /api/dashboard/calendar → 200 + estrutura de dias
+- GET /api/dashboard/calendar?view=summary → contagens por dia/status
+- GET /api/dashboard/calendar/day/{dia} → detalhe do dia
 """
 
 import pytest
@@ -214,3 +216,44 @@ async def test_calendar_with_appointment(
     today_appts = data["appointments"][TODAY]
     assert len(today_appts) >= 1
     assert any(a["time"] == "09:00" for a in today_appts)
+
+
+@pytest.mark.asyncio
+async def test_calendar_summary_and_day_detail(
+    client: AsyncClient,
+    valid_token: str,
+    patient: Patient,
+    professional: Professional,
+):
+    """view=summary deve trazer contagens por status; /calendar/day/{dia} traz os detalhes do dia."""
+    today = date.today()
+    for appt_time, status in [("09:00:00", "Confirmado"), ("10:00:00", "Confirmado"), ("11:00:00", "Cancelado")]:
+        resp = await client.post(
+            "/api/appointments",
+            json={
+                "patient_id": patient.id,
+                "professional_id": professional.id,
+                "date": TODAY,
+                "time": appt_time,
+                "status": status,
+            },
+            headers=_auth_headers(valid_token),
+        )
+        assert resp.status_code == 200
+
+    response = await client.get(
+        f"{CALENDAR_URL}?month={today.month}&year={today.year}&view=summary",
+        headers=_auth_headers(valid_token),
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert "appointments" not in data
+    assert data["days"][TODAY] == {"total": 3, "by_status": {"Confirmado": 2, "Cancelado": 1}}
+
+    day_resp = await client.get(f"{CALENDAR_URL}/day/{TODAY}", headers=_auth_headers(valid_token))
+    assert day_resp.status_code == 200
+    detail = day_resp.json()
+    assert detail["date"] == TODAY
+    assert [a["time"] for a in detail["appointments"]] == ["09:00", "10:00", "11:00"]
+    assert detail["appointments"][0]["patient"] == patient.name
+    assert detail["appointments"][0]["professional_name"] == professional.name
@@ -0,0 +1,216 @@
+"""
+test_http_clients.py — Testes do registro de clientes HTTP de saída.
+
+Cenários cobertos:
+- Falha transitória (503) é repetida e a chamada termina com sucesso
+- POST só é repetido quando marcado como seguro (retry=True)
+- Falhas seguidas abrem o circuito; após o tempo de espera uma chamada de teste o fecha
+- Chamada de teste cancelada ou com erro fora do transporte não deixa o circuito preso
+- Semáforo limita as chamadas simultâneas por serviço
+- Resend e Groq passam pelo registro (mesmo cliente reaproveitado)
+- Completion do Groq não é repetida (cada chamada é cobrada)
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app import http_clients
+from app.http_clients import CircuitOpenError, ClientRegistry, OutboundClient
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────
+
+def _scripted_transport(statuses: list[int], seen: list[httpx.Request]) -> httpx.MockTransport:
+    """Responde com os status na ordem dada (o último se repete)."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        status = statuses[min(len(seen) - 1, len(statuses) - 1)]
+        return httpx.Response(status, json={"ok": status < 400})
+    return httpx.MockTransport(handler)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(http_clients.random, "uniform", lambda a, b: 0.0)
+
+
+@pytest.fixture()
+async def registry(monkeypatch):
+    """Registro global com transportes falsos; clientes fechados ao final do teste."""
+    configs = {name: dict(cfg) for name, cfg in http_clients.registry._configs.items()}
+    yield http_clients.registry
+    await http_clients.registry.close()
+    http_clients.registry._configs = configs
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Testes do cliente
+# ─────────────────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_retries_transient_failure():
+    seen: list[httpx.Request] = []
+    client = OutboundClient("svc", "https://svc.test", transport=_scripted_transport([503, 200], seen))
+
+    response = await client.get("/status")
+    assert response.status_code == 200
+    assert len(seen) == 2
+    stats = client.stats.snapshot()
+    assert stats["requests"] == 2 and stats["errors"] == 1 and stats["retries"] == 1
+    assert stats["p50_ms"] is not None
+
+    # POST sem retry=True não é repetido
+    seen.clear()
+    response = await client.post("/send")
+    assert response.status_code == 503
+    assert len(seen) == 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_opens_and_recovers(monkeypatch):
+    seen: list[httpx.Request] = []
+    statuses = [500]
+    client = OutboundClient(
+        "svc", "https://svc.test", retries=0, failure_threshold=2, reset_timeout=30,
+        transport=_scripted_transport(statuses, seen),
+    )
+
+    assert (await client.get("/")).status_code == 500
+    assert (await client.get("/")).status_code == 500
+    assert client.breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        await client.get("/")
+    assert len(seen) == 2  # A terceira chamada nem saiu
+
+    # Tempo de espera passou → uma chamada de teste; sucesso fecha o circuito
+    client.breaker.opened_at -= 31
+    statuses[0] = 200
+    assert (await client.get("/")).status_code == 200
+    assert client.breaker.state == "closed"
+    assert client.stats.snapshot()["rejected"] == 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_interrupted_probe_releases_circuit():
+    started = asyncio.Event()
+    mode = "hang"
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if mode == "hang":
+            started.set()
+            await asyncio.sleep(3600)
+        if mode == "decode":
+            raise httpx.DecodingError("corpo inválido", request=request)
+        return httpx.Response(200)
+
+    client = OutboundClient("svc", "https://svc.test", transport=httpx.MockTransport(handler))
+    client.breaker.opened_at = time.monotonic() - client.breaker.reset_timeout  # half-open
+
+    probe = asyncio.create_task(client.get("/status"))
+    await started.wait()
+    assert not client.breaker.allow()        # Teste em andamento: as demais são recusadas
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    mode = "decode"                          # Erro do httpx que não é de transporte
+    with pytest.raises(httpx.DecodingError):
+        await client.get("/status")
+    assert client.breaker.state == "half-open"
+
+    mode = "ok"
+    assert (await client.get("/status")).status_code == 200
+    assert client.breaker.state == "closed"
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_semaphore_limits_concurrency():
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200)
+
+    client = OutboundClient("svc", "https://svc.test", max_concurrency=2, transport=httpx.MockTransport(handler))
+    await asyncio.gather(*(client.get("/") for _ in range(6)))
+    assert peak == 2
+    await client.aclose()
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Integração com Resend e Groq
+# ─────────────────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_resend_uses_registry_with_idempotency_key(registry, db_session, monkeypatch):
+    from app.config import settings
+    from app.email_utils import _enviar_email
+
+    seen: list[httpx.Request] = []
+    await registry.configure("resend", transport=_scripted_transport([502, 200], seen))
+    monkeypatch.setattr(settings, "RESEND_API_KEY", "re_test")
+
+    assert await _enviar_email(db_session, "paciente@test.com", "Assunto", "<p>Oi</p>") == "ok"
+    assert [r.url.path for r in seen] == ["/emails", "/emails"]
+    # A nova tentativa reaproveita a mesma Idempotency-Key (o Resend não duplica o envio)
+    assert seen[0].headers["Idempotency-Key"] == seen[1].headers["Idempotency-Key"]
+    assert registry.metrics()["resend"]["retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_groq_provider_uses_registry(registry, monkeypatch):
+    from app.config import settings
+    from app.summaries import GroqSummaryProvider
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/openai/v1/chat/completions"
+        assert request.headers["Authorization"] == "Bearer gsk_test"
+        return httpx.Response(200, json={"choices": [{"message": {"content": "Resumo"}}]})
+
+    await registry.configure("groq", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "gsk_test")
+
+    provider = GroqSummaryProvider()
+    assert await provider.complete("prompt", 100) == "Resumo"
+    assert await provider.complete("prompt", 100) == "Resumo"
+    assert registry.metrics()["groq"]["requests"] == 2
+
+
+@pytest.mark.asyncio
+async def test_groq_completion_is_not_retried(registry, monkeypatch):
+    from app.config import settings
+    from app.summaries import GroqSummaryProvider
+
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(503)
+
+    await registry.configure("groq", transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "gsk_test")
+
+    with pytest.raises(httpx.HTTPStatusError):
+        await GroqSummaryProvider().complete("prompt", 100)
+    assert calls == 1  # Uma completion repetida seria cobrada de novo
+    assert registry.metrics()["groq"]["retries"] == 0
+
+
+def test_registry_requires_registered_service():
+    with pytest.raises(KeyError):
+        ClientRegistry().get("desconhecido")
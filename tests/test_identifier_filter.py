@@ -0,0 +1,170 @@
+"""
+test_identifier_filter.py — Testes do filtro de Bloom de identificadores de login.
+
+Cenários cobertos:
+- Filtro sem falso negativo e com taxa de falso positivo próxima da configurada
+- Login/esqueci a senha com identificador desconhecido → recusa sem query ao banco,
+  com o mesmo tempo da recusa que passa pelo banco
+- A espera da recusa pelo filtro acompanha a latência medida no banco (sondas na reconstrução)
+- Identificador cadastrado pela API entra no filtro na hora
+- Eventos de identificadores chegam ao índice e não vazam para o stream SSE
+- Índice ainda não construído → tudo segue para o banco
+"""
+
+import time
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+
+from app import identifier_filter
+from app.events import bus
+from app.identifier_filter import BloomFilter, IdentifierIndex, identifier_digest
+from tests.conftest import test_engine
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────
+
+LOGIN_URL = "/api/login"
+
+
+@pytest.fixture()
+def index(monkeypatch) -> IdentifierIndex:
+    """Índice isolado por teste (o global começa 'não construído' e assim permanece)."""
+    fresh = IdentifierIndex()
+    monkeypatch.setattr(identifier_filter, "index", fresh)
+    return fresh
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        event.listen(test_engine.sync_engine, "before_cursor_execute", self)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(test_engine.sync_engine, "before_cursor_execute", self)
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Testes do filtro
+# ─────────────────────────────────────────────────────────────────────
+
+def test_bloom_filter_no_false_negatives():
+    bloom = BloomFilter(capacity=2000)
+    members = [identifier_digest("patient_cpf", f"{i:011d}") for i in range(2000)]
+    for digest in members:
+        bloom.add(digest)
+
+    assert all(digest in bloom for digest in members)
+    false_positives = sum(
+        identifier_digest("patient_cpf", f"9{i:010d}") in bloom for i in range(5000)
+    )
+    assert false_positives / 5000 < 0.03
+
+
+@pytest.mark.asyncio
+async def test_unknown_login_rejected_without_query(client: AsyncClient, admin_user, db_session, index):
+    """Identificador fora do filtro → 404 sem consultar o banco, após o tempo médio da recusa."""
+    assert await index.rebuild(db_session) == 1
+    index.login_miss.seconds = 0.05
+
+    with _QueryCounter() as queries:
+        started = time.perf_counter()
+        response = await client.post(LOGIN_URL, json={"email": "ninguem@test.com", "password": "x"})
+        elapsed = time.perf_counter() - started
+
+    assert response.status_code == 404
+    assert queries.count == 0
+    assert elapsed >= 0.04
+
+    # Identificador cadastrado continua passando pelo banco normalmente
+    response = await client.post(LOGIN_URL, json={"email": "admin@test.com", "password": "admin@1234"})
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_padding_tracks_database_latency(client: AsyncClient, admin_user, db_session, index):
+    """Com o banco lento, a reconstrução mede o caminho real e a recusa pelo filtro espera o mesmo."""
+    def slow_query(*args, **kwargs):
+        time.sleep(0.02)
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", slow_query)
+    try:
+        await index.rebuild(db_session)
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", slow_query)
+
+    # Duas consultas por sonda: bem acima dos 5 ms iniciais
+    assert index.login_miss.measured and index.login_miss.seconds >= 0.04
+    assert index.forgot_miss.seconds >= 0.04
+
+    with _QueryCounter() as queries:
+        started = time.perf_counter()
+        response = await client.post(LOGIN_URL, json={"email": "ninguem@test.com", "password": "x"})
+        elapsed = time.perf_counter() - started
+    assert response.status_code == 404
+    assert queries.count == 0
+    assert elapsed >= index.login_miss.seconds * 0.9
+
+
+@pytest.mark.asyncio
+async def test_forgot_password_unknown_email_skips_db(client: AsyncClient, admin_user, db_session, index):
+    await index.rebuild(db_session)
+    index.forgot_miss.seconds = 0
+
+    with _QueryCounter() as queries:
+        response = await client.post("/api/forgot-password", json={"email": "ninguem@test.com"})
+
+    assert response.status_code == 200
+    assert "Se esse e-mail estiver cadastrado" in response.json()["message"]
+    assert queries.count == 0
+
+
+@pytest.mark.asyncio
+async def test_created_patient_enters_filter(client: AsyncClient, valid_token: str, db_session, index):
+    """CPF cadastrado pela API já é reconhecido (401 por senha errada, não 404)."""
+    await index.rebuild(db_session)
+    assert not index.might_contain((identifier_filter.PATIENT_CPF, "55566677788"))
+
+    response = await client.post(
+        "/api/patients",
+        json={"name": "Paciente Novo", "cpf": "55566677788", "password": "novo@1234"},
+        headers={"Authorization": f"Bearer {valid_token}"},
+    )
+    assert response.status_code in (200, 201)
+
+    assert index.might_contain((identifier_filter.PATIENT_CPF, "55566677788"))
+    response = await client.post(LOGIN_URL, json={"email": "55566677788", "password": "errada"})
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_identifier_event_updates_index_not_sse(db_session, index):
+    """Eventos de outros workers entram no filtro e não são entregues aos assinantes SSE."""
+    await index.rebuild(db_session)
+    digest = identifier_digest(identifier_filter.USER_EMAIL, "novo@clinic.com")
+
+    async with bus.subscribe(None) as admin_queue:
+        bus.publish_local({"type": identifier_filter.EVENT_TYPE, "digests": [digest.hex()]})
+        assert admin_queue.empty()
+
+    assert index.might_contain((identifier_filter.USER_EMAIL, "novo@clinic.com"))
+
+
+@pytest.mark.asyncio
+async def test_index_not_ready_passes_through(client: AsyncClient, index):
+    assert not index.ready
+    assert index.might_contain((identifier_filter.USER_EMAIL, "qualquer@test.com"))
+
+    with _QueryCounter() as queries:
+        response = await client.post(LOGIN_URL, json={"email": "ninguem@test.com", "password": "x"})
+    assert response.status_code == 404
+    assert queries.count == 2
@@ -0,0 +1,111 @@
+"""
+test_keyring.py — Testes da assinatura de JWT com key ring e do JWKS (app/keyring.py).
+
+Cenários cobertos:
+- Sem JWT_KEYS_DIR: HS256, JWKS vazio com ETag/Cache-Control e 304 com If-None-Match
+  (inclusive ETag fraca W/"..." e lista de ETags)
+- Com chaves (requer 'cryptography'): token com kid da chave ativa, validado pela chave do kid
+- Rotação: token da chave anterior continua válido; chave aposentada (.pub.pem) só verifica
+- kid desconhecido → 401; JWKS lista as chaves públicas
+"""
+
+import json
+import shutil
+
+import pytest
+from httpx import AsyncClient
+
+from app import auth, keyring
+from app.auth import TokenCache, create_access_token, decode_access_token
+from app.config import settings
+
+
+@pytest.fixture(autouse=True)
+def fresh_keyring(monkeypatch):
+    keyring.get_keyring.cache_clear()
+    monkeypatch.setattr(auth, "token_cache", TokenCache(maxsize=64))
+    yield
+    keyring.get_keyring.cache_clear()
+
+
+def _use_keys(monkeypatch, directory, active_kid: str = "") -> keyring.KeyRing:
+    monkeypatch.setattr(settings, "JWT_KEYS_DIR", str(directory))
+    monkeypatch.setattr(settings, "JWT_ACTIVE_KID", active_kid)
+    keyring.get_keyring.cache_clear()
+    auth.token_cache.clear()
+    return keyring.get_keyring()
+
+
+def _claims() -> dict:
+    return {"sub": "1", "email": "admin@clinic.com", "role": "admin"}
+
+
+@pytest.mark.asyncio
+async def test_jwks_without_keys(client: AsyncClient):
+    response = await client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert response.json() == {"keys": []}
+    assert response.headers["cache-control"] == f"public, max-age={keyring.JWKS_MAX_AGE_SECONDS}"
+
+    cached = await client.get("/.well-known/jwks.json", headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+
+    weak = await client.get("/.well-known/jwks.json", headers={"If-None-Match": f'"outra", W/{response.headers["etag"]}'})
+    assert weak.status_code == 304
+
+
+def test_signs_with_active_key_and_rotates(tmp_path, monkeypatch):
+    pytest.importorskip("cryptography")
+    import jwt
+
+    old = keyring.generate(str(tmp_path), "ES256")
+    old_kid = old.name[: -len(".pem")]
+    ring = _use_keys(monkeypatch, tmp_path)
+    old_token = create_access_token(_claims())
+    assert jwt.get_unverified_header(old_token) == {"alg": "ES256", "kid": old_kid, "typ": "JWT"}
+
+    new = tmp_path / "zzzz-nova.pem"
+    shutil.move(keyring.generate(str(tmp_path / "tmp"), "EdDSA"), new)
+    ring = _use_keys(monkeypatch, tmp_path)
+    assert ring.active.kid == "zzzz-nova" and ring.active.algorithm == "EdDSA"
+    new_token = create_access_token(_claims())
+    assert jwt.get_unverified_header(new_token)["kid"] == "zzzz-nova"
+    assert decode_access_token(new_token)["sub"] == "1"
+    assert decode_access_token(old_token)["sub"] == "1"  # Sobreposição: a anterior ainda verifica
+
+    # Aposentada: fica só a pública, que continua verificando mas não assina
+    from cryptography.hazmat.primitives import serialization
+
+    public_pem = ring.keys[old_kid].public_key.public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    old.unlink()
+    (tmp_path / f"{old_kid}.pub.pem").write_bytes(public_pem)
+    ring = _use_keys(monkeypatch, tmp_path)
+    assert ring.keys[old_kid].private_key is None
+    assert decode_access_token(old_token)["sub"] == "1"
+    assert {key["kid"] for key in json.loads(ring.jwks_body)["keys"]} == {old_kid, "zzzz-nova"}
+
+
+def test_unknown_kid_and_hs256_rejected(tmp_path, monkeypatch):
+    pytest.importorskip("cryptography")
+    from fastapi import HTTPException
+
+    hs_token = create_access_token(_claims())  # Assinado antes do key ring (HS256, sem kid)
+    keyring.generate(str(tmp_path), "EdDSA")
+    _use_keys(monkeypatch, tmp_path)
+    with pytest.raises(HTTPException) as exc:
+        decode_access_token(hs_token)
+    assert exc.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_jwks_lists_public_keys(client: AsyncClient, tmp_path, monkeypatch):
+    pytest.importorskip("cryptography")
+    keyring.generate(str(tmp_path), "EdDSA")
+    keyring.generate(str(tmp_path), "ES256")
+    _use_keys(monkeypatch, tmp_path)
+
+    keys = (await client.get("/.well-known/jwks.json")).json()["keys"]
+    assert sorted(key["alg"] for key in keys) == ["ES256", "EdDSA"]
+    assert all(key["use"] == "sig" and "d" not in key for key in keys)
@@ -0,0 +1,354 @@
+"""
+test_messages.py — Testes das mensagens de pacientes em tempo real.
+
+Cenários cobertos:
+- Barramento entrega eventos ao profissional dono e aos admins, não a outros
+- Envio de mensagem e "marcar como lida" publicam eventos no barramento
+- Mensagem longa (> 8 KB) publica só ids e um trecho: o payload cabe no NOTIFY
+- Stream SSE envia a contagem inicial e os eventos publicados
+- Stream sem token → 401; token em ?token= não é aceito (iria para os logs de acesso)
+- Stream termina quando o token vence ou é revogado (logout)
+- Contadores de não lidas: mantidos na escrita e corrigidos pela reconciliação
+- Total do admin igual ao COUNT das não lidas, incluindo mensagens sem profissional
+- Ações em lote: ler/salvar/remover por ids ou "até" um instante, restritas ao profissional
+"""
+
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+from httpx import AsyncClient
+
+from app import revocation
+from app.auth import get_password_hash
+from app.events import EventBus, bus
+from app.models import Patient, PatientMessage, Professional, UnreadMessageCounter
+from app.revocation import RevocationList
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────
+
+def _auth_headers(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def _patient_without_email_notification(db_session) -> tuple[int, int]:
+    """Paciente cujo profissional não tem e-mail (sem notificação por e-mail em background)."""
+    prof = Professional(name="Dra. Stream", role="Psicóloga", status="Ativo")
+    db_session.add(prof)
+    await db_session.commit()
+    pat = Patient(
+        name="Paciente Stream",
+        cpf="99988877766",
+        hashed_password=get_password_hash("stream@1234"),
+        professional_id=prof.id,
+    )
+    db_session.add(pat)
+    await db_session.commit()
+    return prof.id, pat.id
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Testes do barramento
+# ─────────────────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_event_bus_routes_by_professional():
+    """Eventos chegam ao profissional dono e aos admins (assinatura None), não a terceiros."""
+    local_bus = EventBus()
+    async with local_bus.subscribe(1) as own, local_bus.subscribe(2) as other, local_bus.subscribe(None) as admin:
+        await local_bus.publish({"type": "unread", "professional_id": 1, "count": 3, "total": 5})
+        assert own.get_nowait()["count"] == 3
+        assert admin.get_nowait()["total"] == 5
+        assert other.empty()
+    assert local_bus.subscriber_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_send_and_read_publish_events(client: AsyncClient, valid_token: str, db_session):
+    """Enviar mensagem publica 'message' + 'unread'; marcar como lida publica a nova contagem."""
+    prof_id, _ = await _patient_without_email_notification(db_session)
+
+    async with bus.subscribe(prof_id) as queue:
+        response = await client.post(
+            "/api/patient-contact",
+            json={"cpf": "999.888.777-66", "password": "stream@1234", "message": "Olá, doutora"},
+        )
+        assert response.status_code == 200
+
+        new_message = queue.get_nowait()
+        assert new_message["type"] == "message"
+        assert new_message["patient_name"] == "Paciente Stream"
+        assert queue.get_nowait() == {"type": "unread", "professional_id": prof_id, "count": 1, "total": 1}
+
+        read = await client.put(
+            f"/api/patient-messages/{new_message['message_id']}/read",
+            headers=_auth_headers(valid_token),
+        )
+        assert read.status_code == 200
+        assert queue.get_nowait()["count"] == 0
+
+        # Marcar de novo não altera a contagem e não gera evento
+        await client.put(f"/api/patient-messages/{new_message['message_id']}/read", headers=_auth_headers(valid_token))
+        assert queue.empty()
+
+
+class _NotifyEngine:
+    """Imita o NOTIFY do PostgreSQL: guarda os payloads e recusa os de 8000 bytes ou mais."""
+
+    def __init__(self) -> None:
+        self.payloads: list[str] = []
+
+    @asynccontextmanager
+    async def begin(self):
+        yield self
+
+    async def execute(self, _stmt, params: dict) -> None:
+        if len(params["payload"].encode()) >= 8000:
+            raise ValueError("payload string too long")
+        self.payloads.append(params["payload"])
+
+
+@pytest.mark.asyncio
+async def test_long_message_event_fits_notify(client: AsyncClient, db_session, monkeypatch):
+    """Uma mensagem de mais de 8 KB ainda vai pelo NOTIFY (sem cair na entrega só local)."""
+    from app.rotas.mensagens import EVENT_PREVIEW_CHARS
+
+    await _patient_without_email_notification(db_session)
+    engine = _NotifyEngine()
+    monkeypatch.setattr(bus, "_engine", engine)
+    fallback: list[dict] = []
+    monkeypatch.setattr(bus, "publish_local", fallback.append)
+
+    text = "á" * 9000  # 18 KB em UTF-8
+    response = await client.post(
+        "/api/patient-contact", json={"cpf": "99988877766", "password": "stream@1234", "message": text},
+    )
+    assert response.status_code == 200
+    assert fallback == []
+
+    event = json.loads(engine.payloads[0])
+    assert event["type"] == "message" and "message" not in event
+    assert len(event["preview"]) == EVENT_PREVIEW_CHARS and event["preview"].endswith("…")
+    assert {"message_id", "patient_id", "professional_id"} <= event.keys()
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Testes do stream SSE
+# ─────────────────────────────────────────────────────────────────────
+
+class _ConnectedRequest:
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_yields_initial_count_and_events(db_session):
+    """O gerador SSE envia a contagem atual e repassa os eventos do barramento."""
+    from app.rotas.mensagens import _sse_events
+
+    initial = {"type": "unread", "professional_id": None, "count": 0, "total": 4}
+    stream = _sse_events(_ConnectedRequest(), None, initial, "jti-stream", time.time() + 60)
+
+    first = await anext(stream)
+    assert first.startswith("event: unread\n")
+    assert json.loads(first.split("data: ", 1)[1])["count"] == 4  # admin vê o total
+
+    next_chunk = asyncio.ensure_future(anext(stream))
+    await asyncio.sleep(0)
+    bus.publish_local({"type": "message", "professional_id": 7, "message_id": 1})
+    chunk = await asyncio.wait_for(next_chunk, timeout=1)
+    assert chunk.startswith("event: message\n")
+    await stream.aclose()
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_requires_token(client: AsyncClient):
+    response = await client.get("/api/patient-messages/stream")
+    assert response.status_code == 401
+
+    response = await client.get("/api/patient-messages/stream", params={"token": "invalido"})
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_rejects_query_token(client: AsyncClient, valid_token: str):
+    response = await client.get("/api/patient-messages/stream", params={"token": valid_token})
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_ends_on_revocation(monkeypatch):
+    """Logout revoga o jti: o stream já aberto termina no próximo evento/heartbeat."""
+    from app.rotas.mensagens import _sse_events
+
+    monkeypatch.setattr(revocation, "revocations", RevocationList())
+    initial = {"type": "unread", "professional_id": 7, "count": 0, "total": 0}
+    stream = _sse_events(_ConnectedRequest(), 7, initial, "jti-logout", time.time() + 60)
+    await anext(stream)
+
+    revocation.revocations.add("jti-logout", time.time() + 60)
+    with pytest.raises(StopAsyncIteration):
+        await asyncio.wait_for(anext(stream), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_ends_on_expiry():
+    """O heartbeat é antecipado para o exp e o stream termina logo depois."""
+    from app.rotas.mensagens import _sse_events
+
+    initial = {"type": "unread", "professional_id": 7, "count": 0, "total": 0}
+    stream = _sse_events(_ConnectedRequest(), 7, initial, "jti-exp", time.time() + 0.05)
+    await anext(stream)
+    assert await asyncio.wait_for(anext(stream), timeout=1) == ": ping\n\n"
+    with pytest.raises(StopAsyncIteration):
+        await asyncio.wait_for(anext(stream), timeout=1)
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Testes dos contadores de não lidas
+# ─────────────────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_unread_endpoint_reads_counter(client: AsyncClient, valid_token: str, db_session):
+    """/unread devolve o contador mantido pelas escritas, sem COUNT sobre as mensagens."""
+    prof_id, _ = await _patient_without_email_notification(db_session)
+    for text in ("Primeira", "Segunda"):
+        await client.post(
+            "/api/patient-contact",
+            json={"cpf": "99988877766", "password": "stream@1234", "message": text},
+        )
+
+    response = await client.get(
+        "/api/patient-messages/unread", params={"professional_id": prof_id}, headers=_auth_headers(valid_token)
+    )
+    assert response.json() == {"count": 2}
+
+    counter = await db_session.get(UnreadMessageCounter, prof_id)
+    assert counter.unread_count == 2
+
+
+@pytest.mark.asyncio
+async def test_reconcile_repairs_drift(db_session):
+    """A reconciliação recalcula os contadores divergentes a partir de patient_messages."""
+    from app import unread_counters
+
+    prof_id, pat_id = await _patient_without_email_notification(db_session)
+    # Mensagens gravadas por fora da API (ex: seed) não atualizam o contador
+    db_session.add_all([
+        PatientMessage(patient_id=pat_id, professional_id=prof_id, message="a", is_read=False),
+        PatientMessage(patient_id=pat_id, professional_id=prof_id, message="b", is_read=False),
+        PatientMessage(patient_id=pat_id, professional_id=prof_id, message="c", is_read=True),
+    ])
+    await db_session.commit()
+    assert await unread_counters.get_count(db_session, prof_id) == 0
+
+    assert await unread_counters.reconcile(db_session) == 1
+    await db_session.commit()
+    assert await unread_counters.get_count(db_session, prof_id) == 2
+
+    # Contador consistente → nada a corrigir
+    assert await unread_counters.reconcile(db_session) == 0
+
+    await unread_counters.adjust(db_session, prof_id, +5)
+    await db_session.commit()
+    assert await unread_counters.reconcile(db_session) == 1
+    await db_session.commit()
+    assert await unread_counters.get_total(db_session) == 2
+
+
+@pytest.mark.asyncio
+async def test_admin_total_matches_count(client: AsyncClient, valid_token: str, db_session):
+    """O badge do admin conta também as mensagens de pacientes sem profissional."""
+    from sqlalchemy import func, select
+    from app import unread_counters
+
+    prof_id, pat_id = await _patient_without_email_notification(db_session)
+    orphan = Patient(name="Paciente Sem Vínculo", cpf="11122233344")
+    db_session.add(orphan)
+    await db_session.commit()
+    db_session.add_all([
+        PatientMessage(patient_id=pat_id, professional_id=prof_id, message="a", is_read=False),
+        PatientMessage(patient_id=orphan.id, professional_id=None, message="b", is_read=False),
+        PatientMessage(patient_id=orphan.id, professional_id=None, message="c", is_read=False),
+        PatientMessage(patient_id=orphan.id, professional_id=None, message="d", is_read=True),
+    ])
+    await db_session.commit()
+    await unread_counters.reconcile(db_session)
+    await db_session.commit()
+
+    baseline = await db_session.scalar(select(func.count(PatientMessage.id)).where(PatientMessage.is_read == False))
+    response = await client.get("/api/patient-messages/unread", headers=_auth_headers(valid_token))
+    assert baseline == 3
+    assert response.json() == {"count": baseline}
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Testes das ações em lote
+# ─────────────────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_bulk_read_save_unsave(client: AsyncClient, valid_token: str, db_session):
+    """Um único UPDATE por ação; a contagem afetada e o contador de não lidas ficam corretos."""
+    from datetime import datetime, timedelta, timezone
+    from app import unread_counters
+
+    prof_id, pat_id = await _patient_without_email_notification(db_session)
+    old = datetime.now(timezone.utc) - timedelta(days=2)
+    msgs = [
+        PatientMessage(patient_id=pat_id, professional_id=prof_id, message=f"m{i}", is_read=False,
+                       **({"created_at": old} if i < 3 else {}))
+        for i in range(5)
+    ]
+    db_session.add_all(msgs)
+    await db_session.commit()
+    ids = [m.id for m in msgs]
+    await unread_counters.reconcile(db_session)
+    await db_session.commit()
+
+    headers = _auth_headers(valid_token)
+    response = await client.put(
+        "/api/patient-messages/read",
+        json={"before": (old + timedelta(minutes=1)).isoformat()},
+        headers=headers,
+    )
+    assert response.json() == {"updated": 3}
+    assert await unread_counters.get_count(db_session, prof_id) == 2
+
+    response = await client.put("/api/patient-messages/read", json={"ids": ids}, headers=headers)
+    assert response.json() == {"updated": 2}  # As já lidas não contam de novo
+    assert await unread_counters.get_count(db_session, prof_id) == 0
+
+    assert (await client.put("/api/patient-messages/save", json={"ids": ids[:4]}, headers=headers)).json() == {"updated": 4}
+    assert (await client.put("/api/patient-messages/unsave", json={"ids": ids}, headers=headers)).json() == {"updated": 4}
+
+    assert (await client.put("/api/patient-messages/read", json={}, headers=headers)).status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_bulk_read_restricted_to_professional(client: AsyncClient, db_session):
+    """Profissional só afeta as próprias mensagens, mesmo informando ids de outros."""
+    from app.auth import create_access_token
+
+    prof_id, pat_id = await _patient_without_email_notification(db_session)
+    own_prof = Professional(name="Dr. Dono", email="dono@clinic.com", role="Psicólogo")
+    db_session.add(own_prof)
+    await db_session.commit()
+    own = PatientMessage(patient_id=pat_id, professional_id=own_prof.id, message="minha", is_read=False)
+    foreign = PatientMessage(patient_id=pat_id, professional_id=prof_id, message="alheia", is_read=False)
+    db_session.add_all([own, foreign])
+    await db_session.commit()
+    own_id, foreign_id = own.id, foreign.id
+
+    token = create_access_token({"sub": "50", "email": "dono@clinic.com", "role": "user"})
+    response = await client.put(
+        "/api/patient-messages/read", json={"ids": [own_id, foreign_id]}, headers=_auth_headers(token)
+    )
+    assert response.json() == {"updated": 1}
+
+    await db_session.refresh(foreign)
+    assert foreign.is_read is False
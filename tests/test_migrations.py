@@ -0,0 +1,85 @@
+"""
+test_migrations.py — Testes das migrações versionadas do esquema.
+
+Cenários cobertos:
+- Banco vazio → todas as migrações aplicadas, tabelas e busca textual criadas
+- Segunda execução com o esquema em dia → uma única consulta, nenhuma DDL
+- Banco legado (tabela sem as colunas novas) → colunas adicionadas sem erro
+- Falha ao criar a busca textual (ex: extensão ausente) não desfaz as demais migrações
+- reset() recria o esquema do zero
+"""
+
+import pytest
+from sqlalchemy import event, inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app import migrations, search
+
+
+@pytest.fixture()
+async def engine():
+    """Banco próprio (o conftest cria as tabelas direto, sem migrações)."""
+    eng = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+    yield eng
+    await eng.dispose()
+
+
+async def _columns(engine, table: str) -> set[str]:
+    async with engine.connect() as conn:
+        return await conn.run_sync(lambda c: {col["name"] for col in inspect(c).get_columns(table)})
+
+
+@pytest.mark.asyncio
+async def test_upgrade_empty_database_then_noop(engine):
+    applied = await migrations.upgrade(engine)
+    assert [m.version for m in applied] == [m.version for m in migrations.MIGRATIONS]
+    assert await migrations.current_version(engine) == migrations.LATEST_VERSION
+    assert "photo" in await _columns(engine, "patients")
+    async with engine.connect() as conn:
+        assert await conn.scalar(text("SELECT count(*) FROM patients_fts")) == 0
+
+    statements: list[str] = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+    event.listen(engine.sync_engine, "before_cursor_execute", listener)
+    assert await migrations.upgrade(engine) == []
+    event.remove(engine.sync_engine, "before_cursor_execute", listener)
+    assert len(statements) == 1 and statements[0].startswith("SELECT")
+
+
+@pytest.mark.asyncio
+async def test_upgrade_legacy_database_adds_columns(engine):
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR, hashed_password VARCHAR)"))
+        await conn.execute(text("INSERT INTO users (email, hashed_password) VALUES ('a@b.com', 'x')"))
+
+    await migrations.upgrade(engine)
+    assert {"phone", "role_title", "crp", "photo", "created_at"} <= await _columns(engine, "users")
+    async with engine.connect() as conn:
+        assert await conn.scalar(text("SELECT email FROM users")) == "a@b.com"
+
+
+@pytest.mark.asyncio
+async def test_search_setup_failure_keeps_upgrade(engine, monkeypatch):
+    async def missing_extension(conn) -> None:
+        await conn.execute(text("CREATE TABLE meio_feito (id INTEGER)"))
+        raise RuntimeError('extension "pg_trgm" is not available')
+
+    monkeypatch.setattr(search, "ensure_search_index", missing_extension)
+    await migrations.upgrade(engine)
+    assert await migrations.current_version(engine) == migrations.LATEST_VERSION
+    async with engine.connect() as conn:
+        tables = await conn.run_sync(lambda c: set(inspect(c).get_table_names()))
+    assert "refresh_tokens" in tables and "meio_feito" not in tables  # Só o savepoint foi desfeito
+
+
+@pytest.mark.asyncio
+async def test_reset_recreates_schema(engine):
+    await migrations.upgrade(engine)
+    async with engine.begin() as conn:
+        await conn.execute(text("INSERT INTO professionals (name, role) VALUES ('Dr. A', 'Psicólogo')"))
+
+    await migrations.reset(engine)
+    assert await migrations.current_version(engine) == migrations.LATEST_VERSION
+    async with engine.connect() as conn:
+        assert await conn.scalar(text("SELECT count(*) FROM professionals")) == 0
@@ -0,0 +1,95 @@
+"""
+test_password_rehash.py — Testes do rehash transparente de senhas (app/password_rehash.py).
+
+Cenários cobertos:
+- Login com hash de parâmetros antigos → 200 e hash refeito com os parâmetros atuais
+- Login com hash atual → nenhum rehash agendado
+- Senha trocada antes do rehash terminar → o novo hash é descartado
+- /api/debug/password-hashes mostra a distribuição de versões e os hashes desatualizados
+"""
+
+import pytest
+from httpx import AsyncClient
+from passlib.context import CryptContext
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import password_rehash
+from app.auth import get_password_hash, verify_password
+from app.models import User
+from app.password_rehash import PasswordRehasher, hash_version
+from tests.conftest import TestSessionFactory
+
+OLD_CONTEXT = CryptContext(
+    schemes=["argon2"], argon2__memory_cost=8192, argon2__time_cost=1, argon2__parallelism=1
+)
+OLD_VERSION = "argon2id v=19 m=8192,t=1,p=1"
+CURRENT_VERSION = "argon2id v=19 m=19456,t=2,p=1"
+
+
+@pytest.fixture()
+def rehasher(monkeypatch) -> PasswordRehasher:
+    fresh = PasswordRehasher()
+    monkeypatch.setattr(password_rehash, "SessionLocal", TestSessionFactory)
+    monkeypatch.setattr(password_rehash, "rehasher", fresh)
+    monkeypatch.setattr("app.rotas.autenticacao.rehasher", fresh)
+    monkeypatch.setattr("app.rotas.debug.rehasher", fresh)
+    return fresh
+
+
+async def _user(db: AsyncSession, password_hash: str) -> User:
+    user = User(email="old@clinic.com", hashed_password=password_hash, role="admin", is_active=True)
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+@pytest.mark.asyncio
+async def test_login_rehashes_outdated_hash(client: AsyncClient, db_session: AsyncSession, rehasher):
+    user = await _user(db_session, OLD_CONTEXT.hash("senha-antiga"))
+
+    response = await client.post("/api/login", json={"email": user.email, "password": "senha-antiga"})
+    assert response.status_code == 200
+
+    await db_session.refresh(user)
+    assert hash_version(user.hashed_password) == CURRENT_VERSION
+    assert verify_password("senha-antiga", user.hashed_password)
+    assert rehasher.counters == {"scheduled": 1, "rehashed": 1}
+
+
+@pytest.mark.asyncio
+async def test_login_with_current_hash_does_not_rehash(client: AsyncClient, admin_user: User, rehasher):
+    response = await client.post("/api/login", json={"email": admin_user.email, "password": "admin@1234"})
+    assert response.status_code == 200
+    assert rehasher.counters == {}
+
+
+@pytest.mark.asyncio
+async def test_rehash_does_not_overwrite_changed_password(db_session: AsyncSession, rehasher):
+    old_hash = OLD_CONTEXT.hash("senha-antiga")
+    user = await _user(db_session, old_hash)
+    changed = get_password_hash("senha-nova")
+    user.hashed_password = changed
+    await db_session.commit()
+
+    await rehasher.rehash("user", user.id, "senha-antiga", old_hash)
+
+    await db_session.refresh(user)
+    assert user.hashed_password == changed
+    assert rehasher.counters == {"skipped": 1}
+
+
+@pytest.mark.asyncio
+async def test_hash_distribution_endpoint(
+    client: AsyncClient, db_session: AsyncSession, admin_user: User, valid_token: str, rehasher
+):
+    await _user(db_session, OLD_CONTEXT.hash("senha-antiga"))
+
+    response = await client.get(
+        "/api/debug/password-hashes", headers={"Authorization": f"Bearer {valid_token}"}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["versions"]["users"] == {CURRENT_VERSION: 1, OLD_VERSION: 1}
+    assert data["outdated"] == {"users": 1, "patients": 0}
+    assert data["current"]["memory_cost"] == 19456
@@ -9,6 +9,9 @@ Cenários cobertos:
 - Buscar paciente por ID → 200
 - Buscar paciente inexistente → 404
 - Atualizar paciente → 200
+- Criar e atualizar paciente custam um único comando SQL (INSERT/UPDATE ... RETURNING)
+- Busca textual: nome sem acento, CPF formatado, e-mail; índice acompanha as alterações
+- Busca restrita aos pacientes do profissional e paginada
 """
 
 import pytest
@@ -158,3 +161,109 @@ async def test_update_patient_not_found(client: AsyncClient, valid_token: str):
         headers=_auth_headers(valid_token),
     )
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_create_and_update_single_statement(
+    client: AsyncClient, valid_token: str, patient: Patient, query_log: list[str]
+):
+    """Gravação + ficha completa (com nome do profissional) em uma única ida ao banco."""
+    payload = {"name": "Paciente Atômico", "cpf": "12312312312", "professional_id": patient.professional_id}
+    response = await client.post(PATIENTS_URL, json=payload, headers=_auth_headers(valid_token))
+    assert response.status_code == 200
+    assert response.json()["professional_name"] == "Dr. Teste"
+    assert len(query_log) == 1 and query_log[0].startswith("INSERT INTO patients")
+
+    query_log.clear()
+    response = await client.put(
+        f"{PATIENTS_URL}/{patient.id}", json={"name": patient.name, "phone": "11999990000"}, headers=_auth_headers(valid_token)
+    )
+    assert response.status_code == 200
+    assert response.json()["phone"] == "11999990000"
+    assert response.json()["professional_name"] == "Dr. Teste"
+    assert len(query_log) == 1 and query_log[0].startswith("UPDATE patients")
+
+
+@pytest.mark.asyncio
+async def test_update_patient_duplicate_cpf(client: AsyncClient, valid_token: str, patient: Patient, db_session):
+    """Trocar o CPF para um já cadastrado deve retornar 409."""
+    db_session.add(Patient(name="Outro", cpf="22233344455"))
+    await db_session.commit()
+    response = await client.put(
+        f"{PATIENTS_URL}/{patient.id}", json={"name": patient.name, "cpf": "22233344455"}, headers=_auth_headers(valid_token)
+    )
+    assert response.status_code == 409
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Testes de Busca
+# ─────────────────────────────────────────────────────────────────────
+
+SEARCH_URL = f"{PATIENTS_URL}/search"
+
+
+@pytest.fixture()
+async def search_index():
+    """Tabela FTS5 + triggers sobre a tabela patients recém-criada (ela não faz parte do metadata)."""
+    from sqlalchemy import text
+    from app import search
+    from tests.conftest import test_engine
+
+    async with test_engine.begin() as conn:
+        await conn.execute(text("DROP TABLE IF EXISTS patients_fts"))
+        await search.ensure_search_index(conn)
+
+
+async def _search(client: AsyncClient, token: str, q: str, **params) -> dict:
+    response = await client.get(SEARCH_URL, params={"q": q, **params}, headers=_auth_headers(token))
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_search_patients_ranked(client: AsyncClient, valid_token: str, db_session, search_index):
+    db_session.add_all([
+        Patient(name="José Antônio Araújo", cpf="123.456.789-01", phone="(11) 98888-7777", email="jose@exemplo.com"),
+        Patient(name="Maria José Silva", cpf="98765432100", email="maria@exemplo.com"),
+        Patient(name="Joana Prado", cpf="55544433322"),
+    ])
+    await db_session.commit()
+
+    names = [p["name"] for p in (await _search(client, valid_token, "jose"))["items"]]
+    assert set(names) == {"José Antônio Araújo", "Maria José Silva"}
+
+    assert [p["name"] for p in (await _search(client, valid_token, "araujo ant"))["items"]] == ["José Antônio Araújo"]
+    assert [p["name"] for p in (await _search(client, valid_token, "123.456"))["items"]] == ["José Antônio Araújo"]
+    assert [p["name"] for p in (await _search(client, valid_token, "98888"))["items"]] == ["José Antônio Araújo"]
+    assert [p["name"] for p in (await _search(client, valid_token, "maria@exe"))["items"]] == ["Maria José Silva"]
+    assert (await _search(client, valid_token, "inexistente"))["items"] == []
+
+    page = await _search(client, valid_token, "jo", limit=1)
+    assert len(page["items"]) == 1 and page["has_more"] is True
+
+    response = await client.get(SEARCH_URL, params={"q": "j"}, headers=_auth_headers(valid_token))
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_search_follows_updates(client: AsyncClient, valid_token: str, patient: Patient, search_index):
+    patient_id = patient.id
+    assert len((await _search(client, valid_token, "paciente teste"))["items"]) == 1
+
+    await client.put(f"{PATIENTS_URL}/{patient_id}", json={"name": "Renomeado Souza"}, headers=_auth_headers(valid_token))
+    assert (await _search(client, valid_token, "paciente teste"))["items"] == []
+    assert [p["id"] for p in (await _search(client, valid_token, "souza"))["items"]] == [patient_id]
+
+
+@pytest.mark.asyncio
+async def test_search_scoped_to_professional(client: AsyncClient, patient: Patient, db_session, search_index):
+    from app.auth import create_access_token
+
+    other = Professional(name="Dra. Outra", email="outra@clinic.com", role="Psicóloga")
+    db_session.add(other)
+    await db_session.commit()
+    db_session.add(Patient(name="Paciente Alheio", cpf="10120230344", professional_id=other.id))
+    await db_session.commit()
+
+    token = create_access_token({"sub": "9", "email": "drtest@clinic.com", "role": "user"})
+    assert [p["name"] for p in (await _search(client, token, "paciente"))["items"]] == ["Paciente Teste"]
@@ -0,0 +1,97 @@
+"""
+test_professionals.py — Testes da listagem de profissionais servida pelo diretório em memória.
+
+Cenários cobertos:
+- Listagem repetida não consulta o banco (snapshot compartilhado)
+- ETag + If-None-Match → 304 sem corpo (lista de ETags, "*" e W/); ETag parecido não casa
+- Cadastro e alteração reconstroem o snapshot (novo ETag, nome novo)
+- professional_name dos modelos lê o nome do diretório
+- Evento de outro worker (ETag diferente) descarta o snapshot local
+- Reconstrução periódica enxerga profissionais gravados por fora da API
+"""
+
+import pytest
+
+import app.main as main_module
+from app.directory import directory
+from app.http_cache import etag_matches
+from app.models import Patient, Professional
+from tests.conftest import TestSessionFactory
+
+
+def _auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.asyncio
+async def test_list_served_from_snapshot_with_etag(client, valid_token, patient, query_log):
+    headers = _auth(valid_token)
+    first = await client.get("/api/professionals", headers=headers)
+    assert first.status_code == 200
+    assert [p["name"] for p in first.json()] == ["Dr. Teste"]
+    etag = first.headers["ETag"]
+
+    query_log.clear()
+    second = await client.get("/api/professionals", headers=headers)
+    assert second.json() == first.json()
+    assert not any("FROM professionals" in s for s in query_log)
+
+    cached = await client.get("/api/professionals", headers={**headers, "If-None-Match": f'"velho", {etag}'})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    # Contém o ETag, mas é outro valor (o antigo teste por substring respondia 304)
+    other = await client.get("/api/professionals", headers={**headers, "If-None-Match": f'"v{etag}"'})
+    assert other.status_code == 200
+
+
+def test_etag_matches():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"ab"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+@pytest.mark.asyncio
+async def test_periodic_rebuild_sees_external_inserts(db_session, professional, monkeypatch):
+    monkeypatch.setattr(main_module, "SessionLocal", TestSessionFactory)
+    await main_module.warm_directory()
+    db_session.add(Professional(name="Dra. Seed", role="Psicóloga", status="Ativo"))  # Como o seed_bulk
+    await db_session.commit()
+    assert [item["name"] for item in directory.snapshot.items] == ["Dr. Teste"]
+
+    await main_module.warm_directory()  # O que directory_refresh_task roda a cada ciclo
+    assert [item["name"] for item in directory.snapshot.items] == ["Dr. Teste", "Dra. Seed"]
+
+
+@pytest.mark.asyncio
+async def test_create_and_rename_rebuild_snapshot(client, valid_token, patient):
+    headers = _auth(valid_token)
+    etag = (await client.get("/api/professionals", headers=headers)).headers["ETag"]
+
+    response = await client.post("/api/professionals", json={"name": "Ana Lima", "role": "Psicóloga"}, headers=headers)
+    assert response.status_code == 200
+    listing = await client.get("/api/professionals", headers={**headers, "If-None-Match": etag})
+    assert listing.status_code == 200
+    assert [p["name"] for p in listing.json()] == ["Ana Lima", "Dr. Teste"]
+
+    response = await client.put(f"/api/professionals/{patient.professional_id}", json={"name": "Dr. Novo"}, headers=headers)
+    assert response.status_code == 200
+    assert directory.name_of(patient.professional_id) == "Dr. Novo"
+    # A ficha do paciente mostra o nome novo, vindo do diretório
+    response = await client.get(f"/api/patients/{patient.id}", headers=headers)
+    assert response.json()["professional_name"] == "Dr. Novo"
+
+
+@pytest.mark.asyncio
+async def test_professional_name_reads_directory(db_session, patient):
+    await directory.rebuild(db_session)
+    # Relacionamento não carregado: o nome vem do snapshot
+    fresh = Patient(name="Sem Relacionamento", professional_id=patient.professional_id)
+    assert fresh.professional_name == "Dr. Teste"
+
+    directory.apply({"type": "directory", "etag": directory.snapshot.etag})
+    assert directory.snapshot is not None  # Eco do próprio evento
+    directory.apply({"type": "directory", "etag": '"outro"'})
+    assert directory.snapshot is None
+    assert fresh.professional_name is None
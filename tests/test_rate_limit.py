@@ -0,0 +1,218 @@
+"""
+test_rate_limit.py — Testes da estratégia token bucket e dos backends de rate limit.
+
+Cenários cobertos:
+- Balde permite a rajada até a capacidade e recarrega com o tempo
+- Backend SQLite compartilha o mesmo balde entre "workers" (instâncias distintas)
+- Backend Redis com cliente falso em Python: uma chamada por verificação (o Lua não roda aqui)
+- Script Lua REDIS_TOKEN_BUCKET_SCRIPT executado de verdade: Redis em REDIS_URL ou fakeredis
+  com suporte a Lua (pacote lupa); sem nenhum dos dois o teste é pulado
+- Contadores de janela fixa (incr/get/get_expiry) da interface do limits em todos os backends
+- Estratégia registrada no limits/slowapi e usada pelo limiter global
+"""
+
+import os
+import time
+
+import pytest
+from limits.errors import ConfigurationError
+from limits import parse
+from limits.storage import storage_from_string
+
+from app import rate_limit
+from app.rate_limit import (
+    REDIS_TOKEN_BUCKET_SCRIPT,
+    MemoryBucketStorage,
+    RedisBucketStorage,
+    SQLiteBucketStorage,
+    TokenBucketRateLimiter,
+    refill,
+)
+
+
+class _Clock:
+    """Relógio controlado pelos testes (substitui time.time no módulo)."""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock(monkeypatch) -> _Clock:
+    fake = _Clock()
+    monkeypatch.setattr(rate_limit.time, "time", fake.time)
+    return fake
+
+
+class FakeRedis:
+    """
+    Cliente Redis falso: reimplementa em Python a conta do script de token bucket, com o
+    relógio do teste. Cobre só a ligação do storage com o cliente — o Lua em si é
+    testado em test_redis_lua_script.
+    """
+
+    def __init__(self, clock: _Clock):
+        self.clock = clock
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.calls = 0
+
+    def eval(self, script: str, numkeys: int, key: str, capacity, rate, cost):
+        assert script == REDIS_TOKEN_BUCKET_SCRIPT and numkeys == 1
+        self.calls += 1
+        capacity, rate, cost = float(capacity), float(rate), float(cost)
+        state = self.hashes.get(key, {})
+        now = self.clock.now
+        tokens = refill(float(state.get("tokens", capacity)), float(state.get("updated", now)), now, capacity, rate)
+        allowed = 0
+        if cost > 0 and tokens >= cost:
+            tokens -= cost
+            allowed = 1
+        if cost > 0:
+            self.hashes[key] = {"tokens": str(tokens), "updated": str(now)}
+        return [allowed, str(tokens).encode()]
+
+    def ping(self) -> bool:
+        return True
+
+    def scan_iter(self, match: str):
+        prefix = match.rstrip("*")
+        return [k for k in self.hashes if k.startswith(prefix)]
+
+    def delete(self, *keys: str) -> int:
+        return sum(1 for k in keys if self.hashes.pop(k, None) is not None)
+
+
+@pytest.fixture()
+def lua_redis():
+    """Redis que executa Lua: o de REDIS_URL (se houver) ou fakeredis com lupa."""
+    if os.environ.get("REDIS_URL"):
+        import redis
+
+        client = redis.Redis.from_url(os.environ["REDIS_URL"])
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        client = fakeredis.FakeRedis()
+        try:
+            client.eval("return 1", 0)
+        except Exception:
+            pytest.skip("fakeredis sem suporte a Lua (instale 'fakeredis[lua]') e sem REDIS_URL")
+    yield client
+    keys = list(client.scan_iter(match=RedisBucketStorage.KEY_PREFIX + "*"))
+    if keys:
+        client.delete(*keys)
+
+
+def _exhaust(limiter: TokenBucketRateLimiter, item, key: str, attempts: int) -> list[bool]:
+    return [limiter.hit(item, key) for _ in range(attempts)]
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Testes
+# ─────────────────────────────────────────────────────────────────────
+
+def test_memory_bucket_burst_and_refill(clock: _Clock):
+    """'3/minute' → rajada de 3, depois 1 token a cada 20 segundos."""
+    limiter = TokenBucketRateLimiter(MemoryBucketStorage("bucket+memory://"))
+    item = parse("3/minute")
+
+    assert _exhaust(limiter, item, "1.2.3.4", 4) == [True, True, True, False]
+    assert limiter.get_window_stats(item, "1.2.3.4").remaining == 0
+
+    clock.now += 20
+    assert limiter.test(item, "1.2.3.4")
+    assert _exhaust(limiter, item, "1.2.3.4", 2) == [True, False]
+
+    # Outra chave (outro IP) tem seu próprio balde
+    assert limiter.hit(item, "5.6.7.8")
+
+    limiter.clear(item, "1.2.3.4")
+    assert limiter.get_window_stats(item, "1.2.3.4").remaining == 3
+
+
+def test_sqlite_bucket_shared_between_workers(clock: _Clock, tmp_path):
+    """Duas instâncias (como dois workers) apontando para o mesmo arquivo dividem o limite."""
+    uri = f"bucket+sqlite:///{tmp_path / 'ratelimit.db'}"
+    worker_a = TokenBucketRateLimiter(storage_from_string(uri))
+    worker_b = TokenBucketRateLimiter(storage_from_string(uri))
+    item = parse("4/minute")
+
+    results = [worker_a.hit(item, "ip"), worker_b.hit(item, "ip"), worker_a.hit(item, "ip"), worker_b.hit(item, "ip")]
+    assert results == [True] * 4
+    assert not worker_a.hit(item, "ip")
+    assert not worker_b.hit(item, "ip")
+
+    clock.now += 15
+    assert worker_b.hit(item, "ip")
+    assert worker_a.storage.reset() == 1
+
+
+def test_redis_bucket_with_fake_client(clock: _Clock):
+    """O backend Redis faz uma chamada por verificação e respeita o limite."""
+    fake = FakeRedis(clock)
+    storage = storage_from_string("bucket+redis://localhost:6379/0", client=fake)
+    assert isinstance(storage, RedisBucketStorage)
+    limiter = TokenBucketRateLimiter(storage)
+    item = parse("2/second")
+
+    assert _exhaust(limiter, item, "ip", 3) == [True, True, False]
+    assert fake.calls == 3
+
+    clock.now += 0.5
+    assert limiter.hit(item, "ip")
+    assert storage.check()
+    assert storage.reset() == 1
+
+
+def test_token_bucket_strategy_registered():
+    """O limiter global usa a estratégia token-bucket com o backend padrão."""
+    from limits.strategies import STRATEGIES
+    from app.limiter import limiter
+
+    assert STRATEGIES["token-bucket"] is TokenBucketRateLimiter
+    assert isinstance(limiter._limiter, TokenBucketRateLimiter)
+
+    with pytest.raises(ConfigurationError):
+        TokenBucketRateLimiter(storage_from_string("memory://"))
+
+
+def test_redis_lua_script(lua_redis):
+    """O script que vai para produção: rajada, recusa, recarga pelo relógio do servidor e TTL."""
+    storage = RedisBucketStorage("bucket+redis://localhost:6379/0", client=lua_redis)
+    limiter = TokenBucketRateLimiter(storage)
+    item = parse("5/second")
+
+    assert _exhaust(limiter, item, "lua", 6) == [True] * 5 + [False]
+    assert limiter.get_window_stats(item, "lua").remaining == 0
+    ttl_ms = lua_redis.pttl(RedisBucketStorage.KEY_PREFIX + item.key_for("lua"))
+    assert 0 < ttl_ms <= 2000  # Tempo até encher (1s) + 1s de folga
+
+    time.sleep(0.25)  # 5 tokens/s → ao menos 1 token de volta
+    assert limiter.test(item, "lua")
+    assert limiter.hit(item, "lua")
+    assert storage.reset() == 1
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite", "redis"])
+def test_fixed_window_counters(backend, clock: _Clock, tmp_path):
+    """incr/get/get_expiry: contador que recomeça quando a janela vence."""
+    if backend == "memory":
+        storage = MemoryBucketStorage("bucket+memory://")
+    elif backend == "sqlite":
+        storage = SQLiteBucketStorage(f"bucket+sqlite:///{tmp_path / 'ratelimit.db'}")
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        storage = RedisBucketStorage("bucket+redis://localhost:6379/0", client=fakeredis.FakeRedis())
+
+    assert storage.get("janela") == 0
+    assert storage.incr("janela", 60) == 1
+    assert storage.incr("janela", 60, amount=2) == 3
+    assert storage.get("janela") == 3
+    assert storage.get_expiry("janela") == pytest.approx(clock.now + 60, abs=1)
+
+    if backend != "redis":  # O TTL do Redis segue o relógio real
+        clock.now += 61
+        assert storage.get("janela") == 0
+        assert storage.incr("janela", 60) == 1
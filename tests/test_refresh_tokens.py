@@ -0,0 +1,130 @@
+"""
+test_refresh_tokens.py — Testes da sessão com refresh token e da revogação de access tokens.
+
+Cenários cobertos:
+- Login devolve access token curto (com jti) + refresh token; só o hash vai para o banco
+- Refresh rotaciona o token; reuso dentro da tolerância → 401 sem derrubar a sessão
+- Reuso fora da tolerância (token vazado) → família inteira revogada
+- Refresh de usuário inativo → 401
+- Logout revoga o access token atual (401 nas rotas) e o refresh token
+- Revogação publicada por outro worker (barramento) e leitura incremental do banco
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import refresh_tokens, revocation
+from app.auth import decode_access_token
+from app.config import settings
+from app.events import bus
+from app.limiter import limiter
+from app.models import RefreshToken, RevokedToken, User
+from app.revocation import RevocationList
+
+REFRESH_URL = "/api/token/refresh"
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch) -> RevocationList:
+    limiter.reset()  # Vários logins seguidos neste arquivo
+    fresh = RevocationList()
+    monkeypatch.setattr(revocation, "revocations", fresh)
+    return fresh
+
+
+async def _login(client: AsyncClient, admin_user: User) -> dict:
+    response = await client.post("/api/login", json={"email": admin_user.email, "password": "admin@1234"})
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_login_returns_short_token_and_hashed_refresh(
+    client: AsyncClient, db_session: AsyncSession, admin_user: User
+):
+    data = await _login(client, admin_user)
+    assert data["expires_in"] == settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    assert decode_access_token(data["access_token"])["jti"]
+
+    stored = (await db_session.execute(select(RefreshToken))).scalars().all()
+    assert len(stored) == 1
+    assert stored[0].subject == f"user:{admin_user.id}"
+    assert stored[0].token_hash != data["refresh_token"]
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_token(client: AsyncClient, admin_user: User):
+    first = (await _login(client, admin_user))["refresh_token"]
+
+    response = await client.post(REFRESH_URL, json={"refresh_token": first})
+    assert response.status_code == 200
+    second = response.json()["refresh_token"]
+    assert second != first
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert (await client.get("/api/patients", headers=headers)).status_code == 200
+
+    # Outra aba com o token antigo, logo em seguida: recusa, mas a sessão continua
+    assert (await client.post(REFRESH_URL, json={"refresh_token": first})).status_code == 401
+    assert (await client.post(REFRESH_URL, json={"refresh_token": second})).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_reuse_after_grace_revokes_family(client: AsyncClient, admin_user: User, monkeypatch):
+    first = (await _login(client, admin_user))["refresh_token"]
+    second = (await client.post(REFRESH_URL, json={"refresh_token": first})).json()["refresh_token"]
+
+    monkeypatch.setattr(refresh_tokens, "REUSE_GRACE_SECONDS", -1)
+    assert (await client.post(REFRESH_URL, json={"refresh_token": first})).status_code == 401
+    assert (await client.post(REFRESH_URL, json={"refresh_token": second})).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_refresh_rejected_for_inactive_user(
+    client: AsyncClient, db_session: AsyncSession, admin_user: User
+):
+    token = (await _login(client, admin_user))["refresh_token"]
+    admin_user.is_active = False
+    await db_session.commit()
+
+    response = await client.post(REFRESH_URL, json={"refresh_token": token})
+    assert response.status_code == 401
+    assert (await client.post(REFRESH_URL, json={"refresh_token": "inexistente"})).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_access_and_refresh(client: AsyncClient, admin_user: User, fresh_state):
+    data = await _login(client, admin_user)
+    headers = {"Authorization": f"Bearer {data['access_token']}"}
+    assert (await client.get("/api/patients", headers=headers)).status_code == 200
+
+    response = await client.post("/api/logout", json={"refresh_token": data["refresh_token"]}, headers=headers)
+    assert response.status_code == 200
+    assert len(fresh_state) == 1
+
+    assert (await client.get("/api/patients", headers=headers)).status_code == 401
+    assert (await client.post(REFRESH_URL, json={"refresh_token": data["refresh_token"]})).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_revocations_from_other_workers(db_session: AsyncSession, fresh_state):
+    bus.publish_local({"type": revocation.EVENT_TYPE, "jti": "de-outro-worker", "exp": time.time() + 600})
+    assert fresh_state.is_revoked("de-outro-worker")
+
+    now = datetime.utcnow()
+    db_session.add_all([
+        RevokedToken(jti="a", expires_at=now + timedelta(minutes=10)),
+        RevokedToken(jti="vencido", expires_at=now - timedelta(minutes=1)),
+    ])
+    await db_session.commit()
+    assert await fresh_state.sync(db_session) == 1
+    assert fresh_state.is_revoked("a") and not fresh_state.is_revoked("vencido")
+
+    db_session.add(RevokedToken(jti="b", expires_at=now + timedelta(minutes=10)))
+    await db_session.commit()
+    assert await fresh_state.sync(db_session) == 1  # Só a linha nova
+    assert fresh_state.is_revoked("b")
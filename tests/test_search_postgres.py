@@ -0,0 +1,132 @@
+"""
+test_search_postgres.py — Busca de pacientes no PostgreSQL (pg_trgm + unaccent, app/search.py).
+
+Roda só com TEST_POSTGRES_URL apontando para um banco descartável (as tabelas são
+recriadas); sem a variável, o módulo é pulado. Ex.:
+    TEST_POSTGRES_URL=postgresql://postgres@localhost:5432/clinic_test pytest tests/test_search_postgres.py
+O usuário precisa poder criar as extensões pg_trgm e unaccent (pacote contrib).
+
+Cenários cobertos:
+- ensure_search_index cria extensões, wrapper IMMUTABLE e índices, e é idempotente
+- Nome com ou sem acento (e maiúsculas) casa igual
+- Ranqueamento: o nome mais parecido vem primeiro
+- E-mail buscado por partes ("maria@exe")
+- Dígitos de CPF (prefixo, com ou sem pontuação) e de telefone (qualquer trecho)
+- Escopo por profissional e paginação
+- As consultas usam os índices de expressão (EXPLAIN com seq scan desligado)
+"""
+
+import os
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import make_url, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app import search
+from app.database import Base
+from app.models import Patient, Professional
+
+PG_URL = os.environ.get("TEST_POSTGRES_URL")
+
+pytestmark = pytest.mark.skipif(not PG_URL, reason="TEST_POSTGRES_URL não definida (busca no PostgreSQL)")
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────
+
+@pytest_asyncio.fixture()
+async def pg_db() -> AsyncSession:
+    engine = create_async_engine(make_url(PG_URL).set(drivername="postgresql+psycopg"))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        await search.ensure_search_index(conn)
+        await search.ensure_search_index(conn)  # Idempotente (reaplicado pela migração 8)
+
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        prof = Professional(name="Dra. Busca", email="busca@clinic.com", role="Psicóloga")
+        other = Professional(name="Dr. Outro", email="outro@clinic.com", role="Psicólogo")
+        session.add_all([prof, other])
+        await session.flush()
+        session.add_all([
+            Patient(name="José Antônio Araújo", cpf="123.456.789-01", phone="(11) 98888-7777",
+                    email="jose@exemplo.com", professional_id=prof.id),
+            Patient(name="Maria José Silva", cpf="98765432100", email="maria@exemplo.com", professional_id=prof.id),
+            Patient(name="Joana Prado", cpf="55544433322", phone="21 3333-4444", professional_id=prof.id),
+            Patient(name="Josefa Araújo Lima", cpf="12399988877", professional_id=other.id),
+        ])
+        await session.commit()
+        session.info["prof_id"], session.info["other_id"] = prof.id, other.id
+        yield session
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+    await engine.dispose()
+
+
+async def _names(db: AsyncSession, query: str, professional_id: int | None = None, skip: int = 0, limit: int = 10) -> list[str]:
+    ids = await search.search_patient_ids(db, query, professional_id=professional_id, skip=skip, limit=limit)
+    names = dict((await db.execute(text("SELECT id, name FROM patients"))).all())
+    return [names[i] for i in ids]
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Testes
+# ─────────────────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_accent_and_case_insensitive(pg_db):
+    assert set(await _names(pg_db, "jose")) >= {"José Antônio Araújo", "Maria José Silva"}
+    assert await _names(pg_db, "JOSÉ ARAÚJO") == await _names(pg_db, "jose araujo")
+    assert set(await _names(pg_db, "araujo")) == {"José Antônio Araújo", "Josefa Araújo Lima"}
+
+
+@pytest.mark.asyncio
+async def test_ranking(pg_db):
+    assert (await _names(pg_db, "jose antonio araujo"))[0] == "José Antônio Araújo"
+    assert (await _names(pg_db, "araujo ant"))[0] == "José Antônio Araújo"
+    assert (await _names(pg_db, "maria silva"))[0] == "Maria José Silva"
+    # E-mail por partes, como no FTS5 do SQLite
+    assert await _names(pg_db, "maria@exe") == ["Maria José Silva"]
+    assert await _names(pg_db, "inexistente") == []
+
+
+@pytest.mark.asyncio
+async def test_cpf_and_phone_digits(pg_db):
+    assert await _names(pg_db, "123.456") == ["José Antônio Araújo"]
+    assert set(await _names(pg_db, "123")) == {"José Antônio Araújo", "Josefa Araújo Lima"}
+    assert await _names(pg_db, "987.654.321-00") == ["Maria José Silva"]
+    # Telefone: qualquer trecho dos dígitos, com ou sem DDD/pontuação
+    assert await _names(pg_db, "98888") == ["José Antônio Araújo"]
+    assert await _names(pg_db, "8888-7777") == ["José Antônio Araújo"]
+    assert await _names(pg_db, "(21) 3333") == ["Joana Prado"]
+
+
+@pytest.mark.asyncio
+async def test_scope_and_pagination(pg_db):
+    prof_id, other_id = pg_db.info["prof_id"], pg_db.info["other_id"]
+    assert await _names(pg_db, "josefa", professional_id=prof_id) == []
+    assert await _names(pg_db, "josefa", professional_id=other_id) == ["Josefa Araújo Lima"]
+
+    everyone = await _names(pg_db, "jose")
+    first, second = await _names(pg_db, "jose", limit=1), await _names(pg_db, "jose", skip=1, limit=1)
+    assert [first[0], second[0]] == everyone[:2]
+
+
+@pytest.mark.asyncio
+async def test_queries_use_expression_indexes(pg_db):
+    """Mesmas expressões do CREATE INDEX: com seq scan desligado o plano usa os índices GIN/B-tree."""
+    await pg_db.execute(text("SET LOCAL enable_seqscan = off"))
+    name, tsv, cpf, phone = (e.format(t="") for e in (search._PG_NAME, search._PG_TSV, search._PG_CPF, search._PG_PHONE))
+    plans = {
+        "ix_patients_search_name_trgm": f"SELECT id FROM patients WHERE {name} % 'jose'",
+        "ix_patients_search_words": f"SELECT id FROM patients WHERE {tsv} @@ to_tsquery('simple', 'jose:*')",
+        "ix_patients_search_cpf_digits": f"SELECT id FROM patients WHERE {cpf} LIKE '123%'",
+        "ix_patients_search_phone_trgm": f"SELECT id FROM patients WHERE {phone} LIKE '%98888%'",
+    }
+    for index_name, sql in plans.items():
+        plan = "\n".join(row[0] for row in (await pg_db.execute(text(f"EXPLAIN {sql}"))).all())
+        assert index_name in plan, plan
+
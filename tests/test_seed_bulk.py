@@ -0,0 +1,77 @@
+"""
+test_seed_bulk.py — Testes do gerador de dados sintéticos em alto volume.
+
+Cenários cobertos:
+- Mesma semente → mesmas linhas geradas (determinismo)
+- Inserção em lote respeita as quantidades alvo
+- Nenhum profissional recebe dois agendamentos no mesmo horário
+- Último profissional sem pacientes não faz sumir o resto dos agendamentos
+- --today fixa a data de referência
+- Todas as credenciais reutilizam o mesmo hash pré-calculado
+"""
+
+import pytest
+from datetime import date
+from sqlalchemy import func, select
+
+from app.models import Appointment, Patient, PatientMessage, Professional, User
+from scripts.seed.seed_bulk import BulkCounts, BulkSeedGenerator, _parse_args, seed_bulk
+from tests.conftest import test_engine
+
+
+SMALL = BulkCounts(professionals=5, patients=60, appointments=400, messages=120)
+
+
+def test_generator_is_deterministic():
+    """Duas instâncias com a mesma semente devem produzir exatamente as mesmas linhas."""
+    day = date(2026, 1, 15)
+    a = BulkSeedGenerator(SMALL, seed=7, today=day)
+    b = BulkSeedGenerator(SMALL, seed=7, today=day)
+    assert list(a.professionals()) == list(b.professionals())
+    rows_a = [{k: v for k, v in r.items() if k != "hashed_password"} for r in a.patients([1, 2, 3])]
+    rows_b = [{k: v for k, v in r.items() if k != "hashed_password"} for r in b.patients([1, 2, 3])]
+    assert rows_a == rows_b
+
+    other = BulkSeedGenerator(SMALL, seed=8, today=day)
+    assert [r["name"] for r in other.professionals()] != [r["name"] for r in a.professionals()]
+
+
+@pytest.mark.asyncio
+async def test_seed_bulk_inserts_target_counts(db_session):
+    """O seed bulk deve inserir as quantidades pedidas, sem colisão de horários por profissional."""
+    inserted = await seed_bulk(test_engine, SMALL, seed=3, batch_size=50, verbose=False)
+
+    assert inserted["professionals"] == SMALL.professionals
+    assert inserted["patients"] == SMALL.patients
+    assert inserted["appointments"] == SMALL.appointments
+    assert inserted["messages"] == SMALL.messages
+
+    assert await db_session.scalar(select(func.count(Professional.id))) == SMALL.professionals
+    assert await db_session.scalar(select(func.count(Patient.id))) == SMALL.patients
+    assert await db_session.scalar(select(func.count(Appointment.id))) == SMALL.appointments
+    assert await db_session.scalar(select(func.count(PatientMessage.id))) == SMALL.messages
+
+    duplicated_slots = (await db_session.execute(
+        select(Appointment.professional_id, Appointment.date, Appointment.time)
+        .group_by(Appointment.professional_id, Appointment.date, Appointment.time)
+        .having(func.count(Appointment.id) > 1)
+    )).all()
+    assert duplicated_slots == []
+
+    distinct_hashes = await db_session.scalar(select(func.count(func.distinct(User.hashed_password))))
+    assert distinct_hashes == 1
+
+
+def test_remainder_goes_to_last_professional_with_patients():
+    """O resto do arredondamento vai para o último profissional que tem pacientes."""
+    gen = BulkSeedGenerator(SMALL, seed=5, today=date(2026, 1, 15))
+    rows = list(gen.appointments({1: [10], 2: [20], 3: [30], 4: []}))  # 3 × 133 = 399
+    assert len(rows) == SMALL.appointments
+    assert {r["professional_id"] for r in rows} == {1, 2, 3}
+
+
+def test_today_argument(monkeypatch):
+    monkeypatch.setattr("sys.argv", ["seed_bulk", "--today", "2026-01-15"])
+    assert _parse_args().today == date(2026, 1, 15)
+    monkeypatch.setattr("sys.argv", ["seed_bulk"])
+    assert _parse_args().today is None
@@ -0,0 +1,111 @@
+"""
+test_startup.py — Testes da inicialização (liveness, readiness e dependências adiadas).
+
+Cenários cobertos:
+- /health responde sempre; /ready responde 503 enquanto o aquecimento roda e 200 depois
+- Etapa com erro é repetida; se continuar falhando, /ready responde 503 ("failed")
+- Perfil de inicialização registra as etapas do aquecimento
+- Aquecimento real em banco vazio: filtro de login e autocompletar já incluem o seed
+- Importar app.main não carrega httpx, passlib nem smtplib (adiados até o primeiro uso)
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+
+import app.main as main_module
+from app import identifier_filter, typeahead
+from app.limiter import limiter
+from app.startup import Readiness, StartupProfile
+from tests.conftest import TestSessionFactory
+
+
+@pytest.fixture()
+def fresh_state(monkeypatch):
+    readiness, profile = Readiness(), StartupProfile()
+    monkeypatch.setattr(main_module, "readiness", readiness)
+    monkeypatch.setattr(main_module, "profile", profile)
+    monkeypatch.setattr(main_module, "WARMUP_RETRY_SECONDS", 0)
+    return readiness, profile
+
+
+@pytest.mark.asyncio
+async def test_ready_waits_for_warmup(client: AsyncClient, fresh_state, monkeypatch):
+    readiness, profile = fresh_state
+    calls: list[str] = []
+
+    async def ok_step() -> None:
+        calls.append("ok")
+
+    async def flaky_step() -> None:
+        calls.append("flaky")
+        if calls.count("flaky") == 1:
+            raise RuntimeError("banco subindo")
+
+    monkeypatch.setattr(main_module, "WARMUP_STEPS", {"cache": ok_step, "seed": flaky_step})
+    readiness.begin(*main_module.WARMUP_STEPS)
+
+    assert (await client.get("/health")).status_code == 200
+    response = await client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["pending"] == ["cache", "seed"]
+
+    await main_module.startup_warmup_task()
+    assert calls == ["ok", "flaky", "flaky"]
+    assert [name for name, _ in profile.stages] == ["aquecimento: cache", "aquecimento: seed", "aquecimento: seed"]
+
+    response = await client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["failed"] == {}
+
+
+@pytest.mark.asyncio
+async def test_failed_warmup_keeps_not_ready(client: AsyncClient, fresh_state, monkeypatch):
+    readiness, _ = fresh_state
+
+    async def failing_step() -> None:
+        raise RuntimeError("sem conexão")
+
+    monkeypatch.setattr(main_module, "WARMUP_STEPS", {"seed": failing_step})
+    readiness.begin(*main_module.WARMUP_STEPS)
+    await main_module.startup_warmup_task()
+
+    response = await client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "failed"
+    assert response.json()["failed"] == {"seed": "sem conexão"}
+
+
+@pytest.mark.asyncio
+async def test_warmup_indexes_see_seed(client: AsyncClient, fresh_state, monkeypatch):
+    readiness, _ = fresh_state
+    limiter.reset()
+    monkeypatch.setattr(main_module, "SessionLocal", TestSessionFactory)
+    monkeypatch.setattr(identifier_filter, "index", identifier_filter.IdentifierIndex())
+    monkeypatch.setattr(typeahead, "index", typeahead.TypeaheadIndex())
+    readiness.begin(*main_module.WARMUP_STEPS)
+
+    await main_module.startup_warmup_task()
+    assert (await client.get("/ready")).status_code == 200
+
+    assert identifier_filter.index.might_contain((identifier_filter.USER_EMAIL, "admin@example.com"))
+    response = await client.post("/api/login", json={"email": "admin@example.com", "password": "senhaadmin"})
+    assert response.status_code == 200
+    assert len(typeahead.index.patients) > 0 and len(typeahead.index.professionals) > 0
+
+
+def test_heavy_modules_not_imported_at_startup():
+    code = (
+        "import sys, app.main; "
+        "print(','.join(m for m in ('httpx', 'passlib', 'smtplib') if m in sys.modules))"
+    )
+    env = {**os.environ, "DATABASE_URL": "sqlite+aiosqlite:///:memory:", "SECRET_KEY": "test-secret-key-for-pytest"}
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=Path(__file__).parent.parent, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == ""
@@ -0,0 +1,170 @@
+"""
+test_summaries.py — Testes dos resumos clínicos por IA (jobs em segundo plano + cache).
+
+Cenários cobertos:
+- Primeiro pedido cria um job (202) que é concluído em segundo plano
+- Pedido repetido com as mesmas mensagens → resumo do cache, sem chamar o provedor
+- Nova mensagem salva → nova chave de cache e novo job
+- Falha do provedor → job com status "error"
+- Sem mensagens salvas → 400; job inexistente → 404
+- Históricos longos: resumo por mês em cache; nova mensagem só reprocessa o mês dela
+- Reduce hierárquico quando há mais períodos do que cabem em um prompt
+"""
+
+from datetime import datetime, timezone
+
+import pytest
+from httpx import AsyncClient
+
+from app import summaries
+from app.config import settings
+from app.models import PatientMessage
+from tests.conftest import TestSessionFactory
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Helpers
+# ─────────────────────────────────────────────────────────────────────
+
+class FakeProvider:
+    """Provedor local: devolve um texto fixo e conta as chamadas."""
+
+    model = "fake-model"
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+        self.prompts: list[str] = []
+
+    def is_configured(self) -> bool:
+        return True
+
+    async def complete(self, prompt: str, max_tokens: int) -> str:
+        self.calls += 1
+        self.prompts.append(prompt)
+        if self.fail:
+            raise RuntimeError("provedor indisponível")
+        return f"Resumo #{self.calls}"
+
+
+@pytest.fixture()
+def provider(monkeypatch) -> FakeProvider:
+    fake = FakeProvider()
+    monkeypatch.setitem(summaries._PROVIDERS, "fake", lambda: fake)
+    monkeypatch.setattr(settings, "SUMMARY_PROVIDER", "fake")
+    monkeypatch.setattr(summaries, "SessionLocal", TestSessionFactory)
+    return fake
+
+
+def _auth_headers(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def _save_message(db_session, patient_id: int, text: str, created_at: datetime | None = None) -> None:
+    extra = {"created_at": created_at} if created_at else {}
+    db_session.add(PatientMessage(patient_id=patient_id, message=text, saved=True, is_read=True, **extra))
+    await db_session.commit()
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Testes
+# ─────────────────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_summary_job_then_cache(client: AsyncClient, valid_token: str, patient, db_session, provider):
+    patient_id = patient.id
+    await _save_message(db_session, patient_id, "Tenho dormido mal.")
+    url = f"/api/patients/{patient_id}/summary"
+
+    response = await client.post(url, headers=_auth_headers(valid_token))
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    # O ASGITransport executa a tarefa em segundo plano antes de devolver a resposta
+    job = await client.get(f"/api/patients/summary-jobs/{job_id}", headers=_auth_headers(valid_token))
+    assert job.json()["status"] == "done"
+    assert job.json()["summary"] == "Resumo #1"
+    assert job.json()["messages_count"] == 1
+
+    cached = await client.post(url, headers=_auth_headers(valid_token))
+    assert cached.status_code == 200
+    assert cached.json() == {"status": "done", "summary": "Resumo #1", "messages_count": 1, "cached": True}
+    assert provider.calls == 1
+
+    # Mensagem nova → outra chave, outro job
+    await _save_message(db_session, patient_id, "Hoje foi melhor.")
+    response = await client.post(url, headers=_auth_headers(valid_token))
+    assert response.status_code == 202
+    assert provider.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_summary_job_records_provider_error(client: AsyncClient, valid_token: str, patient, db_session, provider):
+    patient_id = patient.id
+    await _save_message(db_session, patient_id, "Ansiedade no trabalho.")
+    provider.fail = True
+
+    response = await client.post(f"/api/patients/{patient_id}/summary", headers=_auth_headers(valid_token))
+    job = await client.get(
+        f"/api/patients/summary-jobs/{response.json()['job_id']}", headers=_auth_headers(valid_token)
+    )
+    assert job.json()["status"] == "error"
+    assert job.json()["summary"] is None
+
+
+@pytest.mark.asyncio
+async def test_summary_without_saved_messages(client: AsyncClient, valid_token: str, patient, provider):
+    response = await client.post(f"/api/patients/{patient.id}/summary", headers=_auth_headers(valid_token))
+    assert response.status_code == 400
+
+    response = await client.get("/api/patients/summary-jobs/999", headers=_auth_headers(valid_token))
+    assert response.status_code == 404
+
+
+# ─────────────────────────────────────────────────────────────────────
+# Testes do map-reduce
+# ─────────────────────────────────────────────────────────────────────
+
+def _month(month: int, day: int = 1) -> datetime:
+    return datetime(2025, month, day, 10, 0, tzinfo=timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_long_history_only_summarizes_new_period(db_session, patient, provider, monkeypatch):
+    """1ª vez: 3 meses + junção. Nova mensagem em março: só março + junção."""
+    monkeypatch.setattr(summaries, "DIRECT_MAX_CHARS", 10)
+    for month in (1, 2, 3):
+        await _save_message(db_session, patient.id, f"Relato do mês {month}", _month(month))
+
+    messages = await summaries.saved_messages(db_session, patient.id)
+    await summaries.summarize(db_session, provider, patient, messages)
+    assert provider.calls == 4
+    assert "[2025-01]" in provider.prompts[-1] and "[2025-03]" in provider.prompts[-1]
+
+    await _save_message(db_session, patient.id, "Novo relato", _month(3, 20))
+    messages = await summaries.saved_messages(db_session, patient.id)
+    await summaries.summarize(db_session, provider, patient, messages)
+    assert provider.calls == 6
+    assert "2025-03" in provider.prompts[-2] and "Novo relato" in provider.prompts[-2]
+
+
+@pytest.mark.asyncio
+async def test_hierarchical_reduce_and_month_split(db_session, patient, provider, monkeypatch):
+    monkeypatch.setattr(summaries, "DIRECT_MAX_CHARS", 10)
+    monkeypatch.setattr(summaries, "REDUCE_FANIN", 2)
+    monkeypatch.setattr(summaries, "CHUNK_MAX_CHARS", 30)
+    for month in (1, 2, 3):
+        await _save_message(db_session, patient.id, f"Relato do mês {month}", _month(month))
+    await _save_message(db_session, patient.id, "Segundo relato de março", _month(3, 15))
+
+    messages = await summaries.saved_messages(db_session, patient.id)
+    assert [p for p, _ in summaries.period_chunks(messages)] == ["2025-01", "2025-02", "2025-03", "2025-03#2"]
+
+    await summaries.summarize(db_session, provider, patient, messages)
+    # 4 parciais → 2 junções → resumo final
+    assert provider.calls == 4 + 2 + 1
+    assert "[2025-01..2025-02]" in provider.prompts[-1]
+    assert "[2025-03..2025-03#2]" in provider.prompts[-1]
+
+    await summaries.summarize(db_session, provider, patient, messages)
+    assert provider.calls == 8  # Tudo em cache, exceto o resumo final
@@ -0,0 +1,87 @@
+"""
+test_token_cache.py — Testes do cache de tokens validados (TokenCache em app/auth.py).
+
+Cenários cobertos:
+- Mesmo token de novo → claims vindas do cache, sem jwt.decode
+- Entrada vencida (exp) sai do cache e o token volta a ser validado
+- LRU limitado: o token menos usado sai quando o cache enche
+- Token revogado (app/revocation.py) → 401 mesmo já estando no cache
+- Rotas de debug usam a mesma validação: token de não-admin → 403, admin → 200
+"""
+
+import pytest
+from httpx import AsyncClient
+
+from app import auth, revocation
+from app.auth import TokenCache, create_access_token
+from app.revocation import RevocationList
+
+
+def _token(sub: str = "1", role: str = "admin") -> str:
+    return create_access_token({"sub": sub, "email": f"{sub}@clinic.com", "role": role})
+
+
+@pytest.fixture()
+def decode_calls(monkeypatch) -> list[str]:
+    calls: list[str] = []
+    original = auth._decode_uncached
+
+    def counting(token: str) -> dict:
+        calls.append(token)
+        return original(token)
+
+    monkeypatch.setattr(auth, "_decode_uncached", counting)
+    return calls
+
+
+def test_hit_skips_decode(decode_calls):
+    cache, token = TokenCache(maxsize=8), _token()
+    first = cache.decode(token)
+    first["role"] = "alterado"  # Cópia: não contamina o cache
+    second = cache.decode(token)
+    assert second["role"] == "admin"
+    assert len(decode_calls) == 1
+    assert cache.stats()["hits"] == 1
+
+
+def test_expired_entry_is_revalidated(decode_calls, monkeypatch):
+    cache, token = TokenCache(maxsize=8), _token()
+    exp = cache.decode(token)["exp"]
+    monkeypatch.setattr(auth.time, "time", lambda: exp + 1)
+    cache.decode(token)  # O relógio real do jwt.decode ainda aceita; o cache não
+    assert len(decode_calls) == 2
+
+
+def test_lru_is_bounded():
+    cache = TokenCache(maxsize=2)
+    a, b, c = _token("1"), _token("2"), _token("3")
+    cache.decode(a)
+    cache.decode(b)
+    cache.decode(a)  # "b" passa a ser o menos usado
+    cache.decode(c)
+    assert cache.stats()["size"] == 2
+    assert cache._digest(b) not in cache._entries
+    assert cache._digest(a) in cache._entries
+
+
+@pytest.mark.asyncio
+async def test_revoked_token_rejected_on_cache_hit(client: AsyncClient, valid_token: str, monkeypatch):
+    monkeypatch.setattr(auth, "token_cache", TokenCache(maxsize=8))
+    monkeypatch.setattr(revocation, "revocations", RevocationList())
+    headers = {"Authorization": f"Bearer {valid_token}"}
+    assert (await client.get("/api/patients", headers=headers)).status_code == 200
+
+    claims = auth.token_cache.decode(valid_token)
+    revocation.revocations.add(claims["jti"], float(claims["exp"]))
+    assert (await client.get("/api/patients", headers=headers)).status_code == 401
+    assert auth.token_cache.stats()["hits"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_debug_routes_share_validation(client: AsyncClient, valid_token: str):
+    response = await client.get("/api/debug/outbound-metrics", headers={"Authorization": f"Bearer {_token('9', 'user')}"})
+    assert response.status_code == 403
+    response = await client.get("/api/debug/outbound-metrics", headers={"Authorization": f"Bearer {valid_token}"})
+    assert response.status_code == 200
+    response = await client.get("/api/debug/outbound-metrics", headers={"Authorization": "Bearer invalido"})
+    assert response.status_code == 401